@@ -5,6 +5,7 @@ from dagger.dag.dag import (  # noqa
     Node,
     SupportedInputs,
     SupportedOutputs,
+    is_shuffled_output,
     validate_parameters,
 )
 from dagger.dag.topological_sort import CyclicDependencyError  # noqa
@@ -1,7 +1,7 @@
 """Define the data structure for a DAG and validate all its components upon initialization."""
 import re
 import warnings
-from typing import Any, List, Mapping, Optional, Set, Union
+from typing import Any, Iterable, List, Mapping, Optional, Set, Union
 from typing import get_args as get_type_args
 
 from dagger.dag.topological_sort import topological_sort
@@ -129,12 +129,18 @@ class DAG:
         self._outputs = outputs
         self._runtime_options = runtime_options or {}
         self._partition_by_input = partition_by_input
-        self._node_execution_order = topological_sort(
-            {
-                node_name: _node_dependencies(nodes[node_name].inputs)
-                for node_name in nodes
-            }
-        )
+        self._node_dependencies: Mapping[str, Set[str]] = {
+            node_name: _node_dependencies(nodes[node_name].inputs)
+            for node_name in nodes
+        }
+        self._node_dependents: Mapping[str, Set[str]] = {
+            node_name: set() for node_name in nodes
+        }
+        for node_name, dependencies in self._node_dependencies.items():
+            for dependency in dependencies:
+                self._node_dependents[dependency].add(node_name)
+
+        self._node_execution_order = topological_sort(self._node_dependencies)
 
     @property
     def nodes(self) -> Mapping[str, Node]:
@@ -161,6 +167,16 @@ class DAG:
         """Return the input this task should be partitioned by, if any."""
         return self._partition_by_input
 
+    @property
+    def node_dependencies(self) -> Mapping[str, Set[str]]:
+        """Get, for each node, the names of the nodes whose outputs it consumes."""
+        return self._node_dependencies
+
+    @property
+    def node_dependents(self) -> Mapping[str, Set[str]]:
+        """Get, for each node, the names of the nodes that consume its outputs."""
+        return self._node_dependents
+
     @property
     def node_execution_order(self) -> List[Set[str]]:
         """
@@ -174,6 +190,43 @@ class DAG:
         """
         return self._node_execution_order
 
+    def newly_ready_nodes(
+        self,
+        completed_nodes: Set[str],
+        newly_completed_nodes: Optional[Iterable[str]] = None,
+    ) -> Set[str]:
+        """
+        Get the nodes that may start executing after some other nodes have completed.
+
+        Runtimes can use this method to start each node as soon as its own dependencies are completed, instead of waiting for each set in `node_execution_order` to complete.
+
+        Parameters
+        ----------
+        completed_nodes
+            The names of all the nodes that have completed so far (including the ones that have just completed).
+
+        newly_completed_nodes
+            The names of the nodes that have just completed.
+            Only the nodes that depend on them are considered, so every node becomes ready exactly once throughout an execution.
+            If not specified, all nodes are considered. Use this to get the nodes that can be executed first.
+
+        Returns
+        -------
+        A set with the names of the nodes that have not completed yet, but whose dependencies have all completed.
+        """
+        if newly_completed_nodes is None:
+            candidates = set(self._nodes)
+        else:
+            candidates = set().union(
+                *[self._node_dependents[node] for node in newly_completed_nodes]
+            )
+
+        return {
+            node_name
+            for node_name in candidates - completed_nodes
+            if self._node_dependencies[node_name] <= completed_nodes
+        }
+
     def __repr__(self) -> str:
         """Return a human-readable representation of the DAG."""
         return f"DAG(inputs={self._inputs}, outputs={self._outputs}, runtime_options={self._runtime_options}, partition_by_input={self._partition_by_input}, nodes={self._nodes})"
@@ -191,6 +244,7 @@ class DAG:
 def validate_parameters(
     inputs: Mapping[str, SupportedInputs],
     params: Mapping[str, Any],
+    validate_serialization: bool = True,
 ):
     """
     Validate a series of parameters against the inputs of a DAG.
@@ -204,6 +258,10 @@ def validate_parameters(
         A mapping of input names to parameters or input values.
         Input values must be passed in their serialized representation.
 
+    validate_serialization
+        Whether to check that each parameter can be serialized with the serializer of its input.
+        This serializes every parameter, which may be expensive for large values.
+
     Raises
     ------
     ValueError
@@ -224,6 +282,9 @@ def validate_parameters(
             f"The following parameters were supplied to this DAG, but are not necessary: {sorted(list(superfluous_params))}"
         )
 
+    if not validate_serialization:
+        return
+
     for input_name in inputs:
         try:
             inputs[input_name].serializer.serialize(params[input_name])
@@ -233,6 +294,19 @@ def validate_parameters(
             )
 
 
+def is_shuffled_output(node: Node, output_name: str) -> bool:
+    """
+    Return true if an output of a node is shuffled before it is consumed.
+
+    Keyed outputs generated by each of the partitions of a node are shuffled, so that the nodes partitioned by them receive the values of a whole key group (coming from all the partitions) on each partition.
+    """
+    return (
+        isinstance(node, Task)
+        and bool(node.partition_by_input)
+        and node.outputs[output_name].key_groups is not None
+    )
+
+
 def _validate_node_name(name: str):
     if not VALID_NAME.match(name):
         raise ValueError(
@@ -312,6 +386,7 @@ def _validate_node_input_dependency(
         else:
             _validate_input_from_node_output(
                 node_name=node_name,
+                input_name=input_name,
                 input_type=input_type,
                 dag_nodes=dag_nodes,
             )
@@ -342,6 +417,7 @@ def _validate_input_from_param(
 
 def _validate_input_from_node_output(
     node_name: str,
+    input_name: str,
     input_type: FromNodeOutput,
     dag_nodes: Mapping[str, Node],
 ):
@@ -361,7 +437,13 @@ def _validate_input_from_node_output(
             f"This input is serialized {input_type.serializer}. However, the output it references is serialized {referenced_node_outputs[input_type.output].serializer}."
         )
 
-    if (
+    if is_shuffled_output(dag_nodes[input_type.node], input_type.output):
+        node = dag_nodes[node_name]
+        if not isinstance(node, Task) or node.partition_by_input != input_name:
+            raise ValueError(
+                f"This input comes from a keyed output of node '{input_type.node}', which is partitioned. The key groups generated by each partition of a node are shuffled, so they may only be consumed by a task partitioned by them, which receives the values of a whole key group on each partition."
+            )
+    elif (
         dag_nodes[node_name].partition_by_input
         and dag_nodes[input_type.node].partition_by_input
     ):
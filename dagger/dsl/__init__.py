@@ -1,5 +1,5 @@
 """Define DAGs through an imperative domain-specific language."""
 
 from dagger.dsl.build import build  # noqa
-from dagger.dsl.dsl import DAG, task  # noqa
+from dagger.dsl.dsl import DAG, shuffle, task  # noqa
 from dagger.dsl.node_output_serializer import NodeOutputSerializer as Serialize  # noqa
@@ -263,17 +263,20 @@ def _build_task_output(
             node_output_reference.key_name,
             serializer=node_output_reference.serializer,
             is_partitioned=node_output_reference.is_partitioned,
+            key_groups=node_output_reference.key_groups,
         )
     elif isinstance(node_output_reference, NodeOutputPropertyUsage):
         return FromProperty(
             node_output_reference.property_name,
             serializer=node_output_reference.serializer,
             is_partitioned=node_output_reference.is_partitioned,
+            key_groups=node_output_reference.key_groups,
         )
     elif isinstance(node_output_reference, NodeOutputUsage):
         return FromReturnValue(
             serializer=node_output_reference.serializer,
             is_partitioned=node_output_reference.is_partitioned,
+            key_groups=node_output_reference.key_groups,
         )
     elif isinstance(node_output_reference, NodeOutputPartitionUsage):
         return _build_task_output(node_output_reference.wrapped_reference)
@@ -303,6 +306,8 @@ def _build_node(
             },
             runtime_options=node_invocation.runtime_options,
             partition_by_input=node_invocation.partition_by_input,
+            partitions_per_worker=node_invocation.partitions_per_worker,
+            vectorized=node_invocation.vectorized,
         )
     elif node_invocation.node_type == NodeType.DAG:
         return _build_from_parent(
@@ -1,10 +1,15 @@
 """Define DAGs through an imperative domain-specific language."""
 
-from typing import Any, Callable, Mapping
+from typing import Any, Callable, Iterator, Mapping, Sequence, Union
 
 from dagger.dsl.node_invocation_recorder import NodeInvocationRecorder
 from dagger.dsl.node_invocations import NodeType
+from dagger.dsl.node_output_key_usage import NodeOutputKeyUsage
+from dagger.dsl.node_output_property_usage import NodeOutputPropertyUsage
+from dagger.dsl.node_output_reference import NodeOutputReference
 from dagger.dsl.node_output_serializer import NodeOutputSerializer
+from dagger.dsl.node_output_usage import NodeOutputUsage
+from dagger.output.validators import validate_key_groups
 
 
 def DAG(
@@ -29,10 +34,22 @@ def DAG(
 def task(
     serializer: NodeOutputSerializer = NodeOutputSerializer(),
     runtime_options: Mapping[str, Any] = None,
+    partitions_per_worker: int = 1,
+    vectorized: bool = False,
 ) -> Callable[[Callable], NodeInvocationRecorder]:
     """
     Decorate a function as a Task.
 
+    When the task is invoked for each partition of an output, partitions_per_worker and vectorized control how its partitions are batched. Vectorized tasks receive a list with the value of each partition in a batch, and return a result per partition:
+
+    ```
+    @dsl.task(vectorized=True, partitions_per_worker=1000)
+    def square(numbers):
+        return numpy.asarray(numbers) ** 2
+    ```
+
+    See the documentation of `Task` for more details.
+
     You can check examples of how to use the DSL in the examples/dsl directory.
     """
     runtime_options = runtime_options or {}
@@ -43,6 +60,49 @@ def task(
             node_type=NodeType.TASK,
             serializer=serializer,
             runtime_options=runtime_options,
+            partitions_per_worker=partitions_per_worker,
+            vectorized=vectorized,
         )
 
     return decorator
+
+
+def shuffle(
+    output: Union[NodeOutputReference, Sequence[NodeOutputReference]],
+    key_groups: int,
+) -> Iterator:
+    """
+    Shuffle a keyed output into a number of key groups, and return an Iterator over them.
+
+    The output must be a mapping, or an iterable of (key, value) pairs. The values of each key, generated by every partition of the node, are grouped together. Nodes that iterate over the key groups are partitioned by them, receiving a list of (key, list of values) pairs on each partition:
+
+    ```
+    @dsl.DAG()
+    def dag():
+        for line in read_lines():
+            counts = count_words(line)
+
+        for key_group in dsl.shuffle(counts, key_groups=4):
+            sum_counts(key_group)
+    ```
+
+    The outputs of a partitioned node may also be passed as a list, the same way they are passed to a node that fans them in (e.g. `dsl.shuffle([count_words(line) for line in read_lines()], key_groups=4)`).
+
+    You can check examples of how to use the DSL in the examples/dsl directory.
+    """
+    if (
+        isinstance(output, Sequence)
+        and len(output) == 1
+        and isinstance(output[0], NodeOutputReference)
+    ):
+        output = output[0]
+
+    if not isinstance(
+        output, (NodeOutputUsage, NodeOutputKeyUsage, NodeOutputPropertyUsage)
+    ):
+        raise ValueError(
+            f"Only the outputs of a node may be shuffled. Instead, we received an object of type '{type(output).__name__}'."
+        )
+
+    validate_key_groups(key_groups)
+    return output._shuffle(key_groups)
@@ -1,5 +1,6 @@
 """Data structures that hold information about certain elements being invoked or used throughout the definition of a DAG using the imperative DSL."""
 
+import functools
 import inspect
 import uuid
 from typing import Any, Callable, Mapping, Optional, Sequence
@@ -32,12 +33,16 @@ class NodeInvocationRecorder:
         serializer: NodeOutputSerializer = NodeOutputSerializer(),
         runtime_options: Mapping[str, Any] = None,
         override_id: Optional[str] = None,
+        partitions_per_worker: int = 1,
+        vectorized: bool = False,
     ):
         self._func = func
         self._node_type = node_type
         self._serializer = serializer
         self._runtime_options = runtime_options or {}
         self._overridden_id = override_id
+        self._partitions_per_worker = partitions_per_worker
+        self._vectorized = vectorized
 
     def __call__(self, *args, **kwargs) -> NodeOutputUsage:
         """
@@ -77,6 +82,8 @@ class NodeInvocationRecorder:
                 output=output,
                 runtime_options=self._runtime_options,
                 partition_by_input=partition_by_input,
+                partitions_per_worker=self._partitions_per_worker,
+                vectorized=self._vectorized,
             ),
         )
         node_invocations.set(invocations)
@@ -162,9 +169,8 @@ class NodeInvocationRecorder:
                 preset_params[argument_name] = argument_value
 
         if preset_params:
-            return lambda *args, **kwargs: self._func(
-                *args, **{**kwargs, **preset_params}
-            )
+            # A partial (unlike a closure) can be pickled, which allows the task to run in a separate process
+            return functools.partial(self._func, **preset_params)
 
         return self._func
 
@@ -207,4 +213,6 @@ class NodeInvocationRecorder:
             and self._overridden_id == obj._overridden_id
             and self._serializer == obj._serializer
             and self._runtime_options == obj._runtime_options
+            and self._partitions_per_worker == obj._partitions_per_worker
+            and self._vectorized == obj._vectorized
         )
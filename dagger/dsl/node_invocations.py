@@ -28,6 +28,8 @@ class NodeInvocation(NamedTuple):
     output: NodeOutputUsage
     runtime_options: Optional[Mapping[str, Any]] = None
     partition_by_input: Optional[str] = None
+    partitions_per_worker: int = 1
+    vectorized: bool = False
 
 
 def is_node_input_reference(obj: Any):
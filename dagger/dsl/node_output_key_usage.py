@@ -1,6 +1,6 @@
 """Data structure that represents the usage of a specific key of a node output."""
 
-from typing import Iterator
+from typing import Iterator, Optional
 
 from dagger.dsl.node_output_partition_usage import NodeOutputPartitionUsage
 from dagger.serializer import Serializer
@@ -37,6 +37,7 @@ class NodeOutputKeyUsage:
         self._serializer = serializer
         self._references_node_partition = references_node_partition
         self._is_partitioned = False
+        self._key_groups: Optional[int] = None
 
     @property
     def invocation_id(self) -> str:
@@ -68,6 +69,11 @@ class NodeOutputKeyUsage:
         """Return true if the output comes from a partitioned node.."""
         return self._references_node_partition
 
+    @property
+    def key_groups(self) -> Optional[int]:
+        """Return the number of key groups this output is shuffled into, or None if it is not shuffled."""
+        return self._key_groups
+
     def consume(self):
         """Mark this output as consumed by another node."""
         pass
@@ -77,6 +83,12 @@ class NodeOutputKeyUsage:
         self._is_partitioned = True
         return iter([NodeOutputPartitionUsage(self)])
 
+    def _shuffle(self, key_groups: int) -> Iterator:
+        """Return an Iterator over the key groups this output is shuffled into. See `dsl.shuffle`."""
+        self._is_partitioned = True
+        self._key_groups = key_groups
+        return iter([NodeOutputPartitionUsage(self)])
+
     def __repr__(self) -> str:
         """Get a human-readable string representation of this instance."""
         return f"NodeOutputKeyUsage(invocation_id={self._invocation_id}, output_name={self._output_name}, key_name={self._key_name}, serializer={self._serializer}, is_partitioned={self._is_partitioned}, references_node_partition={self._references_node_partition})"
@@ -90,6 +102,7 @@ class NodeOutputKeyUsage:
             and self._key_name == obj._key_name
             and self._serializer == obj._serializer
             and self._is_partitioned == obj._is_partitioned
+            and self._key_groups == obj._key_groups
             and self._references_node_partition == obj._references_node_partition
         )
 
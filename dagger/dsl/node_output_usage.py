@@ -1,6 +1,6 @@
 """Data structure that represents the usage of a node output."""
 
-from typing import Iterator, Set
+from typing import Iterator, Optional, Set
 
 from dagger.dsl.node_output_key_usage import NodeOutputKeyUsage
 from dagger.dsl.node_output_partition_usage import NodeOutputPartitionUsage
@@ -67,6 +67,7 @@ class NodeOutputUsage:
         self._serializer = serializer
         self._references_node_partition = references_node_partition
         self._is_partitioned = False
+        self._key_groups: Optional[int] = None
 
     @property
     def invocation_id(self) -> str:
@@ -99,6 +100,11 @@ class NodeOutputUsage:
         """Return true if the output comes from a partitioned node.."""
         return self._references_node_partition
 
+    @property
+    def key_groups(self) -> Optional[int]:
+        """Return the number of key groups this output is shuffled into, or None if it is not shuffled."""
+        return self._key_groups
+
     @property
     def references(self) -> Set[NodeOutputReference]:
         """
@@ -176,6 +182,13 @@ class NodeOutputUsage:
         self._references.add(self)
         return iter([NodeOutputPartitionUsage(self)])
 
+    def _shuffle(self, key_groups: int) -> Iterator:
+        """Return an Iterator over the key groups this output is shuffled into. See `dsl.shuffle`."""
+        self._is_partitioned = True
+        self._key_groups = key_groups
+        self._references.add(self)
+        return iter([NodeOutputPartitionUsage(self)])
+
     def __repr__(self) -> str:
         """Get a human-readable string representation of this output usage."""
         return f"NodeOutputUsage(invocation_id={self._invocation_id})"
@@ -186,6 +199,7 @@ class NodeOutputUsage:
             isinstance(obj, NodeOutputUsage)
             and self._invocation_id == obj._invocation_id
             and self._is_partitioned == obj._is_partitioned
+            and self._key_groups == obj._key_groups
             and self._references_node_partition == obj._references_node_partition
         )
 
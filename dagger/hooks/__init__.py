@@ -0,0 +1,5 @@
+"""Observe each step of the execution of a DAG, e.g. to trace or profile it."""
+
+from dagger.hooks.chrome_trace import ChromeTrace  # noqa
+from dagger.hooks.hooks import Hooks  # noqa
+from dagger.hooks.registry import register, registered, unregister  # noqa
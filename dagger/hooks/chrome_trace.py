@@ -0,0 +1,202 @@
+"""Record the steps of the execution of a DAG as a trace that can be opened in Perfetto or chrome://tracing."""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from dagger.hooks.hooks import Hooks
+
+
+class ChromeTrace(Hooks):
+    """
+    Record a span for each node, partition, (de)serialization and file read/write, in the Chrome trace-event format.
+
+    Pass an instance to `local.invoke` (or use the `--trace` flag of the CLI runtime), and write it as JSON once the invocation finishes. The file can be opened in https://ui.perfetto.dev or chrome://tracing:
+
+    ```
+    trace = ChromeTrace()
+    invoke(dag, executor=executor, trace=trace)
+    trace.write_json("trace.json")
+    ```
+
+    Spans are laid out per process and thread, so you can see which worker ran each partition, when workers were idle, and how much of each partition was spent serializing its outputs. Nodes may overlap in time, so they are recorded as asynchronous spans, which get their own tracks.
+
+    Partitions that run in worker processes (e.g. with a ProcessPoolExecutor) are not recorded, since the trace only observes the process it was created in.
+    """
+
+    def __init__(self):
+        """Initialize an empty trace."""
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._events: List[Dict[str, Any]] = []
+        self._open_spans: Dict[Tuple[str, str, int], float] = {}
+        self._named_threads: Dict[int, str] = {}
+
+    @property
+    def events(self) -> List[Dict[str, Any]]:
+        """Return the trace events recorded so far."""
+        with self._lock:
+            return list(self._events)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the trace in the Chrome trace-event format, as a dictionary of built-in types."""
+        return {"traceEvents": self.events, "displayTimeUnit": "ms"}
+
+    def write_json(self, path: str):
+        """Write the trace into a JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    def node_start(self, address: str):
+        """Open an asynchronous span for the node."""
+        self._add_event(
+            {"name": address, "cat": "node", "ph": "b", "id": address},
+            self._now(),
+        )
+
+    def node_end(self, address: str, error: Optional[BaseException]):
+        """Close the asynchronous span of the node."""
+        self._add_event(
+            {
+                "name": address,
+                "cat": "node",
+                "ph": "e",
+                "id": address,
+                "args": _args(error=error),
+            },
+            self._now(),
+        )
+
+    def partition_start(self, address: str):
+        """Open a span for the partition in the current thread."""
+        self._open("partition", address)
+
+    def partition_end(self, address: str, error: Optional[BaseException]):
+        """Record the span of the partition in the current thread."""
+        self._close("partition", address, name=address, args=_args(error=error))
+
+    def serialize_start(self, address: str, output_name: str):
+        """Open a span for the serialization of the output."""
+        self._open("serialize", f"{address}:{output_name}")
+
+    def serialize_end(
+        self,
+        address: str,
+        output_name: str,
+        size: int,
+        error: Optional[BaseException],
+    ):
+        """Record the span of the serialization of the output."""
+        self._close(
+            "serialize",
+            f"{address}:{output_name}",
+            name=f"serialize {output_name}",
+            args=_args(node=address, bytes=size, error=error),
+        )
+
+    def deserialize_start(self, address: str, input_name: str):
+        """Open a span for the deserialization of the input."""
+        self._open("deserialize", f"{address}:{input_name}")
+
+    def deserialize_end(
+        self,
+        address: str,
+        input_name: str,
+        size: int,
+        error: Optional[BaseException],
+    ):
+        """Record the span of the deserialization of the input."""
+        self._close(
+            "deserialize",
+            f"{address}:{input_name}",
+            name=f"deserialize {input_name}",
+            args=_args(node=address, bytes=size, error=error),
+        )
+
+    def io_read_start(self, location: str):
+        """Open a span for the read."""
+        self._open("io", location)
+
+    def io_read_end(self, location: str, size: int, error: Optional[BaseException]):
+        """Record the span of the read."""
+        self._close(
+            "io",
+            location,
+            name="read",
+            args=_args(location=location, bytes=size, error=error),
+        )
+
+    def io_write_start(self, location: str):
+        """Open a span for the write."""
+        self._open("io", location)
+
+    def io_write_end(self, location: str, size: int, error: Optional[BaseException]):
+        """Record the span of the write."""
+        self._close(
+            "io",
+            location,
+            name="write",
+            args=_args(location=location, bytes=size, error=error),
+        )
+
+    def _now(self) -> float:
+        """Return the microseconds elapsed since the trace was created."""
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def _open(self, category: str, key: str):
+        started_at = self._now()
+        with self._lock:
+            self._open_spans[(category, key, threading.get_ident())] = started_at
+
+    def _close(self, category: str, key: str, name: str, args: Dict[str, Any]):
+        ended_at = self._now()
+        with self._lock:
+            started_at = self._open_spans.pop(
+                (category, key, threading.get_ident()), ended_at
+            )
+
+        self._add_event(
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "dur": ended_at - started_at,
+                "args": args,
+            },
+            started_at,
+        )
+
+    def _add_event(self, event: Dict[str, Any], timestamp: float):
+        thread_id = threading.get_ident()
+        event.update(ts=timestamp, pid=os.getpid(), tid=thread_id)
+
+        with self._lock:
+            if thread_id not in self._named_threads:
+                # Metadata events label each thread with its name in the trace viewer
+                thread_name = threading.current_thread().name
+                self._named_threads[thread_id] = thread_name
+                self._events.append(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": event["pid"],
+                        "tid": thread_id,
+                        "args": {"name": thread_name},
+                    }
+                )
+
+            self._events.append(event)
+
+    def __repr__(self) -> str:
+        """Get a human-readable string representation of the trace."""
+        return f"ChromeTrace(events={len(self.events)})"
+
+
+def _args(error: Optional[BaseException] = None, **kwargs) -> Dict[str, Any]:
+    """Return the arguments of a trace event, including the error that interrupted the step (if any)."""
+    if error is not None:
+        kwargs["error"] = f"{type(error).__name__}: {error}"
+
+    return kwargs
@@ -0,0 +1,141 @@
+"""Callbacks the runtimes invoke at each step of the execution of a DAG."""
+
+from typing import Optional, Sequence
+
+
+class Hooks:
+    """
+    Base class for the hooks called by the local runtime (`local.invoke`) and the CLI runtime while they invoke DAGs and tasks.
+
+    Every method does nothing by default. Subclass it and override the methods for the events you are interested in, then register an instance with `dagger.hooks.register`:
+
+    ```
+    class PrintNodes(Hooks):
+        def node_end(self, address, error):
+            print(f"{address} finished")
+
+    with dagger.hooks.registered(PrintNodes()):
+        local.invoke(dag)
+    ```
+
+    Nodes and partitions are identified by their address in the DAG. Nested nodes are separated by dots (e.g. "nested-dag.task"), and each partition of a partitioned node is identified by its index (e.g. "task[2]"). Locations are paths in the local filesystem.
+
+    Every "start" event is followed by the matching "end" event, which receives the exception that interrupted the step (or None if it succeeded). When a node fails, the nodes of the same DAG that were still running receive a "node_end" with that same exception, since the runtime stops waiting for them.
+
+    Hooks are called synchronously, from the thread that performs each step. When the runtime runs nodes concurrently, hooks need to be thread-safe. When it runs them in worker processes (e.g. with a ProcessPoolExecutor), the task-level events ("partition_*" and "serialize_*") are only observed by the hooks registered in the worker processes.
+    """
+
+    def node_start(self, address: str):
+        """Call when a node is ready to run, and the runtime starts invoking it."""
+
+    def node_end(self, address: str, error: Optional[BaseException]):
+        """Call when all the partitions of a node completed, or the node failed."""
+
+    def partition_start(self, address: str):
+        """Call when the runtime starts invoking a task. Tasks that are not partitioned are invoked as a single partition with the address of the node."""
+
+    def partition_end(self, address: str, error: Optional[BaseException]):
+        """Call when the invocation of a task completed, including the serialization of its outputs."""
+
+    def serialize_start(self, address: str, output_name: str):
+        """Call before serializing one of the outputs of a task. Partitioned outputs are serialized in a single step."""
+
+    def serialize_end(
+        self,
+        address: str,
+        output_name: str,
+        size: int,
+        error: Optional[BaseException],
+    ):
+        """Call after serializing one of the outputs of a task, with the size in bytes of the serialized output."""
+
+    def deserialize_start(self, address: str, input_name: str):
+        """Call before deserializing one of the inputs of a node. Each partition of a partitioned input is deserialized in a separate step."""
+
+    def deserialize_end(
+        self,
+        address: str,
+        input_name: str,
+        size: int,
+        error: Optional[BaseException],
+    ):
+        """Call after deserializing one of the inputs of a node, with the size in bytes of the serialized input."""
+
+    def io_read_start(self, location: str):
+        """Call before reading a serialized input from a location."""
+
+    def io_read_end(self, location: str, size: int, error: Optional[BaseException]):
+        """Call after reading a serialized input from a location, with the number of bytes read."""
+
+    def io_write_start(self, location: str):
+        """Call before writing a serialized output into a location."""
+
+    def io_write_end(self, location: str, size: int, error: Optional[BaseException]):
+        """Call after writing a serialized output into a location, with the number of bytes written."""
+
+
+class _HooksDispatcher(Hooks):
+    """Call several hooks, in the order they were registered."""
+
+    def __init__(self, hooks: Sequence[Hooks]):
+        self._hooks = tuple(hooks)
+
+    def node_start(self, address: str):
+        for hooks in self._hooks:
+            hooks.node_start(address)
+
+    def node_end(self, address: str, error: Optional[BaseException]):
+        for hooks in self._hooks:
+            hooks.node_end(address, error)
+
+    def partition_start(self, address: str):
+        for hooks in self._hooks:
+            hooks.partition_start(address)
+
+    def partition_end(self, address: str, error: Optional[BaseException]):
+        for hooks in self._hooks:
+            hooks.partition_end(address, error)
+
+    def serialize_start(self, address: str, output_name: str):
+        for hooks in self._hooks:
+            hooks.serialize_start(address, output_name)
+
+    def serialize_end(
+        self,
+        address: str,
+        output_name: str,
+        size: int,
+        error: Optional[BaseException],
+    ):
+        for hooks in self._hooks:
+            hooks.serialize_end(address, output_name, size, error)
+
+    def deserialize_start(self, address: str, input_name: str):
+        for hooks in self._hooks:
+            hooks.deserialize_start(address, input_name)
+
+    def deserialize_end(
+        self,
+        address: str,
+        input_name: str,
+        size: int,
+        error: Optional[BaseException],
+    ):
+        for hooks in self._hooks:
+            hooks.deserialize_end(address, input_name, size, error)
+
+    def io_read_start(self, location: str):
+        for hooks in self._hooks:
+            hooks.io_read_start(location)
+
+    def io_read_end(self, location: str, size: int, error: Optional[BaseException]):
+        for hooks in self._hooks:
+            hooks.io_read_end(location, size, error)
+
+    def io_write_start(self, location: str):
+        for hooks in self._hooks:
+            hooks.io_write_start(location)
+
+    def io_write_end(self, location: str, size: int, error: Optional[BaseException]):
+        for hooks in self._hooks:
+            hooks.io_write_end(location, size, error)
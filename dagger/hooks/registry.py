@@ -0,0 +1,79 @@
+"""Register the hooks the runtimes call while they invoke DAGs and tasks."""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from dagger.hooks.hooks import Hooks, _HooksDispatcher
+
+active: Optional[Hooks] = None
+"""
+The hooks the runtimes should call, or None if no hooks are registered.
+
+Runtimes check this attribute once at each of their hot points, so invoking a DAG without hooks costs a single attribute lookup per step. When several hooks are registered, it holds a dispatcher that calls all of them in order.
+"""
+
+_registered: Tuple[Hooks, ...] = ()
+_lock = threading.Lock()
+
+
+def register(hooks: Hooks):
+    """
+    Register hooks, so the runtimes call them from now on.
+
+    Raises
+    ------
+    TypeError
+        If the hooks are not an instance of dagger.hooks.Hooks.
+
+    ValueError
+        If the hooks were already registered.
+    """
+    if not isinstance(hooks, Hooks):
+        raise TypeError(
+            f"Hooks should be an instance of dagger.hooks.Hooks. We found a value of type '{type(hooks).__name__}' instead."
+        )
+
+    with _lock:
+        if any(h is hooks for h in _registered):
+            raise ValueError(f"The hooks {hooks} were already registered.")
+
+        _update(_registered + (hooks,))
+
+
+def unregister(hooks: Hooks):
+    """
+    Stop calling hooks that were previously registered.
+
+    Raises
+    ------
+    ValueError
+        If the hooks were not registered.
+    """
+    with _lock:
+        if not any(h is hooks for h in _registered):
+            raise ValueError(f"The hooks {hooks} were not registered.")
+
+        _update(tuple(h for h in _registered if h is not hooks))
+
+
+@contextmanager
+def registered(hooks: Hooks) -> Iterator[Hooks]:
+    """Register hooks for the duration of a `with` block."""
+    register(hooks)
+    try:
+        yield hooks
+    finally:
+        unregister(hooks)
+
+
+def _update(hooks: Tuple[Hooks, ...]):
+    global active, _registered
+
+    _registered = hooks
+    if not hooks:
+        active = None
+    elif len(hooks) == 1:
+        active = hooks[0]
+    else:
+        active = _HooksDispatcher(hooks)
@@ -11,6 +11,7 @@ class FromNodeOutput:
         node: str,
         output: str,
         serializer: Serializer = DefaultSerializer,
+        lazy: bool = False,
     ):
         """
         Validate and initialize an input pointing to the output of a different node.
@@ -26,6 +27,11 @@ class FromNodeOutput:
         serializer
             The Serializer implementation to use to deserialize the input.
 
+        lazy
+            Whether to receive the partitions of a partitioned output as a lazy iterable, which deserializes them one at a time while the node iterates over them, instead of as a list with all of them deserialized.
+            Use it for nodes that fold over a large number of partitions (e.g. to reduce them), so only one of them is in memory at any time. It has no effect on outputs that are not partitioned, or on inputs the node is partitioned by.
+            Caches and run records fingerprint lazy inputs by hashing their serialized partitions, without deserializing them.
+
 
         Returns
         -------
@@ -34,6 +40,7 @@ class FromNodeOutput:
         self._node_name = node
         self._node_output_name = output
         self._serializer = serializer
+        self._lazy = lazy
 
     @property
     def node(self) -> str:
@@ -50,9 +57,14 @@ class FromNodeOutput:
         """Get the strategy to use in order to deserialize the supplied inputs."""
         return self._serializer
 
+    @property
+    def lazy(self) -> bool:
+        """Get whether the partitions of a partitioned output are deserialized lazily, while the node iterates over them."""
+        return self._lazy
+
     def __repr__(self) -> str:
         """Get a human-readable string representation of the input."""
-        return f"FromNodeOutput(node={self._node_name}, output={self._node_output_name}, serializer={self._serializer})"
+        return f"FromNodeOutput(node={self._node_name}, output={self._node_output_name}, serializer={self._serializer}, lazy={self._lazy})"
 
     def __eq__(self, obj):
         """Return true if both inputs are equivalent."""
@@ -61,6 +73,7 @@ class FromNodeOutput:
             and self._node_name == obj._node_name
             and self._node_output_name == obj._node_output_name
             and self._serializer == obj._serializer
+            and self._lazy == obj._lazy
         )
 
     def __hash__(self) -> int:
@@ -1,7 +1,8 @@
 """Output retrieved from a key, when the function returns a Mapping."""
 
-from typing import Generic, Mapping, TypeVar
+from typing import Generic, Mapping, Optional, TypeVar
 
+from dagger.output.validators import validate_key_groups
 from dagger.serializer import DefaultSerializer, Serializer
 
 K = TypeVar("K")
@@ -16,6 +17,7 @@ class FromKey(Generic[K, V]):
         name: K,
         serializer: Serializer = DefaultSerializer,
         is_partitioned: bool = False,
+        key_groups: Optional[int] = None,
     ):
         """
         Validate and initialize an output retrieved from a key.
@@ -31,10 +33,17 @@ class FromKey(Generic[K, V]):
 
         is_partitioned
             A flag indicating whether this output should be partitioned. Partitioned outputs are assumed to come from an Iterable object. Each item in the Iterable should be serializable with the specified serializer.
+
+        key_groups
+            If specified, the output is keyed. Keyed outputs are assumed to come from a mapping, or from an iterable of (key, value) pairs. The values are grouped by key, and the keys are split into this number of key groups, according to a hash of their serialized representation. The output is partitioned, with one partition per key group. Each partition is a list of (key, list of values) pairs, which should be serializable with the specified serializer.
+            When a partitioned node generates a keyed output, nodes partitioned by that output receive each key group with the values of every partition of the node (i.e. the output is shuffled). Consumers should not depend on the order of the values of each key.
         """
         self._name = name
         self._serializer = serializer
-        self._is_partitioned = is_partitioned
+        validate_key_groups(key_groups)
+
+        self._is_partitioned = is_partitioned or key_groups is not None
+        self._key_groups = key_groups
 
     @property
     def serializer(self) -> Serializer:
@@ -46,6 +55,11 @@ class FromKey(Generic[K, V]):
         """Return true if the output should be partitioned."""
         return self._is_partitioned
 
+    @property
+    def key_groups(self) -> Optional[int]:
+        """Return the number of key groups to split a keyed output into, or None if the output is not keyed."""
+        return self._key_groups
+
     def from_function_return_value(self, return_value: Mapping[K, V]) -> V:
         """
         Retrieve the output from the return value of the task's function.
@@ -83,7 +97,7 @@ class FromKey(Generic[K, V]):
 
     def __repr__(self) -> str:
         """Get a human-readable string representation of the output."""
-        return f"FromKey(key={self._name}, serializer={self._serializer}, is_partitioned={self._is_partitioned})"
+        return f"FromKey(key={self._name}, serializer={self._serializer}, is_partitioned={self._is_partitioned}, key_groups={self._key_groups})"
 
     def __eq__(self, obj) -> bool:
         """Return true if both outputs are equivalent."""
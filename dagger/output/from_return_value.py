@@ -1,7 +1,8 @@
 """Output retrieved directly from the return value of the task's function."""
 
-from typing import Generic, TypeVar
+from typing import Generic, Optional, TypeVar
 
+from dagger.output.validators import validate_key_groups
 from dagger.serializer import DefaultSerializer, Serializer
 
 T = TypeVar("T")
@@ -14,6 +15,7 @@ class FromReturnValue(Generic[T]):
         self,
         serializer: Serializer = DefaultSerializer,
         is_partitioned: bool = False,
+        key_groups: Optional[int] = None,
     ):
         """
         Validate and initialize an output retrieved from a key.
@@ -26,9 +28,16 @@ class FromReturnValue(Generic[T]):
 
         partitioned
             A flag indicating whether this output should be partitioned. Partitioned outputs are assumed to come from an Iterable object. Each item in the Iterable should be serializable with the specified serializer.
+
+        key_groups
+            If specified, the output is keyed. Keyed outputs are assumed to come from a mapping, or from an iterable of (key, value) pairs. The values are grouped by key, and the keys are split into this number of key groups, according to a hash of their serialized representation. The output is partitioned, with one partition per key group. Each partition is a list of (key, list of values) pairs, which should be serializable with the specified serializer.
+            When a partitioned node generates a keyed output, nodes partitioned by that output receive each key group with the values of every partition of the node (i.e. the output is shuffled). Consumers should not depend on the order of the values of each key.
         """
         self._serializer = serializer
-        self._is_partitioned = is_partitioned
+        validate_key_groups(key_groups)
+
+        self._is_partitioned = is_partitioned or key_groups is not None
+        self._key_groups = key_groups
 
     @property
     def serializer(self) -> Serializer:
@@ -40,6 +49,11 @@ class FromReturnValue(Generic[T]):
         """Return true if the output should be partitioned."""
         return self._is_partitioned
 
+    @property
+    def key_groups(self) -> Optional[int]:
+        """Return the number of key groups to split a keyed output into, or None if the output is not keyed."""
+        return self._key_groups
+
     def from_function_return_value(self, return_value: T) -> T:
         """Retrieve the output from the return value of the task's function."""
         return return_value
@@ -50,4 +64,4 @@ class FromReturnValue(Generic[T]):
 
     def __repr__(self) -> str:
         """Return a human-readable representation of the output."""
-        return f"FromReturnValue(serializer={self._serializer}, is_partitioned={self._is_partitioned})"
+        return f"FromReturnValue(serializer={self._serializer}, is_partitioned={self._is_partitioned}, key_groups={self._key_groups})"
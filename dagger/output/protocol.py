@@ -1,6 +1,6 @@
 """Protocol all outputs should conform to."""
 
-from typing import Any, Protocol, runtime_checkable
+from typing import Any, Optional, Protocol, runtime_checkable
 
 from dagger.serializer import Serializer
 
@@ -17,10 +17,14 @@ class Output(Protocol):  # pragma: no cover
 
     is_partitioned
         A flag indicating whether this output should be partitioned. Partitioned outputs are assumed to come from an Iterable object. Each item in the Iterable should be serializable with the specified serializer.
+
+    key_groups
+        The number of key groups a keyed output is split into, or None if the output is not keyed. Keyed outputs are always partitioned.
     """
 
     serializer: Serializer
     is_partitioned: bool
+    key_groups: Optional[int]
 
     def from_function_return_value(self, return_value: Any) -> Any:
         """
@@ -1,5 +1,6 @@
 """Validation functions applicable to all types of outputs."""
 import re
+from typing import Optional
 
 VALID_NAME_REGEX = r"^[a-zA-Z0-9][a-zA-Z0-9-_]{0,63}$"
 VALID_NAME = re.compile(VALID_NAME_REGEX)
@@ -18,3 +19,18 @@ def validate_name(name: str):
         raise ValueError(
             f"'{name}' is not a valid name for an output. Outputs must comply with the regex {VALID_NAME_REGEX}"
         )
+
+
+def validate_key_groups(key_groups: Optional[int]):
+    """
+    Verify whether a number of key groups is valid for a keyed output.
+
+    Raises
+    ------
+    ValueError
+        If the number of key groups is not a positive integer.
+    """
+    if key_groups is not None and key_groups < 1:
+        raise ValueError(
+            f"Keyed outputs need to be split into at least 1 key group. Instead, they were declared with {key_groups} key groups."
+        )
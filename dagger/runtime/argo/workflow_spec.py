@@ -1,12 +1,13 @@
 """Generate Workflow specifications."""
 import itertools
+import json
 import os
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Mapping, Sequence, Union
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
 
 from dagger.dag import DAG, Node
 from dagger.dag import SupportedInputs as SupportedDAGInputs
-from dagger.dag import validate_parameters
+from dagger.dag import is_shuffled_output, validate_parameters
 from dagger.input import FromNodeOutput, FromParam
 from dagger.runtime.argo.extra_spec_options import with_extra_spec_options
 from dagger.serializer import Serializer
@@ -15,6 +16,11 @@ from dagger.task import Task
 BASE_DAG_NAME = "dag"
 INPUT_PATH = "/tmp/inputs/"
 OUTPUT_PATH = "/tmp/outputs/"
+PLAN_PATH = os.path.join(OUTPUT_PATH, "plan")
+COMBINE_PLAN_PARAMETERS = ["level", "partitions", "prefix", "scratch"]
+COMBINE_PLAN_OUTPUTS = ["groups", "partitions", "prefix", "level", "final"]
+BATCH_PLAN_PARAMETERS = ["partitions"]
+BATCH_PLAN_OUTPUTS = ["batches"]
 
 
 @dataclass(frozen=True)
@@ -31,6 +37,7 @@ class Workflow:
         The container's entrypoint.
         It must run the specified DAG via the CLI runtime.
         Check the examples and documentation to understand better how to containerize your projects and expose your DAGs through the container.
+        It cannot include `--packed-partitions`, since Argo fans out partitioned nodes over a separate artifact per partition.
 
     params
         Parameters to inject to the DAG.
@@ -68,10 +75,15 @@ def workflow_spec(
     Raises
     ------
     ValueError
-        If any of the extra_spec_options collides with a property used by the runtime.
+        If any of the extra_spec_options collides with a property used by the runtime, or the container entrypoint packs partitioned outputs.
     """
     validate_parameters(inputs=dag.inputs, params=workflow.params)
 
+    if "--packed-partitions" in workflow.container_entrypoint_to_dag_cli:
+        raise ValueError(
+            "The container entrypoint of this workflow includes the '--packed-partitions' flag. Argo fans out partitioned nodes over a separate artifact per partition, so it cannot consume partitions packed into a single data file. Please remove the flag from the entrypoint. It is only supported by the CLI and local runtimes."
+        )
+
     spec = {
         "entrypoint": BASE_DAG_NAME,
         "templates": _templates(
@@ -108,6 +120,7 @@ def _templates(
     container_command: List[str],
     params: Mapping[str, Any],
     address: List[str] = None,
+    parent: Optional[DAG] = None,
 ) -> List[Mapping[str, Any]]:
     """
     Return a list of Template resources for all the sub-DAGs and sub-nodes.
@@ -137,6 +150,9 @@ def _templates(
         If not specified, it defaults to an empty list.
         The address should only be empty for the root node of the DAG.
 
+    parent
+        The DAG the node belongs to, or None for the root DAG.
+
 
     Returns
     -------
@@ -146,6 +162,22 @@ def _templates(
 
     if isinstance(node, Task):
         task = node
+        if parent is not None and _combined_partitions(task, parent) is not None:
+            return _combiner_templates(
+                task=task,
+                address=address,
+                container_image=container_image,
+                container_command=container_command,
+            )
+
+        if parent is not None and _batched_partitions(task, parent) is not None:
+            return _batch_templates(
+                task=task,
+                address=address,
+                container_image=container_image,
+                container_command=container_command,
+            )
+
         return [
             _task_template(
                 task=task,
@@ -172,6 +204,7 @@ def _templates(
                         container_image=container_image,
                         container_command=container_command,
                         params=params,
+                        parent=dag,
                     )
                     for node_name in dag.nodes
                 ],
@@ -329,6 +362,13 @@ def _dag_task(
         "template": _template_name(node_address),
     }
 
+    if _combined_partitions(node, parent) is not None:
+        dag_task["template"] += "-combine"
+
+    batched_partitions = _batched_partitions(node, parent)
+    if batched_partitions is not None:
+        dag_task["template"] += "-batches"
+
     dependencies = _dag_task_dependencies(node)
     if dependencies:
         dag_task["dependencies"] = dependencies
@@ -341,10 +381,12 @@ def _dag_task(
     if arguments:
         dag_task["arguments"] = arguments
 
-    if node.partition_by_input:
+    # Batches of partitions are planned by the template of the node
+    if node.partition_by_input and batched_partitions is None:
         dag_task["withParam"] = _dag_task_with_param(
             input_name=node.partition_by_input,
             input_type=node.inputs[node.partition_by_input],
+            parent=parent,
         )
 
     return dag_task
@@ -353,13 +395,25 @@ def _dag_task(
 def _dag_task_with_param(
     input_name: str,
     input_type: Union[FromParam, FromNodeOutput],
+    parent: Optional[DAG] = None,
 ) -> str:
     """
     Return the value for the withParam field in a DAGTask spec.
 
+    Nodes partitioned by a shuffled output are partitioned by its key groups, which are known in advance.
+
     Spec: https://argoproj.github.io/argo-workflows/fields/#dagtask
     """
-    if isinstance(input_type, FromParam):
+    if (
+        parent is not None
+        and isinstance(input_type, FromNodeOutput)
+        and is_shuffled_output(parent.nodes[input_type.node], input_type.output)
+    ):
+        source = parent.nodes[input_type.node]
+        assert isinstance(source, Task)
+        key_groups = source.outputs[input_type.output].key_groups or 0
+        return json.dumps([str(i) for i in range(key_groups)])
+    elif isinstance(input_type, FromParam):
         # As of version 1.0.0, this is not a valid map-reduce pattern and this should never happen
         return "{{" + f"workflow.parameters.{input_type.name or input_name}" + "}}"
     else:
@@ -393,7 +447,9 @@ def _dag_task_arguments(
 
     Spec: https://github.com/argoproj/argo-workflows/blob/v3.0.4/docs/fields.md#arguments
     """
-    parameters = []
+    parameters: List[Mapping[str, Any]] = []
+    combined_partitions = _combined_partitions(node, parent)
+    batched_partitions = _batched_partitions(node, parent)
 
     if isinstance(node, DAG):
         name_param = {
@@ -413,11 +469,36 @@ def _dag_task_arguments(
                     output_name=output_name,
                     serializer=output_type.serializer,
                     dag_outputs=parent.outputs,
-                    is_partitioned=bool(node.partition_by_input),
+                    # Shuffled outputs are stored by key group first, and by partition second
+                    is_partitioned=bool(node.partition_by_input)
+                    and not is_shuffled_output(node, output_name)
+                    and batched_partitions is None,
                 ),
             }
         )
 
+    if isinstance(node, Task) and _shuffled_outputs(node):
+        parameters.append({"name": "partition", "value": "{{item}}"})
+
+    if isinstance(node, Task) and combined_partitions is not None:
+        parameters.extend(
+            _combiner_dag_task_parameters(
+                task=node,
+                node_address=node_address,
+                partitions=combined_partitions,
+                parent=parent,
+            )
+        )
+
+    if isinstance(node, Task) and batched_partitions is not None:
+        parameters.extend(
+            _batch_dag_task_parameters(
+                task=node,
+                partitions=batched_partitions,
+                parent=parent,
+            )
+        )
+
     artifacts = [
         _dag_task_argument_artifact(
             node_address=node_address,
@@ -427,6 +508,10 @@ def _dag_task_arguments(
             dag_outputs=parent.outputs,
         )
         for input_name in node.inputs
+        # Combiners retrieve each partition of the input they combine separately
+        if combined_partitions is None or input_name != node.combine_input  # type: ignore
+        # And batches retrieve each partition of the input they are partitioned by
+        if batched_partitions is None or input_name != node.partition_by_input
     ]
 
     arguments: Dict[str, Any] = {}
@@ -504,17 +589,27 @@ def _task_template(
     address: List[str],
     container_image: str,
     container_command: List[str],
+    is_combining_partitions: bool = False,
+    is_batch: bool = False,
 ) -> Mapping[str, Any]:
     """
     Return a minimal representation of a Template that executes a specific Node.
 
+    When the task is a combiner that reduces the partitions of its input in a tree (is_combining_partitions), the template combines a single group of partitions.
+    When the task invokes several partitions per worker (is_batch), the template invokes a batch of partitions.
+
     https://github.com/argoproj/argo-workflows/blob/v3.0.4/docs/fields.md#template
     """
     template: dict = {
         "name": _template_name(address),
         "container": {
             "image": container_image,
-            "args": _task_template_container_arguments(task=task, address=address),
+            "args": _task_template_container_arguments(
+                task=task,
+                address=address,
+                is_combining_partitions=is_combining_partitions,
+                is_batch=is_batch,
+            ),
         },
     }
 
@@ -525,12 +620,16 @@ def _task_template(
         # of the entrypoints without affecting the rest
         template["container"]["command"] = container_command[:]
 
-    task_inputs = _task_template_inputs(task)
+    task_inputs = _task_template_inputs(
+        task,
+        is_combining_partitions=is_combining_partitions,
+        is_batch=is_batch,
+    )
     if task_inputs:
         template["inputs"] = task_inputs
 
     if task.outputs:
-        template["outputs"] = _task_template_outputs(task)
+        template["outputs"] = _task_template_outputs(task, is_batch=is_batch)
         template["volumes"] = [{"name": "outputs", "emptyDir": {}}]
         template["container"]["volumeMounts"] = [
             {"name": "outputs", "mountPath": OUTPUT_PATH}
@@ -550,28 +649,56 @@ def _task_template(
     )
 
 
-def _task_template_inputs(task: Task) -> Mapping[str, Any]:
+def _task_template_inputs(
+    task: Task,
+    is_combining_partitions: bool = False,
+    is_batch: bool = False,
+) -> Mapping[str, Any]:
     """
     Return a minimal representation of an Inputs object, mounting all the inputs a node needs as artifacts in a given path.
 
+    When the task combines a group of partitions, the input it combines is mounted as a directory, with an optional artifact for each of the partitions the group may contain.
+    Batches mount the input they are partitioned by in the same way. They also receive the name of each partition in the batch, to store its outputs under.
+
     Spec: https://github.com/argoproj/argo-workflows/blob/v3.0.4/docs/fields.md#inputs
     """
     parameters = [
         {"name": f"{output_name}_output_path"} for output_name in task.outputs
     ]
+    if _shuffled_outputs(task):
+        parameters.append({"name": "partition"})
 
-    artifacts = [
-        {
-            "name": input_name,
-            "path": os.path.join(
-                INPUT_PATH,
-                f"{input_name}.{task.inputs[input_name].serializer.extension}",
-            ),
-        }
-        for input_name in task.inputs
-    ]
+    if is_batch:
+        parameters.extend(
+            {"name": f"partition-{slot}"}
+            for slot in _partition_slots(task.partitions_per_worker)
+        )
+
+    artifacts: List[Mapping[str, Any]] = []
+    for input_name in task.inputs:
+        path = os.path.join(
+            INPUT_PATH,
+            f"{input_name}.{task.inputs[input_name].serializer.extension}",
+        )
 
-    inputs = {}
+        if (is_combining_partitions and input_name == task.combine_input) or (
+            is_batch and input_name == task.partition_by_input
+        ):
+            artifacts.extend(
+                {
+                    "name": f"{input_name}-{slot}",
+                    # Partitions are read in the lexicographical order of their filenames
+                    "path": os.path.join(path, slot),
+                    "optional": True,
+                }
+                for slot in _partition_slots(
+                    task.partitions_per_worker if is_batch else task.combine_group_size
+                )
+            )
+        else:
+            artifacts.append({"name": input_name, "path": path})
+
+    inputs: Dict[str, Any] = {}
 
     if parameters:
         inputs["parameters"] = parameters
@@ -582,12 +709,17 @@ def _task_template_inputs(task: Task) -> Mapping[str, Any]:
     return inputs
 
 
-def _task_template_outputs(task: Task) -> Mapping[str, Any]:
+def _task_template_outputs(task: Task, is_batch: bool = False) -> Mapping[str, Any]:
     """
     Return a minimal representation of an Outputs object, pointing all the outputs a node produces to artifacts in a given path.
 
+    Shuffled outputs are stored with an artifact per key group, under "<output path>/<key group>/<partition>". This way, the pieces of a key group generated by every partition can be retrieved together.
+    Batches store an optional artifact for each of the partitions they may contain, under "<output path>/<partition>", as if each partition had been invoked separately.
+
     Spec: https://github.com/argoproj/argo-workflows/blob/v3.0.4/docs/fields.md#outputs
     """
+    shuffled_outputs = _shuffled_outputs(task)
+
     parameters = [
         {
             "name": f"{output_name}_partitions",
@@ -598,25 +730,57 @@ def _task_template_outputs(task: Task) -> Mapping[str, Any]:
             },
         }
         for output_name, output_type in task.outputs.items()
-        if output_type.is_partitioned
+        if output_type.is_partitioned and output_name not in shuffled_outputs
     ]
 
-    artifacts = [
-        {
-            "name": output_name,
-            "path": os.path.join(
-                OUTPUT_PATH,
-                f"{output_name}.{task.outputs[output_name].serializer.extension}",
-            ),
-            "archive": {"none": {}},
-            "s3": {
-                "key": "{{inputs.parameters." + output_name + "_output_path}}",
-            },
-        }
-        for output_name in task.outputs
-    ]
+    artifacts: List[Mapping[str, Any]] = []
+    for output_name, output_type in task.outputs.items():
+        path = os.path.join(
+            OUTPUT_PATH,
+            f"{output_name}.{output_type.serializer.extension}",
+        )
+        output_path = "{{inputs.parameters." + output_name + "_output_path}}"
+
+        if is_batch:
+            artifacts.extend(
+                {
+                    "name": f"{output_name}-{slot}",
+                    "path": os.path.join(path, slot),
+                    "optional": True,
+                    "archive": {"none": {}},
+                    "s3": {
+                        "key": f"{output_path}/"
+                        + "{{"
+                        + f"inputs.parameters.partition-{slot}"
+                        + "}}",
+                    },
+                }
+                for slot in _partition_slots(task.partitions_per_worker)
+            )
+        elif output_name in shuffled_outputs:
+            artifacts.extend(
+                {
+                    "name": f"{output_name}-{i}",
+                    "path": os.path.join(path, str(i)),
+                    "archive": {"none": {}},
+                    "s3": {
+                        "key": f"{output_path}/{i}/"
+                        + "{{inputs.parameters.partition}}",
+                    },
+                }
+                for i in range(output_type.key_groups or 0)
+            )
+        else:
+            artifacts.append(
+                {
+                    "name": output_name,
+                    "path": path,
+                    "archive": {"none": {}},
+                    "s3": {"key": output_path},
+                }
+            )
 
-    outputs = {}
+    outputs: Dict[str, Any] = {}
     if parameters:
         outputs["parameters"] = parameters
 
@@ -629,6 +793,8 @@ def _task_template_outputs(task: Task) -> Mapping[str, Any]:
 def _task_template_container_arguments(
     task: Task,
     address: List[str],
+    is_combining_partitions: bool = False,
+    is_batch: bool = False,
 ) -> List[str]:
     """
     Return a list of arguments to supply to the CLI runtime to run a specific DAG node with a set of inputs and outputs mounted as artifacts.
@@ -639,11 +805,20 @@ def _task_template_container_arguments(
         itertools.chain(
             *[
                 ["--node-name", ".".join(address)],
+                ["--batch"] if is_batch else [],
                 *[
                     [
                         "--input",
                         input_name,
-                        "{{" + f"inputs.artifacts.{input_name}.path" + "}}",
+                        os.path.join(
+                            INPUT_PATH,
+                            f"{input_name}.{task.inputs[input_name].serializer.extension}",
+                        )
+                        if (
+                            is_combining_partitions and input_name == task.combine_input
+                        )
+                        or (is_batch and input_name == task.partition_by_input)
+                        else "{{" + f"inputs.artifacts.{input_name}.path" + "}}",
                     ]
                     for input_name in task.inputs
                 ],
@@ -651,7 +826,12 @@ def _task_template_container_arguments(
                     [
                         "--output",
                         output_name,
-                        "{{" + f"outputs.artifacts.{output_name}.path" + "}}",
+                        os.path.join(
+                            OUTPUT_PATH,
+                            f"{output_name}.{task.outputs[output_name].serializer.extension}",
+                        )
+                        if is_batch or is_shuffled_output(task, output_name)
+                        else "{{" + f"outputs.artifacts.{output_name}.path" + "}}",
                     ]
                     for output_name in task.outputs
                 ],
@@ -660,6 +840,444 @@ def _task_template_container_arguments(
     )
 
 
+def _shuffled_outputs(task: Task) -> List[str]:
+    """Return the names of the outputs of a task that are shuffled."""
+    return [
+        output_name
+        for output_name in task.outputs
+        if is_shuffled_output(task, output_name)
+    ]
+
+
+def _combined_partitions(node: Node, parent: DAG) -> Optional[str]:
+    """
+    Return the list of partitions a combiner reduces in a tree, as an Argo expression, or None if the node should be invoked with all of its inputs at once.
+
+    Combiners are only reduced in a tree when the input they combine comes from a partitioned node, or from the partitioned output of a task. Partitions are stored as separate artifacts in both cases.
+    """
+    if not isinstance(node, Task) or node.combine_input is None:
+        return None
+
+    input_type = node.inputs[node.combine_input]
+    if not isinstance(input_type, FromNodeOutput):
+        return None
+
+    source = parent.nodes[input_type.node]
+    if source.partition_by_input:
+        return _dag_task_with_param(
+            input_name=source.partition_by_input,
+            input_type=source.inputs[source.partition_by_input],
+            parent=parent,
+        )
+
+    if isinstance(source, Task) and source.outputs[input_type.output].is_partitioned:
+        return (
+            "{{"
+            + f"tasks.{input_type.node}.outputs.parameters.{input_type.output}_partitions"
+            + "}}"
+        )
+
+    return None
+
+
+def _combiner_dag_task_parameters(
+    task: Task,
+    node_address: List[str],
+    partitions: str,
+    parent: DAG,
+) -> List[Mapping[str, Any]]:
+    """Return the parameters that start the tree of a combiner with the partitions of the input it combines."""
+    input_type = task.inputs[task.combine_input]  # type: ignore
+    assert isinstance(input_type, FromNodeOutput)
+
+    return [
+        {"name": "level", "value": "0"},
+        {"name": "partitions", "value": partitions},
+        {
+            "name": "prefix",
+            "value": _dag_task_arguments_output_path(
+                node_name=input_type.node,
+                output_name=input_type.output,
+                serializer=input_type.serializer,
+                dag_outputs=parent.outputs,
+                is_partitioned=False,
+            ),
+        },
+        {
+            "name": "scratch",
+            "value": "{{workflow.uid}}/{{inputs.parameters.name}}/"
+            + f"{node_address[-1]}/combine",
+        },
+    ]
+
+
+def _combiner_templates(
+    task: Task,
+    address: List[str],
+    container_image: str,
+    container_command: List[str],
+) -> List[Mapping[str, Any]]:
+    """
+    Return the templates that reduce the partitions of the input of a combiner in a tree.
+
+    Each level of the tree is a DAG template that plans how to split the partitions into groups of (at most) combine_group_size partitions, combines every group in parallel, and invokes itself recursively with the results of the groups, until a single group is left. The result of the last group is the output of the combiner.
+    """
+    return [
+        _task_template(
+            task=task,
+            address=address,
+            container_image=container_image,
+            container_command=container_command,
+            is_combining_partitions=True,
+        ),
+        _combiner_dag_template(task=task, address=address),
+        _plan_template(
+            task=task,
+            name=f"{_template_name(address)}-plan",
+            address=address,
+            container_image=container_image,
+            container_command=container_command,
+            flag="--plan-combine",
+            parameters=COMBINE_PLAN_PARAMETERS,
+            outputs=COMBINE_PLAN_OUTPUTS,
+        ),
+    ]
+
+
+def _combiner_dag_template(
+    task: Task,
+    address: List[str],
+) -> Mapping[str, Any]:
+    """
+    Return a DAG template that combines a level of the tree of a combiner, and invokes itself recursively to combine the next one.
+
+    Argo (as of v3.0) cannot evaluate expressions in templates. Instead, the groups of each level, and the parameters of the next one, are computed by the CLI runtime in a separate container.
+    """
+    name = _template_name(address)
+    (output_name,) = task.outputs
+    output_path_param = f"{output_name}_output_path"
+    fixed_inputs = [
+        input_name for input_name in task.inputs if input_name != task.combine_input
+    ]
+    fixed_artifacts = [
+        {"name": input_name, "from": "{{" + f"inputs.artifacts.{input_name}" + "}}"}
+        for input_name in fixed_inputs
+    ]
+
+    def group_arguments(output_path: str) -> Mapping[str, Any]:
+        return {
+            "parameters": [{"name": output_path_param, "value": output_path}],
+            "artifacts": [
+                {
+                    "name": f"{task.combine_input}-{slot}",
+                    "s3": {"key": "{{" + f"item.p{i}" + "}}"},
+                }
+                for i, slot in enumerate(_partition_slots(task.combine_group_size))
+            ]
+            + fixed_artifacts,
+        }
+
+    next_level_arguments: dict = {
+        "parameters": [
+            {"name": p, "value": "{{" + f"tasks.plan.outputs.parameters.{p}" + "}}"}
+            for p in ["level", "partitions", "prefix"]
+        ]
+        + [
+            {"name": p, "value": "{{" + f"inputs.parameters.{p}" + "}}"}
+            for p in ["scratch", output_path_param]
+        ],
+    }
+    if fixed_artifacts:
+        next_level_arguments["artifacts"] = fixed_artifacts
+
+    is_final = "{{tasks.plan.outputs.parameters.final}} == true"
+    is_not_final = "{{tasks.plan.outputs.parameters.final}} == false"
+
+    template: dict = {
+        "name": f"{name}-combine",
+        "inputs": {
+            "parameters": [{"name": p} for p in COMBINE_PLAN_PARAMETERS]
+            + [{"name": output_path_param}],
+        },
+        "dag": {
+            "tasks": [
+                {
+                    "name": "plan",
+                    "template": f"{name}-plan",
+                    "arguments": {
+                        "parameters": [
+                            {"name": p, "value": "{{" + f"inputs.parameters.{p}" + "}}"}
+                            for p in COMBINE_PLAN_PARAMETERS
+                        ],
+                    },
+                },
+                {
+                    "name": "combine",
+                    "template": name,
+                    "dependencies": ["plan"],
+                    "when": is_not_final,
+                    "withParam": "{{tasks.plan.outputs.parameters.groups}}",
+                    "arguments": group_arguments("{{item.output}}"),
+                },
+                {
+                    "name": "next-level",
+                    "template": f"{name}-combine",
+                    "dependencies": ["combine"],
+                    "when": is_not_final,
+                    "arguments": next_level_arguments,
+                },
+                {
+                    "name": "root",
+                    "template": name,
+                    "dependencies": ["plan"],
+                    "when": is_final,
+                    "withParam": "{{tasks.plan.outputs.parameters.groups}}",
+                    "arguments": group_arguments(
+                        "{{" + f"inputs.parameters.{output_path_param}" + "}}"
+                    ),
+                },
+            ],
+        },
+    }
+
+    if fixed_inputs:
+        template["inputs"]["artifacts"] = [
+            {"name": input_name} for input_name in fixed_inputs
+        ]
+
+    return template
+
+
+def _plan_template(
+    task: Task,
+    name: str,
+    address: List[str],
+    container_image: str,
+    container_command: List[str],
+    flag: str,
+    parameters: List[str],
+    outputs: List[str],
+) -> Mapping[str, Any]:
+    """Return a template that plans how to invoke the partitions of a task (e.g. a level of the tree of a combiner, or the batches of a partitioned task) through the CLI runtime, and exposes the plan as output parameters."""
+    template: dict = {
+        "name": name,
+        "inputs": {
+            "parameters": [{"name": p} for p in parameters],
+        },
+        "container": {
+            "image": container_image,
+            "args": [
+                "--node-name",
+                ".".join(address),
+                flag,
+                *["{{" + f"inputs.parameters.{p}" + "}}" for p in parameters],
+                PLAN_PATH,
+            ],
+            "volumeMounts": [{"name": "outputs", "mountPath": OUTPUT_PATH}],
+        },
+        "outputs": {
+            "parameters": [
+                {
+                    "name": output_name,
+                    "valueFrom": {"path": os.path.join(PLAN_PATH, output_name)},
+                }
+                for output_name in outputs
+            ],
+        },
+        "volumes": [{"name": "outputs", "emptyDir": {}}],
+    }
+
+    if container_command:
+        template["container"]["command"] = container_command[:]
+
+    # The plan runs in the same environment as the task (e.g. service account or image pull secrets)
+    template["container"] = with_extra_spec_options(
+        original=template["container"],
+        extra_options=task.runtime_options.get("argo_container_overrides", {}),
+        context=".".join(address),
+    )
+
+    return with_extra_spec_options(
+        original=template,
+        extra_options=task.runtime_options.get("argo_template_overrides", {}),
+        context=".".join(address),
+    )
+
+
+def _batched_partitions(node: Node, parent: DAG) -> Optional[str]:
+    """
+    Return the list of partitions of a task that invokes several partitions per worker, as an Argo expression, or None if each partition should be invoked by a separate worker.
+
+    Tasks partitioned by the key groups of a shuffled output, or that shuffle their own outputs, store each of their partitions in a different way, so their partitions are not batched.
+    """
+    if (
+        not isinstance(node, Task)
+        or not node.partition_by_input
+        or node.partitions_per_worker <= 1
+        or _shuffled_outputs(node)
+    ):
+        return None
+
+    input_type = node.inputs[node.partition_by_input]
+    if not isinstance(input_type, FromNodeOutput) or is_shuffled_output(
+        parent.nodes[input_type.node], input_type.output
+    ):
+        return None
+
+    return _dag_task_with_param(
+        input_name=node.partition_by_input,
+        input_type=input_type,
+    )
+
+
+def _batch_dag_task_parameters(
+    task: Task,
+    partitions: str,
+    parent: DAG,
+) -> List[Mapping[str, Any]]:
+    """Return the parameters that point the batches of a task to the partitions of the input it is partitioned by."""
+    input_type = task.inputs[task.partition_by_input]  # type: ignore
+    assert isinstance(input_type, FromNodeOutput)
+
+    return [
+        {"name": "partitions", "value": partitions},
+        {
+            "name": "prefix",
+            "value": _dag_task_arguments_output_path(
+                node_name=input_type.node,
+                output_name=input_type.output,
+                serializer=input_type.serializer,
+                dag_outputs=parent.outputs,
+                is_partitioned=False,
+            ),
+        },
+    ]
+
+
+def _batch_templates(
+    task: Task,
+    address: List[str],
+    container_image: str,
+    container_command: List[str],
+) -> List[Mapping[str, Any]]:
+    """
+    Return the templates that invoke the partitions of a task in batches of (at most) partitions_per_worker partitions.
+
+    A DAG template plans how to split the partitions into batches, and invokes every batch in parallel, in a separate container.
+    """
+    return [
+        _task_template(
+            task=task,
+            address=address,
+            container_image=container_image,
+            container_command=container_command,
+            is_batch=True,
+        ),
+        _batch_dag_template(task=task, address=address),
+        _plan_template(
+            task=task,
+            name=f"{_template_name(address)}-plan-batches",
+            address=address,
+            container_image=container_image,
+            container_command=container_command,
+            flag="--plan-batches",
+            parameters=BATCH_PLAN_PARAMETERS,
+            outputs=BATCH_PLAN_OUTPUTS,
+        ),
+    ]
+
+
+def _batch_dag_template(
+    task: Task,
+    address: List[str],
+) -> Mapping[str, Any]:
+    """
+    Return a DAG template that plans the batches of partitions of a task, and invokes each batch.
+
+    Argo (as of v3.0) cannot evaluate expressions in templates. Instead, the batches are computed by the CLI runtime in a separate container.
+    """
+    name = _template_name(address)
+    partition_by_input = task.partition_by_input
+    output_path_params = [f"{output_name}_output_path" for output_name in task.outputs]
+    slots = _partition_slots(task.partitions_per_worker)
+    fixed_inputs = [
+        input_name for input_name in task.inputs if input_name != partition_by_input
+    ]
+
+    template: dict = {
+        "name": f"{name}-batches",
+        "inputs": {
+            "parameters": [{"name": p} for p in BATCH_PLAN_PARAMETERS + ["prefix"]]
+            + [{"name": p} for p in output_path_params],
+        },
+        "dag": {
+            "tasks": [
+                {
+                    "name": "plan",
+                    "template": f"{name}-plan-batches",
+                    "arguments": {
+                        "parameters": [
+                            {"name": p, "value": "{{" + f"inputs.parameters.{p}" + "}}"}
+                            for p in BATCH_PLAN_PARAMETERS
+                        ],
+                    },
+                },
+                {
+                    "name": "batch",
+                    "template": name,
+                    "dependencies": ["plan"],
+                    "withParam": "{{tasks.plan.outputs.parameters.batches}}",
+                    "arguments": {
+                        "parameters": [
+                            {"name": p, "value": "{{" + f"inputs.parameters.{p}" + "}}"}
+                            for p in output_path_params
+                        ]
+                        + [
+                            {
+                                "name": f"partition-{slot}",
+                                "value": "{{" + f"item.p{i}" + "}}",
+                            }
+                            for i, slot in enumerate(slots)
+                        ],
+                        "artifacts": [
+                            {
+                                "name": f"{partition_by_input}-{slot}",
+                                "s3": {
+                                    "key": "{{inputs.parameters.prefix}}/"
+                                    + "{{"
+                                    + f"item.p{i}"
+                                    + "}}"
+                                },
+                            }
+                            for i, slot in enumerate(slots)
+                        ]
+                        + [
+                            {
+                                "name": input_name,
+                                "from": "{{" + f"inputs.artifacts.{input_name}" + "}}",
+                            }
+                            for input_name in fixed_inputs
+                        ],
+                    },
+                },
+            ],
+        },
+    }
+
+    if fixed_inputs:
+        template["inputs"]["artifacts"] = [
+            {"name": input_name} for input_name in fixed_inputs
+        ]
+
+    return template
+
+
+def _partition_slots(size: int) -> List[str]:
+    """Return the filenames of the partitions in a group or batch, zero-padded so that their lexicographical order matches their numerical order."""
+    width = len(str(size - 1))
+    return [str(i).zfill(width) for i in range(size)]
+
+
 def _template_name(address: List[str]) -> str:
     """
     Generate a template name from a node address.
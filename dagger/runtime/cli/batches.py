@@ -0,0 +1,69 @@
+"""Plan the batches of partitions each worker invokes, when the partitions of a task are invoked in separate containers."""
+
+import json
+import os
+from typing import Sequence
+
+from dagger.dag import DAG
+from dagger.runtime.cli.nested_nodes import find_nested_node
+from dagger.task import Task
+
+MISSING_PARTITION = "missing"
+
+
+def plan_batches(partitions: Sequence[str], partitions_per_worker: int) -> str:
+    """
+    Split the partitions of a task into batches of consecutive partitions.
+
+    Parameters
+    ----------
+    partitions
+        The names of the partitions, in order.
+
+    partitions_per_worker
+        The maximum number of partitions in each batch.
+
+
+    Returns
+    -------
+    A JSON list with an object for each batch. The object contains the name of each of the partitions in the batch ("p0", "p1"...). Batches with fewer partitions than partitions_per_worker point the rest of the names to a partition that does not exist.
+    """
+    return json.dumps(
+        [
+            {
+                f"p{j}": partitions[i + j]
+                if i + j < len(partitions)
+                else MISSING_PARTITION
+                for j in range(partitions_per_worker)
+            }
+            for i in range(0, len(partitions), partitions_per_worker)
+        ]
+    )
+
+
+def store_batch_plan(
+    dag: DAG,
+    node_address: Sequence[str],
+    partitions: Sequence[str],
+    directory: str,
+):
+    """
+    Plan the batches of partitions of the task at the address supplied, and store the plan in a file named "batches" inside of the directory.
+
+    See the documentation of `plan_batches` for more details.
+
+
+    Raises
+    ------
+    ValueError
+        If the node at the address is not a partitioned task.
+    """
+    node = find_nested_node(dag, list(node_address)).node
+    if not isinstance(node, Task) or not node.partition_by_input:
+        raise ValueError(
+            f"Only partitioned tasks can plan how to batch their partitions. The node '{'.'.join(node_address)}' is not a task declared with a partition_by_input."
+        )
+
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "batches"), "w") as f:
+        f.write(plan_batches(partitions, node.partitions_per_worker))
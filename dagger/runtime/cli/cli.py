@@ -1,10 +1,16 @@
 """Command-line Interface to run DAGs or Tasks taking their inputs from files and storing their outputs into files."""
 
+import json
 import logging
 import sys
+from contextlib import nullcontext
 from typing import List
 
+import dagger.runtime.local as local
 from dagger.dag import DAG
+from dagger.hooks import ChromeTrace, registered
+from dagger.runtime.cli.batches import store_batch_plan
+from dagger.runtime.cli.combine import store_combine_plan
 from dagger.runtime.cli.invoke import invoke_with_locations
 
 
@@ -20,6 +26,15 @@ def invoke(
     * `--input <name> <location>` -- Retrieve input <name> of the DAG from <location>
     * `--output <name> <location>` -- Store output <name> of the DAG into <location>
     * `--node-name <name>` (optional) -- Select a specific node of the DAG to run. If your DAG contains other nested DAGs you can access nodes using dot-notation (e.g. nested-dag-name.node-name)
+    * `--cache-dir <directory>` (optional) -- Reuse the outputs of tasks that were already invoked with the same inputs, and store the outputs of the rest in <directory>
+    * `--report <location>` (optional) -- Store a JSON report with measurements for each node invoked (such as the time spent running, serializing and deserializing, or the size of its inputs and outputs) into <location>
+    * `--profile-node <address>` (optional, repeatable) -- Profile the function of the task at <address> with cProfile, and store the statistics in a .pstats file next to the outputs. Tasks defined with `runtime_options={"profile": True}` are always profiled
+    * `--trace <location>` (optional) -- Store a Chrome trace-event JSON file with a span for each node, partition, (de)serialization and file read/write into <location>. Open it in https://ui.perfetto.dev or chrome://tracing
+    * `--plan-combine <level> <partitions> <prefix> <scratch-prefix> <directory>` (optional) -- Instead of invoking the combiner selected with `--node-name`, plan how to group the partitions of its input at one level of the tree it reduces them in, and store the plan in <directory>. <partitions> is a JSON list with the names of the partitions stored under <prefix>. Used by the Argo runtime
+    * `--plan-batches <partitions> <directory>` (optional) -- Instead of invoking the partitioned task selected with `--node-name`, plan how to split the partitions in <partitions> (a JSON list with their names) into batches of `partitions_per_worker` partitions, and store the plan in <directory>. Used by the Argo runtime
+    * `--batch` (optional) -- Invoke a batch of partitions of the partitioned task selected with `--node-name`. The input the task is partitioned by points to a directory with a file per partition, and each output points to a directory to store the output of each partition in, under the same filename. Used by the Argo runtime
+    * `--packed-partitions` (optional) -- Store each partitioned output in a single data file with an index of the offset and length of each partition, instead of a file per partition. Partitioned inputs are read in either layout. Not supported by the Argo runtime, which fans out partitioned nodes over a file per partition
+    * `--memory-map-inputs` (optional) -- Map the files of each input into memory instead of reading them, so that large inputs are not copied before they are deserialized. Serializers receive a `memoryview`, so they need to accept any bytes-like object (the ones bundled with dagger do)
 
 
     Parameters
@@ -54,12 +69,61 @@ def invoke(
         output_name: output_location for output_name, output_location in args.outputs
     }
 
-    invoke_with_locations(
-        dag,
-        node_address=[n for n in args.node_name.split(".") if n != ""],
-        input_locations=input_locations,
-        output_locations=output_locations,
-    )
+    node_address = [n for n in args.node_name.split(".") if n != ""]
+
+    if args.plan_combine:
+        level, partitions, prefix, scratch_prefix, directory = args.plan_combine
+        store_combine_plan(
+            dag,
+            node_address=node_address,
+            level=int(level),
+            partitions=json.loads(partitions),
+            prefix=prefix,
+            scratch_prefix=scratch_prefix,
+            directory=directory,
+        )
+        return
+
+    if args.plan_batches:
+        partitions, directory = args.plan_batches
+        store_batch_plan(
+            dag,
+            node_address=node_address,
+            partitions=json.loads(partitions),
+            directory=directory,
+        )
+        return
+
+    report = local.RunReport() if args.report else None
+    trace = ChromeTrace() if args.trace else None
+
+    try:
+        # The trace is registered for the whole invocation, to include reading inputs and storing outputs
+        with registered(trace) if trace is not None else nullcontext():
+            invoke_with_locations(
+                dag,
+                node_address=node_address,
+                input_locations=input_locations,
+                output_locations=output_locations,
+                cache=local.NodeCache(
+                    args.cache_dir,
+                    max_size_bytes=args.cache_max_size_bytes,
+                    max_age_seconds=args.cache_max_age_seconds,
+                )
+                if args.cache_dir
+                else None,
+                report=report,
+                profile_nodes=args.profile_nodes,
+                batch=args.batch,
+                packed_partitions=args.packed_partitions,
+                memory_map_inputs=args.memory_map_inputs,
+            )
+    finally:
+        # The report and trace are also useful to troubleshoot failed invocations
+        if report is not None:
+            report.write_json(args.report)
+        if trace is not None:
+            trace.write_json(args.trace)
 
 
 def _call_arg_parser():
@@ -92,4 +156,74 @@ def _call_arg_parser():
         metavar=("name", "location"),
         help="Retrieve a given input from the location specified. Currently, we only support retrieving inputs from the local filesystem",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Cache the outputs of each task in the directory specified, and reuse them when the task is invoked again with the same inputs",
+    )
+    parser.add_argument(
+        "--cache-max-size-bytes",
+        type=int,
+        default=None,
+        help="Evict the least recently used entries of the cache when it exceeds this size",
+    )
+    parser.add_argument(
+        "--cache-max-age-seconds",
+        type=float,
+        default=None,
+        help="Evict the entries of the cache that were stored more than this number of seconds ago",
+    )
+    parser.add_argument(
+        "--report",
+        type=str,
+        default=None,
+        help="Store a JSON report with measurements for each node invoked into the location specified",
+    )
+    parser.add_argument(
+        "--profile-node",
+        action="append",
+        default=[],
+        dest="profile_nodes",
+        metavar="address",
+        help="Profile the function of the task at the address specified with cProfile, and store the statistics next to the outputs. It can be supplied several times",
+    )
+    parser.add_argument(
+        "--trace",
+        type=str,
+        default=None,
+        help="Store a Chrome trace-event JSON file with a span for each node, partition, serialization and file read/write into the location specified",
+    )
+    parser.add_argument(
+        "--plan-combine",
+        default=None,
+        nargs=5,
+        metavar=("level", "partitions", "prefix", "scratch-prefix", "directory"),
+        help="Instead of invoking the combiner selected, plan how to group the partitions of its input at a level of the tree it reduces them in, and store the plan in the directory specified",
+    )
+    parser.add_argument(
+        "--plan-batches",
+        default=None,
+        nargs=2,
+        metavar=("partitions", "directory"),
+        help="Instead of invoking the partitioned task selected, plan how to split its partitions into batches, and store the plan in the directory specified",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        default=False,
+        help="Invoke a batch of partitions of the partitioned task selected. The input the task is partitioned by, and each of its outputs, point to directories with a file per partition",
+    )
+    parser.add_argument(
+        "--packed-partitions",
+        action="store_true",
+        default=False,
+        help="Store each partitioned output in a single data file with an index, instead of a file per partition. Not supported by the Argo runtime, which reads a file per partition",
+    )
+    parser.add_argument(
+        "--memory-map-inputs",
+        action="store_true",
+        default=False,
+        help="Map the files of each input into memory instead of reading them, and deserialize them from a memoryview",
+    )
     return parser
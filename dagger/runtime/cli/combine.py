@@ -0,0 +1,114 @@
+"""Plan each level of the tree a combiner reduces the partitions of its input in, when the groups are combined in separate containers."""
+
+import json
+import os
+from typing import Mapping, Sequence
+
+from dagger.dag import DAG
+from dagger.runtime.cli.nested_nodes import find_nested_node
+from dagger.task import Task
+
+
+def plan_combine_level(
+    partitions: Sequence[str],
+    prefix: str,
+    scratch_prefix: str,
+    level: int,
+    group_size: int,
+) -> Mapping[str, str]:
+    """
+    Split the partitions combined at a level of the tree into groups, and describe the level that will combine their results.
+
+    Parameters
+    ----------
+    partitions
+        The names of the partitions to combine, in order.
+
+    prefix
+        The key prefix the partitions are stored under. Each partition is stored in "<prefix>/<partition name>".
+
+    scratch_prefix
+        A key prefix to store the results of each group under. The results of the groups of level L are stored in "<scratch_prefix>/<L>/<group index>".
+
+    level
+        The level of the tree, starting at 0 for the partitions of the input.
+
+    group_size
+        The maximum number of partitions in each group.
+
+
+    Returns
+    -------
+    A mapping with the following values, serialized as strings:
+
+    * groups -- A JSON list with an object for each group. The object contains the key to store the result of the group in ("output"), and the key of each of its partitions ("p0", "p1"...). Groups with fewer partitions than the group size point the rest of the keys to a location that does not exist.
+    * partitions -- A JSON list with the names of the results of each group, which are the partitions of the next level.
+    * prefix -- The key prefix the partitions of the next level are stored under.
+    * level -- The next level.
+    * final -- "true" if this level has a single group, whose result is the result of the combiner. Otherwise, "false".
+    """
+    groups = [
+        partitions[i : i + group_size] for i in range(0, len(partitions), group_size)
+    ] or [[]]
+    next_prefix = f"{scratch_prefix}/{level}"
+
+    return {
+        "groups": json.dumps(
+            [
+                {
+                    "output": f"{next_prefix}/{i}",
+                    **{
+                        f"p{j}": f"{prefix}/{group[j]}"
+                        if j < len(group)
+                        else f"{scratch_prefix}/missing"
+                        for j in range(group_size)
+                    },
+                }
+                for i, group in enumerate(groups)
+            ]
+        ),
+        "partitions": json.dumps([str(i) for i in range(len(groups))]),
+        "prefix": next_prefix,
+        "level": str(level + 1),
+        "final": "true" if len(groups) == 1 else "false",
+    }
+
+
+def store_combine_plan(
+    dag: DAG,
+    node_address: Sequence[str],
+    level: int,
+    partitions: Sequence[str],
+    prefix: str,
+    scratch_prefix: str,
+    directory: str,
+):
+    """
+    Plan a level of the tree of the combiner at the address supplied, and store each value of the plan in a file with the same name inside of the directory.
+
+    See the documentation of `plan_combine_level` for more details.
+
+
+    Raises
+    ------
+    ValueError
+        If the node at the address is not a combiner.
+    """
+    node = find_nested_node(dag, list(node_address)).node
+    if not isinstance(node, Task) or node.combine_input is None:
+        raise ValueError(
+            f"Only combiners can plan how to combine their partitions. The node '{'.'.join(node_address)}' is not a task declared with a combine_input."
+        )
+
+    plan = plan_combine_level(
+        partitions=partitions,
+        prefix=prefix,
+        scratch_prefix=scratch_prefix,
+        level=level,
+        group_size=node.combine_group_size,
+    )
+
+    os.makedirs(directory, exist_ok=True)
+    for name, value in plan.items():
+        with open(os.path.join(directory, name), "w") as f:
+            f.write(value)
@@ -1,13 +1,23 @@
 """Command-line Interface to run DAGs or Tasks taking their inputs from files and storing their outputs into files."""
-from typing import Any, Iterable, List, Mapping
+import os
+import shutil
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 
+import dagger.hooks.registry as hooks_registry
 import dagger.runtime.local as local
-from dagger.dag import DAG
+from dagger.dag import DAG, is_shuffled_output
+from dagger.input import FromNodeOutput
 from dagger.runtime.cli.locations import (
+    deserialize_input_from_location,
+    list_partitions_in_location,
     retrieve_input_from_location,
     store_output_in_location,
 )
 from dagger.runtime.cli.nested_nodes import NodeWithParent, find_nested_node
+from dagger.runtime.local.task import _serialization_error
+from dagger.serializer import SerializationError, StreamingSerializer
+from dagger.task import Task
 
 
 def invoke_with_locations(
@@ -15,6 +25,12 @@ def invoke_with_locations(
     node_address: List[str] = None,
     input_locations: Mapping[str, str] = None,
     output_locations: Mapping[str, str] = None,
+    cache: Optional[local.NodeCache] = None,
+    report: Optional[local.RunReport] = None,
+    profile_nodes: Iterable[str] = (),
+    batch: bool = False,
+    packed_partitions: bool = False,
+    memory_map_inputs: bool = False,
 ):
     """
     Invoke the supplied DAG (or a node therein) retrieving the inputs from, and storing the outputs into, the specified locations.
@@ -29,16 +45,45 @@ def invoke_with_locations(
         Empty references the `dag` parameter.
 
     input_locations
-        A mapping of input names to input locations
+        A mapping of input names to input locations.
+        Inputs stored in a single file are read straight by serializers that conform to the StreamingSerializer protocol.
 
     output_locations
-        A mapping of output names to output locations
+        A mapping of output names to output locations.
+        The outputs of tasks are serialized straight into their location by serializers that conform to the StreamingSerializer protocol, unless the task uses a cache or a report, which need the serialized outputs in memory.
+        If any of the outputs cannot be stored, the outputs stored so far are removed.
+
+    cache
+        A cache to retrieve the outputs of tasks from, instead of invoking them again with the same inputs.
+        See the documentation of local.NodeCache for more details.
+
+    report
+        A report to collect measurements for each node invoked.
+        When the node is a task, the report contains a single node with its address, which also measures the time spent retrieving and deserializing its inputs and their size in the input locations. Batches report each of their partitions under the name of the partition (e.g. "task[3]").
+        See the documentation of local.RunReport for more details.
+
+    profile_nodes
+        The addresses of the tasks to profile with cProfile, relative to `dag` (e.g. "nested-dag.task").
+        Tasks defined with `runtime_options={"profile": True}` are profiled too. The statistics are stored next to the first output location, in files named after the address of each task relative to the node invoked (or "task.pstats" if the node invoked is the task itself).
+
+    batch
+        Invoke a batch of partitions of a partitioned task. The location of the input the task is partitioned by is a directory with a file for each partition in the batch. The task is invoked once per partition, in the order of their filenames, and each output location is a directory where the output of each partition is stored in a file with the same name as the partition.
+
+    packed_partitions
+        Store each partitioned output in a single data file with an index, instead of a file per partition.
+        See the documentation of `store_output_in_location` for more details. Partitioned inputs may be stored in either layout.
+        Only use it when the outputs are consumed by the CLI or local runtimes. The Argo runtime fans out partitioned nodes over a file per partition, so it cannot consume packed outputs.
+
+    memory_map_inputs
+        Map the files of each input into memory, instead of reading them, and hand serializers a `memoryview` of their contents.
+        See the documentation of `retrieve_input_from_location` for more details.
 
 
     Raises
     ------
     ValueError
         When the location of any required input/output is missing
+        When a batch is invoked on a node that is not a partitioned task, or the partitions of the batch are not stored in a directory
 
     TypeError
         When any of the outputs cannot be obtained from the return value of their node
@@ -53,16 +98,335 @@ def invoke_with_locations(
     _validate_inputs(nested_node.node.inputs.keys(), input_locations.keys())
     _validate_outputs(nested_node.node.outputs.keys(), output_locations.keys())
 
-    params = _deserialized_params(nested_node, input_locations)
+    ready_at = time.perf_counter()
+    task_report = None
+    if report is not None and isinstance(nested_node.node, Task):
+        # The task is measured in a report of its own, and merged with the deserialization of its inputs afterwards
+        task_report = local.RunReport()
+    invoked_report = task_report if task_report is not None else report
+
+    params = _deserialized_params(
+        nested_node, input_locations, memory_map=memory_map_inputs
+    )
+    deserialize_time = time.perf_counter() - ready_at
+
+    partition_names = None
+    if batch:
+        partition_names = _invoke_batch(
+            nested_node.node,
+            params=params,
+            input_locations=input_locations,
+            output_locations=output_locations,
+            cache=cache,
+            report=invoked_report,
+            profile_nodes=_relative_addresses(profile_nodes, node_address or []),
+            packed_partitions=packed_partitions,
+        )
+    else:
+        _invoke_node(
+            nested_node.node,
+            params=params,
+            output_locations=output_locations,
+            cache=cache,
+            report=invoked_report,
+            profile_nodes=_relative_addresses(profile_nodes, node_address or []),
+            packed_partitions=packed_partitions,
+        )
+
+    if report is not None and task_report is not None:
+        report._add(
+            _task_report(
+                ".".join(node_address or []),
+                invoked=task_report,
+                ready_at=ready_at,
+                deserialize_time=deserialize_time,
+                bytes_in=sum(_location_size(loc) for loc in input_locations.values()),
+                partition_names=partition_names,
+            )
+        )
+
+
+def _invoke_node(
+    node: Any,
+    params: Mapping[str, Any],
+    output_locations: Mapping[str, str],
+    cache: Optional[local.NodeCache],
+    report: Optional[local.RunReport],
+    profile_nodes: Iterable[str],
+    packed_partitions: bool,
+):
+    """Invoke a node and store its outputs in their locations."""
+    stream_outputs = _streams_outputs(node, cache=cache, report=report)
+    if isinstance(node, Task) and node.vectorized:
+        # Vectorized tasks invoked on their own receive a sequence of partitions, and this is a single partition
+        partition_by_input = node.partition_by_input
+        assert partition_by_input is not None
+        (outputs,) = _single_partition_outputs(
+            local.invoke(
+                node,
+                {**params, partition_by_input: [params[partition_by_input]]},
+                cache=cache,
+                report=report,
+                profile_dir=_profile_dir(output_locations),
+                profile_nodes=profile_nodes,
+                serialize_outputs=not stream_outputs,
+            ),
+            partitions=1,
+        )
+    else:
+        outputs = local.invoke(
+            node,
+            params,
+            cache=cache,
+            report=report,
+            profile_dir=_profile_dir(output_locations),
+            profile_nodes=profile_nodes,
+            serialize_outputs=not stream_outputs,
+        )
+
+    _store_outputs(
+        node,
+        (
+            (output_name, output_location, outputs[output_name])
+            for output_name, output_location in output_locations.items()
+        ),
+        stream_outputs=stream_outputs,
+        packed_partitions=packed_partitions,
+    )
 
-    outputs = local.invoke(nested_node.node, params)
 
-    for output_name in output_locations:
+def _store_outputs(
+    node: Any,
+    outputs: Iterable[Tuple[str, str, Any]],
+    stream_outputs: bool,
+    packed_partitions: bool,
+):
+    """
+    Store each output (given as its name, location and value) into its location.
+
+    If any of them fails, the outputs this invocation created so far are removed, so a failed invocation does not leave some of its outputs behind. Locations that existed before the invocation are left untouched.
+    """
+    created: List[str] = []
+    try:
+        for output_name, output_location, output_value in outputs:
+            if not os.path.lexists(output_location):
+                # Locations are recorded before writing into them, so outputs that fail halfway are removed too
+                created.append(output_location)
+
+            if stream_outputs:
+                _stream_output(
+                    node,
+                    output_name=output_name,
+                    output_location=output_location,
+                    output_value=output_value,
+                    packed_partitions=packed_partitions,
+                )
+            else:
+                store_output_in_location(
+                    output_location=output_location,
+                    output_value=output_value,
+                    packed=packed_partitions,
+                )
+    except BaseException:
+        for output_location in created:
+            if os.path.isdir(output_location):
+                shutil.rmtree(output_location)
+            elif os.path.isfile(output_location):
+                os.remove(output_location)
+        raise
+
+
+def _stream_output(
+    task: Task,
+    output_name: str,
+    output_location: str,
+    output_value: Any,
+    packed_partitions: bool,
+):
+    """Serialize the value of an output straight into its location, reporting and extending any errors the same way the local runtime does when it serializes outputs in memory."""
+    hooks = hooks_registry.active
+    if hooks is not None:
+        hooks.serialize_start("", output_name)
+
+    try:
         store_output_in_location(
-            output_location=output_locations[output_name],
-            output_value=outputs[output_name],
+            output_location=output_location,
+            output_value=output_value,
+            packed=packed_partitions,
+            serializer=task.outputs[output_name].serializer,
+        )
+    except BaseException as e:
+        if hooks is not None:
+            hooks.serialize_end("", output_name, 0, e)
+        if isinstance(e, (TypeError, ValueError, SerializationError)):
+            raise _serialization_error(e) from e
+        raise
+
+    if hooks is not None:
+        hooks.serialize_end("", output_name, _location_size(output_location), None)
+
+
+def _streams_outputs(
+    node: Any,
+    cache: Optional[local.NodeCache],
+    report: Optional[local.RunReport],
+) -> bool:
+    """
+    Return true if the outputs of the node can be serialized straight into their locations, because some of them use a StreamingSerializer.
+
+    Only tasks can return the values of their outputs without serializing them. The outputs of tasks that are cached or measured in a report are serialized by the local runtime, since the cache and the report need them.
+    """
+    return (
+        isinstance(node, Task)
+        and cache is None
+        and report is None
+        and any(
+            isinstance(output_type.serializer, StreamingSerializer)
+            for output_type in node.outputs.values()
+        )
+    )
+
+
+def _invoke_batch(
+    node: Any,
+    params: Mapping[str, Any],
+    input_locations: Mapping[str, str],
+    output_locations: Mapping[str, str],
+    cache: Optional[local.NodeCache],
+    report: Optional[local.RunReport],
+    profile_nodes: Iterable[str],
+    packed_partitions: bool,
+) -> List[str]:
+    """
+    Invoke each of the partitions of a task stored in a directory, store their outputs in a directory per output, with a file per partition, and return the names of the partitions.
+
+    Vectorized tasks are invoked once with all the partitions in the batch.
+    """
+    if (
+        not isinstance(node, Task)
+        or not node.partition_by_input
+        or not os.path.isdir(input_locations[node.partition_by_input])
+    ):
+        raise ValueError(
+            "Only partitioned tasks may be invoked in batches, with the input they are partitioned by pointing to a directory that contains a file for each partition in the batch."
+        )
+
+    partition_names = list_partitions_in_location(
+        input_locations[node.partition_by_input]
+    )
+    for output_location in output_locations.values():
+        os.makedirs(output_location, exist_ok=True)
+
+    stream_outputs = _streams_outputs(node, cache=cache, report=report)
+    partitions: Iterable[Mapping[str, Any]]
+    if node.vectorized:
+        partitions = _single_partition_outputs(
+            local.invoke(
+                node,
+                {
+                    **params,
+                    node.partition_by_input: list(params[node.partition_by_input]),
+                },
+                cache=cache,
+                report=report,
+                profile_dir=_profile_dir(output_locations),
+                profile_nodes=profile_nodes,
+                serialize_outputs=not stream_outputs,
+            ),
+            partitions=len(partition_names),
+        )
+    else:
+        partitions = (
+            local.invoke(
+                node,
+                {**params, node.partition_by_input: partition},
+                cache=cache,
+                report=report,
+                profile_dir=_profile_dir(output_locations),
+                profile_nodes=profile_nodes,
+                serialize_outputs=not stream_outputs,
+            )
+            for partition in params[node.partition_by_input]
         )
 
+    _store_outputs(
+        node,
+        (
+            (
+                output_name,
+                os.path.join(output_location, partition_name),
+                outputs[output_name],
+            )
+            for partition_name, outputs in zip(partition_names, partitions)
+            for output_name, output_location in output_locations.items()
+        ),
+        stream_outputs=stream_outputs,
+        packed_partitions=packed_partitions,
+    )
+
+    return partition_names
+
+
+def _task_report(
+    address: str,
+    invoked: local.RunReport,
+    ready_at: float,
+    deserialize_time: float,
+    bytes_in: int,
+    partition_names: Optional[List[str]] = None,
+) -> local.NodeReport:
+    """Merge the measurements of a task invoked on its own (or of each partition in a batch) into a single node, together with the retrieval of its inputs."""
+    node_report = local.NodeReport(
+        address=address, deserialize_time=deserialize_time, bytes_in=bytes_in
+    )
+
+    if partition_names is None:
+        for invoked_report in invoked.nodes:
+            node_report._accumulate(invoked_report)
+    else:
+        # Vectorized tasks report the partitions of the batch in a single node
+        partition_reports = [
+            partition_report
+            for invoked_report in invoked.nodes
+            for partition_report in (invoked_report.partitions or [invoked_report])
+        ]
+        for partition_name, partition_report in zip(partition_names, partition_reports):
+            partition_report.address = f"{address}[{partition_name}]"
+            node_report.partitions.append(partition_report)
+            node_report._accumulate(partition_report)
+
+    node_report.wall_time = time.perf_counter() - ready_at
+    return node_report
+
+
+def _location_size(location: str) -> int:
+    """Return the size of the files stored in a location, which may be a file or a directory."""
+    if os.path.isfile(location):
+        return os.path.getsize(location)
+
+    return sum(
+        os.path.getsize(os.path.join(dir_path, filename))
+        for dir_path, _, filenames in os.walk(location)
+        for filename in filenames
+    )
+
+
+def _single_partition_outputs(
+    outputs: Mapping[str, Any],
+    partitions: int,
+) -> List[Mapping[str, Any]]:
+    """Split the partitioned outputs of a vectorized task into the outputs of each partition."""
+    partitioned_outputs: Mapping[str, List[Any]] = {
+        output_name: list(output_value) for output_name, output_value in outputs.items()
+    }
+    return [
+        {
+            output_name: output_value[i]
+            for output_name, output_value in partitioned_outputs.items()
+        }
+        for i in range(partitions)
+    ]
+
 
 def _validate_inputs(
     input_names: Iterable[str],
@@ -88,17 +452,69 @@ def _validate_outputs(
             )
 
 
+def _profile_dir(output_locations: Mapping[str, str]) -> str:
+    """Return the directory to store profiling statistics in, next to the outputs of the node."""
+    if not output_locations:
+        return os.getcwd()
+
+    first_output = output_locations[sorted(output_locations)[0]]
+    return os.path.dirname(os.path.abspath(first_output))
+
+
+def _relative_addresses(addresses: Iterable[str], node_address: List[str]) -> List[str]:
+    """Return the addresses of the nodes nested inside of the node invoked, relative to it."""
+    prefix = ".".join(node_address)
+    if not prefix:
+        return list(addresses)
+
+    relative_addresses = []
+    for address in addresses:
+        if address == prefix:
+            relative_addresses.append("")
+        elif address.startswith(f"{prefix}."):
+            relative_addresses.append(address[len(prefix) + 1 :])
+
+    return relative_addresses
+
+
 def _deserialized_params(
     nested_node: NodeWithParent,
     input_locations: Mapping[str, str],
+    memory_map: bool = False,
 ) -> Mapping[str, Any]:
     """Retrieve and deserialize all the parameters expected by a Node."""
-    params = {}
-    for input_name in input_locations:
-        input_value = retrieve_input_from_location(input_locations[input_name])
+    params: Dict[str, Any] = {}
+    for input_name, input_location in input_locations.items():
         input_type = nested_node.node.inputs[input_name]
+        if not memory_map and os.path.isfile(input_location):
+            # Inputs stored in a single file are read straight by serializers that support streaming
+            params[input_name] = deserialize_input_from_location(
+                input_location, input_type.serializer
+            )
+            continue
 
-        if isinstance(input_value, local.PartitionedOutput):
+        input_value = retrieve_input_from_location(
+            input_location, memory_map=memory_map
+        )
+
+        if isinstance(input_value, local.PartitionedOutput) and _is_key_group(
+            nested_node, input_name
+        ):
+            # Each file contains the piece of the key group generated by one of the partitions of the node that produced it
+            params[input_name] = local.merge_key_groups(
+                (input_type.serializer.deserialize(piece) for piece in input_value),
+                serializer=input_type.serializer,
+            )
+        elif (
+            isinstance(input_value, local.PartitionedOutput)
+            and isinstance(input_type, FromNodeOutput)
+            and input_type.lazy
+        ):
+            # Partitions stored in a directory are only read from disk while the node iterates over them
+            params[input_name] = local.LazyPartitions(
+                input_value, input_type.serializer.deserialize
+            )
+        elif isinstance(input_value, local.PartitionedOutput):
             params[input_name] = [
                 input_type.serializer.deserialize(partition)
                 for partition in input_value
@@ -107,3 +523,20 @@ def _deserialized_params(
             params[input_name] = input_type.serializer.deserialize(input_value)
 
     return params
+
+
+def _is_key_group(nested_node: NodeWithParent, input_name: str) -> bool:
+    """Return true if the node is partitioned by an input that receives a key group, shuffled from a keyed output of a partitioned node."""
+    node = nested_node.node
+    input_type = node.inputs[input_name]
+    if (
+        node.partition_by_input != input_name
+        or not isinstance(input_type, FromNodeOutput)
+        or nested_node.parent is None
+        or not isinstance(nested_node.parent.node, DAG)
+    ):
+        return False
+
+    return is_shuffled_output(
+        nested_node.parent.node.nodes[input_type.node], input_type.output
+    )
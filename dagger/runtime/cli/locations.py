@@ -6,13 +6,26 @@ At the moment, only locations in the local filesystem are supported.
 
 import json
 import os
+import struct
+from typing import Any, BinaryIO, List, Optional, Sequence, Tuple, Union
 
+import dagger.hooks.registry as hooks_registry
 from dagger.runtime.local import NodeOutput, PartitionedOutput
+from dagger.runtime.local.output_store import _memory_map
+from dagger.serializer import Serializer, StreamingSerializer
 
 PARTITION_MANIFEST_FILENAME = "partitions.json"
+PACKED_PARTITIONS_DATA_FILENAME = "partitions.data"
+PACKED_PARTITIONS_INDEX_FILENAME = "partitions.index"
 
+# Each entry of the index of packed partitions is the offset and length of a partition in the data file, as little-endian unsigned 64-bit integers
+_INDEX_ENTRY = struct.Struct("<QQ")
 
-def retrieve_input_from_location(input_location: str) -> NodeOutput:
+
+def retrieve_input_from_location(
+    input_location: str,
+    memory_map: bool = False,
+) -> NodeOutput:
     """
     Given an input location, retrieve the contents of the file/directory it points to.
 
@@ -20,14 +33,21 @@ def retrieve_input_from_location(input_location: str) -> NodeOutput:
     ----------
     input_location
         A pointer to a path (e.g. "/my/filesystem/file.txt").
-        If the path is a directory, the runtime will assume the input is partitioned,
-        and concatenate all existing partitions based on the lexicographical order
-        of their filenames.
+        If the path is a directory, the runtime will assume the input is partitioned.
+        Partitions may be packed in a single data file with an index (see `store_output_in_location`),
+        or stored in a file each. In the latter case, all existing partitions are concatenated
+        in the order of their filenames (see `list_partitions_in_location`).
+
+    memory_map
+        Map the contents of each file into memory, instead of reading them into a new bytes object.
+        The input is returned as a read-only `memoryview`, and the operating system only loads the pages the serializer actually reads.
+        It avoids holding a second copy of large inputs in memory while they are deserialized. Serializers need to accept any bytes-like object.
+        The serializers bundled with dagger do.
 
 
     Returns
     -------
-    The serialized version of the input. If the input is partitioned, it returns a list of serialized partitions.
+    The serialized version of the input. If the input is partitioned, it returns a sequence of serialized partitions, which are read from disk when each of them is accessed.
 
 
     Raises
@@ -39,27 +59,96 @@ def retrieve_input_from_location(input_location: str) -> NodeOutput:
         If the current execution context doesn't have enough permissions to read the file.
     """
     if os.path.isdir(input_location):
-        partition_filenames = sorted(
-            [
-                fname
-                for fname in os.listdir(input_location)
-                if os.path.isfile(os.path.join(input_location, fname))
-                and fname != PARTITION_MANIFEST_FILENAME
-            ]
-        )
+        if _is_packed(input_location):
+            return PartitionedOutput(
+                _PackedPartitions.from_location(input_location, memory_map=memory_map)
+            )
 
-        def load_lazily(partition_filename: str):
-            with open(os.path.join(input_location, partition_filename), "rb") as f:
-                return f.read()
+        partition_filenames = list_partitions_in_location(input_location)
 
-        return PartitionedOutput(map(load_lazily, partition_filenames))
+        return PartitionedOutput(
+            _PartitionFiles(
+                [os.path.join(input_location, fname) for fname in partition_filenames],
+                memory_map=memory_map,
+            )
+        )
 
     else:
+        # Memory-mapped inputs are bytes-like, rather than bytes
+        return _read(input_location, memory_map=memory_map)  # type: ignore
+
+
+def list_partitions_in_location(input_location: str) -> List[str]:
+    """
+    Return the names of the partitions stored in a directory, in order.
+
+    Filenames that are numbers (such as the ones generated by `store_output_in_location`) are sorted by their value, so that "2" comes before "10", and before any other filename. The rest are sorted lexicographically.
+    Partitions packed in a single data file are named after their index.
+    """
+    if _is_packed(input_location):
+        return [
+            str(i) for i in range(len(_PackedPartitions.from_location(input_location)))
+        ]
+
+    # Directory entries usually know their type, which saves a stat per partition
+    with os.scandir(input_location) as entries:
+        partition_filenames = [
+            entry.name
+            for entry in entries
+            if entry.is_file() and entry.name != PARTITION_MANIFEST_FILENAME
+        ]
+
+    return sorted(partition_filenames, key=_partition_sort_key)
+
+
+def deserialize_input_from_location(input_location: str, serializer: Serializer) -> Any:
+    """
+    Deserialize the contents of the file an input location points to.
+
+    Serializers that conform to the StreamingSerializer protocol read the file directly, without loading its contents in memory as a sequence of bytes first. The rest deserialize the contents of the file after reading them.
+
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file cannot be located.
+
+    IsADirectoryError
+        If the location points to a directory (i.e. the input is partitioned).
+
+    PermissionError
+        If the current execution context doesn't have enough permissions to read the file.
+    """
+    if not isinstance(serializer, StreamingSerializer):
+        # Files that are not memory-mapped are read into bytes
+        return serializer.deserialize(_read(input_location))  # type: ignore
+
+    hooks = hooks_registry.active
+    if hooks is not None:
+        hooks.io_read_start(input_location)
+
+    size = 0
+    try:
         with open(input_location, "rb") as f:
-            return f.read()
+            value = serializer.deserialize_from(f)
+            size = f.tell()
+    except BaseException as e:
+        if hooks is not None:
+            hooks.io_read_end(input_location, size, e)
+        raise
+
+    if hooks is not None:
+        hooks.io_read_end(input_location, size, None)
 
+    return value
 
-def store_output_in_location(output_location: str, output_value: NodeOutput):
+
+def store_output_in_location(
+    output_location: str,
+    output_value: Any,
+    packed: bool = False,
+    serializer: Optional[Serializer] = None,
+):
     """
     Store a serialized output into the specified location.
 
@@ -74,8 +163,17 @@ def store_output_in_location(output_location: str, output_value: NodeOutput):
         It may be partitioned. If it is, we will treat the output_location as a directory
         and dump each partition separately, together with a file named "partitions.json"
         containing a json-serialized list with all the partitions.
-        Partitions filenames follow a lexicographical order, so they can be joined later
-        in the same order.
+        Partitions are named after their index, so they can be joined later in the same order.
+
+    packed
+        Store all the partitions of a partitioned output in a single data file named "partitions.data",
+        next to "partitions.json" and an index named "partitions.index". The index contains the offset and length
+        of each partition in the data file, which allows reading any partition without reading the rest.
+        It saves creating a file per partition when outputs have many small partitions.
+
+    serializer
+        If supplied, output_value is the value of the output (or a PartitionedOutput with the value of each partition), instead of its serialized representation.
+        Values are serialized straight into their file. Serializers that conform to the StreamingSerializer protocol write the file as they serialize the value, which saves holding its serialized representation in memory. The rest serialize the value first.
 
 
     Raises
@@ -91,16 +189,232 @@ def store_output_in_location(output_location: str, output_value: NodeOutput):
     """
     if isinstance(output_value, PartitionedOutput):
         os.mkdir(output_location)
-        partition_filenames = []
 
-        for i, partition in enumerate(output_value):
-            partition_filename = str(i)
-            partition_filenames.append(partition_filename)
-            with open(os.path.join(output_location, partition_filename), "wb") as f:
-                f.write(partition)
+        if packed:
+            # Packed partitions are named after their index too, so the manifest is the same for both layouts
+            partition_filenames = [
+                str(i)
+                for i in range(_write_packed(output_location, output_value, serializer))
+            ]
+        else:
+            partition_filenames = []
+            for i, partition in enumerate(output_value):
+                partition_filename = str(i)
+                partition_filenames.append(partition_filename)
+                _write(
+                    os.path.join(output_location, partition_filename),
+                    partition,
+                    serializer,
+                )
 
         with open(os.path.join(output_location, PARTITION_MANIFEST_FILENAME), "w") as p:
             json.dump(partition_filenames, p)
     else:
-        with open(output_location, "wb") as f:
-            f.write(output_value)
+        _write(output_location, output_value, serializer)
+
+
+def _is_packed(location: str) -> bool:
+    return os.path.isfile(os.path.join(location, PACKED_PARTITIONS_INDEX_FILENAME))
+
+
+def _partition_sort_key(filename: str) -> Tuple[int, int, str]:
+    if filename.isdigit():
+        return (0, int(filename), filename)
+
+    return (1, 0, filename)
+
+
+def _write_packed(
+    location: str,
+    partitions: PartitionedOutput[Any],
+    serializer: Optional[Serializer] = None,
+) -> int:
+    """Write the partitions supplied into a data file and an index inside of a directory, and return the number of partitions written."""
+    data_path = os.path.join(location, PACKED_PARTITIONS_DATA_FILENAME)
+    index = bytearray()
+    offset = 0
+
+    hooks = hooks_registry.active
+    if hooks is not None:
+        hooks.io_write_start(data_path)
+    try:
+        with open(data_path, "wb") as f:
+            for partition in partitions:
+                _write_value(f, partition, serializer)
+                index += _INDEX_ENTRY.pack(offset, f.tell() - offset)
+                offset = f.tell()
+    except BaseException as e:
+        # The data file may have been partially written
+        _remove_files(data_path)
+        if hooks is not None:
+            hooks.io_write_end(data_path, offset, e)
+        raise
+
+    if hooks is not None:
+        hooks.io_write_end(data_path, offset, None)
+
+    index_path = os.path.join(location, PACKED_PARTITIONS_INDEX_FILENAME)
+    try:
+        _write(index_path, bytes(index))
+    except BaseException:
+        # Without a complete index, the data file cannot be read
+        _remove_files(data_path, index_path)
+        raise
+
+    return len(index) // _INDEX_ENTRY.size
+
+
+def _remove_files(*paths: str):
+    for path in paths:
+        if os.path.isfile(path):
+            os.remove(path)
+
+
+def _read(path: str, memory_map: bool = False) -> Union[bytes, memoryview]:
+    read = _memory_map if memory_map else _read_file
+    hooks = hooks_registry.active
+    if hooks is None:
+        return read(path)
+
+    hooks.io_read_start(path)
+    try:
+        value = read(path)
+    except BaseException as e:
+        hooks.io_read_end(path, 0, e)
+        raise
+
+    hooks.io_read_end(path, len(value), None)
+    return value
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _write(path: str, value: Any, serializer: Optional[Serializer] = None):
+    hooks = hooks_registry.active
+    if hooks is not None:
+        hooks.io_write_start(path)
+
+    size = 0
+    try:
+        with open(path, "wb") as f:
+            _write_value(f, value, serializer)
+            size = f.tell()
+    except BaseException as e:
+        if serializer is not None and os.path.isfile(path):
+            # Values serialized straight into a file may have been partially written
+            os.remove(path)
+        if hooks is not None:
+            hooks.io_write_end(path, size, e)
+        raise
+
+    if hooks is not None:
+        hooks.io_write_end(path, size, None)
+
+
+def _write_value(f: BinaryIO, value: Any, serializer: Optional[Serializer]):
+    if serializer is None:
+        f.write(value)
+    elif isinstance(serializer, StreamingSerializer):
+        serializer.serialize_to(value, f)
+    else:
+        f.write(serializer.serialize(value))
+
+
+class _PartitionFiles(Sequence[bytes]):
+    """The contents of a series of partition files, which are only read when each partition is accessed."""
+
+    def __init__(self, paths: List[str], memory_map: bool = False):
+        self._paths = paths
+        self._memory_map = memory_map
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return _PartitionFiles(self._paths[index], memory_map=self._memory_map)
+
+        return _read(self._paths[index], memory_map=self._memory_map)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __repr__(self) -> str:
+        return f"_PartitionFiles({self._paths})"
+
+
+class _PackedPartitions(Sequence[bytes]):
+    """
+    The contents of a series of partitions packed in a single data file, which are only read when each partition is accessed.
+
+    When the data file is memory-mapped, it is mapped once, and each partition is a slice of the mapping.
+    """
+
+    def __init__(
+        self,
+        data_path: str,
+        entries: Sequence[Tuple[int, int]],
+        memory_map: bool = False,
+        data: Optional[Union[bytes, memoryview]] = None,
+    ):
+        self._data_path = data_path
+        self._entries = entries
+        self._memory_map = memory_map
+        self._data = data
+
+    @classmethod
+    def from_location(
+        cls, location: str, memory_map: bool = False
+    ) -> "_PackedPartitions":
+        index = _read(os.path.join(location, PACKED_PARTITIONS_INDEX_FILENAME))
+        if len(index) % _INDEX_ENTRY.size != 0:
+            raise ValueError(
+                f"The index of the partitions packed in '{location}' is corrupted. Its size should be a multiple of {_INDEX_ENTRY.size} bytes, but it is {len(index)} bytes long."
+            )
+
+        return cls(
+            os.path.join(location, PACKED_PARTITIONS_DATA_FILENAME),
+            [(offset, length) for offset, length in _INDEX_ENTRY.iter_unpack(index)],
+            memory_map=memory_map,
+        )
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return _PackedPartitions(
+                self._data_path,
+                self._entries[index],
+                memory_map=self._memory_map,
+                data=self._data,
+            )
+
+        offset, length = self._entries[index]
+        hooks = hooks_registry.active
+        if hooks is None:
+            return self._read_range(offset, length)
+
+        hooks.io_read_start(self._data_path)
+        try:
+            value = self._read_range(offset, length)
+        except BaseException as e:
+            hooks.io_read_end(self._data_path, 0, e)
+            raise
+
+        hooks.io_read_end(self._data_path, len(value), None)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"_PackedPartitions({self._data_path}, {len(self._entries)} partitions)"
+
+    def _read_range(self, offset: int, length: int) -> Union[bytes, memoryview]:
+        if self._memory_map:
+            if self._data is None:
+                self._data = _memory_map(self._data_path)
+
+            return self._data[offset : offset + length]
+
+        with open(self._data_path, "rb") as f:
+            f.seek(offset)
+            return f.read(length)
@@ -1,7 +1,15 @@
 """Run DAGs or nodes in memory."""
 
+from dagger.runtime.local.async_dag import ainvoke  # noqa
+from dagger.runtime.local.cache import NodeCache  # noqa
+from dagger.runtime.local.compact import CompactPartitions  # noqa
 from dagger.runtime.local.dag import invoke  # noqa
+from dagger.runtime.local.output_store import SpillingOutputStore  # noqa
+from dagger.runtime.local.report import AllocationSite, NodeReport, RunReport  # noqa
+from dagger.runtime.local.run_record import NodeDecision, RunRecord  # noqa
+from dagger.runtime.local.shuffle import merge_key_groups, split_into_key_groups  # noqa
 from dagger.runtime.local.types import (  # noqa
+    LazyPartitions,
     NodeOutput,
     NodeOutputs,
     PartitionedOutput,
@@ -0,0 +1,332 @@
+"""Run a DAG in memory on top of an asyncio event loop."""
+import asyncio
+import functools
+import inspect
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    TypeVar,
+    Union,
+)
+
+from dagger.dag import DAG, Node, validate_parameters
+from dagger.runtime.local.dag import (
+    _extract_dag_outputs,
+    _node_error_context,
+    _node_param_partitions,
+    _outputs_as_bytes,
+    _release_consumed_outputs,
+)
+from dagger.runtime.local.task import (
+    _serialize_outputs,
+    _validate_and_filter_inputs,
+    _vectorized_inputs,
+    _vectorized_return_values,
+)
+from dagger.runtime.local.types import (
+    NodeExecutions,
+    NodeOutput,
+    NodeOutputs,
+    NodeParams,
+    PartitionedOutput,
+)
+from dagger.task import Task
+
+T = TypeVar("T")
+
+
+async def ainvoke(
+    node: Union[DAG, Task],
+    params: Optional[Mapping[str, Any]] = None,
+    max_concurrency: Optional[int] = None,
+) -> Mapping[str, NodeOutput]:
+    """
+    Invoke a node with a series of parameters, awaiting all the coroutines on the current event loop.
+
+    Tasks whose function is a coroutine function (`async def`) are awaited on the event loop. Other tasks are run in the loop's default executor, so they don't block it.
+    Each node starts as soon as the nodes it depends on have completed, and all the partitions of a partitioned node are started at the same time.
+
+    Parameters
+    ----------
+    node
+        Node to execute
+
+    params
+        Inputs to the task, indexed by input/parameter name.
+
+    max_concurrency
+        Maximum number of task functions that may be running at the same time.
+        If not specified, there is no limit.
+
+
+    Returns
+    -------
+    Serialized outputs of the task, indexed by output name.
+
+
+    Raises
+    ------
+    ValueError
+        When any required parameters are missing
+
+    TypeError
+        When any of the outputs cannot be obtained from the return value of the task's function
+
+    SerializationError
+        When some of the outputs cannot be serialized with the specified Serializer
+    """
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+    outputs = await _ainvoke(node, params=params, semaphore=semaphore)
+    return _outputs_as_bytes(outputs)
+
+
+async def _ainvoke(
+    node: Node,
+    params: Optional[Mapping[str, Any]],
+    semaphore: Optional[asyncio.Semaphore],
+) -> NodeOutputs:
+    if isinstance(node, DAG):
+        return await _ainvoke_dag(node, params=params, semaphore=semaphore)
+    elif node.vectorized:
+        return await _ainvoke_vectorized_task_on_its_own(
+            node, params=params, semaphore=semaphore
+        )
+    else:
+        return await _ainvoke_task(node, params=params, semaphore=semaphore)
+
+
+async def _ainvoke_dag(
+    dag: DAG,
+    params: Optional[Mapping[str, Any]],
+    semaphore: Optional[asyncio.Semaphore],
+) -> NodeOutputs:
+    # Nested functions do not see the narrowed type of the parameters
+    dag_params: Mapping[str, Any] = params or {}
+    validate_parameters(dag.inputs, dag_params)
+
+    outputs: Dict[str, NodeExecutions] = {}
+    dag_outputs: Dict[str, NodeOutput] = {}
+    remaining_consumers = {
+        node_name: len(dependents)
+        for node_name, dependents in dag.node_dependents.items()
+    }
+    completed_nodes: Set[str] = set()
+    running: Dict[asyncio.Future, str] = {}
+
+    def start(node_names: Set[str]):
+        for node_name in node_names:
+            node = dag.nodes[node_name]
+            # The inputs are deserialized off the event loop, from a snapshot of the outputs that may be released below
+            future = asyncio.ensure_future(
+                _ainvoke_node_partitions(
+                    node,
+                    params=dag_params,
+                    outputs=dict(outputs),
+                    semaphore=semaphore,
+                )
+            )
+            running[future] = node_name
+
+            _release_consumed_outputs(
+                dag,
+                consumer=node_name,
+                outputs=outputs,
+                remaining_consumers=remaining_consumers,
+            )
+
+    try:
+        start(dag.newly_ready_nodes(completed_nodes))
+
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+            newly_completed_nodes = []
+            for future in done:
+                node_name = running.pop(future)
+                with _node_error_context(node_name):
+                    outputs[node_name] = future.result()
+
+                dag_outputs.update(
+                    _extract_dag_outputs(dag, node_name=node_name, outputs=outputs)
+                )
+                if remaining_consumers[node_name] == 0:
+                    del outputs[node_name]
+
+                completed_nodes.add(node_name)
+                newly_completed_nodes.append(node_name)
+
+            start(dag.newly_ready_nodes(completed_nodes, newly_completed_nodes))
+
+    except BaseException:
+        for future in running:
+            future.cancel()
+
+        raise
+
+    return dag_outputs
+
+
+def _list_node_param_partitions(
+    node: Node,
+    params: Mapping[str, Any],
+    outputs: Mapping[str, NodeExecutions],
+) -> List[NodeParams]:
+    return list(_node_param_partitions(node=node, params=params, outputs=outputs))
+
+
+async def _ainvoke_node_partitions(
+    node: Node,
+    params: Mapping[str, Any],
+    outputs: Mapping[str, NodeExecutions],
+    semaphore: Optional[asyncio.Semaphore],
+) -> NodeExecutions:
+    partition_params = await _run_in_executor(
+        _list_node_param_partitions, node=node, params=params, outputs=outputs
+    )
+    if isinstance(node, Task) and node.vectorized:
+        # The function of vectorized tasks receives a batch of partitions on each call
+        batch_size = node.partitions_per_worker
+        futures: List["asyncio.Future[Any]"] = [
+            asyncio.ensure_future(
+                _ainvoke_vectorized_batch(
+                    node,
+                    partitions=partition_params[i : i + batch_size],
+                    semaphore=semaphore,
+                )
+            )
+            for i in range(0, len(partition_params), batch_size)
+        ]
+    else:
+        futures = [
+            asyncio.ensure_future(_ainvoke(node, params=p, semaphore=semaphore))
+            for p in partition_params
+        ]
+
+    try:
+        results = await asyncio.gather(*futures)
+    except BaseException:
+        for future in futures:
+            future.cancel()
+
+        raise
+
+    executions: List[NodeOutputs] = (
+        [execution for batch in results for execution in batch]
+        if isinstance(node, Task) and node.vectorized
+        else results
+    )
+
+    if node.partition_by_input:
+        return PartitionedOutput(executions)
+    else:
+        return executions[0]
+
+
+async def _ainvoke_task(
+    task: Task,
+    params: Optional[NodeParams],
+    semaphore: Optional[asyncio.Semaphore],
+) -> NodeOutputs:
+    params = params or {}
+    inputs = _validate_and_filter_inputs(inputs=task.inputs, params=params)
+
+    if semaphore is None:
+        return_value = await _call(task, inputs)
+    else:
+        async with semaphore:
+            return_value = await _call(task, inputs)
+
+    return await _run_in_executor(
+        _serialize_outputs,
+        outputs=task.outputs,
+        return_value=return_value,
+    )
+
+
+async def _ainvoke_vectorized_task_on_its_own(
+    task: Task,
+    params: Optional[NodeParams],
+    semaphore: Optional[asyncio.Semaphore],
+) -> NodeOutputs:
+    params = params or {}
+    _validate_and_filter_inputs(inputs=task.inputs, params=params)
+    assert task.partition_by_input is not None
+
+    executions = await _ainvoke_vectorized_batch(
+        task,
+        partitions=[
+            {**params, task.partition_by_input: p}
+            for p in params[task.partition_by_input]
+        ],
+        semaphore=semaphore,
+    )
+    return {
+        output_name: PartitionedOutput(
+            [execution[output_name] for execution in executions]  # type: ignore
+        )
+        for output_name in task.outputs
+    }
+
+
+async def _ainvoke_vectorized_batch(
+    task: Task,
+    partitions: List[NodeParams],
+    semaphore: Optional[asyncio.Semaphore],
+) -> List[NodeOutputs]:
+    if not partitions:
+        return []
+
+    inputs = _vectorized_inputs(
+        task,
+        [_validate_and_filter_inputs(inputs=task.inputs, params=p) for p in partitions],
+    )
+
+    if semaphore is None:
+        return_value = await _call(task, inputs)
+    else:
+        async with semaphore:
+            return_value = await _call(task, inputs)
+
+    return await _run_in_executor(
+        _serialize_vectorized_outputs,
+        task,
+        return_value=return_value,
+        n_partitions=len(partitions),
+    )
+
+
+def _serialize_vectorized_outputs(
+    task: Task,
+    return_value: Any,
+    n_partitions: int,
+) -> List[NodeOutputs]:
+    return [
+        _serialize_outputs(outputs=task.outputs, return_value=partition_return_value)
+        for partition_return_value in _vectorized_return_values(
+            return_value, n_partitions
+        )
+    ]
+
+
+async def _call(task: Task, inputs: Mapping[str, Any]) -> Any:
+    if inspect.iscoroutinefunction(task.func):
+        return await task.func(**inputs)
+
+    return_value = await _run_in_executor(task.func, **inputs)
+
+    # Functions that wrap a coroutine function (e.g. a lambda) return a coroutine
+    if inspect.iscoroutine(return_value):
+        return_value = await return_value
+
+    return return_value
+
+
+async def _run_in_executor(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking function in the default executor of the loop, which also runs the functions of tasks that are not coroutine functions."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
@@ -0,0 +1,467 @@
+"""Persistent cache of the outputs of local task executions."""
+
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+import types
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from dagger.runtime.local.compact import CompactPartitions
+from dagger.runtime.local.types import (
+    LazyPartitions,
+    NodeOutputs,
+    PartitionedOutput,
+)
+from dagger.serializer import SerializationError
+from dagger.task import Task
+
+CACHE_ENTRY_EXTENSION = ".outputs"
+
+
+class NodeCache:
+    """
+    Cache the serialized outputs of tasks in a directory, so they are not recomputed when a task is invoked again with the same inputs.
+
+    Entries are addressed by a hash of:
+    - The code of the task's function, together with any literal values bound to it (e.g. its default arguments, the variables it closes over, or the arguments preset with functools.partial or the imperative DSL).
+    - The outputs the task declares.
+    - The value of each of its inputs, serialized with the serializer of the input.
+
+    Functions are fingerprinted by their own code. Changes in other functions they call are not detected, so you should clear the cache (or point the runtime to a new directory) when you change them.
+
+    The directory may be shared by several processes. Entries are written atomically, so concurrent invocations never observe a partially-written entry.
+    To enforce its limits without listing the directory every time an entry is stored, each process lists it once, and then keeps track of the entries it stores, uses and evicts. Entries stored by other processes in the meantime are only taken into account by processes that list the directory afterwards.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_size_bytes: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize a node cache.
+
+        Parameters
+        ----------
+        directory
+            Directory to store the cached outputs in. It is created if it doesn't exist.
+
+        max_size_bytes
+            Maximum size of all the entries in the cache.
+            When a new entry makes the cache exceed this size, the least recently used entries are evicted.
+            If not specified, the size of the cache is unbounded.
+
+        max_age_seconds
+            Maximum number of seconds an entry remains valid after it was stored.
+            Older entries are evicted, and the task is invoked again.
+            If not specified, entries never expire.
+        """
+        if max_size_bytes is not None and max_size_bytes < 0:
+            raise ValueError(
+                f"The maximum size of the cache must be a non-negative number of bytes. Instead, we found {max_size_bytes}."
+            )
+
+        if max_age_seconds is not None and max_age_seconds < 0:
+            raise ValueError(
+                f"The maximum age of the entries in the cache must be a non-negative number of seconds. Instead, we found {max_age_seconds}."
+            )
+
+        self._directory = directory
+        self._max_size_bytes = max_size_bytes
+        self._max_age_seconds = max_age_seconds
+
+    @property
+    def directory(self) -> str:
+        """Return the directory the cache stores its entries in."""
+        return self._directory
+
+    def key(
+        self,
+        task: Task,
+        params: Mapping[str, Any],
+        input_hashes: Optional[Mapping[str, str]] = None,
+    ) -> Optional[str]:
+        """
+        Return the key that identifies the execution of a task with a series of parameters.
+
+        Runtimes that already hold the serialized value of some of the inputs may supply the hash of each of them, so they are not serialized again.
+
+        If some of the parameters cannot be fingerprinted to compute the key (e.g. they cannot be serialized), it returns None, signaling the execution cannot be cached.
+        """
+        fingerprint = _task_fingerprint(task, params, input_hashes=input_hashes)
+        return fingerprint.key if fingerprint else None
+
+    def get(self, key: str) -> Optional[NodeOutputs]:
+        """Return the outputs stored under a key, or None if there are none (or they have expired)."""
+        path = self._path(key)
+        try:
+            stat = os.stat(path)
+            if self._has_expired(stat.st_mtime):
+                self._remove(path)
+                return None
+
+            with open(path, "rb") as f:
+                outputs = pickle.load(f)
+
+            # The access time tracks the last time an entry was used, and the modification time tracks when it was stored
+            os.utime(path, (time.time(), stat.st_mtime))
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+        if self._has_limits():
+            _directory_entries(self._directory).used(os.path.basename(path))
+
+        return {
+            name: PartitionedOutput(value)  # type: ignore
+            if isinstance(value, (list, CompactPartitions))
+            else value
+            for name, value in outputs.items()
+        }
+
+    def put(self, key: str, outputs: NodeOutputs):
+        """Store the outputs under a key, evicting other entries if the cache exceeds its maximum size."""
+        # Partitions are pickled as a single compact buffer, instead of one object per partition
+        materialized_outputs = {
+            name: CompactPartitions.from_iterable(value)
+            if isinstance(value, PartitionedOutput)
+            else value
+            for name, value in outputs.items()
+        }
+
+        os.makedirs(self._directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(materialized_outputs, f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = f.tell()
+        os.replace(tmp_path, self._path(key))
+
+        if not self._has_limits():
+            return
+
+        entries = _directory_entries(self._directory)
+        entries.stored(
+            os.path.basename(self._path(key)), size=size, stored_at=time.time()
+        )
+        for filename in entries.evict(self._max_size_bytes, self._has_expired):
+            _remove_file(os.path.join(self._directory, filename))
+
+    def clear(self):
+        """Remove all the entries of the cache."""
+        for path, _ in _list_entries(self._directory):
+            self._remove(path)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, f"{key}{CACHE_ENTRY_EXTENSION}")
+
+    def _has_expired(self, stored_at: float) -> bool:
+        return (
+            self._max_age_seconds is not None
+            and time.time() - stored_at > self._max_age_seconds
+        )
+
+    def _has_limits(self) -> bool:
+        return self._max_size_bytes is not None or self._max_age_seconds is not None
+
+    def _remove(self, path: str):
+        _remove_file(path)
+        if self._has_limits():
+            _directory_entries(self._directory).removed(os.path.basename(path))
+
+    def __repr__(self) -> str:
+        """Get a human-readable string representation of the cache."""
+        return f"NodeCache(directory={self._directory}, max_size_bytes={self._max_size_bytes}, max_age_seconds={self._max_age_seconds})"
+
+    def __eq__(self, obj) -> bool:
+        """Return true if both caches are equivalent."""
+        return (
+            isinstance(obj, NodeCache)
+            and self._directory == obj._directory
+            and self._max_size_bytes == obj._max_size_bytes
+            and self._max_age_seconds == obj._max_age_seconds
+        )
+
+
+class _DirectoryEntries:
+    """
+    The size and time of storage of the entries of a cache directory, by filename, in the order they were last used.
+
+    The directory is listed once, when the entries are created. From then on, they are updated as the cache stores, uses and removes entries, so it can evict the least recently used ones without listing the directory again.
+    """
+
+    def __init__(self, directory: str):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._size = 0
+
+        for path, stat in sorted(_list_entries(directory), key=lambda e: e[1].st_atime):
+            self._entries[os.path.basename(path)] = (stat.st_size, stat.st_mtime)
+            self._size += stat.st_size
+
+    def used(self, filename: str):
+        with self._lock:
+            if filename in self._entries:
+                self._entries.move_to_end(filename)
+
+    def stored(self, filename: str, size: int, stored_at: float):
+        with self._lock:
+            previous = self._entries.pop(filename, None)
+            if previous is not None:
+                self._size -= previous[0]
+
+            self._entries[filename] = (size, stored_at)
+            self._size += size
+
+    def removed(self, filename: str):
+        with self._lock:
+            entry = self._entries.pop(filename, None)
+            if entry is not None:
+                self._size -= entry[0]
+
+    def evict(
+        self,
+        max_size: Optional[int],
+        has_expired: Callable[[float], bool],
+    ) -> List[str]:
+        """Forget the least recently used entries while they have expired or the entries exceed the maximum size, and return their filenames so they can be removed."""
+        evicted = []
+        with self._lock:
+            while self._entries:
+                filename, (size, stored_at) = next(iter(self._entries.items()))
+                if not has_expired(stored_at) and (
+                    max_size is None or self._size <= max_size
+                ):
+                    break
+
+                del self._entries[filename]
+                self._size -= size
+                evicted.append(filename)
+
+        return evicted
+
+
+# The entries of each cache directory known to this process
+_entries_by_directory: Dict[str, _DirectoryEntries] = {}
+_entries_by_directory_lock = threading.Lock()
+
+
+def _directory_entries(directory: str) -> _DirectoryEntries:
+    directory = os.path.abspath(directory)
+    with _entries_by_directory_lock:
+        if directory not in _entries_by_directory:
+            _entries_by_directory[directory] = _DirectoryEntries(directory)
+
+        return _entries_by_directory[directory]
+
+
+def _list_entries(directory: str) -> List[Tuple[str, os.stat_result]]:
+    try:
+        filenames = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+
+    entries = []
+    for filename in filenames:
+        if not filename.endswith(CACHE_ENTRY_EXTENSION):
+            continue
+
+        path = os.path.join(directory, filename)
+        try:
+            entries.append((path, os.stat(path)))
+        except FileNotFoundError:
+            # Another process may have evicted it in the meantime
+            pass
+
+    return entries
+
+
+class _TaskFingerprint(NamedTuple):
+    """The hashes of everything that determines the outputs of a task execution."""
+
+    function: str
+    outputs: str
+    inputs: Mapping[str, str]
+
+    @property
+    def key(self) -> str:
+        h = hashlib.sha256()
+        h.update(self.function.encode())
+        h.update(self.outputs.encode())
+        for input_name in sorted(self.inputs):
+            h.update(input_name.encode())
+            h.update(self.inputs[input_name].encode())
+
+        return h.hexdigest()
+
+
+def _task_fingerprint(
+    task: Task,
+    params: Mapping[str, Any],
+    input_hashes: Optional[Mapping[str, str]] = None,
+) -> Optional[_TaskFingerprint]:
+    """Fingerprint the execution of a task, or return None if some of the parameters cannot be fingerprinted."""
+    try:
+        return _fingerprint(task, params, input_hashes=input_hashes)
+    except _UnfingerprintableInputError:
+        return None
+
+
+class _UnfingerprintableInputError(Exception):
+    """Raised when one of the inputs of a task cannot be fingerprinted. The message explains why."""
+
+
+def _fingerprint(
+    task: Task,
+    params: Mapping[str, Any],
+    input_hashes: Optional[Mapping[str, str]] = None,
+) -> _TaskFingerprint:
+    """Fingerprint the execution of a task, or raise an _UnfingerprintableInputError if some of the parameters cannot be fingerprinted."""
+    input_hashes = input_hashes or {}
+    hashes = {}
+    for input_name, value in params.items():
+        if input_name in input_hashes:
+            hashes[input_name] = input_hashes[input_name]
+        else:
+            hashes[input_name] = _input_hash(task, input_name, value)
+
+    return _TaskFingerprint(
+        function=hashlib.sha256(_func_fingerprint(task.func)).hexdigest(),
+        outputs=hashlib.sha256(repr(sorted(task.outputs.items())).encode()).hexdigest(),
+        inputs=hashes,
+    )
+
+
+def _input_hash(task: Task, input_name: str, value: Any) -> str:
+    """Hash the serialized value of an input of a task."""
+    if isinstance(value, LazyPartitions):
+        # Lazy partitions keep their partitions serialized, so they can be hashed without deserializing them
+        if all(
+            isinstance(p, (bytes, bytearray, memoryview)) for p in value._partitions
+        ):
+            return _serialized_hash(value._partitions)
+
+        raise _UnfingerprintableInputError(
+            f"Its input '{input_name}' is a lazy iterable over partitions that were not serialized, so it cannot be compared with the previous run."
+        )
+
+    if isinstance(value, PartitionedOutput):
+        # Partitioned inputs are deserialized one at a time while the task consumes them. Hashing them would load all of them in memory upfront
+        raise _UnfingerprintableInputError(
+            f"Its input '{input_name}' is partitioned, and its partitions are only deserialized while the task consumes them, so it cannot be compared with the previous run."
+        )
+
+    try:
+        serialized_value = task.inputs[input_name].serializer.serialize(value)
+    except SerializationError:
+        raise _UnfingerprintableInputError(
+            f"Its input '{input_name}' cannot be serialized, so it cannot be compared with the previous run."
+        )
+
+    return _serialized_hash(serialized_value)
+
+
+def _serialized_hash(serialized_value: Any) -> str:
+    """
+    Return the hash of the serialized value of an input, as the cache fingerprints it.
+
+    The value may be the serialized representation of the input, or a sequence with the serialized representation of each of its partitions.
+    """
+    if isinstance(serialized_value, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(serialized_value).hexdigest()
+
+    h = hashlib.sha256(b"partitions")
+    for partition in serialized_value:
+        h.update(hashlib.sha256(partition).digest())
+
+    return h.hexdigest()
+
+
+def _func_fingerprint(func: Any, _seen: Optional[Set[int]] = None) -> bytes:
+    """Return a fingerprint of the code of a function and the literal values bound to it."""
+    # Recursive functions may reference themselves through their closure
+    seen = _seen or set()
+    if id(func) in seen:
+        return b"<recursive>"
+    seen.add(id(func))
+
+    if isinstance(func, functools.partial):
+        return b"".join(
+            [
+                _func_fingerprint(func.func, seen),
+                _literal_fingerprint(func.args, seen),
+                _literal_fingerprint(sorted(func.keywords.items()), seen),
+            ]
+        )
+
+    code = getattr(func, "__code__", None)
+    if code is None:
+        # Builtins and callable objects are identified by their qualified name and state
+        return _literal_fingerprint(func, seen)
+
+    return b"".join(
+        [
+            _code_fingerprint(code),
+            _literal_fingerprint(getattr(func, "__defaults__", None), seen),
+            _literal_fingerprint(getattr(func, "__kwdefaults__", None), seen),
+            b"".join(
+                _literal_fingerprint(cell.cell_contents, seen)
+                for cell in getattr(func, "__closure__", None) or []
+            ),
+        ]
+    )
+
+
+def _code_fingerprint(code: types.CodeType) -> bytes:
+    return b"".join(
+        [
+            code.co_code,
+            repr(code.co_names).encode(),
+            # Inputs are passed by keyword, so the names and kinds of the arguments are part of the behavior of the function
+            repr(
+                (
+                    code.co_varnames,
+                    code.co_argcount,
+                    code.co_posonlyargcount,
+                    code.co_kwonlyargcount,
+                )
+            ).encode(),
+            b"".join(
+                _code_fingerprint(const)
+                if isinstance(const, types.CodeType)
+                else repr(const).encode()
+                for const in code.co_consts
+            ),
+        ]
+    )
+
+
+def _literal_fingerprint(value: Any, seen: Set[int]) -> bytes:
+    if isinstance(value, (types.FunctionType, functools.partial)):
+        return _func_fingerprint(value, seen)
+
+    try:
+        return pickle.dumps(value, protocol=4)
+    except Exception:
+        return repr(value).encode()
+
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
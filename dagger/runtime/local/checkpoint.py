@@ -0,0 +1,69 @@
+"""Persist the outputs of the nodes of a DAG as they complete, so a failed invocation can be resumed."""
+
+import os
+import pickle
+import tempfile
+from typing import List, Optional
+
+from dagger.runtime.local.types import NodeOutputs, PartitionedOutput
+
+CHECKPOINT_EXTENSION = ".checkpoint"
+
+
+def _store_checkpoint(
+    directory: str,
+    address: str,
+    partitions: List[NodeOutputs],
+):
+    """Store the outputs of each partition of a node in the checkpoint directory."""
+    # Partitioned outputs and memory views cannot be pickled directly
+    materialized_partitions = [
+        {
+            name: [bytes(p) for p in value]
+            if isinstance(value, PartitionedOutput)
+            else bytes(value)
+            for name, value in outputs.items()
+        }
+        for outputs in partitions
+    ]
+
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        pickle.dump(materialized_partitions, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, _checkpoint_path(directory, address))
+
+
+def _load_checkpoint(directory: str, address: str) -> Optional[List[NodeOutputs]]:
+    """Load the outputs of each partition of a node from the checkpoint directory, or return None if the node has no checkpoint."""
+    try:
+        with open(_checkpoint_path(directory, address), "rb") as f:
+            return _restore_partitions(pickle.load(f))
+    except FileNotFoundError:
+        return None
+
+
+def _clear_checkpoints(directory: str):
+    """Remove all the checkpoints from a directory, leaving any other files untouched."""
+    try:
+        filenames = os.listdir(directory)
+    except FileNotFoundError:
+        return
+
+    for filename in filenames:
+        if filename.endswith(CHECKPOINT_EXTENSION):
+            os.remove(os.path.join(directory, filename))
+
+
+def _checkpoint_path(directory: str, address: str) -> str:
+    return os.path.join(directory, f"{address}{CHECKPOINT_EXTENSION}")
+
+
+def _restore_partitions(partitions: List[dict]) -> List[NodeOutputs]:
+    return [
+        {
+            name: PartitionedOutput(value) if isinstance(value, list) else value
+            for name, value in outputs.items()
+        }
+        for outputs in partitions
+    ]
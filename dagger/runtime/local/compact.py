@@ -0,0 +1,111 @@
+"""Keep many small serialized partitions in a single contiguous buffer."""
+
+from array import array
+from typing import Any, Iterable, Iterator, Optional, Sequence, Union
+
+from dagger.runtime.local.types import PartitionedOutput
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+class CompactPartitions(Sequence[memoryview]):
+    """
+    A sequence of serialized partitions stored back to back in a single buffer, together with a table of their offsets.
+
+    Partitioned outputs with many small partitions would otherwise be made of one bytes object per partition, whose overhead (~33 bytes each, plus a pointer in a list) often exceeds the size of the partition itself. A compact buffer takes 8 bytes per partition on top of its contents. It is also sent to (and back from) worker processes as two objects, instead of one per partition.
+
+    Partitions are read as memoryview slices of the buffer. The local runtime hands them as they are to serializers that accept buffers (see `Serializer.deserialize`), and copies them into bytes right before they are deserialized for the rest.
+    """
+
+    def __init__(self, buffer: BytesLike, offsets: "array[int]"):
+        """
+        Build a sequence of partitions from a buffer and the offsets where each partition starts and ends.
+
+        Use `CompactPartitions.from_iterable` to build it from a series of serialized partitions.
+
+        Parameters
+        ----------
+        buffer
+            Bytes-like object with the contents of all partitions, back to back.
+
+        offsets
+            An array with the offset where each partition starts, followed by the offset where the last one ends (i.e. one more element than partitions).
+        """
+        if not offsets or offsets[0] != 0 or offsets[-1] != len(buffer):
+            raise ValueError(
+                f"The offsets of a compact buffer should start at 0 and end at the length of the buffer ({len(buffer)}). Instead, we found {list(offsets[:1])} and {list(offsets[-1:])}."
+            )
+
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+        self._offsets = offsets
+
+    @classmethod
+    def from_iterable(cls, partitions: Iterable[Any]) -> "CompactPartitions":
+        """Copy a series of bytes-like partitions into a compact buffer, unless they are already in one."""
+        compact = _compact_partitions(partitions)
+        if compact is not None:
+            return compact
+
+        buffer = bytearray()
+        offsets = array("Q", [0])
+        for partition in partitions:
+            buffer += partition
+            offsets.append(len(buffer))
+
+        return cls(buffer, offsets)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the size of the contents of all partitions."""
+        return len(self._buffer)
+
+    def __len__(self) -> int:
+        """Return the number of partitions."""
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: Any) -> Any:
+        """Return a view of the partition at an index, or a sequence with the partitions in a slice."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError("partition index out of range")
+
+        return self._view[self._offsets[index] : self._offsets[index + 1]]
+
+    def __iter__(self) -> Iterator[memoryview]:
+        """Return an iterator over views of the partitions."""
+        view, offsets = self._view, self._offsets
+        for i in range(len(offsets) - 1):
+            yield view[offsets[i] : offsets[i + 1]]
+
+    def __reduce__(self):
+        """Pickle the buffer and the offsets, instead of each partition."""
+        # Buffers may be memory-mapped views of a spilled output, which cannot be pickled
+        buffer = (
+            bytes(self._buffer)
+            if isinstance(self._buffer, memoryview)
+            else self._buffer
+        )
+        return (CompactPartitions, (buffer, self._offsets))
+
+    def __repr__(self) -> str:
+        """Return a human-readable representation of the partitions."""
+        return f"CompactPartitions(partitions={len(self)}, nbytes={self.nbytes})"
+
+
+def _compact_partitions(value: Any) -> Optional[CompactPartitions]:
+    """Return the compact buffer that holds the partitions of a value, or None if they are not kept in one."""
+    if isinstance(value, CompactPartitions):
+        return value
+
+    if isinstance(value, PartitionedOutput) and isinstance(
+        value._partitions, CompactPartitions
+    ):
+        return value._partitions
+
+    return None
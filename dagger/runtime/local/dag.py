@@ -1,11 +1,58 @@
 """Run a DAG in memory."""
-import itertools
-from typing import Any, Dict, Iterable, Mapping, Optional, Union
+import functools
+import os
+import threading
+import time
+import tracemalloc
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    CancelledError,
+    Executor,
+    Future,
+    InvalidStateError,
+    wait,
+)
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, replace
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
+import dagger.hooks.registry as hooks_registry
 from dagger.dag import DAG, Node, validate_parameters
+from dagger.hooks import ChromeTrace, Hooks, registered
 from dagger.input import FromNodeOutput, FromParam
-from dagger.runtime.local.task import _invoke_task
+from dagger.runtime.local.cache import NodeCache, _serialized_hash
+from dagger.runtime.local.checkpoint import (
+    _clear_checkpoints,
+    _load_checkpoint,
+    _store_checkpoint,
+)
+from dagger.runtime.local.output_store import SpillingOutputStore
+from dagger.runtime.local.report import NodeReport, RunReport, _outputs_size
+from dagger.runtime.local.run_record import RunRecord
+from dagger.runtime.local.shuffle import KeyGroup, merge_key_groups
+from dagger.runtime.local.task import (
+    _invoke_task,
+    _invoke_task_and_report,
+    _invoke_task_batch,
+    _invoke_vectorized_task,
+    _validate_and_filter_inputs,
+)
 from dagger.runtime.local.types import (
+    LazyPartitions,
     NodeExecutions,
     NodeOutput,
     NodeOutputs,
@@ -16,9 +63,50 @@ from dagger.serializer import SerializationError, Serializer
 from dagger.task import Task
 
 
+@dataclass(frozen=True)
+class _InvocationOptions:
+    """Options that apply to the invocation of a node and all the nodes nested inside of it."""
+
+    executor: Optional[Executor] = None
+    partition_executor: Optional[Executor] = None
+    serialize_intermediate_outputs: bool = True
+    serialize_outputs: bool = True
+    output_store: Optional[SpillingOutputStore] = None
+    cache: Optional[NodeCache] = None
+    run_record: Optional[RunRecord] = None
+    checkpoint_dir: Optional[str] = None
+    resume: bool = False
+    report: Optional[RunReport] = None
+    profile_memory: bool = False
+    profile_dir: Optional[str] = None
+    profile_nodes: FrozenSet[str] = frozenset()
+    # Threads left to orchestrate nested DAGs and combiners concurrently
+    orchestrators: Optional[threading.BoundedSemaphore] = None
+    # Completed when the node that contains this one is cancelled
+    cancellation: Optional[Future] = None
+
+
+# Same default as the number of workers of a concurrent.futures.ThreadPoolExecutor
+_MAX_ORCHESTRATOR_THREADS = min(32, (os.cpu_count() or 1) + 4)
+
+
 def invoke(
     node: Union[DAG, Task],
     params: Optional[Mapping[str, Any]] = None,
+    executor: Optional[Executor] = None,
+    partition_executor: Optional[Executor] = None,
+    serialize_intermediate_outputs: bool = True,
+    output_store: Optional[SpillingOutputStore] = None,
+    cache: Optional[NodeCache] = None,
+    run_record: Optional[RunRecord] = None,
+    checkpoint_dir: Optional[str] = None,
+    resume: bool = False,
+    report: Optional[RunReport] = None,
+    trace: Optional[ChromeTrace] = None,
+    profile_memory: bool = False,
+    profile_dir: Optional[str] = None,
+    profile_nodes: Iterable[str] = (),
+    serialize_outputs: bool = True,
 ) -> Mapping[str, NodeOutput]:
     """
     Invoke a node with a series of parameters.
@@ -31,10 +119,80 @@ def invoke(
     params
         Inputs to the task, indexed by input/parameter name.
 
+    executor
+        An executor (e.g. concurrent.futures.ThreadPoolExecutor) used to run tasks concurrently.
+        Each node is submitted to the executor as soon as the nodes it depends on have completed. The partitions of partitioned nodes are submitted at the same time.
+        Nested DAGs are coordinated from their own threads, so they never take up (or wait on) a slot in the executor. Up to min(32, os.cpu_count() + 4) of them (the default number of workers of a ThreadPoolExecutor) get a thread of their own at a time. Beyond that, they are coordinated from the thread of the DAG that contains them.
+        If not specified, all nodes are executed sequentially in the current thread. In that case, tasks with a coroutine function cannot be invoked from asynchronous code (a thread running an event loop), since they are awaited in a new event loop. Use `ainvoke` instead.
+
+    partition_executor
+        An executor used to run the partitions of partitioned tasks. It defaults to `executor`.
+        This lets you run CPU-bound map steps in a concurrent.futures.ProcessPoolExecutor, while the rest of the nodes run in the current thread or in `executor`.
+        When using a process pool, the function of each partitioned task must be picklable (e.g. a function defined at the top level of a module), and so must its inputs.
+        Only the parameters of each partition are shipped to the worker processes, and only their serialized outputs are shipped back.
+
+    serialize_intermediate_outputs
+        Whether to serialize the outputs of each node and deserialize them again before they are passed on to other nodes.
+        Setting it to False passes the Python objects returned by each task directly to the nodes that consume them, and only serializes the outputs of the DAG itself. This saves a lot of time when intermediate outputs are large, but:
+        - Outputs that are not serializable will not be detected until the DAG runs on a different runtime.
+        - Nodes will receive the same object other nodes returned (not a copy of it), and in its original type (e.g. a tuple will not turn into a list after a round-trip through JSON).
+
+    output_store
+        A SpillingOutputStore to keep the serialized outputs of intermediate nodes in.
+        The store keeps outputs in memory up to a certain budget, and spills the rest to disk. This allows you to run DAGs whose intermediate outputs do not fit in memory.
+        It has no effect when serialize_intermediate_outputs is False.
+        If not specified, all intermediate outputs are kept in memory until their consumers have retrieved them.
+
+    cache
+        A NodeCache to retrieve the outputs of tasks from, instead of invoking them again with the same inputs.
+        Tasks whose outputs are not in the cache yet are invoked, and their outputs are stored in it.
+        Each partition of a partitioned task is cached separately. Only serialized outputs are cached, so it has no effect on intermediate nodes when serialize_intermediate_outputs is False.
+
+    run_record
+        A RunRecord with the fingerprints of the tasks invoked in a previous run. It requires a cache.
+        Only the tasks whose function, literal parameters or inputs changed since the previous run are invoked again. The outputs of the rest are retrieved from the cache. The decision taken for each task (and the reason behind it) is available in `run_record.decisions` when the invocation finishes, and the record is updated with the fingerprints of this run.
+
+    checkpoint_dir
+        A directory to store the serialized outputs of each node of the DAG (and of the DAGs nested inside of it) as soon as the node completes.
+        Unless `resume` is True, the checkpoints of previous invocations in this directory are removed when the invocation starts.
+        Only serialized outputs can be checkpointed, so it cannot be combined with serialize_intermediate_outputs=False.
+
+    resume
+        Whether to resume a previous invocation that failed, using the checkpoints stored in `checkpoint_dir`.
+        Nodes that completed in a previous invocation are not invoked again. Their outputs are loaded from their checkpoint instead. The invocation then continues from the nodes that failed or did not get to run.
+        Checkpoints are not validated against the DAG or its parameters, so you should only resume an invocation of the same DAG with the same parameters.
+
+    report
+        A RunReport to collect measurements for each node and partition invoked in the DAG, such as the time spent in each task's function, serializing its outputs and deserializing its inputs, or the size of the serialized inputs and outputs.
+        When the node is a task, the report contains a single node with an empty address.
+        See the documentation of RunReport for more details.
+
+    trace
+        A ChromeTrace to record a span for each node, partition and (de)serialization of the invocation, laid out per thread.
+        Once the invocation finishes, write it as JSON to inspect it in Perfetto or chrome://tracing. See the documentation of ChromeTrace for more details.
+
+    profile_memory
+        Whether to measure the peak memory and the top allocation sites of each task with tracemalloc, and add them to the report. It requires a report.
+        Tracing allocations slows tasks down considerably. tracemalloc also traces the whole process, so the measurements are only accurate when tasks run sequentially (i.e. without an executor) or in a concurrent.futures.ProcessPoolExecutor.
+
+    profile_dir
+        A directory to store the cProfile statistics of the tasks selected for profiling, in files named after their address (e.g. "nested-dag.task.pstats", or "task[2].pstats" for each partition of a partitioned task). Load them with the pstats module or a viewer such as snakeviz.
+        Only the call to the task's function is profiled, not the validation, (de)serialization or caching around it.
+        Tasks are selected with `profile_nodes`, or with `runtime_options={"profile": True}` when they are defined. If not specified, no tasks are profiled.
+
+    profile_nodes
+        The addresses of the tasks to profile (e.g. "nested-dag.task"). It requires a profile_dir.
+        Selecting a partitioned task profiles each of its partitions.
+
+    serialize_outputs
+        Whether to serialize the outputs of the node invoked.
+        Setting it to False returns the values the node produced instead (with a PartitionedOutput of values for each partitioned output), so that the caller can serialize them on its own (e.g. streaming them into a file).
+        Only serialized outputs are cached, so the cache has no effect on a task invoked without serializing its outputs. DAGs can only return their outputs without serializing them when serialize_intermediate_outputs is False.
+
 
     Returns
     -------
-    Serialized outputs of the task, indexed by output name.
+    Serialized outputs of the task, indexed by output name. Or the values of each output, if serialize_outputs is False.
 
 
     Raises
@@ -48,57 +206,1046 @@ def invoke(
     SerializationError
         When some of the outputs cannot be serialized with the specified Serializer
     """
+    if run_record is not None and cache is None:
+        raise ValueError(
+            "Incremental runs need a cache to retrieve the outputs of the tasks that did not change since the previous run. Please supply a cache together with the run record."
+        )
+
+    if resume and checkpoint_dir is None:
+        raise ValueError(
+            "Resuming an invocation requires the directory where the checkpoints of the previous invocation were stored. Please supply a checkpoint_dir."
+        )
+
+    if checkpoint_dir is not None and not serialize_intermediate_outputs:
+        raise ValueError(
+            "Checkpoints store the serialized outputs of each node, but the outputs of the nodes are not serialized when serialize_intermediate_outputs is False. Please remove the checkpoint_dir, or serialize the intermediate outputs."
+        )
+
+    if profile_memory and report is None:
+        raise ValueError(
+            "Memory measurements are added to the report of the invocation. Please supply a report together with profile_memory=True."
+        )
+
+    if (
+        not serialize_outputs
+        and isinstance(node, DAG)
+        and serialize_intermediate_outputs
+    ):
+        raise ValueError(
+            "The outputs of a DAG can only be returned without serializing them when the outputs of its nodes are not serialized either. Please set serialize_intermediate_outputs=False together with serialize_outputs=False."
+        )
+
+    profile_nodes = frozenset(profile_nodes)
+    if profile_nodes and profile_dir is None:
+        raise ValueError(
+            "Profiling statistics are stored in a directory. Please supply a profile_dir together with the nodes to profile."
+        )
+
+    if checkpoint_dir is not None and not resume:
+        _clear_checkpoints(checkpoint_dir)
+
+    # Tracing is stopped at the end of the invocation, unless it was already active before
+    stop_tracing_memory = profile_memory and not tracemalloc.is_tracing()
+    if stop_tracing_memory:
+        tracemalloc.start()
+
+    try:
+        with registered(trace) if trace is not None else nullcontext():
+            outputs = _invoke(
+                node,
+                params=params,
+                options=_InvocationOptions(
+                    executor=executor,
+                    partition_executor=partition_executor,
+                    serialize_intermediate_outputs=serialize_intermediate_outputs,
+                    serialize_outputs=serialize_outputs,
+                    output_store=output_store,
+                    cache=cache,
+                    run_record=run_record,
+                    checkpoint_dir=checkpoint_dir,
+                    resume=resume,
+                    report=report,
+                    profile_memory=profile_memory,
+                    profile_dir=profile_dir,
+                    profile_nodes=profile_nodes,
+                    orchestrators=threading.BoundedSemaphore(_MAX_ORCHESTRATOR_THREADS)
+                    if executor is not None or partition_executor is not None
+                    else None,
+                ),
+            )
+    finally:
+        if run_record is not None:
+            run_record._save()
+        if stop_tracing_memory:
+            tracemalloc.stop()
+
+    return _outputs_as_bytes(outputs) if serialize_outputs else outputs
+
+
+def _outputs_as_bytes(outputs: NodeOutputs) -> NodeOutputs:
+    """
+    Return the serialized outputs of an invocation as bytes.
+
+    Partitions are views of a compact buffer, and outputs that were spilled to disk are memory-mapped. Both are copied into bytes objects, like the rest of the outputs.
+    """
+    return {
+        name: PartitionedOutput(
+            [p if isinstance(p, bytes) else bytes(p) for p in output]
+        )
+        if isinstance(output, PartitionedOutput)
+        else output
+        if isinstance(output, bytes)
+        else bytes(output)
+        for name, output in outputs.items()
+    }
+
+
+def _invoke(
+    node: Node,
+    params: Optional[Mapping[str, Any]],
+    options: _InvocationOptions,
+) -> NodeOutputs:
     if isinstance(node, DAG):
-        return _invoke_dag(node, params=params)
+        return _invoke_dag(node, params=params, options=options)
+
+    # Tasks invoked on their own are reported with an empty address
+    node_report = NodeReport(address="") if options.report is not None else None
+    ready_at = time.perf_counter()
+
+    if node.vectorized:
+        outputs = _invoke_vectorized_task_on_its_own(
+            node, params=params, options=options, report=node_report
+        )
     else:
-        return _invoke_task(node, params=params)
+        outputs = _invoke_task(
+            node,
+            params=params,
+            serialize_outputs=options.serialize_outputs,
+            cache=options.cache,
+            report=node_report,
+            profile_memory=options.profile_memory,
+            profile_path=_profile_path(node, address="", options=options),
+        )
+
+    if options.report is not None and node_report is not None:
+        _complete_node_report(
+            options.report, node_report, ready_at=ready_at, partitions=[outputs]
+        )
+
+    return outputs
+
+
+def _invoke_vectorized_task_on_its_own(
+    task: Task,
+    params: Optional[Mapping[str, Any]],
+    options: _InvocationOptions,
+    report: Optional[NodeReport] = None,
+) -> NodeOutputs:
+    """Invoke a vectorized task with a sequence of partitions, and return a partitioned output with the value of each partition."""
+    params = params or {}
+    _validate_and_filter_inputs(inputs=task.inputs, params=params)
+    assert task.partition_by_input is not None
+    partitions = list(params[task.partition_by_input])
+
+    results = _invoke_vectorized_task(
+        task,
+        params=[{**params, task.partition_by_input: p} for p in partitions],
+        addresses=[f"[{i}]" for i in range(len(partitions))],
+        serialize_outputs=options.serialize_outputs,
+        cache=options.cache,
+        profile_memory=options.profile_memory,
+        profile_path=_profile_path(task, address="", options=options),
+    )
+    if report is not None:
+        report.partitions.extend(partition_report for _, partition_report in results)
+
+    return {
+        output_name: PartitionedOutput(
+            [partition_outputs[output_name] for partition_outputs, _ in results]  # type: ignore
+        )
+        for output_name in task.outputs
+    }
 
 
 def _invoke_dag(
     dag: DAG,
     params: Optional[Mapping[str, Any]] = None,
+    options: _InvocationOptions = _InvocationOptions(),
+    address: str = "",
 ) -> NodeOutputs:
     params = params or {}
-    validate_parameters(dag.inputs, params)
+    validate_parameters(
+        dag.inputs,
+        params,
+        # The inputs of nested DAGs are not serialized when they are passed in memory
+        validate_serialization=options.serialize_outputs,
+    )
 
-    outputs: Dict[str, NodeExecutions] = {}
+    node_options = replace(
+        options,
+        serialize_outputs=options.serialize_intermediate_outputs,
+    )
+    checkpoint_dir = options.checkpoint_dir
 
-    sequential_node_order = itertools.chain(*dag.node_execution_order)
-    for node_name in sequential_node_order:
-        node = dag.nodes[node_name]
+    outputs: MutableMapping[str, NodeExecutions]
+    if options.output_store is not None and options.serialize_intermediate_outputs:
+        outputs = options.output_store.new_namespace()
+    else:
+        outputs = {}
 
-        try:
-            outputs[node_name] = PartitionedOutput(
-                [
-                    invoke(node, params=p)
-                    for p in _node_param_partitions(
-                        node=node,
+    dag_outputs: Dict[str, NodeOutput] = {}
+    remaining_consumers = {
+        node_name: len(dependents)
+        for node_name, dependents in dag.node_dependents.items()
+    }
+    completed_nodes: Set[str] = set()
+    node_partitions: Dict[str, List[Future]] = {}
+    remaining_partitions: Dict[str, int] = {}
+    pending: Dict[Future, str] = {}
+    restored_nodes: Set[str] = set()
+    node_reports: Dict[str, Tuple[NodeReport, float]] = {}
+    started_nodes: Set[str] = set()
+    # Hooks are looked up once per DAG, so every node_start has a matching node_end
+    hooks = hooks_registry.active
+
+    ready_nodes = dag.newly_ready_nodes(completed_nodes)
+
+    try:
+        while ready_nodes or pending:
+            _raise_if_cancelled(options)
+            newly_completed_nodes = []
+
+            for node_name in ready_nodes:
+                node_address = _node_address(address, node_name)
+                started_nodes.add(node_name)
+                if hooks is not None:
+                    hooks.node_start(node_address)
+
+                node_report = None
+                if options.report is not None:
+                    node_report = NodeReport(address=node_address)
+                    node_reports[node_name] = (node_report, time.perf_counter())
+
+                with _node_error_context(node_name):
+                    node_partitions[node_name], restored = _restore_or_submit_node(
+                        dag.nodes[node_name],
                         params=params,
                         outputs=outputs,
+                        options=node_options,
+                        address=node_address,
+                        checkpoint_dir=checkpoint_dir,
+                        report=node_report,
                     )
-                ]
+
+                if restored:
+                    restored_nodes.add(node_name)
+
+                _release_consumed_outputs(
+                    dag,
+                    consumer=node_name,
+                    outputs=outputs,
+                    remaining_consumers=remaining_consumers,
+                )
+
+                remaining_partitions[node_name] = len(node_partitions[node_name])
+                if remaining_partitions[node_name] == 0:
+                    newly_completed_nodes.append(node_name)
+
+                for future in node_partitions[node_name]:
+                    pending[future] = node_name
+
+            if not newly_completed_nodes:
+                done, _ = wait(
+                    _with_cancellation(pending, options),
+                    return_when=FIRST_COMPLETED,
+                )
+                _raise_if_cancelled(options)
+                for future in done:
+                    node_name = pending.pop(future)
+                    if future.exception() is not None:
+                        with _node_error_context(node_name):
+                            future.result()
+
+                    remaining_partitions[node_name] -= 1
+                    if remaining_partitions[node_name] == 0:
+                        newly_completed_nodes.append(node_name)
+
+            for node_name in newly_completed_nodes:
+                outputs[node_name] = _node_executions(
+                    dag.nodes[node_name],
+                    partitions=[f.result() for f in node_partitions.pop(node_name)],
+                    address=_node_address(address, node_name),
+                    checkpoint_dir=None
+                    if node_name in restored_nodes
+                    else checkpoint_dir,
+                    run_report=options.report,
+                    node_report=node_reports.pop(node_name, None),
+                )
+
+                dag_outputs.update(
+                    _extract_dag_outputs(dag, node_name=node_name, outputs=outputs)
+                )
+                if remaining_consumers[node_name] == 0:
+                    del outputs[node_name]
+
+                completed_nodes.add(node_name)
+                if hooks is not None:
+                    hooks.node_end(_node_address(address, node_name), None)
+
+            ready_nodes = dag.newly_ready_nodes(completed_nodes, newly_completed_nodes)
+
+    except BaseException as e:
+        _interrupt_dag(
+            pending,
+            unfinished_nodes=[
+                _node_address(address, node_name)
+                for node_name in started_nodes - completed_nodes
+            ],
+            hooks=hooks,
+            error=e,
+        )
+        raise
+
+    if options.serialize_outputs and not options.serialize_intermediate_outputs:
+        return _serialize_dag_outputs(dag, dag_outputs=dag_outputs)
+
+    return dag_outputs
+
+
+def _interrupt_dag(
+    pending: Iterable[Future],
+    unfinished_nodes: Iterable[str],
+    hooks: Optional[Hooks],
+    error: BaseException,
+):
+    """Cancel the nodes that have not started yet, since they are no longer necessary, and notify the end of the nodes that did not finish."""
+    for future in pending:
+        future.cancel()
+
+    if hooks is not None:
+        for node_address in unfinished_nodes:
+            hooks.node_end(node_address, error)
+
+
+def _node_address(dag_address: str, node_name: str) -> str:
+    """Return the address of a node of a DAG, with all the DAGs it is nested in separated by dots."""
+    return f"{dag_address}.{node_name}" if dag_address else node_name
+
+
+def _restore_or_submit_node(
+    node: Node,
+    params: Mapping[str, Any],
+    outputs: Mapping[str, NodeExecutions],
+    options: _InvocationOptions,
+    address: str,
+    checkpoint_dir: Optional[str] = None,
+    report: Optional[NodeReport] = None,
+) -> Tuple[List[Future], bool]:
+    """
+    Start the invocation of each partition of a node, and return the futures that will hold their outputs.
+
+    When resuming a previous invocation, nodes that have a checkpoint are restored from it instead. The second value returned signals whether the node was restored.
+    """
+    if checkpoint_dir is not None and options.resume:
+        checkpoint = _load_checkpoint(checkpoint_dir, address)
+        if checkpoint is not None:
+            if report is not None:
+                report.reused = True
+            return [_completed(p) for p in checkpoint], True
+
+    return (
+        _submit_node_partitions(
+            node,
+            params=params,
+            outputs=outputs,
+            options=options,
+            address=address,
+            report=report,
+        ),
+        False,
+    )
+
+
+def _submit_node_partitions(
+    node: Node,
+    params: Mapping[str, Any],
+    outputs: Mapping[str, NodeExecutions],
+    options: _InvocationOptions,
+    address: str,
+    report: Optional[NodeReport] = None,
+) -> List[Future]:
+    """
+    Start the invocation of each partition of a node, and return the futures that will hold their outputs.
+
+    Partitioned tasks that invoke several partitions per worker are submitted to the executor in batches of consecutive partitions. There is still a future for each partition.
+    Vectorized tasks are always invoked in batches, since their function receives a batch of partitions.
+    """
+    input_hashes: Optional[Dict[str, str]] = None
+    if (
+        isinstance(node, Task)
+        and options.cache is not None
+        and options.serialize_outputs
+    ):
+        input_hashes = _input_hashes(node, outputs=outputs)
+
+    partitions: List[
+        Tuple[NodeParams, str, Optional[NodeReport], Optional[Mapping[str, str]]]
+    ] = []
+    for i, p in enumerate(
+        _node_param_partitions(
+            node=node,
+            params=params,
+            outputs=outputs,
+            # Intermediate outputs only need to be deserialized if the nodes serialized them
+            deserialize=options.serialize_outputs,
+            report=report,
+            address=address,
+        )
+    ):
+        partition_address = address
+        partition_report = report
+        partition_input_hashes = input_hashes
+        if node.partition_by_input:
+            partition_address = f"{address}[{i}]"
+            if report is not None:
+                partition_report = NodeReport(address=partition_address)
+                report.partitions.append(partition_report)
+            if isinstance(node, Task) and input_hashes is not None:
+                partition_input_hashes = {
+                    **input_hashes,
+                    **_partition_input_hash(node, outputs=outputs, index=i),
+                }
+
+        partitions.append(
+            (p, partition_address, partition_report, partition_input_hashes)
+        )
+
+    if (
+        isinstance(node, Task)
+        and node.partition_by_input
+        and (
+            node.vectorized
+            or (
+                node.partitions_per_worker > 1
+                and (
+                    options.executor is not None
+                    or options.partition_executor is not None
+                )
+            )
+        )
+    ):
+        return _submit_task_batches(node, partitions=partitions, options=options)
+
+    return [
+        _submit_node(
+            node,
+            params=p,
+            options=options,
+            address=partition_address,
+            report=partition_report,
+            input_hashes=partition_input_hashes,
+        )
+        for p, partition_address, partition_report, partition_input_hashes in partitions
+    ]
+
+
+def _input_hashes(task: Task, outputs: Mapping[str, NodeExecutions]) -> Dict[str, str]:
+    """
+    Hash the serialized values of the inputs of a task that come from the outputs of other nodes, except for the input it is partitioned by.
+
+    The cache computes its keys with them, instead of serializing the deserialized inputs again.
+    """
+    input_hashes = {}
+    for input_name, input_type in task.inputs.items():
+        if input_name == task.partition_by_input or not isinstance(
+            input_type, FromNodeOutput
+        ):
+            continue
+
+        source = outputs[input_type.node]
+        if isinstance(source, PartitionedOutput):
+            input_hashes[input_name] = _serialized_hash(
+                [partition[input_type.output] for partition in source]
+            )
+        else:
+            input_hashes[input_name] = _serialized_hash(source[input_type.output])
+
+    return input_hashes
+
+
+def _partition_input_hash(
+    task: Task, outputs: Mapping[str, NodeExecutions], index: int
+) -> Dict[str, str]:
+    """Hash the serialized value of the input a partition of a task is partitioned by, if the runtime holds it."""
+    assert task.partition_by_input is not None
+    input_type = task.inputs[task.partition_by_input]
+    if not isinstance(input_type, FromNodeOutput):
+        return {}
+
+    source = outputs[input_type.node]
+    # Key groups are merged from the pieces of every partition of the source, and the values of outputs that are not partitioned are split after deserializing them
+    if isinstance(source, PartitionedOutput) or not isinstance(
+        source[input_type.output], PartitionedOutput
+    ):
+        return {}
+
+    return {task.partition_by_input: _serialized_hash(source[input_type.output][index])}
+
+
+def _submit_task_batches(
+    task: Task,
+    partitions: List[
+        Tuple[NodeParams, str, Optional[NodeReport], Optional[Mapping[str, str]]]
+    ],
+    options: _InvocationOptions,
+) -> List[Future]:
+    """
+    Start the invocation of the partitions of a task in batches of (at most) partitions_per_worker consecutive partitions, and return a future for each partition.
+
+    Partitions whose outputs are retrieved from a previous run are not submitted, and the rest are batched together.
+    """
+    decisions = [
+        _reuse_task_outputs(
+            task, params=p, options=options, address=a, report=r, input_hashes=h
+        )
+        for p, a, r, h in partitions
+    ]
+    futures: List[Optional[Future]] = [future for future, _ in decisions]
+    pending = [i for i, future in enumerate(futures) if future is None]
+    executor = options.partition_executor or options.executor
+    submit = executor.submit if executor is not None else _run_inline
+
+    for start in range(0, len(pending), task.partitions_per_worker):
+        batch = pending[start : start + task.partitions_per_worker]
+        batch_future = submit(
+            _invoke_task_batch,
+            task,
+            params=[partitions[i][0] for i in batch],
+            addresses=[partitions[i][1] for i in batch],
+            profile_paths=[
+                _profile_path(task, address=partitions[i][1], options=options)
+                for i in batch
+            ],
+            serialize_outputs=options.serialize_outputs,
+            cache=options.cache,
+            profile_memory=options.profile_memory,
+            input_hashes=[partitions[i][3] for i in batch],
+            cache_keys=[decisions[i][1] for i in batch],
+        )
+
+        for j, i in enumerate(batch):
+            futures[i] = _then(
+                batch_future,
+                functools.partial(
+                    _batch_partition_outputs, index=j, report=partitions[i][2]
+                ),
             )
 
-            if not node.partition_by_input:
-                outputs[node_name] = next(outputs[node_name])
+    return [future for future in futures if future is not None]
 
-        except (ValueError, TypeError, SerializationError) as e:
-            raise e.__class__(
-                f"Error when invoking node '{node_name}'. {str(e)}"
-            ) from e
 
-    dag_outputs = {
-        output_name: outputs[output_type.node][output_type.output]
+def _batch_partition_outputs(
+    results: List[Tuple[NodeOutputs, NodeReport]],
+    index: int,
+    report: Optional[NodeReport],
+) -> NodeOutputs:
+    """Return the outputs of one of the partitions in a batch, adding its measurements to its report."""
+    outputs, task_report = results[index]
+    if report is None:
+        return outputs
+
+    return _merge_task_report(report, outputs, task_report)
+
+
+def _node_executions(
+    node: Node,
+    partitions: List[NodeOutputs],
+    address: str,
+    checkpoint_dir: Optional[str] = None,
+    run_report: Optional[RunReport] = None,
+    node_report: Optional[Tuple[NodeReport, float]] = None,
+) -> NodeExecutions:
+    """Gather the outputs of all the partitions of a node that completed, storing a checkpoint and reporting its measurements if necessary."""
+    if run_report is not None and node_report is not None:
+        _complete_node_report(run_report, *node_report, partitions=partitions)
+
+    if checkpoint_dir is not None:
+        _store_checkpoint(
+            checkpoint_dir,
+            address=address,
+            partitions=partitions,
+        )
+
+    if node.partition_by_input:
+        return PartitionedOutput(partitions)
+
+    return partitions[0]
+
+
+def _complete_node_report(
+    run_report: RunReport,
+    node_report: NodeReport,
+    ready_at: float,
+    partitions: List[NodeOutputs],
+):
+    """Add the measurements of all the partitions of a node to its report, and add it to the run report."""
+    for partition_report in node_report.partitions:
+        node_report._accumulate(partition_report)
+
+    node_report.bytes_out = sum(_outputs_size(p) for p in partitions)
+    node_report.wall_time = time.perf_counter() - ready_at
+    run_report._add(node_report)
+
+
+def _release_consumed_outputs(
+    dag: DAG,
+    consumer: str,
+    outputs: MutableMapping[str, NodeExecutions],
+    remaining_consumers: Dict[str, int],
+):
+    """
+    Release the outputs of the nodes the consumer depends on, once all of their consumers have retrieved them.
+
+    This allows intermediate outputs to be garbage-collected in the middle of the execution of a DAG, instead of keeping all of them in memory until the DAG completes.
+    """
+    for dependency in dag.node_dependencies[consumer]:
+        remaining_consumers[dependency] -= 1
+        if remaining_consumers[dependency] == 0:
+            del outputs[dependency]
+
+
+def _extract_dag_outputs(
+    dag: DAG,
+    node_name: str,
+    outputs: Mapping[str, NodeExecutions],
+) -> Mapping[str, NodeOutput]:
+    """Extract the outputs of the DAG that come from a specific node."""
+    return {
+        output_name: outputs[node_name][output_type.output]
         for output_name, output_type in dag.outputs.items()
+        if output_type.node == node_name
     }
 
-    return dag_outputs
+
+def _serialize_dag_outputs(
+    dag: DAG,
+    dag_outputs: Mapping[str, NodeOutput],
+) -> NodeOutputs:
+    """Serialize the outputs of a DAG whose nodes passed their outputs to each other in memory."""
+    serialized_outputs: Dict[str, NodeOutput] = {}
+    for output_name, output_value in dag_outputs.items():
+        serializer = dag.outputs[output_name].serializer
+        with _node_error_context(dag.outputs[output_name].node):
+            if isinstance(output_value, PartitionedOutput):
+                serialized_outputs[output_name] = PartitionedOutput(
+                    [serializer.serialize(v) for v in output_value]
+                )
+            else:
+                serialized_outputs[output_name] = serializer.serialize(output_value)
+
+    return serialized_outputs
+
+
+@contextmanager
+def _node_error_context(node_name: str):
+    """Extend the details of the exceptions raised while invoking a node with the name of the node."""
+    try:
+        yield
+    except (ValueError, TypeError, SerializationError) as e:
+        raise e.__class__(f"Error when invoking node '{node_name}'. {str(e)}") from e
+
+
+def _submit_node(
+    node: Node,
+    params: NodeParams,
+    options: _InvocationOptions,
+    address: str = "",
+    report: Optional[NodeReport] = None,
+    input_hashes: Optional[Mapping[str, str]] = None,
+) -> Future:
+    """
+    Start the invocation of a node and return a future that will hold its outputs.
+
+    Tasks are submitted to the executor (or to the partition executor, if they are partitioned). Nested DAGs only orchestrate other nodes, so they run in a dedicated thread instead. Otherwise, a DAG could occupy every worker of the executor while waiting for its own nodes, which would never get to run.
+    Combiners reduce the partitions of their input in a tree, submitting each group of partitions as a separate invocation. They are orchestrated in a dedicated thread too.
+    When every orchestrator thread is busy, they are orchestrated from the current thread instead.
+
+    In incremental runs, tasks that did not change since the previous run are not submitted at all. Their outputs are retrieved from the cache instead.
+    """
+    if isinstance(node, DAG):
+        return _orchestrate(
+            _invoke_dag, node, params=params, options=options, address=address
+        )
+
+    reused_outputs, cache_key = _reuse_task_outputs(
+        node,
+        params=params,
+        options=options,
+        address=address,
+        report=report,
+        input_hashes=input_hashes,
+    )
+    if reused_outputs is not None:
+        return reused_outputs
+
+    if node.combine_input and isinstance(
+        params[node.combine_input], (LazyPartitions, PartitionedOutput)
+    ):
+        # Like nested DAGs, combiners only orchestrate the invocations that combine each group of partitions
+        return _orchestrate(
+            _combine,
+            node,
+            combine_input=node.combine_input,
+            params=params,
+            options=options,
+            address=address,
+            report=report,
+            input_hashes=input_hashes,
+            cache_key=cache_key,
+        )
+
+    executor: Optional[Executor]
+    if node.partition_by_input and options.partition_executor is not None:
+        executor = options.partition_executor
+    else:
+        executor = options.executor
+
+    return _submit_task(
+        node,
+        params=params,
+        options=options,
+        executor=executor,
+        serialize_outputs=options.serialize_outputs,
+        address=address,
+        report=report,
+        input_hashes=input_hashes,
+        cache_key=cache_key,
+    )
+
+
+def _reuse_task_outputs(
+    task: Task,
+    params: NodeParams,
+    options: _InvocationOptions,
+    address: str,
+    report: Optional[NodeReport] = None,
+    input_hashes: Optional[Mapping[str, str]] = None,
+) -> Tuple[Optional[Future], Optional[str]]:
+    """
+    In incremental runs, return a completed future with the outputs of a task that did not change since the previous run, or None if it needs to be invoked.
+
+    The key of the task in the cache is returned too, if the run record computed it, so the task does not compute it (and look it up) again when it is invoked.
+    """
+    if (
+        options.run_record is None
+        or options.cache is None
+        or not options.serialize_outputs
+    ):
+        return None, None
+
+    cache_key, cached_outputs = options.run_record._decide(
+        address,
+        task=task,
+        params=params,
+        cache=options.cache,
+        input_hashes=input_hashes,
+    )
+    if cached_outputs is None:
+        return None, cache_key
+
+    if report is not None:
+        report.reused = True
+    return _completed(cached_outputs), cache_key
+
+
+def _submit_task(
+    task: Task,
+    params: NodeParams,
+    options: _InvocationOptions,
+    executor: Optional[Executor],
+    serialize_outputs: bool,
+    address: str = "",
+    report: Optional[NodeReport] = None,
+    input_hashes: Optional[Mapping[str, str]] = None,
+    cache_key: Optional[str] = None,
+) -> Future:
+    """Start the invocation of a task in an executor (or right away, if there is none), and return a future that will hold its outputs."""
+    profile_path = _profile_path(task, address=address, options=options)
+
+    if executor is None:
+        return _run_inline(
+            _invoke_task,
+            task,
+            params=params,
+            serialize_outputs=serialize_outputs,
+            cache=options.cache,
+            report=report,
+            address=address,
+            profile_memory=options.profile_memory,
+            profile_path=profile_path,
+            input_hashes=input_hashes,
+            cache_key=cache_key,
+        )
+
+    if report is not None:
+        # Measurements are sent back together with the outputs, since the task may run in a different process
+        merge_report = functools.partial(_merge_task_report, report)
+        return _then(
+            executor.submit(
+                _invoke_task_and_report,
+                task,
+                params=params,
+                serialize_outputs=serialize_outputs,
+                cache=options.cache,
+                address=address,
+                profile_memory=options.profile_memory,
+                profile_path=profile_path,
+                input_hashes=input_hashes,
+                cache_key=cache_key,
+            ),
+            lambda result: merge_report(*result),
+        )
+
+    return executor.submit(
+        _invoke_task,
+        task,
+        params=params,
+        serialize_outputs=serialize_outputs,
+        cache=options.cache,
+        address=address,
+        profile_path=profile_path,
+        input_hashes=input_hashes,
+        cache_key=cache_key,
+    )
+
+
+def _combine(
+    task: Task,
+    combine_input: str,
+    params: NodeParams,
+    options: _InvocationOptions,
+    address: str,
+    report: Optional[NodeReport] = None,
+    input_hashes: Optional[Mapping[str, str]] = None,
+    cache_key: Optional[str] = None,
+) -> NodeOutputs:
+    """
+    Reduce the partitions of the input of a combiner in a tree, and return the outputs of the root of the tree.
+
+    Groups of partitions are combined in parallel (in the partition executor, if there is one), and the results of each level are combined again in groups until a single group remains. Each group is identified by its level and its index within the level (e.g. "task[1.3]").
+    The results of the intermediate groups are passed to the next level in memory, without serializing them.
+    """
+    executor = options.partition_executor or options.executor
+    (output_name,) = task.outputs
+    group_size = task.combine_group_size
+    values: Sequence[Any] = params[combine_input]
+    level = 0
+    # Each group receives a different slice of the partitions, which the cache fingerprints on its own
+    group_input_hashes = {
+        name: h for name, h in (input_hashes or {}).items() if name != combine_input
+    }
+
+    while True:
+        groups = [
+            values[i : i + group_size] for i in range(0, len(values), group_size)
+        ] or [values]
+        is_root = len(groups) == 1
+
+        futures = []
+        for i, group in enumerate(groups):
+            group_address = f"{address}[{level}.{i}]"
+            group_report = None
+            if report is not None:
+                group_report = NodeReport(address=group_address)
+                report.partitions.append(group_report)
+
+            futures.append(
+                _submit_task(
+                    task,
+                    params={**params, combine_input: group},
+                    options=options,
+                    executor=executor,
+                    serialize_outputs=options.serialize_outputs if is_root else False,
+                    address=group_address,
+                    report=group_report,
+                    input_hashes=group_input_hashes,
+                )
+            )
+
+        try:
+            _wait_for_all(futures, options)
+            results = [f.result() for f in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+        if is_root:
+            if options.cache is not None and options.serialize_outputs:
+                # Incremental runs look up the outputs of the whole combiner, besides the outputs of each group
+                if cache_key is None:
+                    cache_key = options.cache.key(
+                        task,
+                        {name: params[name] for name in task.inputs if name in params},
+                        input_hashes=input_hashes,
+                    )
+                if cache_key is not None:
+                    options.cache.put(cache_key, results[0])
+
+            return results[0]
+
+        values = [r[output_name] for r in results]
+        level += 1
+
+
+def _profile_path(
+    task: Task, address: str, options: _InvocationOptions
+) -> Optional[str]:
+    """Return the file to store the profiling statistics of a task in, or None if the task should not be profiled."""
+    if options.profile_dir is None:
+        return None
+
+    # Partitions are profiled when their task is selected
+    node_address = address.split("[")[0]
+    if node_address not in options.profile_nodes and not task.runtime_options.get(
+        "profile", False
+    ):
+        return None
+
+    # Tasks invoked on their own have no address within a DAG
+    return os.path.join(options.profile_dir, f"{address or 'task'}.pstats")
+
+
+def _merge_task_report(
+    report: NodeReport,
+    outputs: NodeOutputs,
+    task_report: NodeReport,
+) -> NodeOutputs:
+    report._accumulate(task_report)
+    report.wall_time = task_report.wall_time
+    return outputs
+
+
+def _then(future: Future, func: Callable[[Any], Any]) -> Future:
+    """Return a future that will hold the result of applying a function to the result of another future."""
+    chained: Future = Future()
+
+    def propagate(f: Future):
+        try:
+            if f.cancelled():
+                chained.cancel()
+            elif f.exception() is not None:
+                chained.set_exception(f.exception())
+            else:
+                chained.set_result(func(f.result()))
+        except InvalidStateError:
+            # The chained future was cancelled in the meantime
+            pass
+        except Exception as e:
+            chained.set_exception(e)
+
+    chained.add_done_callback(lambda c: future.cancel() if c.cancelled() else None)
+    future.add_done_callback(propagate)
+    return chained
+
+
+def _completed(result: Any) -> Future:
+    future: Future = Future()
+    future.set_result(result)
+    return future
+
+
+def _run_inline(func: Callable, *args, **kwargs) -> Future:
+    future: Future = Future()
+    try:
+        future.set_result(func(*args, **kwargs))
+    except Exception as e:
+        future.set_exception(e)
+
+    return future
+
+
+def _orchestrate(
+    func: Callable, *args, options: _InvocationOptions, **kwargs
+) -> Future:
+    """
+    Start a function that orchestrates the invocation of other nodes (a nested DAG or a combiner) and return a future that will hold its result.
+
+    The function runs in a dedicated thread while there are orchestrator threads left, and in the current thread otherwise.
+    Cancelling the future cancels the invocations it orchestrates. Those that are already running are left to finish, but their results are discarded.
+    """
+    orchestrators = options.orchestrators
+    if orchestrators is None or not orchestrators.acquire(blocking=False):
+        return _run_inline(func, *args, options=options, **kwargs)
+
+    future: Future = Future()
+    cancellation: Future = Future()
+    future.add_done_callback(
+        lambda f: cancellation.set_result(None) if f.cancelled() else None
+    )
+    options = replace(options, cancellation=cancellation)
+
+    def run():
+        try:
+            result = func(*args, options=options, **kwargs)
+        except BaseException as e:
+            _resolve(future, exception=e)
+        else:
+            _resolve(future, result=result)
+        finally:
+            orchestrators.release()
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def _resolve(
+    future: Future, result: Any = None, exception: Optional[BaseException] = None
+):
+    """Set the result (or exception) of a future, unless it was cancelled in the meantime."""
+    try:
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+def _with_cancellation(
+    futures: Iterable[Future], options: _InvocationOptions
+) -> List[Future]:
+    """Return the futures to wait on, so the wait is interrupted when the node that contains them is cancelled."""
+    if options.cancellation is None:
+        return list(futures)
+    return [*futures, options.cancellation]
+
+
+def _raise_if_cancelled(options: _InvocationOptions):
+    if options.cancellation is not None and options.cancellation.done():
+        raise CancelledError()
+
+
+def _wait_for_all(futures: Sequence[Future], options: _InvocationOptions):
+    """Wait until all futures are done, stopping as soon as one of them fails or the node that contains them is cancelled."""
+    remaining = set(futures)
+    while remaining:
+        done, _ = wait(
+            _with_cancellation(remaining, options), return_when=FIRST_COMPLETED
+        )
+        _raise_if_cancelled(options)
+        for future in done:
+            future.result()
+        remaining -= done
 
 
 def _node_param_partitions(
     node: Node,
     params: Mapping[str, Any],
-    outputs: Mapping[str, NodeOutputs],
+    outputs: Mapping[str, NodeExecutions],
+    deserialize: bool = True,
+    report: Optional[NodeReport] = None,
+    address: str = "",
 ) -> Iterable[NodeParams]:
     fixed_params = {
         name: _node_param(
@@ -106,17 +1253,40 @@ def _node_param_partitions(
             input_type=node.inputs[name],
             params=params,
             outputs=outputs,
+            deserialize=deserialize,
+            report=report,
+            address=address,
+            # Combiners deserialize their partitions in the group that combines them
+            lazy=isinstance(node, Task) and name == node.combine_input,
         )
         for name in node.inputs.keys() - {node.partition_by_input}
     }
 
     if node.partition_by_input:
-        input_value = _node_param(
-            input_name=node.partition_by_input,
-            input_type=node.inputs[node.partition_by_input],
-            params=params,
-            outputs=outputs,
-        )
+        input_type = node.inputs[node.partition_by_input]
+        if isinstance(input_type, FromNodeOutput) and isinstance(
+            outputs[input_type.node], PartitionedOutput
+        ):
+            # Nodes partitioned by the keyed output of a partitioned node receive one key group per partition, shuffled from all the partitions of that node
+            input_value: Any = _node_param_key_groups(
+                input_name=node.partition_by_input,
+                input_type=input_type,
+                outputs=outputs,
+                deserialize=deserialize,
+                report=report,
+                address=address,
+            )
+        else:
+            input_value = _node_param(
+                input_name=node.partition_by_input,
+                input_type=input_type,
+                params=params,
+                outputs=outputs,
+                deserialize=deserialize,
+                report=report,
+                address=address,
+            )
+
         if not isinstance(input_value, Iterable):
             raise TypeError(
                 f"This node is supposed to be partitioned by input '{node.partition_by_input}'. When a node is partitioned, the value of the input that determines the partition should be an iterable. Instead, we found a value of type '{type(input_value).__name__}'."
@@ -131,30 +1301,155 @@ def _node_param(
     input_name: str,
     input_type: Union[FromParam, FromNodeOutput],
     params: Mapping[str, Any],
-    outputs: Mapping[str, NodeOutputs],
+    outputs: Mapping[str, NodeExecutions],
+    deserialize: bool = True,
+    report: Optional[NodeReport] = None,
+    address: str = "",
+    lazy: bool = False,
 ) -> Any:
     if isinstance(input_type, FromParam):
         return params[input_type.name or input_name]
-    elif isinstance(outputs[input_type.node], PartitionedOutput):
+
+    source = outputs[input_type.node]
+    if isinstance(source, PartitionedOutput) and (input_type.lazy or lazy):
+        return LazyPartitions(
+            [partition[input_type.output] for partition in source],
+            functools.partial(
+                _node_param_from_output,
+                input_type.serializer,
+                deserialize=deserialize,
+                report=report,
+                address=address,
+                input_name=input_name,
+            ),
+        )
+    elif isinstance(source, PartitionedOutput):
         return [
             _node_param_from_output(
                 serializer=input_type.serializer,
                 node_output=partition[input_type.output],
+                deserialize=deserialize,
+                report=report,
+                address=address,
+                input_name=input_name,
             )
-            for partition in outputs[input_type.node]
+            for partition in source
         ]
     else:
         return _node_param_from_output(
             serializer=input_type.serializer,
-            node_output=outputs[input_type.node][input_type.output],
+            node_output=source[input_type.output],
+            deserialize=deserialize,
+            report=report,
+            address=address,
+            input_name=input_name,
+            lazy=input_type.lazy or lazy,
         )
 
 
+def _node_param_key_groups(
+    input_name: str,
+    input_type: FromNodeOutput,
+    outputs: Mapping[str, NodeExecutions],
+    deserialize: bool = True,
+    report: Optional[NodeReport] = None,
+    address: str = "",
+) -> List[KeyGroup]:
+    """Merge the pieces of each key group that every partition of a node generated for a keyed output."""
+    partitions: PartitionedOutput[Any] = outputs[input_type.node]  # type: ignore
+    pieces = [partition[input_type.output] for partition in partitions]
+    key_groups = len(pieces[0]) if pieces else 0
+
+    return [
+        merge_key_groups(
+            (
+                _node_param_from_output(
+                    serializer=input_type.serializer,
+                    node_output=piece[i],
+                    deserialize=deserialize,
+                    report=report,
+                    address=address,
+                    input_name=input_name,
+                )
+                for piece in pieces
+            ),
+            serializer=input_type.serializer,
+        )
+        for i in range(key_groups)
+    ]
+
+
 def _node_param_from_output(
     serializer: Serializer,
     node_output: NodeOutput,
-) -> Union[Any, PartitionedOutput[Any]]:
-    if isinstance(node_output, PartitionedOutput):
-        return PartitionedOutput(map(lambda v: serializer.deserialize(v), node_output))
+    deserialize: bool = True,
+    report: Optional[NodeReport] = None,
+    address: str = "",
+    input_name: str = "",
+    lazy: bool = False,
+) -> Union[Any, PartitionedOutput[Any], LazyPartitions[Any]]:
+    if not deserialize:
+        return node_output
+    elif isinstance(node_output, PartitionedOutput) and lazy:
+        return LazyPartitions(
+            node_output,
+            functools.partial(
+                _deserialize,
+                serializer,
+                report=report,
+                address=address,
+                input_name=input_name,
+            ),
+        )
+    elif isinstance(node_output, PartitionedOutput):
+        return PartitionedOutput(
+            map(
+                lambda v: _deserialize(serializer, v, report, address, input_name),
+                node_output,
+            )
+        )
     else:
-        return serializer.deserialize(node_output)
+        return _deserialize(serializer, node_output, report, address, input_name)
+
+
+def _deserialize(
+    serializer: Serializer,
+    serialized_value: bytes,
+    report: Optional[NodeReport] = None,
+    address: str = "",
+    input_name: str = "",
+) -> Any:
+    hooks = hooks_registry.active
+    if hooks is None:
+        return _deserialize_and_measure(serializer, serialized_value, report)
+
+    hooks.deserialize_start(address, input_name)
+    try:
+        value = _deserialize_and_measure(serializer, serialized_value, report)
+    except BaseException as e:
+        hooks.deserialize_end(address, input_name, len(serialized_value), e)
+        raise
+
+    hooks.deserialize_end(address, input_name, len(serialized_value), None)
+    return value
+
+
+def _deserialize_and_measure(
+    serializer: Serializer,
+    serialized_value: bytes,
+    report: Optional[NodeReport],
+) -> Any:
+    if not isinstance(serialized_value, bytes) and not getattr(
+        serializer, "accepts_buffers", False
+    ):
+        # Partitions in a compact buffer and spilled outputs are views. Only some serializers accept them
+        serialized_value = bytes(serialized_value)
+
+    if report is None:
+        return serializer.deserialize(serialized_value)
+
+    started_at = time.perf_counter()
+    value = serializer.deserialize(serialized_value)
+    report.deserialize_time += time.perf_counter() - started_at
+    report.bytes_in += len(serialized_value)
+    return value
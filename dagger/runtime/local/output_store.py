@@ -0,0 +1,315 @@
+"""Storage for the intermediate outputs of a DAG, with a limited memory budget."""
+
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+from array import array
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Union,
+)
+
+from dagger.runtime.local.compact import (
+    BytesLike,
+    CompactPartitions,
+    _compact_partitions,
+)
+from dagger.runtime.local.types import NodeExecutions, PartitionedOutput
+
+
+class _StoredValue:
+    """A serialized value kept by the store, either in memory or in a file. Files are memory-mapped the first time they are loaded, and the mapping is reused afterwards."""
+
+    __slots__ = ("value", "path", "size", "mapping")
+
+    def __init__(self, value: bytes):
+        self.value: Optional[bytes] = value
+        self.path: Optional[str] = None
+        self.size = len(value)
+        self.mapping: Optional[Union[bytes, memoryview]] = None
+
+
+class SpillingOutputStore:
+    """
+    Keep the serialized outputs of local nodes in memory up to a budget, and spill the rest to disk.
+
+    Once the serialized outputs kept in memory exceed the budget, the oldest ones are written to files in a temporary directory. When a node needs them again, they are memory-mapped back, so only the pages the consumer actually reads are loaded in memory.
+
+    Serializers that accept buffers (see `Serializer.deserialize`) deserialize spilled outputs straight from the mapped file. For the rest, they are only read back into bytes when the node that consumes them deserializes them.
+
+    The store may be shared by several invocations, but not concurrently. Use it as a context manager (or call `close()`) to remove the temporary directory once you don't need it anymore:
+
+    ```
+    with SpillingOutputStore(memory_budget=2 * 1024 ** 3) as store:
+        outputs = invoke(dag, output_store=store)
+    ```
+    """
+
+    def __init__(
+        self,
+        memory_budget: int,
+        directory: Optional[str] = None,
+    ):
+        """
+        Initialize a spilling output store.
+
+        Parameters
+        ----------
+        memory_budget
+            Maximum number of bytes of serialized outputs to keep in memory at the same time.
+            Outputs bigger than the budget are always spilled to disk.
+
+        directory
+            Directory to create the temporary directory with the spilled outputs in.
+            It defaults to the temporary directory of the system (see the official tempfile library in Python for more details).
+        """
+        if memory_budget < 0:
+            raise ValueError(
+                f"The memory budget of the output store must be a non-negative number of bytes. Instead, we found {memory_budget}."
+            )
+
+        self._memory_budget = memory_budget
+        self._directory = directory
+        self._spill_directory: Optional[str] = None
+        self._lock = threading.Lock()
+        self._in_memory: "OrderedDict[int, _StoredValue]" = OrderedDict()
+        self._bytes_in_memory = 0
+        self._spilled_files = 0
+
+    @property
+    def memory_budget(self) -> int:
+        """Return the maximum number of bytes kept in memory."""
+        return self._memory_budget
+
+    @property
+    def bytes_in_memory(self) -> int:
+        """Return the number of bytes of serialized outputs currently kept in memory."""
+        return self._bytes_in_memory
+
+    def new_namespace(self) -> MutableMapping[str, NodeExecutions]:
+        """
+        Return an empty mapping to store the outputs of the nodes of a DAG, indexed by node name.
+
+        All namespaces created by the same store share its memory budget.
+        """
+        return _OutputStoreNamespace(self)
+
+    def close(self):
+        """Remove all the outputs that were spilled to disk."""
+        with self._lock:
+            if self._spill_directory is not None:
+                shutil.rmtree(self._spill_directory, ignore_errors=True)
+                self._spill_directory = None
+
+    def __enter__(self) -> "SpillingOutputStore":
+        """Use the store as a context manager."""
+        return self
+
+    def __exit__(self, *args):
+        """Remove all the outputs that were spilled to disk."""
+        self.close()
+
+    def _store(self, value: BytesLike) -> _StoredValue:
+        """Keep a serialized value, and spill the oldest ones if the budget is exceeded."""
+        stored = _StoredValue(bytes(value))
+        with self._lock:
+            self._in_memory[id(stored)] = stored
+            self._bytes_in_memory += stored.size
+            self._enforce_budget()
+
+        return stored
+
+    def _load(self, stored: _StoredValue) -> Union[bytes, memoryview]:
+        """Retrieve a serialized value, memory-mapping it if it was spilled."""
+        with self._lock:
+            if stored.value is not None:
+                return stored.value
+
+            if not stored.size or stored.path is None:
+                return b""
+
+            if stored.mapping is None:
+                stored.mapping = _memory_map(stored.path)
+
+            return stored.mapping
+
+    def _discard(self, stored: _StoredValue):
+        """Free the memory or disk space taken by a serialized value."""
+        with self._lock:
+            if stored.value is not None:
+                del self._in_memory[id(stored)]
+                self._bytes_in_memory -= stored.size
+                stored.value = None
+            elif stored.path is not None:
+                # The file is unmapped once the consumers release their views of it
+                stored.mapping = None
+                _remove_file(stored.path)
+                stored.path = None
+
+    def _enforce_budget(self):
+        while self._bytes_in_memory > self._memory_budget:
+            _, oldest = self._in_memory.popitem(last=False)
+            oldest.path = self._spill(oldest.value)
+            oldest.value = None
+            self._bytes_in_memory -= oldest.size
+
+    def _spill(self, value: Optional[bytes]) -> str:
+        if self._spill_directory is None:
+            self._spill_directory = tempfile.mkdtemp(
+                prefix="dagger-outputs-",
+                dir=self._directory,
+            )
+
+        path = os.path.join(self._spill_directory, str(self._spilled_files))
+        self._spilled_files += 1
+
+        with open(path, "wb") as f:
+            f.write(value or b"")
+
+        return path
+
+    def __repr__(self) -> str:
+        """Get a human-readable string representation of the store."""
+        return f"SpillingOutputStore(memory_budget={self._memory_budget}, directory={self._directory})"
+
+
+class _OutputStoreNamespace(MutableMapping[str, NodeExecutions]):
+    """The outputs of the nodes of a single DAG, kept in a SpillingOutputStore."""
+
+    def __init__(self, store: SpillingOutputStore):
+        self._store = store
+        self._outputs: Dict[str, Any] = {}
+
+    def __getitem__(self, node_name: str) -> NodeExecutions:
+        return _map_serialized_values(
+            self._outputs[node_name],
+            self._load,
+            partitioned=PartitionedOutput,
+        )
+
+    def __setitem__(self, node_name: str, value: NodeExecutions):
+        if node_name in self._outputs:
+            del self[node_name]
+
+        self._outputs[node_name] = _map_serialized_values(
+            value,
+            self._store_value,
+            partitioned=_StoredPartitions,
+        )
+
+    def __delitem__(self, node_name: str):
+        _map_serialized_values(
+            self._outputs.pop(node_name),
+            self._discard,
+            partitioned=_StoredPartitions,
+        )
+
+    def _store_value(self, value: Any) -> Any:
+        compact = _compact_partitions(value)
+        if compact is not None:
+            # The buffer of compact partitions is stored (and spilled) as a single value
+            return _StoredCompactPartitions(
+                self._store._store(compact._buffer), compact._offsets
+            )
+
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return self._store._store(value)
+
+        return value
+
+    def _load(self, value: Any) -> Any:
+        if isinstance(value, _StoredCompactPartitions):
+            return PartitionedOutput(
+                CompactPartitions(self._store._load(value.buffer), value.offsets)
+            )
+
+        if isinstance(value, _StoredValue):
+            return self._store._load(value)
+
+        return value
+
+    def _discard(self, value: Any):
+        if isinstance(value, _StoredCompactPartitions):
+            self._store._discard(value.buffer)
+        elif isinstance(value, _StoredValue):
+            self._store._discard(value)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._outputs)
+
+    def __len__(self) -> int:
+        return len(self._outputs)
+
+
+class _StoredPartitions(list):
+    """
+    The partitions of an execution or output kept by the store.
+
+    The store keeps the partitions in a list of stored values, and builds a new partitioned output around the loaded values every time they are retrieved.
+    """
+
+
+class _StoredCompactPartitions:
+    """The partitions of an output kept in a compact buffer, with the buffer kept by the store as a single value."""
+
+    __slots__ = ("buffer", "offsets")
+
+    def __init__(self, buffer: _StoredValue, offsets: "array[int]"):
+        self.buffer = buffer
+        self.offsets = offsets
+
+
+def _map_serialized_values(
+    executions: Any,
+    func: Callable[[Any], Any],
+    partitioned: Callable[[list], Any],
+) -> Any:
+    """
+    Apply a function to each of the individual values contained in the executions of a node, and rebuild the partitions around them with the function supplied.
+
+    The values may be nested inside of partitioned executions and partitioned outputs. However, the values themselves are never traversed, since they may not be serialized (e.g. when the nodes pass their outputs to each other in memory).
+    Partitioned outputs kept in a compact buffer are passed to the function as a whole, so their buffer can be handled as a single value.
+    """
+
+    def map_outputs(outputs: Mapping[str, Any]) -> Mapping[str, Any]:
+        return {
+            output_name: partitioned([func(p) for p in output])
+            if isinstance(output, (PartitionedOutput, _StoredPartitions))
+            and _compact_partitions(output) is None
+            else func(output)
+            for output_name, output in outputs.items()
+        }
+
+    if isinstance(executions, (PartitionedOutput, _StoredPartitions)):
+        return partitioned([map_outputs(e) for e in executions])
+
+    return map_outputs(executions)
+
+
+def _memory_map(path: str) -> Union[bytes, memoryview]:
+    """Map the contents of a file into memory, read-only, and return a view of them."""
+    with open(path, "rb") as f:
+        # Empty files cannot be mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+
+        # The mapping remains valid after the file is closed (or removed)
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        # On some platforms, files cannot be removed while they are memory-mapped.
+        # They will be removed together with the rest of the directory when the store is closed.
+        pass
@@ -0,0 +1,243 @@
+"""Measurements taken while invoking the nodes of a DAG."""
+
+import json
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from dagger.runtime.local.compact import _compact_partitions
+from dagger.runtime.local.types import NodeOutputs, PartitionedOutput
+
+TOP_ALLOCATION_SITES = 10
+
+
+@dataclass
+class AllocationSite:
+    """
+    A line of code that allocated memory during the invocation of a task, according to tracemalloc.
+
+    Attributes
+    ----------
+    filename
+        Path of the file the line belongs to.
+
+    lineno
+        Line number.
+
+    size
+        Bytes allocated by the line that were still in use when the invocation finished.
+
+    count
+        Number of memory blocks allocated by the line that were still in use when the invocation finished.
+    """
+
+    filename: str
+    lineno: int
+    size: int
+    count: int
+
+
+@dataclass
+class NodeReport:
+    """
+    Measurements taken during the invocation of a node, or one of its partitions.
+
+    Times are expressed in seconds, and sizes in bytes.
+
+    Attributes
+    ----------
+    address
+        Address of the node in the DAG. Nested nodes are separated by dots (e.g. "nested-dag.task"), and partitions are identified by their index (e.g. "task[2]").
+
+    wall_time
+        Time elapsed since the node was ready to run until it completed, including the time it was waiting for a worker. For partitions, only the time spent invoking the partition.
+
+    cpu_time
+        CPU time consumed by the thread that invoked the task, summed across partitions.
+
+    func_time
+        Time spent in the task's function, summed across partitions.
+
+    serialize_time
+        Time spent serializing the outputs of the task, summed across partitions.
+
+    deserialize_time
+        Time spent deserializing the inputs of the node. Inputs that come from partitioned outputs are deserialized lazily, while the task iterates over them, so that time is part of func_time too.
+
+    bytes_in
+        Size of the serialized inputs the node received from other nodes.
+
+    bytes_out
+        Size of the serialized outputs of the node.
+
+    reused
+        Whether the outputs were retrieved from a cache or checkpoint, instead of invoking the node.
+
+    partitions
+        Measurements for each of the partitions of a partitioned node.
+
+    peak_memory
+        Peak memory traced by tracemalloc while invoking the task, relative to the memory in use when the invocation started. For partitioned nodes, the highest peak among their partitions.
+        It is only measured when the DAG is invoked with profile_memory=True. Otherwise, it is None.
+
+    allocation_sites
+        The lines of code that allocated the most memory during the invocation, and that was still in use when it finished (e.g. the outputs of the task). For partitioned nodes, the ones of the partition with the highest peak.
+        They are computed from snapshots taken before and after the invocation, so they do not necessarily explain peak_memory. Memory that was allocated and released during the invocation (e.g. temporary copies) counts towards the peak, but it does not appear among the allocation sites.
+        It is only measured when the DAG is invoked with profile_memory=True.
+    """
+
+    address: str
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    func_time: float = 0.0
+    serialize_time: float = 0.0
+    deserialize_time: float = 0.0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    reused: bool = False
+    partitions: List["NodeReport"] = field(default_factory=list)
+    peak_memory: Optional[int] = None
+    allocation_sites: List[AllocationSite] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the measurements as a dictionary of built-in types, which can be serialized into JSON."""
+        return asdict(self)
+
+    def _accumulate(self, other: "NodeReport"):
+        """Add the measurements of a task invocation to the ones of this node, except for its wall time."""
+        self.cpu_time += other.cpu_time
+        self.func_time += other.func_time
+        self.serialize_time += other.serialize_time
+        self.deserialize_time += other.deserialize_time
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+        self.reused = self.reused or other.reused
+
+        if other.peak_memory is not None and (
+            self.peak_memory is None or other.peak_memory > self.peak_memory
+        ):
+            self.peak_memory = other.peak_memory
+            self.allocation_sites = other.allocation_sites
+
+
+class RunReport:
+    """
+    Collect measurements for each of the nodes invoked in a DAG.
+
+    Pass an instance to `local.invoke` and inspect it (or write it as JSON) once the invocation finishes:
+
+    ```
+    report = RunReport()
+    invoke(dag, report=report)
+
+    for node in report.nodes:
+        print(node.address, node.wall_time, node.func_time, node.serialize_time)
+
+    report.write_json("report.json")
+    ```
+
+    Nodes are added as they complete. If the invocation fails, the report contains the nodes that completed before the failure.
+    """
+
+    def __init__(self):
+        """Initialize an empty report."""
+        self._lock = threading.Lock()
+        self._nodes: List[NodeReport] = []
+
+    @property
+    def nodes(self) -> List[NodeReport]:
+        """Return the measurements for each node, in the order they completed."""
+        with self._lock:
+            return list(self._nodes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the report as a dictionary of built-in types, which can be serialized into JSON."""
+        return {"nodes": [node.to_dict() for node in self.nodes]}
+
+    def write_json(self, path: str):
+        """Write the report into a JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def _add(self, node_report: NodeReport):
+        with self._lock:
+            self._nodes.append(node_report)
+
+    def __repr__(self) -> str:
+        """Get a human-readable string representation of the report."""
+        return f"RunReport(nodes={self.nodes})"
+
+
+def _outputs_size(outputs: NodeOutputs) -> int:
+    """Return the size of the serialized outputs of a node."""
+    size = 0
+    for value in outputs.values():
+        compact = _compact_partitions(value)
+        if compact is not None:
+            size += compact.nbytes
+        elif isinstance(value, PartitionedOutput):
+            size += sum(
+                len(p) for p in value if isinstance(p, (bytes, bytearray, memoryview))
+            )
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            size += len(value)
+
+    return size
+
+
+@contextmanager
+def _profile_memory(
+    report: NodeReport,
+    top_allocation_sites: int = TOP_ALLOCATION_SITES,
+) -> Iterator[None]:
+    """
+    Measure the peak memory and the top allocation sites of the code that runs inside the context, and add them to the report.
+
+    Allocation sites compare the snapshots taken before and after the code runs, so they only show the memory that is still in use at the end, not where the peak came from.
+
+    tracemalloc traces the whole process. When other tasks run concurrently in the same process (e.g. in a ThreadPoolExecutor), their allocations are measured too, so the measurements are only accurate when tasks run sequentially or in separate processes.
+    """
+    if not tracemalloc.is_tracing():
+        # Worker processes start tracing the first time they run a task, and keep tracing the rest of the tasks they run
+        tracemalloc.start()
+
+    before = tracemalloc.take_snapshot()
+    _reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+
+    yield
+
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+
+    report.peak_memory = max(peak - baseline, 0)
+    report.allocation_sites = [
+        AllocationSite(
+            filename=stat.traceback[0].filename,
+            lineno=stat.traceback[0].lineno,
+            size=stat.size_diff,
+            count=stat.count_diff,
+        )
+        for stat in after.filter_traces(_ALLOCATION_FILTERS).compare_to(
+            before.filter_traces(_ALLOCATION_FILTERS), "lineno"
+        )[:top_allocation_sites]
+        if stat.size_diff > 0
+    ]
+
+
+_ALLOCATION_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def _reset_peak():
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    else:  # pragma: no cover
+        # Python 3.8 can only reset the peak by forgetting the memory traced so far
+        tracemalloc.clear_traces()
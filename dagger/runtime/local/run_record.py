@@ -0,0 +1,172 @@
+"""Record the fingerprints of the tasks invoked in a run, to only invoke the tasks that changed in the next one."""
+
+import json
+import os
+import tempfile
+import threading
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+
+from dagger.runtime.local.cache import (
+    NodeCache,
+    _fingerprint,
+    _UnfingerprintableInputError,
+)
+from dagger.runtime.local.types import NodeOutputs
+from dagger.task import Task
+
+
+class NodeDecision(NamedTuple):
+    """Whether a task was invoked during a run, and why."""
+
+    invoked: bool
+    reason: str
+
+
+class RunRecord:
+    """
+    Record the fingerprints of the function, literal parameters and inputs of each task invoked in a DAG.
+
+    When a DAG is invoked with a run record and a cache, each task is compared with the fingerprints recorded in the previous run. Only the tasks whose function, literal parameters or inputs changed are invoked again. The outputs of the rest are retrieved from the cache.
+
+    After each run, the record contains the decision taken for every task, and the reason behind it:
+
+    ```
+    record = RunRecord("run-record.json")
+    invoke(dag, cache=NodeCache("cache"), run_record=record)
+
+    for node_address, decision in record.decisions.items():
+        print(node_address, decision.invoked, decision.reason)
+    ```
+
+    Tasks are identified by their address in the DAG. Nested nodes are separated by dots (e.g. "nested-dag.task"), and each partition of a partitioned node is identified by its index (e.g. "task[2]").
+
+    Tasks with an input that cannot be fingerprinted are always invoked, and their decision explains why (e.g. an input that cannot be serialized, or a lazy input over partitions that were not serialized).
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize a run record, loading the fingerprints recorded by the previous run (if any).
+
+        Parameters
+        ----------
+        path
+            Path of the JSON file to load the previous fingerprints from and store the new ones into.
+        """
+        self._path = path
+        self._lock = threading.Lock()
+        self._decisions: Dict[str, NodeDecision] = {}
+
+        try:
+            with open(path, "r") as f:
+                self._fingerprints: Dict[str, Any] = json.load(f)
+        except FileNotFoundError:
+            self._fingerprints = {}
+
+    @property
+    def path(self) -> str:
+        """Return the path of the file the record is stored in."""
+        return self._path
+
+    @property
+    def decisions(self) -> Mapping[str, NodeDecision]:
+        """Return the decision taken for each task during the last run, indexed by the address of the task."""
+        return dict(self._decisions)
+
+    def _decide(
+        self,
+        address: str,
+        task: Task,
+        params: Mapping[str, Any],
+        cache: NodeCache,
+        input_hashes: Optional[Mapping[str, str]] = None,
+    ) -> Tuple[Optional[str], Optional[NodeOutputs]]:
+        """
+        Decide whether a task needs to be invoked.
+
+        Return the key of the task in the cache (or None if it cannot be fingerprinted), together with its outputs from the cache if it doesn't need to be invoked. Tasks that are invoked store their outputs under the same key, without fingerprinting them again.
+        """
+        try:
+            fingerprint = _fingerprint(
+                task,
+                {name: params[name] for name in task.inputs if name in params},
+                input_hashes=input_hashes,
+            )
+        except _UnfingerprintableInputError as e:
+            self._record(address, None, NodeDecision(invoked=True, reason=str(e)))
+            return None, None
+
+        with self._lock:
+            previous = self._fingerprints.get(address)
+
+        current = fingerprint._asdict()
+        cached_outputs = cache.get(fingerprint.key)
+
+        if cached_outputs is not None:
+            if previous == current:
+                reason = "Its function, literal parameters and inputs did not change since the previous run."
+            else:
+                reason = "Its outputs for the same function, literal parameters and inputs were found in the cache."
+
+            decision = NodeDecision(invoked=False, reason=reason)
+        elif previous is None:
+            decision = NodeDecision(
+                invoked=True,
+                reason="It was not invoked in the previous run.",
+            )
+        else:
+            decision = NodeDecision(invoked=True, reason=_changes(previous, current))
+
+        self._record(address, current, decision)
+        return fingerprint.key, cached_outputs
+
+    def _record(
+        self,
+        address: str,
+        fingerprint: Optional[Mapping[str, Any]],
+        decision: NodeDecision,
+    ):
+        with self._lock:
+            self._decisions[address] = decision
+            if fingerprint is None:
+                self._fingerprints.pop(address, None)
+            else:
+                self._fingerprints[address] = fingerprint
+
+    def _save(self):
+        """Store the fingerprints of the last run, atomically replacing the previous ones."""
+        directory = os.path.dirname(os.path.abspath(self._path))
+        with self._lock:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(self._fingerprints, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self._path)
+
+    def __repr__(self) -> str:
+        """Get a human-readable string representation of the record."""
+        return f"RunRecord(path={self._path})"
+
+
+def _changes(previous: Mapping[str, Any], current: Mapping[str, Any]) -> str:
+    """Explain the differences between the fingerprints of two executions of a task."""
+    changes = []
+    if previous.get("function") != current["function"]:
+        changes.append("Its function or literal parameters changed.")
+
+    if previous.get("outputs") != current["outputs"]:
+        changes.append("Its outputs changed.")
+
+    previous_inputs = previous.get("inputs", {})
+    changed_inputs = sorted(
+        name
+        for name in previous_inputs.keys() | current["inputs"].keys()
+        if previous_inputs.get(name) != current["inputs"].get(name)
+    )
+    if changed_inputs:
+        changes.append(f"The following inputs changed: {changed_inputs}.")
+
+    if not changes:
+        changes.append(
+            "Nothing changed since the previous run, but its outputs are no longer in the cache."
+        )
+
+    return " ".join(changes)
@@ -0,0 +1,100 @@
+"""Group the values of keyed outputs by key, and shuffle them into key groups."""
+
+import zlib
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+from dagger.serializer import Serializer
+
+KeyGroup = List[Tuple[Any, List[Any]]]
+
+
+def split_into_key_groups(
+    value: Any,
+    serializer: Serializer,
+    key_groups: int,
+) -> List[KeyGroup]:
+    """
+    Group the values of a keyed output by key, and split the keys into a number of key groups.
+
+    Parameters
+    ----------
+    value
+        A mapping, or an iterable of (key, value) pairs.
+
+    serializer
+        The serializer of the output. Keys are compared, and assigned to a key group, by their serialized representation, so that the same key always lands in the same key group, regardless of the process that generated it.
+
+    key_groups
+        The number of key groups.
+
+
+    Returns
+    -------
+    A list with one item per key group. Each key group is a list of (key, list of values) pairs, in the order each key was first found.
+
+
+    Raises
+    ------
+    TypeError
+        If the value is not a mapping or an iterable of pairs.
+    """
+    pairs = value.items() if isinstance(value, Mapping) else value
+    if not isinstance(pairs, Iterable):
+        raise TypeError(
+            f"Keyed outputs should be mappings, or iterables of (key, value) pairs. Instead, the output was of type '{type(value).__name__}'."
+        )
+
+    groups: List[Dict[bytes, Tuple[Any, List[Any]]]] = [{} for _ in range(key_groups)]
+    for pair in pairs:
+        key, item = _unpack_pair(pair)
+        serialized_key = bytes(serializer.serialize(key))
+        group = groups[zlib.crc32(serialized_key) % key_groups]
+        if serialized_key in group:
+            group[serialized_key][1].append(item)
+        else:
+            group[serialized_key] = (key, [item])
+
+    return [list(group.values()) for group in groups]
+
+
+def merge_key_groups(
+    pieces: Iterable[Iterable[Sequence[Any]]],
+    serializer: Serializer,
+) -> KeyGroup:
+    """
+    Merge the pieces of the same key group, generated by each of the partitions of a node, into a single key group.
+
+    Parameters
+    ----------
+    pieces
+        The key group generated by each partition, as a list of (key, list of values) pairs.
+
+    serializer
+        The serializer of the output, used to compare keys by their serialized representation.
+
+
+    Returns
+    -------
+    A list of (key, list of values) pairs, where each key appears once, with the values every partition generated for it.
+    """
+    merged: Dict[bytes, Tuple[Any, List[Any]]] = {}
+    for piece in pieces:
+        for key, values in piece:
+            serialized_key = bytes(serializer.serialize(key))
+            if serialized_key in merged:
+                merged[serialized_key][1].extend(values)
+            else:
+                merged[serialized_key] = (key, list(values))
+
+    return list(merged.values())
+
+
+def _unpack_pair(pair: Any) -> Tuple[Any, Any]:
+    try:
+        key, value = pair
+    except (TypeError, ValueError):
+        raise TypeError(
+            f"Keyed outputs should be mappings, or iterables of (key, value) pairs. Instead, we found an item of type '{type(pair).__name__}'."
+        )
+
+    return key, value
@@ -1,7 +1,28 @@
 """Run tasks in memory."""
+import asyncio
+import cProfile
+import inspect
+import os
+import time
 import warnings
-from typing import Any, Dict, Iterable, List, Mapping, Optional
+from contextlib import nullcontext
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
+import dagger.hooks.registry as hooks_registry
+from dagger.runtime.local.cache import NodeCache
+from dagger.runtime.local.compact import CompactPartitions
+from dagger.runtime.local.report import NodeReport, _outputs_size, _profile_memory
+from dagger.runtime.local.shuffle import split_into_key_groups
 from dagger.runtime.local.types import NodeOutput, NodeOutputs, PartitionedOutput
 from dagger.serializer import SerializationError
 from dagger.task import SupportedInputs, SupportedOutputs, Task
@@ -10,16 +31,413 @@ from dagger.task import SupportedInputs, SupportedOutputs, Task
 def _invoke_task(
     task: Task,
     params: Optional[Mapping[str, Any]] = None,
+    serialize_outputs: bool = True,
+    cache: Optional[NodeCache] = None,
+    report: Optional[NodeReport] = None,
+    address: str = "",
+    profile_memory: bool = False,
+    profile_path: Optional[str] = None,
+    input_hashes: Optional[Mapping[str, str]] = None,
+    cache_key: Optional[str] = None,
 ) -> NodeOutputs:
+    hooks = hooks_registry.active
+    if hooks is None:
+        return _run_task(
+            task,
+            params,
+            serialize_outputs,
+            cache,
+            report,
+            address,
+            profile_memory,
+            profile_path,
+            input_hashes,
+            cache_key,
+        )
+
+    hooks.partition_start(address)
+    try:
+        outputs = _run_task(
+            task,
+            params,
+            serialize_outputs,
+            cache,
+            report,
+            address,
+            profile_memory,
+            profile_path,
+            input_hashes,
+            cache_key,
+        )
+    except BaseException as e:
+        hooks.partition_end(address, e)
+        raise
+
+    hooks.partition_end(address, None)
+    return outputs
+
+
+def _run_task(
+    task: Task,
+    params: Optional[Mapping[str, Any]],
+    serialize_outputs: bool,
+    cache: Optional[NodeCache],
+    report: Optional[NodeReport],
+    address: str,
+    profile_memory: bool,
+    profile_path: Optional[str],
+    input_hashes: Optional[Mapping[str, str]],
+    cache_key: Optional[str],
+) -> NodeOutputs:
+    started_at, cpu_started_at = time.perf_counter(), time.thread_time()
     params = params or {}
     inputs = _validate_and_filter_inputs(inputs=task.inputs, params=params)
 
+    # Only serialized outputs can be cached. Callers that supply the key already looked it up
+    if cache is not None and serialize_outputs and cache_key is None:
+        cache_key = cache.key(task, inputs, input_hashes=input_hashes)
+        cached_outputs = cache.get(cache_key) if cache_key else None
+        if cached_outputs is not None:
+            if report is not None:
+                report.reused = True
+                report.bytes_out += _outputs_size(cached_outputs)
+                report.wall_time = time.perf_counter() - started_at
+            return cached_outputs
+
+    with (
+        _profile_memory(report)
+        if profile_memory and report is not None
+        else nullcontext()
+    ):
+        func_started_at = time.perf_counter()
+        if profile_path is None:
+            return_value = _call(task, inputs)
+        else:
+            return_value = _call_and_profile(task, inputs, profile_path)
+
+        serialize_started_at = time.perf_counter()
+        outputs = _serialize_outputs(
+            outputs=task.outputs,
+            return_value=return_value,
+            serialize=serialize_outputs,
+            address=address,
+        )
+
+    if report is not None:
+        report.func_time += serialize_started_at - func_started_at
+        report.serialize_time += time.perf_counter() - serialize_started_at
+        report.bytes_out += _outputs_size(outputs) if serialize_outputs else 0
+
+    if cache is not None and cache_key is not None:
+        cache.put(cache_key, outputs)
+
+    if report is not None:
+        report.cpu_time += time.thread_time() - cpu_started_at
+        report.wall_time = time.perf_counter() - started_at
+
+    return outputs
+
+
+def _call(task: Task, inputs: Mapping[str, Any]) -> Any:
     return_value = task.func(**inputs)
 
-    return _serialize_outputs(
-        outputs=task.outputs,
-        return_value=return_value,
+    # Coroutine functions are awaited in a new event loop, which cannot be started from a thread that is already running one
+    if inspect.iscoroutine(return_value):
+        if _is_running_event_loop():
+            return_value.close()
+            raise RuntimeError(
+                "The function of this task is a coroutine function, but it was invoked from a thread that is already running an event loop, so it cannot be awaited in a new one. Please use `ainvoke` to invoke nodes from asynchronous code, or supply an executor to `invoke` so tasks run in other threads."
+            )
+
+        return_value = asyncio.run(return_value)
+
+    return return_value
+
+
+def _is_running_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+
+    return True
+
+
+def _call_and_profile(task: Task, inputs: Mapping[str, Any], profile_path: str) -> Any:
+    """Call the function of a task with cProfile, and dump the statistics into a file that can be loaded with pstats (or tools like snakeviz)."""
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Since Python 3.12, only one profiler may be active at a time in the same process
+        warnings.warn(
+            f"The task could not be profiled because another profiler is already active in this process. Statistics will not be stored in '{profile_path}'."
+        )
+        return _call(task, inputs)
+
+    try:
+        return _call(task, inputs)
+    finally:
+        profiler.disable()
+        os.makedirs(os.path.dirname(profile_path) or ".", exist_ok=True)
+        profiler.dump_stats(profile_path)
+
+
+def _invoke_task_and_report(
+    task: Task,
+    params: Optional[Mapping[str, Any]] = None,
+    serialize_outputs: bool = True,
+    cache: Optional[NodeCache] = None,
+    address: str = "",
+    profile_memory: bool = False,
+    profile_path: Optional[str] = None,
+    input_hashes: Optional[Mapping[str, str]] = None,
+    cache_key: Optional[str] = None,
+) -> Tuple[NodeOutputs, NodeReport]:
+    """Invoke a task and return its measurements together with its outputs, so they can be sent back from a worker process."""
+    report = NodeReport(address=address)
+    outputs = _invoke_task(
+        task,
+        params=params,
+        serialize_outputs=serialize_outputs,
+        cache=cache,
+        report=report,
+        address=address,
+        profile_memory=profile_memory,
+        profile_path=profile_path,
+        input_hashes=input_hashes,
+        cache_key=cache_key,
     )
+    return outputs, report
+
+
+def _invoke_task_batch(
+    task: Task,
+    params: Sequence[Mapping[str, Any]],
+    addresses: Sequence[str],
+    profile_paths: Sequence[Optional[str]],
+    serialize_outputs: bool = True,
+    cache: Optional[NodeCache] = None,
+    profile_memory: bool = False,
+    input_hashes: Optional[Sequence[Optional[Mapping[str, str]]]] = None,
+    cache_keys: Optional[Sequence[Optional[str]]] = None,
+) -> List[Tuple[NodeOutputs, NodeReport]]:
+    """
+    Invoke a batch of partitions of a task one after another, and return the outputs and measurements of each, so they can be sent back from a worker process at once.
+
+    The function of vectorized tasks is called once for the whole batch instead.
+    """
+    if task.vectorized:
+        return _invoke_vectorized_task(
+            task,
+            params=params,
+            addresses=addresses,
+            serialize_outputs=serialize_outputs,
+            cache=cache,
+            profile_memory=profile_memory,
+            profile_path=next(iter(profile_paths), None),
+            input_hashes=input_hashes,
+            cache_keys=cache_keys,
+        )
+
+    return [
+        _invoke_task_and_report(
+            task,
+            params=partition_params,
+            serialize_outputs=serialize_outputs,
+            cache=cache,
+            address=address,
+            profile_memory=profile_memory,
+            profile_path=profile_path,
+            input_hashes=partition_input_hashes,
+            cache_key=partition_cache_key,
+        )
+        for (
+            partition_params,
+            address,
+            profile_path,
+            partition_input_hashes,
+            partition_cache_key,
+        ) in zip(
+            params,
+            addresses,
+            profile_paths,
+            input_hashes or [None] * len(params),
+            cache_keys or [None] * len(params),
+        )
+    ]
+
+
+def _invoke_vectorized_task(
+    task: Task,
+    params: Sequence[Mapping[str, Any]],
+    addresses: Sequence[str],
+    serialize_outputs: bool = True,
+    cache: Optional[NodeCache] = None,
+    profile_memory: bool = False,
+    profile_path: Optional[str] = None,
+    input_hashes: Optional[Sequence[Optional[Mapping[str, str]]]] = None,
+    cache_keys: Optional[Sequence[Optional[str]]] = None,
+) -> List[Tuple[NodeOutputs, NodeReport]]:
+    """
+    Invoke the function of a vectorized task once with a batch of partitions, and return the outputs and measurements of each partition.
+
+    Partitions whose outputs are in the cache are left out of the batch. The time spent in the function is split evenly among the partitions in the batch.
+    """
+    hooks = hooks_registry.active
+    if hooks is None:
+        return _run_vectorized_task(
+            task,
+            params,
+            addresses,
+            serialize_outputs,
+            cache,
+            profile_memory,
+            profile_path,
+            input_hashes,
+            cache_keys,
+        )
+
+    for address in addresses:
+        hooks.partition_start(address)
+    try:
+        results = _run_vectorized_task(
+            task,
+            params,
+            addresses,
+            serialize_outputs,
+            cache,
+            profile_memory,
+            profile_path,
+            input_hashes,
+            cache_keys,
+        )
+    except BaseException as e:
+        for address in addresses:
+            hooks.partition_end(address, e)
+        raise
+
+    for address in addresses:
+        hooks.partition_end(address, None)
+    return results
+
+
+def _run_vectorized_task(
+    task: Task,
+    params: Sequence[Mapping[str, Any]],
+    addresses: Sequence[str],
+    serialize_outputs: bool,
+    cache: Optional[NodeCache],
+    profile_memory: bool,
+    profile_path: Optional[str],
+    input_hashes: Optional[Sequence[Optional[Mapping[str, str]]]],
+    cache_keys: Optional[Sequence[Optional[str]]],
+) -> List[Tuple[NodeOutputs, NodeReport]]:
+    started_at, cpu_started_at = time.perf_counter(), time.thread_time()
+    reports = [NodeReport(address=address) for address in addresses]
+    inputs = [_validate_and_filter_inputs(inputs=task.inputs, params=p) for p in params]
+    outputs: List[Optional[NodeOutputs]] = [None] * len(inputs)
+
+    partition_cache_keys: List[Optional[str]] = list(cache_keys or [None] * len(inputs))
+    # Only serialized outputs can be cached. Callers that supply the key of a partition already looked it up
+    if cache is not None and serialize_outputs:
+        for i, partition_inputs in enumerate(inputs):
+            if partition_cache_keys[i] is not None:
+                continue
+
+            cache_key = cache.key(
+                task,
+                partition_inputs,
+                input_hashes=input_hashes[i] if input_hashes else None,
+            )
+            cached_outputs = cache.get(cache_key) if cache_key else None
+            partition_cache_keys[i] = cache_key
+            if cached_outputs is not None:
+                outputs[i] = cached_outputs
+                reports[i].reused = True
+                reports[i].bytes_out += _outputs_size(cached_outputs)
+
+    pending = [
+        i for i, partition_outputs in enumerate(outputs) if partition_outputs is None
+    ]
+    if pending:
+        batch_report = NodeReport(address=addresses[pending[0]])
+        with (_profile_memory(batch_report) if profile_memory else nullcontext()):
+            func_started_at = time.perf_counter()
+            batch_inputs = _vectorized_inputs(task, [inputs[i] for i in pending])
+            if profile_path is None:
+                return_value = _call(task, batch_inputs)
+            else:
+                return_value = _call_and_profile(task, batch_inputs, profile_path)
+
+            return_values = _vectorized_return_values(return_value, len(pending))
+            func_time = (time.perf_counter() - func_started_at) / len(pending)
+
+            for i, partition_return_value in zip(pending, return_values):
+                serialize_started_at = time.perf_counter()
+                partition_outputs = _serialize_outputs(
+                    outputs=task.outputs,
+                    return_value=partition_return_value,
+                    serialize=serialize_outputs,
+                    address=addresses[i],
+                )
+                outputs[i] = partition_outputs
+
+                reports[i].func_time += func_time
+                reports[i].serialize_time += time.perf_counter() - serialize_started_at
+                reports[i].bytes_out += (
+                    _outputs_size(partition_outputs) if serialize_outputs else 0
+                )
+                cache_key = partition_cache_keys[i]
+                if cache is not None and cache_key is not None:
+                    cache.put(cache_key, partition_outputs)
+
+        for i in pending:
+            reports[i].peak_memory = batch_report.peak_memory
+            reports[i].allocation_sites = batch_report.allocation_sites
+
+    cpu_time = (time.thread_time() - cpu_started_at) / max(len(inputs), 1)
+    wall_time = time.perf_counter() - started_at
+    for report in reports:
+        report.cpu_time += cpu_time
+        report.wall_time = wall_time
+
+    return [
+        (partition_outputs, report)
+        for partition_outputs, report in zip(outputs, reports)
+        if partition_outputs is not None
+    ]
+
+
+def _vectorized_inputs(
+    task: Task, inputs: Sequence[Mapping[str, Any]]
+) -> Mapping[str, Any]:
+    """Return the inputs of a vectorized task for a batch of partitions, which receives a list with the value of each partition, instead of a single value."""
+    assert task.partition_by_input is not None
+    return {
+        **inputs[0],
+        task.partition_by_input: [
+            partition_inputs[task.partition_by_input] for partition_inputs in inputs
+        ],
+    }
+
+
+def _vectorized_return_values(return_value: Any, partitions: int) -> List[Any]:
+    """Return the result of each of the partitions in a batch, from the return value of a vectorized task."""
+    if not isinstance(return_value, Iterable) or isinstance(
+        return_value, (str, bytes, Mapping)
+    ):
+        raise TypeError(
+            f"Vectorized tasks should return a sequence with one result per partition they receive (e.g. a list or an array). Instead, the function returned a value of type '{type(return_value).__name__}'."
+        )
+
+    return_values = list(return_value)
+    if len(return_values) != partitions:
+        raise TypeError(
+            f"Vectorized tasks should return one result per partition they receive. Instead, the function received {partitions} partitions and returned {len(return_values)} results."
+        )
+
+    return return_values
 
 
 def _validate_and_filter_inputs(
@@ -44,6 +462,8 @@ def _validate_and_filter_inputs(
 def _serialize_outputs(
     outputs: Mapping[str, SupportedOutputs],
     return_value: Any,
+    serialize: bool = True,
+    address: str = "",
 ) -> Mapping[str, NodeOutput]:
 
     node_outputs: Dict[str, List[bytes]] = {}
@@ -54,29 +474,78 @@ def _serialize_outputs(
                 output_name=output_name,
                 output_type=outputs[output_name],
                 output_value=output_type.from_function_return_value(return_value),
+                serialize=serialize,
+                address=address,
             )
 
         except (TypeError, ValueError, SerializationError) as e:
-            raise e.__class__(
-                f"We encountered the following error while attempting to serialize the results of this task: {str(e)}"
-            ) from e
+            raise _serialization_error(e) from e
 
     return node_outputs
 
 
+def _serialization_error(
+    e: Union[TypeError, ValueError, SerializationError]
+) -> Exception:
+    """Return an error of the same type, explaining that it happened while serializing the results of a task."""
+    return e.__class__(
+        f"We encountered the following error while attempting to serialize the results of this task: {str(e)}"
+    )
+
+
 def _serialize_output(
     output_name: str,
     output_type: SupportedOutputs,
     output_value: Any,
+    serialize: bool = True,
+    address: str = "",
 ) -> NodeOutput:
+    if output_type.key_groups is not None:
+        output_value = split_into_key_groups(
+            output_value,
+            serializer=output_type.serializer,
+            key_groups=output_type.key_groups,
+        )
+
     if output_type.is_partitioned:
         if not isinstance(output_value, Iterable):
             raise TypeError(
                 f"Output '{output_name}' was declared as a partitioned output, but the return value was not an iterable (instead, it was of type '{type(output_value).__name__}'). Partitioned outputs should be iterables of values (e.g. lists or sets). Each value in the iterable must be serializable with the serializer defined in the output."
             )
 
+        if not serialize:
+            return PartitionedOutput(list(output_value))
+    elif not serialize:
+        return output_value
+
+    hooks = hooks_registry.active
+    if hooks is None:
+        return _serialize_value(output_type, output_value)
+
+    hooks.serialize_start(address, output_name)
+    try:
+        serialized_value = _serialize_value(output_type, output_value)
+    except BaseException as e:
+        hooks.serialize_end(address, output_name, 0, e)
+        raise
+
+    hooks.serialize_end(
+        address,
+        output_name,
+        _outputs_size({output_name: serialized_value}),
+        None,
+    )
+    return serialized_value
+
+
+def _serialize_value(output_type: SupportedOutputs, output_value: Any) -> NodeOutput:
+    if output_type.is_partitioned:
+        # Partitions are serialized eagerly so the outputs can be sent back from a worker process.
+        # They are kept back to back in a single buffer, which is much lighter than a bytes object per partition.
         return PartitionedOutput(
-            map(lambda o: output_type.serializer.serialize(o), output_value)
+            CompactPartitions.from_iterable(  # type: ignore
+                output_type.serializer.serialize(o) for o in output_value
+            )
         )
-    else:
-        return output_type.serializer.serialize(output_value)
+
+    return output_type.serializer.serialize(output_value)
@@ -1,31 +1,148 @@
 """Data types used for local invocations."""
 
-from typing import Any, Generic, Iterable, Iterator, Mapping, TypeVar, Union
+import threading
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    TypeVar,
+    Union,
+)
 
 T = TypeVar("T")
 
 
-class PartitionedOutput(Generic[T]):
-    """Represents a partitioned output explicitly."""
+class PartitionedOutput(Sequence[T]):
+    """
+    Represents a partitioned output explicitly.
+
+    Partitioned outputs are sequences: they support `len()`, indexing and iterating over them several times (e.g. by several consumers).
+
+    When they are built from a sequence (e.g. a list), they access it directly. When they are built from any other iterable (e.g. a generator or a lazy `map`), its elements are only consumed as they are requested, and kept to serve later requests. Asking for the length or for a negative index consumes the whole iterable.
+    """
 
     def __init__(self, iterable: Iterable[T]):
         """Build a partitioned output from an Iterable."""
         self._iterable = iterable
-        self._iterator = iter(iterable)
+        self._lock = threading.Lock()
+        self._partitions: Sequence[T]
+        self._pending: Optional[Iterator[T]]
+
+        if isinstance(iterable, Sequence):
+            self._partitions = iterable
+            self._pending = None
+        else:
+            self._partitions = []
+            self._pending = iter(iterable)
 
     def __iter__(self) -> Iterator[T]:
-        """Return an iterator over the partitions of the output."""
-        return self
+        """Return a new iterator over the partitions of the output."""
+        if self._pending is None:
+            return iter(self._partitions)
+
+        return self._iter_lazily()
+
+    def __len__(self) -> int:
+        """Return the number of partitions."""
+        self._consume()
+        return len(self._partitions)
+
+    def __bool__(self) -> bool:
+        """Return whether there are any partitions, consuming at most one element of the iterable."""
+        self._consume(1)
+        return len(self._partitions) > 0
+
+    def __getitem__(self, index: Any) -> Any:
+        """Return the partition at an index, or a partitioned output with the partitions in a slice."""
+        if isinstance(index, slice):
+            self._consume()
+            return PartitionedOutput(self._partitions[index])
 
-    def __next__(self) -> T:
-        """Return the next element in the partitioned output."""
-        return next(self._iterator)
+        self._consume(None if index < 0 else index + 1)
+        return self._partitions[index]
+
+    def _iter_lazily(self) -> Iterator[T]:
+        i = 0
+        while True:
+            self._consume(i + 1)
+            if i >= len(self._partitions):
+                return
+
+            yield self._partitions[i]
+            i += 1
+
+    def _consume(self, until: Optional[int] = None):
+        """Consume the pending elements of the iterable until there are enough partitions (or all of them, if no number is specified)."""
+        if self._pending is None:
+            return
+
+        with self._lock:
+            partitions: List[T] = self._partitions  # type: ignore
+            while self._pending is not None and (
+                until is None or len(partitions) < until
+            ):
+                try:
+                    partitions.append(next(self._pending))
+                except StopIteration:
+                    self._pending = None
+
+    def __reduce__(self):
+        """Pickle the partitions consumed so far, so partitioned outputs can be sent to (and back from) worker processes."""
+        self._consume()
+        return (PartitionedOutput, (self._partitions,))
 
     def __repr__(self) -> str:
         """Return a human-readable representation of the partitioned output."""
         return repr(self._iterable)
 
 
+class LazyPartitions(Iterable[T]):
+    """
+    The partitions of a partitioned output, deserialized one at a time while they are iterated over.
+
+    Nodes receive them for the inputs declared with `FromNodeOutput(..., lazy=True)`. Only the partition being consumed is kept in memory, so reduce tasks can fold over a large number of partitions.
+
+    They may be iterated over several times, deserializing each partition again every time. Their length is known without deserializing any of them.
+    """
+
+    def __init__(self, partitions: Sequence[Any], deserialize: Callable[[Any], T]):
+        """Build a lazy iterable from the serialized partitions and the function that deserializes each of them."""
+        self._partitions = partitions
+        self._deserialize = deserialize
+
+    def __iter__(self) -> Iterator[T]:
+        """Return a new iterator that deserializes each partition as it is requested."""
+        return map(self._deserialize, self._partitions)
+
+    def __len__(self) -> int:
+        """Return the number of partitions."""
+        return len(self._partitions)
+
+    def __getitem__(self, index: Any) -> Any:
+        """Return the partition at an index, deserialized, or lazy partitions with the partitions in a slice."""
+        if isinstance(index, slice):
+            return LazyPartitions(self._partitions[index], self._deserialize)
+
+        return self._deserialize(self._partitions[index])
+
+    def __reduce__(self):
+        """Pickle the serialized partitions, so lazy partitions can be sent to worker processes."""
+        # Partitions spilled to disk are memory-mapped views, which cannot be pickled
+        partitions = [
+            bytes(p) if isinstance(p, memoryview) else p for p in self._partitions
+        ]
+        return (LazyPartitions, (partitions, self._deserialize))
+
+    def __repr__(self) -> str:
+        """Return a human-readable representation of the partitions."""
+        return f"LazyPartitions(partitions={len(self)})"
+
+
 #: One of the outputs of a node, which may be partitioned
 NodeOutput = Union[bytes, PartitionedOutput[bytes]]
 
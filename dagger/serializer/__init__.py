@@ -3,6 +3,6 @@
 from dagger.serializer.as_json import AsJSON  # noqa
 from dagger.serializer.as_pickle import AsPickle  # noqa
 from dagger.serializer.errors import DeserializationError, SerializationError  # noqa
-from dagger.serializer.protocol import Serializer  # noqa
+from dagger.serializer.protocol import Serializer, StreamingSerializer  # noqa
 
 DefaultSerializer = AsJSON()
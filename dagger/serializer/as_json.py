@@ -1,7 +1,7 @@
 """Serialization strategy based on JSON."""
 
 from json.decoder import JSONDecodeError
-from typing import Any, Optional
+from typing import Any, BinaryIO, Optional
 
 from dagger.serializer.errors import DeserializationError, SerializationError
 
@@ -49,10 +49,38 @@ class AsJSON:
         except (TypeError, ValueError) as e:
             raise SerializationError(e)
 
+    def serialize_to(self, value: Any, stream: BinaryIO):
+        """
+        Serialize a value into a JSON object, and write it into a binary file object encoded using utf-8.
+
+        The JSON object is written in chunks as it is encoded, instead of being encoded as a whole first.
+        """
+        import io
+        import json
+
+        writer = io.TextIOWrapper(stream, encoding="utf-8")
+        try:
+            json.dump(
+                value,
+                writer,
+                indent=self._indent,
+                allow_nan=self._allow_nan,
+            )
+            writer.flush()
+        except (TypeError, ValueError) as e:
+            raise SerializationError(e)
+        finally:
+            # The stream belongs to the caller, so it must stay open
+            writer.detach()
+
     def deserialize(self, serialized_value: bytes) -> Any:
         """Deserialize a utf-8-encoded json object into the value it represents."""
         import json
 
+        if isinstance(serialized_value, memoryview):
+            # The json library only accepts strings, bytes and bytearrays
+            serialized_value = serialized_value.tobytes()
+
         try:
             return json.loads(serialized_value)
         except (TypeError, JSONDecodeError) as e:
@@ -60,6 +88,21 @@ class AsJSON:
                 f"We cannot deserialize value '{str(serialized_value)}' as JSON. {str(e)}"
             )
 
+    def deserialize_from(self, stream: BinaryIO) -> Any:
+        """
+        Deserialize a utf-8-encoded json object, read from a binary file object, into the value it represents.
+
+        The json library reads the whole file before decoding it, so this takes as much memory as reading the file and calling `deserialize`. It is only defined so the serializer conforms to the StreamingSerializer protocol, which lets its values be written in chunks.
+        """
+        import json
+
+        try:
+            return json.load(stream)
+        except (TypeError, JSONDecodeError) as e:
+            raise DeserializationError(
+                f"We cannot deserialize the contents of '{getattr(stream, 'name', stream)}' as JSON. {str(e)}"
+            )
+
     def __repr__(self) -> str:
         """Get a human-readable string representation of the serializer."""
         return f"AsJSON(indent={self._indent}, allow_nan={self._allow_nan})"
@@ -1,6 +1,6 @@
 """Serialization strategy based on the Pickle protocol."""
 
-from typing import Any
+from typing import Any, BinaryIO
 
 from dagger.serializer.errors import DeserializationError, SerializationError
 
@@ -13,6 +13,7 @@ class AsPickle:
     """
 
     extension = "pickle"
+    accepts_buffers = True
 
     def serialize(self, value: Any) -> bytes:
         """Serialize a value using the Pickle protocol."""
@@ -23,6 +24,15 @@ class AsPickle:
         except (pickle.PicklingError, AttributeError) as e:
             raise SerializationError(e)
 
+    def serialize_to(self, value: Any, stream: BinaryIO):
+        """Serialize a value using the Pickle protocol, writing it into a binary file object as it is pickled."""
+        import pickle
+
+        try:
+            pickle.dump(value, stream)
+        except (pickle.PicklingError, AttributeError) as e:
+            raise SerializationError(e)
+
     def deserialize(self, serialized_value: bytes) -> Any:
         """Deserialize a pickled object into the value it represents."""
         import pickle
@@ -41,6 +51,24 @@ class AsPickle:
                 f"We cannot unpickle value '{str(serialized_value)}'. {str(e)}"
             )
 
+    def deserialize_from(self, stream: BinaryIO) -> Any:
+        """Deserialize a pickled object, reading it from a binary file object, into the value it represents."""
+        import pickle
+
+        try:
+            return pickle.load(stream)
+        except (
+            pickle.UnpicklingError,
+            AttributeError,
+            EOFError,
+            ImportError,
+            IndexError,
+            TypeError,
+        ) as e:
+            raise DeserializationError(
+                f"We cannot unpickle the contents of '{getattr(stream, 'name', stream)}'. {str(e)}"
+            )
+
     def __repr__(self) -> str:
         """Get a human-readable string representation of the serializer."""
         return "AsPickle()"
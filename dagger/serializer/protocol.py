@@ -1,6 +1,6 @@
 """Protocol all serializers should conform to."""
 
-from typing import Any, Protocol, runtime_checkable
+from typing import Any, BinaryIO, Protocol, runtime_checkable
 
 
 @runtime_checkable
@@ -14,5 +14,28 @@ class Serializer(Protocol):  # pragma: no cover
         ...
 
     def deserialize(self, serialized_value: bytes) -> Any:
-        """Deserialize a sequence of bytes into a value."""
+        """
+        Deserialize a sequence of bytes into a value.
+
+        Runtimes pass a bytes object, unless the user opts into memory-mapped inputs (e.g. with the `--memory-map-inputs` flag of the CLI runtime), which pass a read-only memoryview.
+
+        Serializers that set the class attribute `accepts_buffers = True` may also receive a read-only memoryview from the local runtime, when the value is stored in a compact buffer or in a file spilled to disk. The rest receive a copy of it as bytes.
+        """
+        ...
+
+
+@runtime_checkable
+class StreamingSerializer(Serializer, Protocol):  # pragma: no cover
+    """
+    Protocol serializers may optionally conform to, in order to write values into (and read them from) binary files directly.
+
+    Runtimes that store values in files use these methods when they are available, so that values do not need to be held in memory as a sequence of bytes on top of their deserialized representation.
+    """
+
+    def serialize_to(self, value: Any, stream: BinaryIO):
+        """Serialize a value into a binary file object."""
+        ...
+
+    def deserialize_from(self, stream: BinaryIO) -> Any:
+        """Deserialize the contents of a binary file object into a value."""
         ...
@@ -19,6 +19,8 @@ SupportedOutputs = Union[
     FromProperty,
 ]
 
+DEFAULT_COMBINE_GROUP_SIZE = 16
+
 
 class Task:
     """A task that executes a given function taking inputs from the specified sources and producing the specified outputs."""
@@ -30,6 +32,10 @@ class Task:
         outputs: Mapping[str, SupportedOutputs] = None,
         runtime_options: Mapping[str, Any] = None,
         partition_by_input: Optional[str] = None,
+        combine_input: Optional[str] = None,
+        combine_group_size: int = DEFAULT_COMBINE_GROUP_SIZE,
+        partitions_per_worker: int = 1,
+        vectorized: bool = False,
     ):
         """
         Validate and initialize a Task.
@@ -56,6 +62,22 @@ class Task:
             If specified, it signals the task should be run as many times as partitions in the specified input.
             Each of the executions will only receive one of the partitions of that input.
 
+        combine_input
+            If specified, it declares the task as a combiner of the partitions of the specified input: its function receives an iterable of values and reduces them into a single value of the same kind, and it is associative, so the partitions may be combined in groups (e.g. a sum, a merge of dictionaries or a concatenation of sorted runs).
+            Runtimes may then reduce the partitions in a tree: groups of partitions are combined in parallel, and the results of the groups are combined again until a single value remains. The order of the partitions is preserved.
+            The task must have a single output, obtained from the return value of the function and serialized in the same way as the input, since the results of each group are fed back to the function.
+
+        combine_group_size
+            The maximum number of values the function of a combiner receives on each invocation.
+
+        partitions_per_worker
+            The number of partitions of a partitioned task that each worker invokes, one after another. Runtimes split the partitions into batches of consecutive partitions, and send each batch to a worker (e.g. a process of an executor, or a pod in Argo) at once.
+            Batches are worth it when the overhead of dispatching a partition to a worker is comparable to the time it takes to invoke it. The function of the task is still invoked once per partition, unless the task is vectorized.
+
+        vectorized
+            If true, the function of a partitioned task is called once per batch of partitions (see partitions_per_worker), instead of once per partition. It receives a list with the values of the input the task is partitioned by (the rest of the inputs are the same for every partition), and it must return a sequence (e.g. a list or an array) with the return value of each partition, in the same order. Each partition still has its own outputs.
+            When a vectorized task is invoked on its own, the input it is partitioned by should contain a sequence of partitions, and each of its outputs contains a partition per value.
+
 
         Returns
         -------
@@ -71,6 +93,8 @@ class Task:
         ValueError
             If the names of the inputs/outputs have unsupported characters.
             If the partition_by field doesn't link to a valid input.
+            If the task is declared as a combiner, but it is not a valid combiner.
+            If the task invokes more than 1 partition per worker, or it is vectorized, but it is not partitioned.
         """
         inputs = FrozenMapping(
             inputs or {},
@@ -95,11 +119,31 @@ class Task:
             _validate_partitioned_input(partition_by_input, inputs)
             _validate_there_are_no_partitioned_outputs(outputs)
 
+        _validate_partitions_per_worker(partitions_per_worker, partition_by_input)
+
+        if vectorized and not partition_by_input:
+            raise ValueError(
+                "Only partitioned tasks may be vectorized. A vectorized task receives the values of a batch of partitions of the input it is partitioned by."
+            )
+
+        if combine_input:
+            _validate_combiner(
+                combine_input,
+                combine_group_size=combine_group_size,
+                inputs=inputs,
+                outputs=outputs,
+                partition_by_input=partition_by_input,
+            )
+
         self._inputs = inputs
         self._outputs = outputs
         self._func = func
         self._runtime_options = runtime_options or {}
         self._partition_by_input = partition_by_input
+        self._combine_input = combine_input
+        self._combine_group_size = combine_group_size
+        self._partitions_per_worker = partitions_per_worker
+        self._vectorized = vectorized
 
     @property
     def func(self) -> Callable:
@@ -126,6 +170,26 @@ class Task:
         """Return the input this task should be partitioned by, if any."""
         return self._partition_by_input
 
+    @property
+    def combine_input(self) -> Optional[str]:
+        """Return the input whose partitions this task combines, if it is a combiner."""
+        return self._combine_input
+
+    @property
+    def combine_group_size(self) -> int:
+        """Return the maximum number of values combined by each invocation of a combiner."""
+        return self._combine_group_size
+
+    @property
+    def partitions_per_worker(self) -> int:
+        """Return the number of partitions each worker invokes, when the task is partitioned."""
+        return self._partitions_per_worker
+
+    @property
+    def vectorized(self) -> bool:
+        """Return true if the function of the task receives a batch of partitions on each call."""
+        return self._vectorized
+
     def __eq__(self, obj) -> bool:
         """Return true if the two tasks are equivalent to each other."""
         return (
@@ -133,11 +197,15 @@ class Task:
             and self._inputs == obj._inputs
             and self._outputs == obj._outputs
             and self._runtime_options == obj._runtime_options
+            and self._combine_input == obj._combine_input
+            and self._combine_group_size == obj._combine_group_size
+            and self._partitions_per_worker == obj._partitions_per_worker
+            and self._vectorized == obj._vectorized
         )
 
     def __repr__(self) -> str:
         """Return a human-readable representation of the task."""
-        return f"Task(func={self._func}, inputs={self._inputs}, outputs={self._outputs}, runtime_options={self._runtime_options}, partition_by_input={self._partition_by_input})"
+        return f"Task(func={self._func}, inputs={self._inputs}, outputs={self._outputs}, runtime_options={self._runtime_options}, partition_by_input={self._partition_by_input}, combine_input={self._combine_input}, combine_group_size={self._combine_group_size}, partitions_per_worker={self._partitions_per_worker}, vectorized={self._vectorized})"
 
 
 def _validate_input_is_supported(input_name, input_type):
@@ -164,12 +232,71 @@ def _validate_partitioned_input(
 
 def _validate_there_are_no_partitioned_outputs(outputs: Mapping[str, SupportedOutputs]):
     for output_name, output_type in outputs.items():
-        if output_type.is_partitioned:
+        # Keyed outputs of partitioned nodes are shuffled into one partition per key group
+        if output_type.is_partitioned and output_type.key_groups is None:
             raise ValueError(
                 "Partitioned nodes may not generate partitioned outputs. This is not a valid map-reduce pattern in dagger. Please check the 'Map Reduce' section in the documentation for an explanation of why this is not possible and suggestions of other valid map-reduce patterns."
             )
 
 
+def _validate_partitions_per_worker(
+    partitions_per_worker: int,
+    partition_by_input: Optional[str],
+):
+    if partitions_per_worker < 1:
+        raise ValueError(
+            f"Partitioned tasks need to invoke at least 1 partition per worker. Instead, they were declared with {partitions_per_worker} partitions per worker."
+        )
+
+    if partitions_per_worker > 1 and not partition_by_input:
+        raise ValueError(
+            f"This task invokes {partitions_per_worker} partitions per worker. However, it is not partitioned. Only tasks declared with a partition_by_input may invoke their partitions in batches."
+        )
+
+
+def _validate_combiner(
+    combine_input: str,
+    combine_group_size: int,
+    inputs: Mapping[str, SupportedInputs],
+    outputs: Mapping[str, SupportedOutputs],
+    partition_by_input: Optional[str],
+):
+    if combine_input not in inputs:
+        raise ValueError(
+            f"This node combines the partitions of '{combine_input}'. However, '{combine_input}' is not an input of the node. The available inputs are {sorted(list(inputs))}."
+        )
+
+    if isinstance(inputs[combine_input], FromParam):
+        raise ValueError(
+            "Nodes may not combine the partitions of an input that comes from a parameter. Combiners reduce the partitions of the output of another node."
+        )
+
+    if partition_by_input:
+        raise ValueError(
+            "Combiners may not be partitioned. A combiner reduces all the partitions of its input into a single value."
+        )
+
+    if combine_group_size < 2:
+        raise ValueError(
+            f"Combiners need to combine at least 2 values on each invocation. Instead, the group size was {combine_group_size}."
+        )
+
+    output_types = list(outputs.values())
+    if (
+        len(output_types) != 1
+        or not isinstance(output_types[0], FromReturnValue)
+        or output_types[0].is_partitioned
+    ):
+        raise ValueError(
+            "Combiners must have a single output, taken from the return value of their function (and not partitioned), since the results of each group of partitions are combined again."
+        )
+
+    if output_types[0].serializer != inputs[combine_input].serializer:
+        raise ValueError(
+            f"The output of a combiner is read back as one of the values of '{combine_input}', so both need to use the same serializer. Instead, the input uses {inputs[combine_input].serializer} and the output uses {output_types[0].serializer}."
+        )
+
+
 def _validate_output_is_supported(output_name, output):
     if not _is_type_supported(output, SupportedOutputs):
         raise TypeError(
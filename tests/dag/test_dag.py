@@ -362,6 +362,42 @@ def test__init__partitioned_by_output_of_partitioned_node():
     )
 
 
+def _shuffle_nodes(**consumer_options) -> dict:
+    return {
+        "fan-out": Task(
+            lambda: [1, 2],
+            outputs={"numbers": FromReturnValue(is_partitioned=True)},
+        ),
+        "map": Task(
+            lambda n: {n % 2: n},
+            inputs={"n": FromNodeOutput("fan-out", "numbers")},
+            outputs={"remainders": FromReturnValue(key_groups=2)},
+            partition_by_input="n",
+        ),
+        "reduce": Task(
+            lambda group: group,
+            inputs={"group": FromNodeOutput("map", "remainders")},
+            outputs={"group": FromReturnValue()},
+            **consumer_options,
+        ),
+    }
+
+
+def test__init__partitioned_by_keyed_output_of_partitioned_node():
+    dag = DAG(_shuffle_nodes(partition_by_input="group"))
+    assert dag.node_dependencies["reduce"] == {"map"}
+
+
+def test__init__keyed_output_of_partitioned_node_consumed_by_a_node_that_is_not_partitioned():
+    with pytest.raises(ValueError) as e:
+        DAG(_shuffle_nodes())
+
+    assert (
+        str(e.value)
+        == "Error validating input 'group' of node 'reduce': This input comes from a keyed output of node 'map', which is partitioned. The key groups generated by each partition of a node are shuffled, so they may only be consumed by a task partitioned by them, which receives the values of a whole key group on each partition."
+    )
+
+
 #
 # Node execution order
 #
@@ -398,6 +434,73 @@ def test__node_execution_order__is_based_on_dependencies():
     assert dag.node_execution_order == [{"first"}, {"second"}, {"third"}]
 
 
+#
+# Newly ready nodes
+#
+
+
+def _diamond_dag() -> DAG:
+    return DAG(
+        nodes=dict(
+            first=Task(lambda: 1, outputs=dict(x=FromReturnValue())),
+            left=Task(
+                lambda x: x,
+                inputs=dict(x=FromNodeOutput("first", "x")),
+                outputs=dict(x=FromReturnValue()),
+            ),
+            right=Task(
+                lambda x: x,
+                inputs=dict(x=FromNodeOutput("first", "x")),
+                outputs=dict(x=FromReturnValue()),
+            ),
+            last=Task(
+                lambda a, b: a + b,
+                inputs=dict(
+                    a=FromNodeOutput("left", "x"),
+                    b=FromNodeOutput("right", "x"),
+                ),
+            ),
+            independent=Task(lambda: 2),
+        ),
+    )
+
+
+def test__node_dependencies_and_dependents():
+    dag = _diamond_dag()
+    assert dag.node_dependencies == {
+        "first": set(),
+        "left": {"first"},
+        "right": {"first"},
+        "last": {"left", "right"},
+        "independent": set(),
+    }
+    assert dag.node_dependents == {
+        "first": {"left", "right"},
+        "left": {"last"},
+        "right": {"last"},
+        "last": set(),
+        "independent": set(),
+    }
+
+
+def test__newly_ready_nodes__when_nothing_has_completed_yet():
+    dag = _diamond_dag()
+    assert dag.newly_ready_nodes(set()) == {"first", "independent"}
+
+
+def test__newly_ready_nodes__only_returns_dependents_of_the_newly_completed_nodes():
+    dag = _diamond_dag()
+    assert dag.newly_ready_nodes({"first"}, ["first"]) == {"left", "right"}
+    assert dag.newly_ready_nodes({"first", "independent"}, ["independent"]) == set()
+    assert dag.newly_ready_nodes({"first"}, []) == set()
+
+
+def test__newly_ready_nodes__waits_for_all_dependencies():
+    dag = _diamond_dag()
+    assert dag.newly_ready_nodes({"first", "left"}, ["left"]) == set()
+    assert dag.newly_ready_nodes({"first", "left", "right"}, ["right"]) == {"last"}
+
+
 #
 # Properties
 #
@@ -610,3 +713,16 @@ def test__validate_parameters__when_param_value_is_not_compatible_with_serialize
         str(e.value)
         == "The value supplied for input 'a' is not compatible with the serializer defined for that input (AsJSON(indent=None, allow_nan=False)): Object of type set is not JSON serializable"
     )
+
+
+def test__validate_parameters__without_validating_serialization():
+    # We are testing it doesn't raise any serialization errors
+    validate_parameters(
+        inputs={
+            "a": FromParam(),
+        },
+        params={
+            "a": {1},
+        },
+        validate_serialization=False,
+    )
@@ -6,6 +6,7 @@ from the standpoint of a user of the library. That is, without any explicit
 knowledge about the internal data structures that build the DAG under the hood.
 """
 
+import pickle
 import random
 
 import pytest
@@ -126,6 +127,21 @@ def test__build__input_from_literal_value():
         )
 
 
+def add_numbers(a, b):
+    return a + b
+
+
+def test__build__tasks_with_literal_values_can_be_pickled():
+    add = dsl.task()(add_numbers)
+
+    @dsl.DAG()
+    def dag(a):
+        add(a, b=2)
+
+    func = dsl.build(dag).nodes["add-numbers"].func
+    assert pickle.loads(pickle.dumps(func))(a=1) == 3
+
+
 def test__build__input_from_param_with_different_names():
     @dsl.task()
     def say_hello(first_name):
@@ -635,6 +651,142 @@ def test__build__map_reduce():
     )
 
 
+def test__build__shuffle():
+    @dsl.task()
+    def generate_lines():
+        return ["a b", "b c"]
+
+    @dsl.task()
+    def count_words(line):
+        return [(word, 1) for word in line.split()]
+
+    @dsl.task()
+    def sum_counts(counts):
+        return {word: sum(ones) for word, ones in counts}
+
+    @dsl.task()
+    def merge(totals):
+        return {word: n for partial in totals for word, n in partial.items()}
+
+    @dsl.DAG()
+    def dag():
+        for line in generate_lines():
+            counts = count_words(line)
+
+        return merge(
+            [sum_counts(key_group) for key_group in dsl.shuffle(counts, key_groups=2)]
+        )
+
+    built_dag = dsl.build(dag)
+
+    verify_dags_are_equivalent(
+        built_dag,
+        DAG(
+            outputs={
+                "return_value": FromNodeOutput("merge", "return_value"),
+            },
+            nodes={
+                "generate-lines": Task(
+                    generate_lines.func,
+                    outputs={
+                        "return_value": FromReturnValue(is_partitioned=True),
+                    },
+                ),
+                "count-words": Task(
+                    count_words.func,
+                    inputs={
+                        "line": FromNodeOutput("generate-lines", "return_value"),
+                    },
+                    outputs={
+                        "return_value": FromReturnValue(key_groups=2),
+                    },
+                    partition_by_input="line",
+                ),
+                "sum-counts": Task(
+                    sum_counts.func,
+                    inputs={
+                        "counts": FromNodeOutput("count-words", "return_value"),
+                    },
+                    outputs={
+                        "return_value": FromReturnValue(),
+                    },
+                    partition_by_input="counts",
+                ),
+                "merge": Task(
+                    merge.func,
+                    inputs={
+                        "totals": FromNodeOutput("sum-counts", "return_value"),
+                    },
+                    outputs={
+                        "return_value": FromReturnValue(),
+                    },
+                ),
+            },
+        ),
+    )
+    assert built_dag.nodes["count-words"].outputs["return_value"].key_groups == 2
+
+
+def test__build__vectorized_task():
+    @dsl.task()
+    def generate_numbers():
+        return [1, 2, 3]
+
+    @dsl.task(partitions_per_worker=2, vectorized=True)
+    def square_numbers(numbers):
+        return [n ** 2 for n in numbers]
+
+    @dsl.task()
+    def sum_numbers(numbers):
+        return sum(numbers)
+
+    @dsl.DAG()
+    def dag():
+        return sum_numbers([square_numbers(n) for n in generate_numbers()])
+
+    built_dag = dsl.build(dag)
+
+    verify_dags_are_equivalent(
+        built_dag,
+        DAG(
+            outputs={
+                "return_value": FromNodeOutput("sum-numbers", "return_value"),
+            },
+            nodes={
+                "generate-numbers": Task(
+                    generate_numbers.func,
+                    outputs={
+                        "return_value": FromReturnValue(is_partitioned=True),
+                    },
+                ),
+                "square-numbers": Task(
+                    square_numbers.func,
+                    inputs={
+                        "numbers": FromNodeOutput("generate-numbers", "return_value"),
+                    },
+                    outputs={
+                        "return_value": FromReturnValue(),
+                    },
+                    partition_by_input="numbers",
+                    partitions_per_worker=2,
+                    vectorized=True,
+                ),
+                "sum-numbers": Task(
+                    sum_numbers.func,
+                    inputs={
+                        "numbers": FromNodeOutput("square-numbers", "return_value"),
+                    },
+                    outputs={
+                        "return_value": FromReturnValue(),
+                    },
+                ),
+            },
+        ),
+    )
+    assert built_dag.nodes["square-numbers"].partitions_per_worker == 2
+    assert built_dag.nodes["square-numbers"].vectorized
+
+
 def test__build__nested_map_reduce():
     @dsl.task()
     def generate_numbers(partitions):
@@ -1,7 +1,11 @@
+import pytest
+
 import dagger.dsl.dsl as dsl
 from dagger.dsl.node_invocation_recorder import NodeInvocationRecorder
 from dagger.dsl.node_invocations import NodeType
+from dagger.dsl.node_output_partition_usage import NodeOutputPartitionUsage
 from dagger.dsl.node_output_serializer import NodeOutputSerializer
+from dagger.dsl.node_output_usage import NodeOutputUsage
 from dagger.serializer import AsPickle
 
 
@@ -55,3 +59,49 @@ def test__dag__as_decorator_with_overrides():
         node_type=NodeType.DAG,
         runtime_options=runtime_options,
     )
+
+
+def test__shuffle():
+    output = NodeOutputUsage("x", references_node_partition=True)
+
+    (key_group,) = dsl.shuffle(output, key_groups=3)
+
+    assert key_group == NodeOutputPartitionUsage(output)
+    assert output.is_partitioned
+    assert output.key_groups == 3
+    assert output.references == {output}
+
+
+def test__shuffle__from_a_list_of_partitions():
+    output = NodeOutputUsage("x", references_node_partition=True)
+
+    (key_group,) = dsl.shuffle([output], key_groups=3)
+
+    assert key_group == NodeOutputPartitionUsage(output)
+    assert output.key_groups == 3
+
+
+def test__shuffle__with_a_key_of_the_output():
+    output = NodeOutputUsage("x")
+
+    (key_group,) = dsl.shuffle(output["counts"], key_groups=2)
+
+    assert key_group.wrapped_reference.key_groups == 2
+    assert key_group.wrapped_reference.is_partitioned
+
+
+def test__shuffle__a_partition_of_an_output():
+    partition = NodeOutputPartitionUsage(NodeOutputUsage("x"))
+
+    with pytest.raises(ValueError) as e:
+        dsl.shuffle(partition, key_groups=2)
+
+    assert (
+        str(e.value)
+        == "Only the outputs of a node may be shuffled. Instead, we received an object of type 'NodeOutputPartitionUsage'."
+    )
+
+
+def test__shuffle__into_no_key_groups():
+    with pytest.raises(ValueError):
+        dsl.shuffle(NodeOutputUsage("x"), key_groups=0)
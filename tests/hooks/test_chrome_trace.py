@@ -0,0 +1,119 @@
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import dagger.hooks.registry as hooks_registry
+from dagger.dag import DAG
+from dagger.hooks import ChromeTrace
+from dagger.input import FromNodeOutput, FromParam
+from dagger.output import FromReturnValue
+from dagger.runtime.local import invoke
+from dagger.task import Task
+
+
+def _dag() -> DAG:
+    return DAG(
+        inputs=dict(n=FromParam()),
+        outputs=dict(total=FromNodeOutput("sum", "total")),
+        nodes=dict(
+            generate=Task(
+                lambda n: list(range(n)),
+                inputs=dict(n=FromParam()),
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            square=Task(
+                lambda number: number ** 2,
+                inputs=dict(number=FromNodeOutput("generate", "numbers")),
+                outputs=dict(squared=FromReturnValue()),
+                partition_by_input="number",
+            ),
+            sum=Task(
+                lambda numbers: sum(numbers),
+                inputs=dict(numbers=FromNodeOutput("square", "squared")),
+                outputs=dict(total=FromReturnValue()),
+            ),
+        ),
+    )
+
+
+def test__invoke__with_a_trace_records_a_span_for_each_step():
+    trace = ChromeTrace()
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        invoke(_dag(), params=dict(n=3), executor=executor, trace=trace)
+
+    events = trace.events
+
+    node_events = [(e["name"], e["ph"]) for e in events if e.get("cat") == "node"]
+    for node_name in ["generate", "square", "sum"]:
+        assert (node_name, "b") in node_events
+        assert (node_name, "e") in node_events
+
+    partitions = {e["name"] for e in events if e.get("cat") == "partition"}
+    assert partitions == {"generate", "square[0]", "square[1]", "square[2]", "sum"}
+
+    serializations = [e for e in events if e.get("cat") == "serialize"]
+    assert len(serializations) == 5
+    assert {"node": "sum", "bytes": 1} == serializations[-1]["args"]
+
+    deserializations = [e for e in events if e.get("cat") == "deserialize"]
+    assert len(deserializations) == 6
+
+    for event in events:
+        assert event["pid"] == os.getpid()
+        if event["ph"] == "X":
+            assert event["dur"] >= 0
+
+    thread_names = [e["args"]["name"] for e in events if e["ph"] == "M"]
+    assert len(thread_names) == len({e["tid"] for e in events})
+
+    assert hooks_registry.active is None
+
+
+def test__invoke__with_a_trace_records_the_errors():
+    def fail():
+        raise ValueError("failure")
+
+    trace = ChromeTrace()
+
+    with pytest.raises(ValueError):
+        invoke(
+            DAG(nodes=dict(fail=Task(fail, outputs=dict(x=FromReturnValue())))),
+            trace=trace,
+        )
+
+    node_end = [e for e in trace.events if e.get("cat") == "node" and e["ph"] == "e"]
+    assert node_end[0]["args"]["error"].startswith("ValueError: ")
+    assert hooks_registry.active is None
+
+
+def test__write_json():
+    trace = ChromeTrace()
+    invoke(_dag(), params=dict(n=2), trace=trace)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trace.json")
+        trace.write_json(path)
+
+        with open(path, "r") as f:
+            written = json.load(f)
+
+    assert written["traceEvents"] == trace.events
+    assert written["displayTimeUnit"] == "ms"
+
+
+def test__io_spans():
+    trace = ChromeTrace()
+
+    trace.io_write_start("/path")
+    trace.io_write_end("/path", 3, None)
+    trace.io_read_start("/path")
+    trace.io_read_end("/path", 0, FileNotFoundError("missing"))
+
+    spans = [e for e in trace.events if e["ph"] == "X"]
+    assert [(s["name"], s["cat"]) for s in spans] == [("write", "io"), ("read", "io")]
+    assert spans[0]["args"] == {"location": "/path", "bytes": 3}
+    assert spans[1]["args"]["error"] == "FileNotFoundError: missing"
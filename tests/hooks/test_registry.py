@@ -0,0 +1,97 @@
+import pytest
+
+import dagger.hooks.registry as hooks_registry
+from dagger.hooks import Hooks, register, registered, unregister
+
+
+class RecordNodes(Hooks):
+    def __init__(self):
+        self.events = []
+
+    def node_start(self, address):
+        self.events.append(("node_start", address))
+
+
+def test__active__is_none_when_no_hooks_are_registered():
+    assert hooks_registry.active is None
+
+
+def test__register__makes_the_hooks_active():
+    hooks = RecordNodes()
+
+    register(hooks)
+    try:
+        assert hooks_registry.active is hooks
+    finally:
+        unregister(hooks)
+
+    assert hooks_registry.active is None
+
+
+def test__register__with_several_hooks_calls_all_of_them_in_order():
+    calls = []
+
+    class Record(Hooks):
+        def __init__(self, name):
+            self.name = name
+
+        def node_end(self, address, error):
+            calls.append((self.name, address, error))
+
+    with registered(Record("first")), registered(Record("second")):
+        hooks_registry.active.node_end("node", None)
+
+    assert calls == [("first", "node", None), ("second", "node", None)]
+    assert hooks_registry.active is None
+
+
+def test__register__with_a_value_that_is_not_a_hook():
+    with pytest.raises(TypeError) as e:
+        register(object())
+
+    assert (
+        str(e.value)
+        == "Hooks should be an instance of dagger.hooks.Hooks. We found a value of type 'object' instead."
+    )
+
+
+def test__register__the_same_hooks_twice():
+    hooks = RecordNodes()
+
+    with registered(hooks):
+        with pytest.raises(ValueError):
+            register(hooks)
+
+    assert hooks_registry.active is None
+
+
+def test__unregister__hooks_that_were_not_registered():
+    with pytest.raises(ValueError):
+        unregister(RecordNodes())
+
+
+def test__registered__unregisters_the_hooks_when_the_block_raises():
+    hooks = RecordNodes()
+
+    with pytest.raises(RuntimeError):
+        with registered(hooks):
+            raise RuntimeError()
+
+    assert hooks_registry.active is None
+
+
+def test__hooks__do_nothing_by_default():
+    hooks = Hooks()
+
+    hooks.node_start("node")
+    hooks.node_end("node", None)
+    hooks.partition_start("node[0]")
+    hooks.partition_end("node[0]", None)
+    hooks.serialize_start("node", "output")
+    hooks.serialize_end("node", "output", 0, None)
+    hooks.deserialize_start("node", "input")
+    hooks.deserialize_end("node", "input", 0, None)
+    hooks.io_read_start("/path")
+    hooks.io_read_end("/path", 0, None)
+    hooks.io_write_start("/path")
+    hooks.io_write_end("/path", 0, None)
@@ -27,10 +27,18 @@ def test__with_custom_serializer():
     assert input_.serializer == serializer
 
 
+def test__lazy():
+    assert not FromNodeOutput("node", "output").lazy
+    assert FromNodeOutput("node", "output", lazy=True).lazy
+    assert FromNodeOutput("node", "output") != FromNodeOutput(
+        "node", "output", lazy=True
+    )
+
+
 def test__representation():
     serializer = CustomSerializer()
     input_ = FromNodeOutput("my-node", "my-output", serializer=serializer)
     assert (
         repr(input_)
-        == f"FromNodeOutput(node=my-node, output=my-output, serializer={repr(serializer)})"
+        == f"FromNodeOutput(node=my-node, output=my-output, serializer={repr(serializer)}, lazy=False)"
     )
@@ -23,6 +23,24 @@ def test__is_partitioned():
     assert FromKey("key-name", is_partitioned=True).is_partitioned is True
 
 
+def test__key_groups():
+    assert FromKey("key-name").key_groups is None
+
+    output = FromKey("key-name", key_groups=4)
+    assert output.key_groups == 4
+    assert output.is_partitioned is True
+
+
+def test__key_groups__must_be_positive():
+    with pytest.raises(ValueError) as e:
+        FromKey("key-name", key_groups=0)
+
+    assert (
+        str(e.value)
+        == "Keyed outputs need to be split into at least 1 key group. Instead, they were declared with 0 key groups."
+    )
+
+
 #
 # from_function_return_value
 #
@@ -69,5 +87,5 @@ def test__representation():
     )
     assert (
         repr(output)
-        == f"FromKey(key=my-key, serializer={repr(serializer)}, is_partitioned=True)"
+        == f"FromKey(key=my-key, serializer={repr(serializer)}, is_partitioned=True, key_groups=None)"
     )
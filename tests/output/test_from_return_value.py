@@ -1,3 +1,5 @@
+import pytest
+
 from dagger.output.from_return_value import FromReturnValue
 from dagger.output.protocol import Output
 from dagger.serializer import AsPickle, DefaultSerializer
@@ -18,6 +20,24 @@ def test__is_partitioned():
     assert FromReturnValue(is_partitioned=True).is_partitioned is True
 
 
+def test__key_groups():
+    assert FromReturnValue().key_groups is None
+
+    output = FromReturnValue(key_groups=4)
+    assert output.key_groups == 4
+    assert output.is_partitioned is True
+
+
+def test__key_groups__must_be_positive():
+    with pytest.raises(ValueError) as e:
+        FromReturnValue(key_groups=0)
+
+    assert (
+        str(e.value)
+        == "Keyed outputs need to be split into at least 1 key group. Instead, they were declared with 0 key groups."
+    )
+
+
 #
 # from_function_return_value
 #
@@ -45,5 +65,5 @@ def test__representation():
     )
     assert (
         repr(output)
-        == f"FromReturnValue(serializer={repr(serializer)}, is_partitioned=True)"
+        == f"FromReturnValue(serializer={repr(serializer)}, is_partitioned=True, key_groups=None)"
     )
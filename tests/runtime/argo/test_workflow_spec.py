@@ -230,6 +230,34 @@ def test__workflow_spec__with_invalid_parameters():
     )
 
 
+def test__workflow_spec__with_packed_partitions_in_the_entrypoint__fails():
+    dag = DAG(
+        nodes={
+            "double": Task(
+                lambda x: x * 2,
+                inputs={"x": FromParam()},
+                outputs={"2x": FromReturnValue()},
+            ),
+        },
+        inputs={"x": FromParam()},
+    )
+
+    with pytest.raises(ValueError) as e:
+        workflow_spec(
+            dag,
+            Workflow(
+                container_image="my-image",
+                container_entrypoint_to_dag_cli=["my-dag", "--packed-partitions"],
+                params={"x": 1},
+            ),
+        )
+
+    assert (
+        str(e.value)
+        == "The container entrypoint of this workflow includes the '--packed-partitions' flag. Argo fans out partitioned nodes over a separate artifact per partition, so it cannot consume partitions packed into a single data file. Please remove the flag from the entrypoint. It is only supported by the CLI and local runtimes."
+    )
+
+
 def test__workflow_spec__with_template_overrides_that_affect_essential_attributes__fails():
     dag = DAG(
         {
@@ -470,3 +498,507 @@ def test__dag_task_with_param():
         )
         == "{{tasks.another-node.outputs.parameters.another-output_partitions}}"
     )
+
+
+def test__workflow_spec__with_a_combiner_of_a_partitioned_output():
+    workflow = Workflow(container_image="my-image", params=dict(offset=1))
+    dag = DAG(
+        inputs=dict(offset=FromParam()),
+        outputs=dict(total=FromNodeOutput("sum", "total")),
+        nodes=dict(
+            generate=Task(
+                lambda: [1, 2, 3],
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            sum=Task(
+                lambda numbers, offset: sum(numbers) + offset,
+                inputs=dict(
+                    numbers=FromNodeOutput("generate", "numbers"),
+                    offset=FromParam(),
+                ),
+                outputs=dict(total=FromReturnValue()),
+                combine_input="numbers",
+                combine_group_size=2,
+            ),
+        ),
+    )
+
+    templates = {
+        template["name"]: template
+        for template in workflow_spec(dag, workflow)["templates"]
+    }
+
+    assert list(templates) == [
+        "dag",
+        "dag-generate",
+        "dag-sum",
+        "dag-sum-combine",
+        "dag-sum-plan",
+    ]
+    assert templates["dag"]["dag"]["tasks"][1] == {
+        "name": "sum",
+        "template": "dag-sum-combine",
+        "dependencies": ["generate"],
+        "arguments": {
+            "parameters": [
+                {
+                    "name": "total_output_path",
+                    "value": "{{inputs.parameters.total_output_path}}",
+                },
+                {"name": "level", "value": "0"},
+                {
+                    "name": "partitions",
+                    "value": "{{tasks.generate.outputs.parameters.numbers_partitions}}",
+                },
+                {
+                    "name": "prefix",
+                    "value": "{{workflow.uid}}/{{inputs.parameters.name}}/generate/numbers.json",
+                },
+                {
+                    "name": "scratch",
+                    "value": "{{workflow.uid}}/{{inputs.parameters.name}}/sum/combine",
+                },
+            ],
+            "artifacts": [
+                {"name": "offset", "from": "{{inputs.artifacts.offset}}"},
+            ],
+        },
+    }
+    assert templates["dag-sum"]["container"]["args"] == [
+        "--node-name",
+        "sum",
+        "--input",
+        "numbers",
+        "/tmp/inputs/numbers.json",
+        "--input",
+        "offset",
+        "{{inputs.artifacts.offset.path}}",
+        "--output",
+        "total",
+        "{{outputs.artifacts.total.path}}",
+    ]
+    assert templates["dag-sum"]["inputs"]["artifacts"] == [
+        {"name": "numbers-0", "path": "/tmp/inputs/numbers.json/0", "optional": True},
+        {"name": "numbers-1", "path": "/tmp/inputs/numbers.json/1", "optional": True},
+        {"name": "offset", "path": "/tmp/inputs/offset.json"},
+    ]
+
+    group_arguments = {
+        "parameters": [{"name": "total_output_path", "value": "{{item.output}}"}],
+        "artifacts": [
+            {"name": "numbers-0", "s3": {"key": "{{item.p0}}"}},
+            {"name": "numbers-1", "s3": {"key": "{{item.p1}}"}},
+            {"name": "offset", "from": "{{inputs.artifacts.offset}}"},
+        ],
+    }
+    assert templates["dag-sum-combine"] == {
+        "name": "dag-sum-combine",
+        "inputs": {
+            "parameters": [
+                {"name": "level"},
+                {"name": "partitions"},
+                {"name": "prefix"},
+                {"name": "scratch"},
+                {"name": "total_output_path"},
+            ],
+            "artifacts": [{"name": "offset"}],
+        },
+        "dag": {
+            "tasks": [
+                {
+                    "name": "plan",
+                    "template": "dag-sum-plan",
+                    "arguments": {
+                        "parameters": [
+                            {"name": p, "value": "{{inputs.parameters.%s}}" % p}
+                            for p in ["level", "partitions", "prefix", "scratch"]
+                        ],
+                    },
+                },
+                {
+                    "name": "combine",
+                    "template": "dag-sum",
+                    "dependencies": ["plan"],
+                    "when": "{{tasks.plan.outputs.parameters.final}} == false",
+                    "withParam": "{{tasks.plan.outputs.parameters.groups}}",
+                    "arguments": group_arguments,
+                },
+                {
+                    "name": "next-level",
+                    "template": "dag-sum-combine",
+                    "dependencies": ["combine"],
+                    "when": "{{tasks.plan.outputs.parameters.final}} == false",
+                    "arguments": {
+                        "parameters": [
+                            {
+                                "name": "level",
+                                "value": "{{tasks.plan.outputs.parameters.level}}",
+                            },
+                            {
+                                "name": "partitions",
+                                "value": "{{tasks.plan.outputs.parameters.partitions}}",
+                            },
+                            {
+                                "name": "prefix",
+                                "value": "{{tasks.plan.outputs.parameters.prefix}}",
+                            },
+                            {
+                                "name": "scratch",
+                                "value": "{{inputs.parameters.scratch}}",
+                            },
+                            {
+                                "name": "total_output_path",
+                                "value": "{{inputs.parameters.total_output_path}}",
+                            },
+                        ],
+                        "artifacts": [
+                            {"name": "offset", "from": "{{inputs.artifacts.offset}}"},
+                        ],
+                    },
+                },
+                {
+                    "name": "root",
+                    "template": "dag-sum",
+                    "dependencies": ["plan"],
+                    "when": "{{tasks.plan.outputs.parameters.final}} == true",
+                    "withParam": "{{tasks.plan.outputs.parameters.groups}}",
+                    "arguments": {
+                        **group_arguments,
+                        "parameters": [
+                            {
+                                "name": "total_output_path",
+                                "value": "{{inputs.parameters.total_output_path}}",
+                            }
+                        ],
+                    },
+                },
+            ],
+        },
+    }
+    assert templates["dag-sum-plan"]["container"]["args"] == [
+        "--node-name",
+        "sum",
+        "--plan-combine",
+        "{{inputs.parameters.level}}",
+        "{{inputs.parameters.partitions}}",
+        "{{inputs.parameters.prefix}}",
+        "{{inputs.parameters.scratch}}",
+        "/tmp/outputs/plan",
+    ]
+    assert templates["dag-sum-plan"]["outputs"] == {
+        "parameters": [
+            {"name": name, "valueFrom": {"path": f"/tmp/outputs/plan/{name}"}}
+            for name in ["groups", "partitions", "prefix", "level", "final"]
+        ],
+    }
+
+
+def test__workflow_spec__with_a_combiner_of_a_partitioned_node():
+    dag = DAG(
+        dict(
+            generate=Task(
+                lambda: [1, 2, 3],
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            square=Task(
+                lambda number: number ** 2,
+                inputs=dict(number=FromNodeOutput("generate", "numbers")),
+                outputs=dict(square=FromReturnValue()),
+                partition_by_input="number",
+            ),
+            sum=Task(
+                lambda squares: sum(squares),
+                inputs=dict(squares=FromNodeOutput("square", "square")),
+                outputs=dict(total=FromReturnValue()),
+                combine_input="squares",
+            ),
+        )
+    )
+
+    spec = workflow_spec(dag, Workflow(container_image="my-image"))
+
+    (_, _, sum_task) = spec["templates"][0]["dag"]["tasks"]
+    assert sum_task["template"] == "dag-sum-combine"
+    assert sum_task["arguments"]["parameters"][2:4] == [
+        {
+            "name": "partitions",
+            "value": "{{tasks.generate.outputs.parameters.numbers_partitions}}",
+        },
+        {
+            "name": "prefix",
+            "value": "{{workflow.uid}}/{{inputs.parameters.name}}/square/square.json",
+        },
+    ]
+    sum_template = spec["templates"][3]
+    assert sum_template["name"] == "dag-sum"
+    assert [a["path"] for a in sum_template["inputs"]["artifacts"]] == [
+        f"/tmp/inputs/squares.json/{i:02d}" for i in range(16)
+    ]
+
+
+def test__workflow_spec__with_a_combiner_of_an_output_that_is_not_partitioned():
+    dag = DAG(
+        nodes=dict(
+            generate=Task(
+                lambda: [1, 2, 3],
+                outputs=dict(numbers=FromReturnValue()),
+            ),
+            sum=Task(
+                lambda numbers: sum(numbers),
+                inputs=dict(numbers=FromNodeOutput("generate", "numbers")),
+                outputs=dict(total=FromReturnValue()),
+                combine_input="numbers",
+            ),
+        ),
+    )
+
+    spec = workflow_spec(dag, Workflow(container_image="my-image"))
+
+    assert [t["name"] for t in spec["templates"]] == [
+        "dag",
+        "dag-generate",
+        "dag-sum",
+    ]
+    (_, sum_task) = spec["templates"][0]["dag"]["tasks"]
+    assert sum_task["template"] == "dag-sum"
+    assert sum_task["arguments"]["artifacts"] == [
+        {
+            "name": "numbers",
+            "s3": {
+                "key": "{{workflow.uid}}/{{inputs.parameters.name}}/generate/numbers.json"
+            },
+        }
+    ]
+
+
+def test__workflow_spec__with_a_keyed_output_shuffled_between_partitioned_nodes():
+    dag = DAG(
+        dict(
+            generate=Task(
+                lambda: [["a", "b"], ["a"]],
+                outputs=dict(words=FromReturnValue(is_partitioned=True)),
+            ),
+            map=Task(
+                lambda words: [(word, 1) for word in words],
+                inputs=dict(words=FromNodeOutput("generate", "words")),
+                outputs=dict(counts=FromReturnValue(key_groups=2)),
+                partition_by_input="words",
+            ),
+            reduce=Task(
+                lambda counts: {word: sum(ones) for word, ones in counts},
+                inputs=dict(counts=FromNodeOutput("map", "counts")),
+                outputs=dict(totals=FromReturnValue()),
+                partition_by_input="counts",
+            ),
+        )
+    )
+
+    spec = workflow_spec(dag, Workflow(container_image="my-image"))
+
+    (_, map_task, reduce_task) = spec["templates"][0]["dag"]["tasks"]
+    assert map_task["arguments"]["parameters"][-2:] == [
+        {
+            "name": "counts_output_path",
+            "value": "{{workflow.uid}}/{{inputs.parameters.name}}/map/counts.json",
+        },
+        {"name": "partition", "value": "{{item}}"},
+    ]
+    assert reduce_task["withParam"] == '["0", "1"]'
+    assert reduce_task["arguments"]["artifacts"] == [
+        {
+            "name": "counts",
+            "s3": {
+                "key": "{{workflow.uid}}/{{inputs.parameters.name}}/map/counts.json/{{item}}"
+            },
+        }
+    ]
+
+    map_template = spec["templates"][2]
+    assert map_template["name"] == "dag-map"
+    assert map_template["inputs"]["parameters"] == [
+        {"name": "counts_output_path"},
+        {"name": "partition"},
+    ]
+    assert map_template["outputs"] == {
+        "artifacts": [
+            {
+                "name": f"counts-{i}",
+                "path": f"/tmp/outputs/counts.json/{i}",
+                "archive": {"none": {}},
+                "s3": {
+                    "key": "{{inputs.parameters.counts_output_path}}"
+                    + f"/{i}/"
+                    + "{{inputs.parameters.partition}}"
+                },
+            }
+            for i in range(2)
+        ]
+    }
+    assert map_template["container"]["args"][-3:] == [
+        "--output",
+        "counts",
+        "/tmp/outputs/counts.json",
+    ]
+
+
+def test__workflow_spec__with_a_combiner_of_a_node_partitioned_by_a_shuffled_output():
+    dag = DAG(
+        dict(
+            generate=Task(
+                lambda: [["a", "b"], ["a"]],
+                outputs=dict(words=FromReturnValue(is_partitioned=True)),
+            ),
+            map=Task(
+                lambda words: [(word, 1) for word in words],
+                inputs=dict(words=FromNodeOutput("generate", "words")),
+                outputs=dict(counts=FromReturnValue(key_groups=2)),
+                partition_by_input="words",
+            ),
+            reduce=Task(
+                lambda counts: {word: sum(ones) for word, ones in counts},
+                inputs=dict(counts=FromNodeOutput("map", "counts")),
+                outputs=dict(totals=FromReturnValue()),
+                partition_by_input="counts",
+            ),
+            merge=Task(
+                lambda totals: {k: v for t in totals for k, v in t.items()},
+                inputs=dict(totals=FromNodeOutput("reduce", "totals")),
+                outputs=dict(merged=FromReturnValue()),
+                combine_input="totals",
+            ),
+        )
+    )
+
+    spec = workflow_spec(dag, Workflow(container_image="my-image"))
+
+    (_, _, _, merge_task) = spec["templates"][0]["dag"]["tasks"]
+    assert merge_task["template"] == "dag-merge-combine"
+    assert merge_task["arguments"]["parameters"][2:4] == [
+        {"name": "partitions", "value": '["0", "1"]'},
+        {
+            "name": "prefix",
+            "value": "{{workflow.uid}}/{{inputs.parameters.name}}/reduce/totals.json",
+        },
+    ]
+
+
+def test__workflow_spec__with_partitions_invoked_in_batches():
+    dag = DAG(
+        dict(
+            generate=Task(
+                lambda: [1, 2, 3],
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            power=Task(
+                lambda number, exponent: number ** exponent,
+                inputs=dict(
+                    number=FromNodeOutput("generate", "numbers"),
+                    exponent=FromParam(),
+                ),
+                outputs=dict(result=FromReturnValue()),
+                partition_by_input="number",
+                partitions_per_worker=2,
+            ),
+        ),
+        inputs=dict(exponent=FromParam()),
+    )
+
+    spec = workflow_spec(
+        dag, Workflow(container_image="my-image", params={"exponent": 2})
+    )
+
+    (_, power_task) = spec["templates"][0]["dag"]["tasks"]
+    assert "withParam" not in power_task
+    assert power_task["template"] == "dag-power-batches"
+    assert power_task["arguments"] == {
+        "parameters": [
+            {
+                "name": "result_output_path",
+                "value": "{{workflow.uid}}/{{inputs.parameters.name}}/power/result.json",
+            },
+            {
+                "name": "partitions",
+                "value": "{{tasks.generate.outputs.parameters.numbers_partitions}}",
+            },
+            {
+                "name": "prefix",
+                "value": "{{workflow.uid}}/{{inputs.parameters.name}}/generate/numbers.json",
+            },
+        ],
+        "artifacts": [
+            {"name": "exponent", "from": "{{inputs.artifacts.exponent}}"},
+        ],
+    }
+
+    assert [t["name"] for t in spec["templates"]] == [
+        "dag",
+        "dag-generate",
+        "dag-power",
+        "dag-power-batches",
+        "dag-power-plan-batches",
+    ]
+    (_, _, power_template, batches_template, plan_template) = spec["templates"]
+    assert power_template["container"]["args"] == [
+        "--node-name",
+        "power",
+        "--batch",
+        "--input",
+        "number",
+        "/tmp/inputs/number.json",
+        "--input",
+        "exponent",
+        "{{inputs.artifacts.exponent.path}}",
+        "--output",
+        "result",
+        "/tmp/outputs/result.json",
+    ]
+    assert power_template["inputs"] == {
+        "parameters": [
+            {"name": "result_output_path"},
+            {"name": "partition-0"},
+            {"name": "partition-1"},
+        ],
+        "artifacts": [
+            {"name": "number-0", "path": "/tmp/inputs/number.json/0", "optional": True},
+            {"name": "number-1", "path": "/tmp/inputs/number.json/1", "optional": True},
+            {"name": "exponent", "path": "/tmp/inputs/exponent.json"},
+        ],
+    }
+    assert power_template["outputs"] == {
+        "artifacts": [
+            {
+                "name": f"result-{slot}",
+                "path": f"/tmp/outputs/result.json/{slot}",
+                "optional": True,
+                "archive": {"none": {}},
+                "s3": {
+                    "key": "{{inputs.parameters.result_output_path}}/"
+                    + "{{"
+                    + f"inputs.parameters.partition-{slot}"
+                    + "}}"
+                },
+            }
+            for slot in ["0", "1"]
+        ]
+    }
+
+    (plan_task, batch_task) = batches_template["dag"]["tasks"]
+    assert plan_task["template"] == "dag-power-plan-batches"
+    assert batch_task["withParam"] == "{{tasks.plan.outputs.parameters.batches}}"
+    assert batch_task["arguments"]["artifacts"] == [
+        {"name": "number-0", "s3": {"key": "{{inputs.parameters.prefix}}/{{item.p0}}"}},
+        {"name": "number-1", "s3": {"key": "{{inputs.parameters.prefix}}/{{item.p1}}"}},
+        {"name": "exponent", "from": "{{inputs.artifacts.exponent}}"},
+    ]
+    assert plan_template["container"]["args"] == [
+        "--node-name",
+        "power",
+        "--plan-batches",
+        "{{inputs.parameters.partitions}}",
+        "/tmp/outputs/plan",
+    ]
+    assert plan_template["outputs"] == {
+        "parameters": [
+            {"name": "batches", "valueFrom": {"path": "/tmp/outputs/plan/batches"}}
+        ]
+    }
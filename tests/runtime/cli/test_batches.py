@@ -0,0 +1,21 @@
+import json
+
+from dagger.runtime.cli.batches import plan_batches
+
+
+def test__plan_batches():
+    assert json.loads(plan_batches(["0", "1", "2", "3", "4"], 2)) == [
+        {"p0": "0", "p1": "1"},
+        {"p0": "2", "p1": "3"},
+        {"p0": "4", "p1": "missing"},
+    ]
+
+
+def test__plan_batches__with_a_single_batch():
+    assert json.loads(plan_batches(["0", "1"], 4)) == [
+        {"p0": "0", "p1": "1", "p2": "missing", "p3": "missing"},
+    ]
+
+
+def test__plan_batches__without_partitions():
+    assert json.loads(plan_batches([], 4)) == []
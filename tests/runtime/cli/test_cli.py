@@ -2,19 +2,22 @@ import itertools
 import json
 import os
 import tempfile
+from typing import List
 
 import pytest
 
 from dagger.dag import DAG
 from dagger.input import FromNodeOutput, FromParam
-from dagger.output import FromReturnValue
+from dagger.output import FromKey, FromReturnValue
 from dagger.runtime.cli.cli import invoke
 from dagger.runtime.cli.locations import (
+    PACKED_PARTITIONS_INDEX_FILENAME,
     PARTITION_MANIFEST_FILENAME,
+    retrieve_input_from_location,
     store_output_in_location,
 )
 from dagger.runtime.local import PartitionedOutput
-from dagger.serializer import AsPickle
+from dagger.serializer import AsJSON, AsPickle, SerializationError
 from dagger.task import Task
 
 
@@ -368,3 +371,1049 @@ def test__invoke__node_with_partitioned_input():
 
         with open(together_output, "rb") as f:
             assert f.read() == b"[1, 2, 3]"
+
+
+def test__invoke__with_packed_partitions():
+    dag = DAG(
+        inputs={"n": FromParam()},
+        outputs={"total": FromNodeOutput("sum", "total")},
+        nodes={
+            "generate": Task(
+                lambda n: list(range(n)),
+                inputs={"n": FromParam()},
+                outputs={"numbers": FromReturnValue(is_partitioned=True)},
+            ),
+            "sum": Task(
+                lambda numbers: sum(numbers),
+                inputs={"numbers": FromNodeOutput("generate", "numbers")},
+                outputs={"total": FromReturnValue()},
+            ),
+        },
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        n_input = os.path.join(tmp, "n")
+        with open(n_input, "wb") as f:
+            f.write(b"12")
+
+        numbers_output = os.path.join(tmp, "numbers")
+        invoke(
+            dag,
+            argv=[
+                "--node-name",
+                "generate",
+                "--input",
+                "n",
+                n_input,
+                "--output",
+                "numbers",
+                numbers_output,
+                "--packed-partitions",
+            ],
+        )
+
+        assert os.path.isfile(
+            os.path.join(numbers_output, PACKED_PARTITIONS_INDEX_FILENAME)
+        )
+        assert list(retrieve_input_from_location(numbers_output)) == [
+            str(i).encode() for i in range(12)
+        ]
+
+        total_output = os.path.join(tmp, "total")
+        invoke(
+            dag,
+            argv=[
+                "--node-name",
+                "sum",
+                "--input",
+                "numbers",
+                numbers_output,
+                "--output",
+                "total",
+                total_output,
+            ],
+        )
+
+        with open(total_output, "rb") as f:
+            assert f.read() == b"66"
+
+
+def test__invoke__node_with_a_lazy_partitioned_input():
+    dag = DAG(
+        outputs={"total": FromNodeOutput("reduce", "total")},
+        nodes={
+            "fan-out": Task(
+                lambda: [1, 2, 3],
+                outputs={"numbers": FromReturnValue(is_partitioned=True)},
+            ),
+            "reduce": Task(
+                lambda numbers: dict(
+                    is_list=isinstance(numbers, list),
+                    total=sum(numbers),
+                ),
+                inputs={"numbers": FromNodeOutput("fan-out", "numbers", lazy=True)},
+                outputs={"is_list": FromKey("is_list"), "total": FromKey("total")},
+            ),
+        },
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        numbers_input = os.path.join(tmp, "numbers")
+        is_list_output = os.path.join(tmp, "is_list")
+        total_output = os.path.join(tmp, "total")
+
+        store_output_in_location(
+            output_location=numbers_input,
+            output_value=PartitionedOutput([b"1", b"2", b"3"]),
+        )
+
+        invoke(
+            dag,
+            argv=itertools.chain(
+                *[
+                    ["--node-name", "reduce"],
+                    ["--input", "numbers", numbers_input],
+                    ["--output", "is_list", is_list_output],
+                    ["--output", "total", total_output],
+                ]
+            ),
+        )
+
+        with open(is_list_output, "rb") as f:
+            assert f.read() == b"false"
+
+        with open(total_output, "rb") as f:
+            assert f.read() == b"6"
+
+
+_invocations: List[int] = []
+
+
+def _square(x):
+    _invocations.append(x)
+    return x ** 2
+
+
+def test__invoke__with_a_cache_directory():
+    dag = DAG(
+        nodes=dict(
+            square=Task(
+                _square,
+                inputs=dict(x=FromParam()),
+                outputs=dict(x_squared=FromReturnValue()),
+            ),
+        ),
+        inputs=dict(x=FromParam()),
+        outputs=dict(x_squared=FromNodeOutput("square", "x_squared")),
+    )
+
+    _invocations.clear()
+    with tempfile.TemporaryDirectory() as tmp:
+        x_input = os.path.join(tmp, "x_input")
+        cache_dir = os.path.join(tmp, "cache")
+
+        with open(x_input, "wb") as f:
+            f.write(b"4")
+
+        for i in range(2):
+            x_output = os.path.join(tmp, f"x_output_{i}")
+            invoke(
+                dag,
+                argv=[
+                    "--input",
+                    "x",
+                    x_input,
+                    "--output",
+                    "x_squared",
+                    x_output,
+                    "--cache-dir",
+                    cache_dir,
+                ],
+            )
+
+            with open(x_output, "rb") as f:
+                assert f.read() == b"16"
+
+    assert _invocations == [4]
+
+
+def test__invoke__with_a_report():
+    dag = DAG(
+        nodes=dict(
+            square=Task(
+                lambda x: x ** 2,
+                inputs=dict(x=FromParam()),
+                outputs=dict(x_squared=FromReturnValue()),
+            ),
+        ),
+        inputs=dict(x=FromParam()),
+        outputs=dict(x_squared=FromNodeOutput("square", "x_squared")),
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        x_input = os.path.join(tmp, "x_input")
+        x_output = os.path.join(tmp, "x_output")
+        report = os.path.join(tmp, "report.json")
+
+        with open(x_input, "wb") as f:
+            f.write(b"4")
+
+        invoke(
+            dag,
+            argv=[
+                "--input",
+                "x",
+                x_input,
+                "--output",
+                "x_squared",
+                x_output,
+                "--report",
+                report,
+            ],
+        )
+
+        with open(report, "r") as f:
+            nodes = json.load(f)["nodes"]
+
+        assert [n["address"] for n in nodes] == ["square"]
+        assert nodes[0]["bytes_out"] == 2
+
+
+def test__invoke__task_with_a_report():
+    dag = DAG(
+        nodes=dict(
+            square=Task(
+                lambda x: x ** 2,
+                inputs=dict(x=FromParam()),
+                outputs=dict(x_squared=FromReturnValue()),
+            ),
+        ),
+        inputs=dict(x=FromParam()),
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        x_input = os.path.join(tmp, "x_input")
+        x_output = os.path.join(tmp, "x_output")
+        report = os.path.join(tmp, "report.json")
+
+        with open(x_input, "wb") as f:
+            f.write(b"12")
+
+        invoke(
+            dag,
+            argv=[
+                "--node-name",
+                "square",
+                "--input",
+                "x",
+                x_input,
+                "--output",
+                "x_squared",
+                x_output,
+                "--report",
+                report,
+            ],
+        )
+
+        with open(report, "r") as f:
+            (node,) = json.load(f)["nodes"]
+
+        assert node["address"] == "square"
+        assert node["bytes_in"] == 2
+        assert node["bytes_out"] == 3
+        assert node["deserialize_time"] > 0
+        assert node["wall_time"] >= node["deserialize_time"] + node["func_time"]
+
+
+def test__invoke__with_a_trace():
+    dag = DAG(
+        nodes=dict(
+            square=Task(
+                lambda x: x ** 2,
+                inputs=dict(x=FromParam()),
+                outputs=dict(x_squared=FromReturnValue()),
+            ),
+        ),
+        inputs=dict(x=FromParam()),
+        outputs=dict(x_squared=FromNodeOutput("square", "x_squared")),
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        x_input = os.path.join(tmp, "x_input")
+        x_output = os.path.join(tmp, "x_output")
+        trace = os.path.join(tmp, "trace.json")
+
+        with open(x_input, "wb") as f:
+            f.write(b"4")
+
+        invoke(
+            dag,
+            argv=[
+                "--input",
+                "x",
+                x_input,
+                "--output",
+                "x_squared",
+                x_output,
+                "--trace",
+                trace,
+            ],
+        )
+
+        with open(trace, "r") as f:
+            events = json.load(f)["traceEvents"]
+
+        spans = [(e["cat"], e["name"]) for e in events if e["ph"] in ("X", "b")]
+        assert spans == [
+            ("io", "read"),
+            ("node", "square"),
+            ("serialize", "serialize x_squared"),
+            ("partition", "square"),
+            ("io", "write"),
+        ]
+
+
+def test__invoke__with_profile_nodes():
+    dag = DAG(
+        nodes=dict(
+            square=Task(
+                lambda x: x ** 2,
+                inputs=dict(x=FromParam()),
+                outputs=dict(x_squared=FromReturnValue()),
+            ),
+        ),
+        inputs=dict(x=FromParam()),
+        outputs=dict(x_squared=FromNodeOutput("square", "x_squared")),
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        x_input = os.path.join(tmp, "inputs", "x")
+        os.mkdir(os.path.dirname(x_input))
+        with open(x_input, "wb") as f:
+            f.write(b"4")
+
+        for node_name, output_dir in [("", "dag"), ("square", "task")]:
+            os.mkdir(os.path.join(tmp, output_dir))
+            invoke(
+                dag,
+                argv=[
+                    "--node-name",
+                    node_name,
+                    "--input",
+                    "x",
+                    x_input,
+                    "--output",
+                    "x_squared",
+                    os.path.join(tmp, output_dir, "x_squared"),
+                    "--profile-node",
+                    "square",
+                ],
+            )
+
+        assert sorted(os.listdir(os.path.join(tmp, "dag"))) == [
+            "square.pstats",
+            "x_squared",
+        ]
+        assert sorted(os.listdir(os.path.join(tmp, "task"))) == [
+            "task.pstats",
+            "x_squared",
+        ]
+
+
+def _combiner_dag() -> DAG:
+    return DAG(
+        outputs=dict(total=FromNodeOutput("sum", "total")),
+        nodes=dict(
+            generate=Task(
+                lambda: [1, 2, 3],
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            sum=Task(
+                lambda numbers: sum(numbers),
+                inputs=dict(numbers=FromNodeOutput("generate", "numbers")),
+                outputs=dict(total=FromReturnValue()),
+                combine_input="numbers",
+                combine_group_size=2,
+            ),
+        ),
+    )
+
+
+def test__invoke__plan_combine():
+    with tempfile.TemporaryDirectory() as tmp:
+        plan_dir = os.path.join(tmp, "plan")
+
+        invoke(
+            _combiner_dag(),
+            argv=[
+                "--node-name",
+                "sum",
+                "--plan-combine",
+                "0",
+                '["0", "1", "2"]',
+                "uid/dag/generate/numbers.json",
+                "uid/dag/sum/combine",
+                plan_dir,
+            ],
+        )
+
+        assert sorted(os.listdir(plan_dir)) == [
+            "final",
+            "groups",
+            "level",
+            "partitions",
+            "prefix",
+        ]
+        with open(os.path.join(plan_dir, "groups")) as f:
+            assert json.load(f) == [
+                {
+                    "output": "uid/dag/sum/combine/0/0",
+                    "p0": "uid/dag/generate/numbers.json/0",
+                    "p1": "uid/dag/generate/numbers.json/1",
+                },
+                {
+                    "output": "uid/dag/sum/combine/0/1",
+                    "p0": "uid/dag/generate/numbers.json/2",
+                    "p1": "uid/dag/sum/combine/missing",
+                },
+            ]
+        with open(os.path.join(plan_dir, "final")) as f:
+            assert f.read() == "false"
+
+
+def test__invoke__plan_combine_of_a_node_that_is_not_a_combiner():
+    with tempfile.TemporaryDirectory() as tmp:
+        with pytest.raises(ValueError) as e:
+            invoke(
+                _combiner_dag(),
+                argv=[
+                    "--node-name",
+                    "generate",
+                    "--plan-combine",
+                    "0",
+                    "[]",
+                    "prefix",
+                    "scratch",
+                    tmp,
+                ],
+            )
+
+        assert (
+            str(e.value)
+            == "Only combiners can plan how to combine their partitions. The node 'generate' is not a task declared with a combine_input."
+        )
+
+
+def test__invoke__combiner_with_a_group_of_partitions():
+    with tempfile.TemporaryDirectory() as tmp:
+        # Groups mount each partition in a zero-padded slot, and do not include a manifest
+        group_dir = os.path.join(tmp, "numbers.json")
+        os.mkdir(group_dir)
+        for slot, value in [("0", b"4"), ("1", b"5")]:
+            with open(os.path.join(group_dir, slot), "wb") as f:
+                f.write(value)
+
+        total_output = os.path.join(tmp, "total.json")
+        invoke(
+            _combiner_dag(),
+            argv=[
+                "--node-name",
+                "sum",
+                "--input",
+                "numbers",
+                group_dir,
+                "--output",
+                "total",
+                total_output,
+            ],
+        )
+
+        with open(total_output, "rb") as f:
+            assert f.read() == b"9"
+
+
+def test__invoke__node_partitioned_by_a_shuffled_key_group():
+    dag = DAG(
+        nodes=dict(
+            orders=Task(
+                lambda: [[("a", 1), ("b", 2)], [("a", 3)]],
+                outputs=dict(orders=FromReturnValue(is_partitioned=True)),
+            ),
+            map=Task(
+                lambda orders: orders,
+                inputs=dict(orders=FromNodeOutput("orders", "orders")),
+                outputs=dict(amounts=FromReturnValue(key_groups=2)),
+                partition_by_input="orders",
+            ),
+            reduce=Task(
+                lambda group: {key: sum(values) for key, values in group},
+                inputs=dict(group=FromNodeOutput("map", "amounts")),
+                outputs=dict(totals=FromReturnValue()),
+                partition_by_input="group",
+            ),
+        ),
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The key group contains a piece from each of the partitions of the node that generated it
+        group_dir = os.path.join(tmp, "group")
+        os.mkdir(group_dir)
+        for partition, piece in [
+            ("0", b'[["a", [1]], ["b", [2]]]'),
+            ("1", b'[["a", [3]]]'),
+        ]:
+            with open(os.path.join(group_dir, partition), "wb") as f:
+                f.write(piece)
+
+        totals_output = os.path.join(tmp, "totals")
+        invoke(
+            dag,
+            argv=[
+                "--node-name",
+                "reduce",
+                "--input",
+                "group",
+                group_dir,
+                "--output",
+                "totals",
+                totals_output,
+            ],
+        )
+
+        with open(totals_output, "rb") as f:
+            assert json.loads(f.read()) == {"a": 4, "b": 2}
+
+
+def _batched_dag() -> DAG:
+    return DAG(
+        nodes=dict(
+            generate=Task(
+                lambda: [1, 2, 3],
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            square=Task(
+                lambda number, exponent: number ** exponent,
+                inputs=dict(
+                    number=FromNodeOutput("generate", "numbers"),
+                    exponent=FromParam(),
+                ),
+                outputs=dict(result=FromReturnValue()),
+                partition_by_input="number",
+                partitions_per_worker=2,
+            ),
+        ),
+        inputs=dict(exponent=FromParam()),
+    )
+
+
+def test__invoke__plan_batches():
+    with tempfile.TemporaryDirectory() as tmp:
+        invoke(
+            _batched_dag(),
+            argv=["--node-name", "square", "--plan-batches", '["0", "1", "2"]', tmp],
+        )
+
+        with open(os.path.join(tmp, "batches")) as f:
+            assert json.load(f) == [
+                {"p0": "0", "p1": "1"},
+                {"p0": "2", "p1": "missing"},
+            ]
+
+
+def test__invoke__plan_batches_of_a_node_that_is_not_partitioned():
+    with tempfile.TemporaryDirectory() as tmp:
+        with pytest.raises(ValueError) as e:
+            invoke(
+                _batched_dag(),
+                argv=["--node-name", "generate", "--plan-batches", "[]", tmp],
+            )
+
+        assert (
+            str(e.value)
+            == "Only partitioned tasks can plan how to batch their partitions. The node 'generate' is not a task declared with a partition_by_input."
+        )
+
+
+def test__invoke__batch_of_partitions():
+    with tempfile.TemporaryDirectory() as tmp:
+        # Batches mount each partition in a slot, and do not include a manifest
+        batch_dir = os.path.join(tmp, "numbers.json")
+        os.mkdir(batch_dir)
+        for slot, value in [("0", b"2"), ("1", b"3")]:
+            with open(os.path.join(batch_dir, slot), "wb") as f:
+                f.write(value)
+
+        exponent_input = os.path.join(tmp, "exponent.json")
+        with open(exponent_input, "wb") as f:
+            f.write(b"3")
+
+        result_output = os.path.join(tmp, "result.json")
+        invoke(
+            _batched_dag(),
+            argv=[
+                "--node-name",
+                "square",
+                "--batch",
+                "--input",
+                "number",
+                batch_dir,
+                "--input",
+                "exponent",
+                exponent_input,
+                "--output",
+                "result",
+                result_output,
+            ],
+        )
+
+        assert sorted(os.listdir(result_output)) == ["0", "1"]
+        with open(os.path.join(result_output, "0"), "rb") as f:
+            assert f.read() == b"8"
+        with open(os.path.join(result_output, "1"), "rb") as f:
+            assert f.read() == b"27"
+
+
+def test__invoke__batch_of_partitions_with_a_report():
+    with tempfile.TemporaryDirectory() as tmp:
+        batch_dir = os.path.join(tmp, "numbers.json")
+        os.mkdir(batch_dir)
+        for slot, value in [("0", b"2"), ("1", b"3")]:
+            with open(os.path.join(batch_dir, slot), "wb") as f:
+                f.write(value)
+
+        exponent_input = os.path.join(tmp, "exponent.json")
+        with open(exponent_input, "wb") as f:
+            f.write(b"3")
+
+        report = os.path.join(tmp, "report.json")
+        invoke(
+            _batched_dag(),
+            argv=[
+                "--node-name",
+                "square",
+                "--batch",
+                "--input",
+                "number",
+                batch_dir,
+                "--input",
+                "exponent",
+                exponent_input,
+                "--output",
+                "result",
+                os.path.join(tmp, "result.json"),
+                "--report",
+                report,
+            ],
+        )
+
+        with open(report, "r") as f:
+            (node,) = json.load(f)["nodes"]
+
+        assert node["address"] == "square"
+        assert node["bytes_in"] == 3
+        assert node["bytes_out"] == 3
+        assert [p["address"] for p in node["partitions"]] == ["square[0]", "square[1]"]
+        assert [p["bytes_out"] for p in node["partitions"]] == [1, 2]
+
+
+def test__invoke__with_memory_mapped_inputs():
+    received = []
+
+    def concatenate(first, rest):
+        received.extend([first, rest])
+        return first + "".join(rest)
+
+    dag = DAG(
+        inputs={"first": FromParam(serializer=AsPickle()), "rest": FromParam()},
+        outputs={"together": FromNodeOutput("concatenate", "together")},
+        nodes={
+            "concatenate": Task(
+                concatenate,
+                inputs={
+                    "first": FromParam(serializer=AsPickle()),
+                    "rest": FromParam(),
+                },
+                outputs={"together": FromReturnValue()},
+            ),
+        },
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        first_input = os.path.join(tmp, "first")
+        store_output_in_location(first_input, AsPickle().serialize("a"))
+
+        rest_input = os.path.join(tmp, "rest")
+        store_output_in_location(
+            rest_input,
+            PartitionedOutput([b'"b"', b'"c"']),
+            packed=True,
+        )
+
+        together_output = os.path.join(tmp, "together")
+        invoke(
+            dag,
+            argv=[
+                "--input",
+                "first",
+                first_input,
+                "--input",
+                "rest",
+                rest_input,
+                "--output",
+                "together",
+                together_output,
+                "--memory-map-inputs",
+            ],
+        )
+
+        with open(together_output, "rb") as f:
+            assert f.read() == b'"abc"'
+
+    assert received == ["a", ["b", "c"]]
+
+
+def test__invoke__batch_of_packed_partitions():
+    with tempfile.TemporaryDirectory() as tmp:
+        batch_dir = os.path.join(tmp, "numbers.json")
+        store_output_in_location(
+            batch_dir,
+            PartitionedOutput([b"2", b"3"]),
+            packed=True,
+        )
+
+        exponent_input = os.path.join(tmp, "exponent.json")
+        with open(exponent_input, "wb") as f:
+            f.write(b"2")
+
+        result_output = os.path.join(tmp, "result.json")
+        invoke(
+            _batched_dag(),
+            argv=[
+                "--node-name",
+                "square",
+                "--batch",
+                "--input",
+                "number",
+                batch_dir,
+                "--input",
+                "exponent",
+                exponent_input,
+                "--output",
+                "result",
+                result_output,
+            ],
+        )
+
+        assert sorted(os.listdir(result_output)) == ["0", "1"]
+        with open(os.path.join(result_output, "1"), "rb") as f:
+            assert f.read() == b"9"
+
+
+def test__invoke__batch_of_a_node_that_is_not_partitioned():
+    with tempfile.TemporaryDirectory() as tmp:
+        with pytest.raises(ValueError) as e:
+            invoke(
+                _batched_dag(),
+                argv=[
+                    "--node-name",
+                    "generate",
+                    "--batch",
+                    "--output",
+                    "numbers",
+                    os.path.join(tmp, "numbers.json"),
+                ],
+            )
+
+        assert (
+            str(e.value)
+            == "Only partitioned tasks may be invoked in batches, with the input they are partitioned by pointing to a directory that contains a file for each partition in the batch."
+        )
+
+
+def _vectorized_dag(batches: list) -> DAG:
+    def powers(numbers, exponent):
+        batches.append(numbers)
+        return [n ** exponent for n in numbers]
+
+    return DAG(
+        nodes=dict(
+            generate=Task(
+                lambda: [1, 2, 3],
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            power=Task(
+                powers,
+                inputs=dict(
+                    numbers=FromNodeOutput("generate", "numbers"),
+                    exponent=FromParam(),
+                ),
+                outputs=dict(result=FromReturnValue()),
+                partition_by_input="numbers",
+                partitions_per_worker=2,
+                vectorized=True,
+            ),
+        ),
+        inputs=dict(exponent=FromParam()),
+    )
+
+
+def test__invoke__vectorized_node_with_a_single_partition():
+    batches: list = []
+    with tempfile.TemporaryDirectory() as tmp:
+        numbers_input = os.path.join(tmp, "numbers.json")
+        with open(numbers_input, "wb") as f:
+            f.write(b"2")
+
+        exponent_input = os.path.join(tmp, "exponent.json")
+        with open(exponent_input, "wb") as f:
+            f.write(b"2")
+
+        result_output = os.path.join(tmp, "result.json")
+        invoke(
+            _vectorized_dag(batches),
+            argv=[
+                "--node-name",
+                "power",
+                "--input",
+                "numbers",
+                numbers_input,
+                "--input",
+                "exponent",
+                exponent_input,
+                "--output",
+                "result",
+                result_output,
+            ],
+        )
+
+        with open(result_output, "rb") as f:
+            assert f.read() == b"4"
+
+    assert batches == [[2]]
+
+
+def test__invoke__vectorized_batch_of_partitions():
+    batches: list = []
+    with tempfile.TemporaryDirectory() as tmp:
+        batch_dir = os.path.join(tmp, "numbers.json")
+        os.mkdir(batch_dir)
+        for slot, value in [("0", b"2"), ("1", b"3")]:
+            with open(os.path.join(batch_dir, slot), "wb") as f:
+                f.write(value)
+
+        exponent_input = os.path.join(tmp, "exponent.json")
+        with open(exponent_input, "wb") as f:
+            f.write(b"2")
+
+        result_output = os.path.join(tmp, "result.json")
+        invoke(
+            _vectorized_dag(batches),
+            argv=[
+                "--node-name",
+                "power",
+                "--batch",
+                "--input",
+                "numbers",
+                batch_dir,
+                "--input",
+                "exponent",
+                exponent_input,
+                "--output",
+                "result",
+                result_output,
+            ],
+        )
+
+        assert sorted(os.listdir(result_output)) == ["0", "1"]
+        with open(os.path.join(result_output, "0"), "rb") as f:
+            assert f.read() == b"4"
+        with open(os.path.join(result_output, "1"), "rb") as f:
+            assert f.read() == b"9"
+
+    assert batches == [[2, 3]]
+
+
+class _RecordStreams(AsJSON):
+    def __init__(self, calls: list):
+        super().__init__()
+        self.calls = calls
+
+    def serialize(self, value):
+        self.calls.append("serialize")
+        return super().serialize(value)
+
+    def serialize_to(self, value, stream):
+        self.calls.append("serialize_to")
+        return super().serialize_to(value, stream)
+
+    def deserialize(self, serialized_value):
+        self.calls.append("deserialize")
+        return super().deserialize(serialized_value)
+
+    def deserialize_from(self, stream):
+        self.calls.append("deserialize_from")
+        return super().deserialize_from(stream)
+
+
+def _streaming_dag(calls: list) -> DAG:
+    return DAG(
+        inputs={"x": FromParam(serializer=_RecordStreams(calls))},
+        outputs={"doubled": FromNodeOutput("double", "doubled")},
+        nodes={
+            "double": Task(
+                lambda x: x * 2,
+                inputs={"x": FromParam(serializer=_RecordStreams(calls))},
+                outputs={"doubled": FromReturnValue(serializer=_RecordStreams(calls))},
+            ),
+        },
+    )
+
+
+def test__invoke__streams_inputs_and_outputs_of_tasks():
+    calls: list = []
+    with tempfile.TemporaryDirectory() as tmp:
+        x_input = os.path.join(tmp, "x")
+        with open(x_input, "wb") as f:
+            f.write(b"[1, 2]")
+
+        doubled_output = os.path.join(tmp, "doubled")
+        invoke(
+            _streaming_dag(calls),
+            argv=[
+                "--node-name",
+                "double",
+                "--input",
+                "x",
+                x_input,
+                "--output",
+                "doubled",
+                doubled_output,
+            ],
+        )
+
+        with open(doubled_output, "rb") as f:
+            assert f.read() == b"[1, 2, 1, 2]"
+
+    assert calls == ["deserialize_from", "serialize_to"]
+
+
+def test__invoke__streams_outputs_within_a_serialization_span():
+    calls: list = []
+    with tempfile.TemporaryDirectory() as tmp:
+        x_input = os.path.join(tmp, "x")
+        with open(x_input, "wb") as f:
+            f.write(b"[1]")
+
+        trace = os.path.join(tmp, "trace.json")
+        invoke(
+            _streaming_dag(calls),
+            argv=[
+                "--node-name",
+                "double",
+                "--input",
+                "x",
+                x_input,
+                "--output",
+                "doubled",
+                os.path.join(tmp, "doubled"),
+                "--trace",
+                trace,
+            ],
+        )
+
+        with open(trace, "r") as f:
+            events = json.load(f)["traceEvents"]
+
+    (serialize,) = [e for e in events if e.get("cat") == "serialize"]
+    assert serialize["name"] == "serialize doubled"
+    assert serialize["args"]["bytes"] == len(b"[1, 1]")
+    assert "serialize_to" in calls
+
+
+def test__invoke__when_a_streamed_output_cannot_be_serialized():
+    dag = DAG(
+        nodes={
+            "split": Task(
+                lambda: {"valid": [1], "invalid": {1}},
+                outputs={
+                    "valid": FromKey("valid", serializer=AsJSON()),
+                    "invalid": FromKey("invalid", serializer=AsJSON()),
+                },
+            ),
+        },
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        valid_output = os.path.join(tmp, "valid")
+        invalid_output = os.path.join(tmp, "invalid")
+
+        with pytest.raises(SerializationError) as e:
+            invoke(
+                dag,
+                argv=[
+                    "--node-name",
+                    "split",
+                    "--output",
+                    "valid",
+                    valid_output,
+                    "--output",
+                    "invalid",
+                    invalid_output,
+                ],
+            )
+
+        # Outputs are removed when others fail, so the node does not appear to have completed
+        assert os.listdir(tmp) == []
+
+    assert str(e.value).startswith(
+        "We encountered the following error while attempting to serialize the results of this task:"
+    )
+
+
+def test__invoke__when_a_partitioned_output_location_already_exists():
+    task = Task(
+        lambda: [1, 2],
+        outputs={"x": FromReturnValue(is_partitioned=True)},
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "keep.txt"), "w") as f:
+            f.write("keep")
+
+        with pytest.raises(FileExistsError):
+            invoke(task, argv=["--output", "x", tmp])
+
+        # Locations that existed before the invocation are not removed when it fails
+        assert os.listdir(tmp) == ["keep.txt"]
+
+
+def test__invoke__with_a_cache_directory_serializes_the_outputs_of_tasks():
+    calls: list = []
+    with tempfile.TemporaryDirectory() as tmp:
+        x_input = os.path.join(tmp, "x")
+        with open(x_input, "wb") as f:
+            f.write(b"[1]")
+
+        doubled_output = os.path.join(tmp, "doubled")
+        invoke(
+            _streaming_dag(calls),
+            argv=[
+                "--node-name",
+                "double",
+                "--input",
+                "x",
+                x_input,
+                "--output",
+                "doubled",
+                doubled_output,
+                "--cache-dir",
+                os.path.join(tmp, "cache"),
+            ],
+        )
+
+        with open(doubled_output, "rb") as f:
+            assert f.read() == b"[1, 1]"
+
+    # The cache needs the serialized outputs, so they are not streamed
+    assert "serialize_to" not in calls
+    assert calls[0] == "deserialize_from"
@@ -0,0 +1,53 @@
+import json
+
+from dagger.runtime.cli.combine import plan_combine_level
+
+
+def test__plan_combine_level():
+    plan = plan_combine_level(
+        partitions=["0", "1", "2", "3", "4"],
+        prefix="in",
+        scratch_prefix="scratch",
+        level=0,
+        group_size=2,
+    )
+
+    assert json.loads(plan["groups"]) == [
+        {"output": "scratch/0/0", "p0": "in/0", "p1": "in/1"},
+        {"output": "scratch/0/1", "p0": "in/2", "p1": "in/3"},
+        {"output": "scratch/0/2", "p0": "in/4", "p1": "scratch/missing"},
+    ]
+    assert json.loads(plan["partitions"]) == ["0", "1", "2"]
+    assert plan["prefix"] == "scratch/0"
+    assert plan["level"] == "1"
+    assert plan["final"] == "false"
+
+
+def test__plan_combine_level__with_a_single_group():
+    plan = plan_combine_level(
+        partitions=["0", "1"],
+        prefix="scratch/2",
+        scratch_prefix="scratch",
+        level=3,
+        group_size=2,
+    )
+
+    assert json.loads(plan["groups"]) == [
+        {"output": "scratch/3/0", "p0": "scratch/2/0", "p1": "scratch/2/1"},
+    ]
+    assert plan["final"] == "true"
+
+
+def test__plan_combine_level__without_partitions():
+    plan = plan_combine_level(
+        partitions=[],
+        prefix="in",
+        scratch_prefix="scratch",
+        level=0,
+        group_size=2,
+    )
+
+    assert json.loads(plan["groups"]) == [
+        {"output": "scratch/0/0", "p0": "scratch/missing", "p1": "scratch/missing"},
+    ]
+    assert plan["final"] == "true"
@@ -4,12 +4,54 @@ import tempfile
 
 import pytest
 
+from dagger.hooks import Hooks, registered
 from dagger.runtime.cli.locations import (
+    PACKED_PARTITIONS_DATA_FILENAME,
+    PACKED_PARTITIONS_INDEX_FILENAME,
     PARTITION_MANIFEST_FILENAME,
+    deserialize_input_from_location,
+    list_partitions_in_location,
     retrieve_input_from_location,
     store_output_in_location,
 )
 from dagger.runtime.local import PartitionedOutput
+from dagger.serializer import AsJSON, AsPickle, SerializationError
+
+
+class _RecordStreams(AsJSON):
+    """A streaming serializer that records whether each value was streamed."""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def serialize(self, value):
+        self.calls.append("serialize")
+        return super().serialize(value)
+
+    def serialize_to(self, value, stream):
+        self.calls.append("serialize_to")
+        return super().serialize_to(value, stream)
+
+    def deserialize(self, serialized_value):
+        self.calls.append("deserialize")
+        return super().deserialize(serialized_value)
+
+    def deserialize_from(self, stream):
+        self.calls.append("deserialize_from")
+        return super().deserialize_from(stream)
+
+
+class _BytesOnly:
+    """A serializer that does not support streams."""
+
+    extension = "txt"
+
+    def serialize(self, value):
+        return str(value).encode()
+
+    def deserialize(self, serialized_value):
+        return int(serialized_value)
 
 
 def test__retrieve_input_from_location__when_location_doesnt_exist():
@@ -53,7 +95,10 @@ def test__retrieve_input_from_location__reads_partitions_lazily():
                 # Create the file but do not write anything yet
                 f.write(b"")
 
-        lazily_loaded_partitions = retrieve_input_from_location(dir_path)
+        partitioned_input = retrieve_input_from_location(dir_path)
+        assert len(partitioned_input) == 3
+
+        lazily_loaded_partitions = iter(partitioned_input)
 
         with open(os.path.join(dir_path, "a"), "wb") as f:
             f.write(b"1")
@@ -69,6 +114,12 @@ def test__retrieve_input_from_location__reads_partitions_lazily():
         with pytest.raises(StopIteration):
             next(lazily_loaded_partitions)
 
+        # Partitions are read again every time they are accessed
+        with open(os.path.join(dir_path, "c"), "wb") as f:
+            f.write(b"3")
+        assert partitioned_input[2] == b"3"
+        assert list(partitioned_input) == [b"1", b"2", b"3"]
+
 
 def test__retrieve_input_from_location__can_read_partitioned_directory_without_a_partitions_manifest():
     with tempfile.TemporaryDirectory() as tmp:
@@ -83,6 +134,211 @@ def test__retrieve_input_from_location__can_read_partitioned_directory_without_a
         assert list(retrieve_input_from_location(dir_path)) == partitions
 
 
+def test__retrieve_input_from_location__sorts_numeric_filenames_by_their_value():
+    with tempfile.TemporaryDirectory() as tmp:
+        dir_path = os.path.join(tmp, "partitioned_dir")
+
+        partitions = [str(i).encode() for i in range(12)]
+        store_output_in_location(
+            output_location=dir_path,
+            output_value=PartitionedOutput(partitions),
+        )
+
+        assert list(retrieve_input_from_location(dir_path)) == partitions
+
+
+def test__list_partitions_in_location():
+    with tempfile.TemporaryDirectory() as tmp:
+        for filename in ["b", "10", "2", "a", "02", PARTITION_MANIFEST_FILENAME]:
+            with open(os.path.join(tmp, filename), "wb") as f:
+                f.write(b"")
+        os.mkdir(os.path.join(tmp, "1"))
+
+        assert list_partitions_in_location(tmp) == ["02", "2", "10", "a", "b"]
+
+
+def test__store_output_in_location__with_packed_partitions():
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, "output")
+        store_output_in_location(
+            output_location=output_path,
+            output_value=PartitionedOutput([b"1", b"", b"234"]),
+            packed=True,
+        )
+
+        assert sorted(os.listdir(output_path)) == [
+            PACKED_PARTITIONS_DATA_FILENAME,
+            PACKED_PARTITIONS_INDEX_FILENAME,
+            PARTITION_MANIFEST_FILENAME,
+        ]
+        with open(os.path.join(output_path, PARTITION_MANIFEST_FILENAME), "r") as f:
+            assert json.load(f) == ["0", "1", "2"]
+        with open(
+            os.path.join(output_path, PACKED_PARTITIONS_DATA_FILENAME), "rb"
+        ) as f:
+            assert f.read() == b"1234"
+
+        partitioned_input = retrieve_input_from_location(output_path)
+        assert len(partitioned_input) == 3
+        assert partitioned_input[2] == b"234"
+        assert list(partitioned_input[1:]) == [b"", b"234"]
+        assert list(partitioned_input) == [b"1", b"", b"234"]
+        assert list_partitions_in_location(output_path) == ["0", "1", "2"]
+
+
+def test__store_output_in_location__with_packed_partitions_without_partitions():
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, "output")
+        store_output_in_location(
+            output_location=output_path,
+            output_value=PartitionedOutput([]),
+            packed=True,
+        )
+
+        assert list(retrieve_input_from_location(output_path)) == []
+
+
+def test__retrieve_input_from_location__with_a_corrupted_index_of_packed_partitions():
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, PACKED_PARTITIONS_DATA_FILENAME), "wb") as f:
+            f.write(b"12")
+        with open(os.path.join(tmp, PACKED_PARTITIONS_INDEX_FILENAME), "wb") as f:
+            f.write(b"123")
+
+        with pytest.raises(ValueError) as e:
+            retrieve_input_from_location(tmp)
+
+        assert (
+            str(e.value)
+            == f"The index of the partitions packed in '{tmp}' is corrupted. Its size should be a multiple of 16 bytes, but it is 3 bytes long."
+        )
+
+
+def test__retrieve_input_from_location__memory_mapped():
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = os.path.join(tmp, "input")
+        with open(input_file, "wb") as f:
+            f.write(b"123")
+
+        value = retrieve_input_from_location(input_file, memory_map=True)
+
+        assert isinstance(value, memoryview)
+        assert value.readonly
+        assert value == b"123"
+
+
+def test__retrieve_input_from_location__memory_mapped_empty_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        input_file = os.path.join(tmp, "input")
+        with open(input_file, "wb") as f:
+            f.write(b"")
+
+        assert retrieve_input_from_location(input_file, memory_map=True) == b""
+
+
+def test__retrieve_input_from_location__memory_mapped_partitions():
+    with tempfile.TemporaryDirectory() as tmp:
+        dir_path = os.path.join(tmp, "partitioned_dir")
+        store_output_in_location(
+            output_location=dir_path,
+            output_value=PartitionedOutput([b"1", b"23"]),
+        )
+
+        partitions = list(retrieve_input_from_location(dir_path, memory_map=True))
+
+        assert all(isinstance(p, memoryview) for p in partitions)
+        assert partitions == [b"1", b"23"]
+
+
+def test__retrieve_input_from_location__memory_mapped_packed_partitions():
+    with tempfile.TemporaryDirectory() as tmp:
+        dir_path = os.path.join(tmp, "partitioned_dir")
+        store_output_in_location(
+            output_location=dir_path,
+            output_value=PartitionedOutput([b"1", b"", b"234"]),
+            packed=True,
+        )
+
+        partitioned_input = retrieve_input_from_location(dir_path, memory_map=True)
+        partitions = list(partitioned_input)
+
+        assert partitions == [b"1", b"", b"234"]
+        # The data file is mapped once, and each partition is a slice of the same mapping
+        assert all(isinstance(p, memoryview) for p in partitions)
+        assert partitions[0].obj is partitions[2].obj
+        assert list(partitioned_input[2:]) == [b"234"]
+
+
+def test__store_output_in_location__with_a_streaming_serializer():
+    serializer = _RecordStreams()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, "output")
+        store_output_in_location(output_path, {"a": 1}, serializer=serializer)
+
+        assert deserialize_input_from_location(output_path, serializer) == {"a": 1}
+        with open(output_path, "rb") as f:
+            assert f.read() == b'{"a": 1}'
+
+    assert serializer.calls == ["serialize_to", "deserialize_from"]
+
+
+def test__store_output_in_location__with_a_serializer_that_does_not_support_streams():
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, "output")
+        store_output_in_location(output_path, 12, serializer=_BytesOnly())
+
+        with open(output_path, "rb") as f:
+            assert f.read() == b"12"
+        assert deserialize_input_from_location(output_path, _BytesOnly()) == 12
+
+
+def test__store_output_in_location__with_a_serializer_and_partitions():
+    with tempfile.TemporaryDirectory() as tmp:
+        for packed in [False, True]:
+            output_path = os.path.join(tmp, f"output-{packed}")
+            store_output_in_location(
+                output_path,
+                PartitionedOutput([1, [2, 3]]),
+                packed=packed,
+                serializer=AsPickle(),
+            )
+
+            assert [
+                AsPickle().deserialize(p)
+                for p in retrieve_input_from_location(output_path)
+            ] == [1, [2, 3]]
+
+
+def test__store_output_in_location__removes_the_file_when_streaming_fails():
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, "output")
+
+        with pytest.raises(SerializationError):
+            store_output_in_location(
+                output_path,
+                ["serializable", float("nan")],
+                serializer=AsJSON(),
+            )
+
+        assert not os.path.exists(output_path)
+
+
+def test__store_output_in_location__removes_the_packed_files_when_streaming_fails():
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, "output")
+
+        with pytest.raises(SerializationError):
+            store_output_in_location(
+                output_path,
+                PartitionedOutput([["serializable"], [float("nan")]]),
+                packed=True,
+                serializer=AsJSON(),
+            )
+
+        assert os.listdir(output_path) == []
+
+
 def test__store_output_in_location__with_simple_output():
     with tempfile.TemporaryDirectory() as tmp:
         output_path = os.path.join(tmp, "output")
@@ -133,3 +389,111 @@ def test__store_output_in_location__when_partition_directory_already_exists():
                 output_location=tmp,
                 output_value=PartitionedOutput([b"2"]),
             )
+
+
+class RecordIO(Hooks):
+    def __init__(self):
+        self.events = []
+
+    def io_read_start(self, location):
+        self.events.append(("io_read_start", os.path.basename(location)))
+
+    def io_read_end(self, location, size, error):
+        self.events.append(("io_read_end", os.path.basename(location), size, error))
+
+    def io_write_start(self, location):
+        self.events.append(("io_write_start", os.path.basename(location)))
+
+    def io_write_end(self, location, size, error):
+        self.events.append(("io_write_end", os.path.basename(location), size, error))
+
+
+def test__locations__call_the_io_hooks_for_each_file():
+    hooks = RecordIO()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with registered(hooks):
+            store_output_in_location(os.path.join(tmp, "single"), b"12")
+            store_output_in_location(
+                os.path.join(tmp, "partitioned"),
+                PartitionedOutput([b"1", b"234"]),
+            )
+            assert retrieve_input_from_location(os.path.join(tmp, "single")) == b"12"
+            assert list(
+                retrieve_input_from_location(os.path.join(tmp, "partitioned"))
+            ) == [b"1", b"234"]
+
+    assert hooks.events == [
+        ("io_write_start", "single"),
+        ("io_write_end", "single", 2, None),
+        ("io_write_start", "0"),
+        ("io_write_end", "0", 1, None),
+        ("io_write_start", "1"),
+        ("io_write_end", "1", 3, None),
+        ("io_read_start", "single"),
+        ("io_read_end", "single", 2, None),
+        ("io_read_start", "0"),
+        ("io_read_end", "0", 1, None),
+        ("io_read_start", "1"),
+        ("io_read_end", "1", 3, None),
+    ]
+
+
+def test__locations__call_the_io_hooks_for_packed_partitions():
+    hooks = RecordIO()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with registered(hooks):
+            store_output_in_location(
+                os.path.join(tmp, "partitioned"),
+                PartitionedOutput([b"1", b"234"]),
+                packed=True,
+            )
+            partitioned_input = retrieve_input_from_location(
+                os.path.join(tmp, "partitioned")
+            )
+            assert partitioned_input[1] == b"234"
+
+    assert hooks.events == [
+        ("io_write_start", PACKED_PARTITIONS_DATA_FILENAME),
+        ("io_write_end", PACKED_PARTITIONS_DATA_FILENAME, 4, None),
+        ("io_write_start", PACKED_PARTITIONS_INDEX_FILENAME),
+        ("io_write_end", PACKED_PARTITIONS_INDEX_FILENAME, 32, None),
+        ("io_read_start", PACKED_PARTITIONS_INDEX_FILENAME),
+        ("io_read_end", PACKED_PARTITIONS_INDEX_FILENAME, 32, None),
+        ("io_read_start", PACKED_PARTITIONS_DATA_FILENAME),
+        ("io_read_end", PACKED_PARTITIONS_DATA_FILENAME, 3, None),
+    ]
+
+
+def test__locations__call_the_io_hooks_when_streaming():
+    hooks = RecordIO()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with registered(hooks):
+            store_output_in_location(
+                os.path.join(tmp, "single"), [1, 2], serializer=AsJSON()
+            )
+            assert deserialize_input_from_location(
+                os.path.join(tmp, "single"), AsJSON()
+            ) == [1, 2]
+
+    assert hooks.events == [
+        ("io_write_start", "single"),
+        ("io_write_end", "single", 6, None),
+        ("io_read_start", "single"),
+        ("io_read_end", "single", 6, None),
+    ]
+
+
+def test__retrieve_input_from_location__notifies_the_io_hooks_of_errors():
+    hooks = RecordIO()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with registered(hooks):
+            with pytest.raises(FileNotFoundError):
+                retrieve_input_from_location(os.path.join(tmp, "missing"))
+
+    assert hooks.events[0] == ("io_read_start", "missing")
+    assert hooks.events[1][:3] == ("io_read_end", "missing", 0)
+    assert isinstance(hooks.events[1][3], FileNotFoundError)
@@ -0,0 +1,209 @@
+import asyncio
+import threading
+
+import pytest
+
+from dagger.dag import DAG
+from dagger.input import FromNodeOutput, FromParam
+from dagger.output import FromKey, FromReturnValue
+from dagger.runtime.local import ainvoke
+from dagger.serializer import AsJSON
+from dagger.task import Task
+
+
+def test__ainvoke__task_with_a_coroutine_function():
+    async def double(number):
+        await asyncio.sleep(0)
+        return number * 2
+
+    task = Task(
+        double,
+        inputs=dict(number=FromParam()),
+        outputs=dict(doubled_number=FromReturnValue()),
+    )
+    assert asyncio.run(ainvoke(task, params=dict(number=2))) == dict(
+        doubled_number=b"4"
+    )
+
+
+def test__ainvoke__task_with_a_regular_function():
+    task = Task(
+        lambda number: number * 2,
+        inputs=dict(number=FromParam()),
+        outputs=dict(doubled_number=FromReturnValue()),
+    )
+    assert asyncio.run(ainvoke(task, params=dict(number=2))) == dict(
+        doubled_number=b"4"
+    )
+
+
+def test__ainvoke__task_with_a_function_that_returns_a_coroutine():
+    async def double(number):
+        return number * 2
+
+    task = Task(
+        lambda number: double(number),
+        inputs=dict(number=FromParam()),
+        outputs=dict(doubled_number=FromReturnValue()),
+    )
+    assert asyncio.run(ainvoke(task, params=dict(number=2))) == dict(
+        doubled_number=b"4"
+    )
+
+
+def test__ainvoke__dag_runs_independent_nodes_concurrently():
+    async def run():
+        left_started = asyncio.Event()
+        right_started = asyncio.Event()
+
+        async def left():
+            left_started.set()
+            await asyncio.wait_for(right_started.wait(), timeout=5)
+            return 1
+
+        async def right():
+            right_started.set()
+            await asyncio.wait_for(left_started.wait(), timeout=5)
+            return 2
+
+        dag = DAG(
+            {
+                "left": Task(left, outputs=dict(x=FromReturnValue())),
+                "right": Task(right, outputs=dict(x=FromReturnValue())),
+                "sum": Task(
+                    lambda a, b: a + b,
+                    inputs=dict(
+                        a=FromNodeOutput("left", "x"),
+                        b=FromNodeOutput("right", "x"),
+                    ),
+                    outputs=dict(x=FromReturnValue()),
+                ),
+            },
+            outputs=dict(x=FromNodeOutput("sum", "x")),
+        )
+        return await ainvoke(dag)
+
+    assert asyncio.run(run()) == dict(x=b"3")
+
+
+def test__ainvoke__dag_with_partitions_and_a_concurrency_limit():
+    running = []
+    max_running = []
+
+    async def square(n):
+        running.append(n)
+        max_running.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(n)
+        return n ** 2
+
+    dag = DAG(
+        {
+            "fan-out": Task(
+                lambda: list(range(10)),
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            "map": Task(
+                square,
+                inputs=dict(n=FromNodeOutput("fan-out", "numbers")),
+                outputs=dict(n=FromReturnValue()),
+                partition_by_input="n",
+            ),
+            "reduce": Task(
+                lambda numbers: sum(numbers),
+                inputs=dict(numbers=FromNodeOutput("map", "n")),
+                outputs=dict(total=FromReturnValue()),
+            ),
+        },
+        outputs=dict(total=FromNodeOutput("reduce", "total")),
+    )
+
+    assert asyncio.run(ainvoke(dag, max_concurrency=3)) == dict(total=b"285")
+    assert max(max_running) == 3
+
+
+def test__ainvoke__dag_with_nested_dags():
+    async def increment(x):
+        return x + 1
+
+    dag = DAG(
+        {
+            "nested": DAG(
+                {
+                    "inner": Task(
+                        increment,
+                        inputs=dict(x=FromParam()),
+                        outputs=dict(y=FromReturnValue()),
+                    )
+                },
+                inputs=dict(x=FromParam()),
+                outputs=dict(y=FromNodeOutput("inner", "y")),
+            ),
+        },
+        inputs=dict(x=FromParam()),
+        outputs=dict(y=FromNodeOutput("nested", "y")),
+    )
+
+    assert asyncio.run(ainvoke(dag, params=dict(x=1), max_concurrency=1)) == dict(
+        y=b"2"
+    )
+
+
+def test__ainvoke__dag_propagates_task_exceptions_extending_the_details():
+    async def square(x):
+        return x ** 2
+
+    dag = DAG(
+        nodes=dict(
+            square=Task(
+                square,
+                inputs=dict(x=FromParam()),
+                outputs=dict(x_squared=FromKey("missing-key")),
+            ),
+        ),
+        inputs=dict(x=FromParam()),
+    )
+
+    with pytest.raises(TypeError) as e:
+        asyncio.run(ainvoke(dag, params=dict(x=3)))
+
+    assert str(e.value).startswith(
+        "Error when invoking node 'square'. We encountered the following error while attempting to serialize the results of this task"
+    )
+
+
+def test__ainvoke__dag_serializes_and_deserializes_off_the_event_loop():
+    threads = []
+
+    class RecordThreads(AsJSON):
+        def serialize(self, value):
+            threads.append(threading.current_thread())
+            return super().serialize(value)
+
+        def deserialize(self, serialized_value):
+            threads.append(threading.current_thread())
+            return super().deserialize(serialized_value)
+
+    async def double(x):
+        return x * 2
+
+    dag = DAG(
+        nodes=dict(
+            first=Task(
+                double,
+                inputs=dict(x=FromParam()),
+                outputs=dict(y=FromReturnValue(serializer=RecordThreads())),
+            ),
+            second=Task(
+                double,
+                inputs=dict(x=FromNodeOutput("first", "y", serializer=RecordThreads())),
+                outputs=dict(y=FromReturnValue(serializer=RecordThreads())),
+            ),
+        ),
+        inputs=dict(x=FromParam()),
+        outputs=dict(y=FromNodeOutput("second", "y")),
+    )
+
+    assert asyncio.run(ainvoke(dag, params=dict(x=1))) == dict(y=b"4")
+    assert len(threads) == 3
+    assert threading.main_thread() not in threads
@@ -0,0 +1,105 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from dagger.dag import DAG
+from dagger.input import FromNodeOutput
+from dagger.output import FromReturnValue
+from dagger.runtime.local import RunReport, invoke
+from dagger.task import Task
+
+
+class _CountingExecutor(ThreadPoolExecutor):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.submissions = 0
+
+    def submit(self, *args, **kwargs):
+        self.submissions += 1
+        return super().submit(*args, **kwargs)
+
+
+def _process_id_and_square(n):
+    return [os.getpid(), n ** 2]
+
+
+def _dag(map_func, n_partitions: int = 10, partitions_per_worker: int = 4) -> DAG:
+    return DAG(
+        outputs=dict(results=FromNodeOutput("reduce", "results")),
+        nodes=dict(
+            generate=Task(
+                lambda: list(range(n_partitions)),
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            map=Task(
+                map_func,
+                inputs=dict(n=FromNodeOutput("generate", "numbers")),
+                outputs=dict(result=FromReturnValue()),
+                partition_by_input="n",
+                partitions_per_worker=partitions_per_worker,
+            ),
+            reduce=Task(
+                lambda results: list(results),
+                inputs=dict(results=FromNodeOutput("map", "result")),
+                outputs=dict(results=FromReturnValue()),
+            ),
+        ),
+    )
+
+
+def test__invoke__submits_a_batch_of_partitions_per_worker():
+    with _CountingExecutor(2) as partition_executor:
+        outputs = invoke(
+            _dag(lambda n: n ** 2),
+            partition_executor=partition_executor,
+        )
+
+    assert outputs == dict(results=b"[0, 1, 4, 9, 16, 25, 36, 49, 64, 81]")
+    assert partition_executor.submissions == 3
+
+
+def test__invoke__without_an_executor():
+    assert invoke(_dag(lambda n: n ** 2)) == dict(
+        results=b"[0, 1, 4, 9, 16, 25, 36, 49, 64, 81]"
+    )
+
+
+def test__invoke__with_an_executor_process_pool_runs_each_batch_in_one_process():
+    with ProcessPoolExecutor(2) as partition_executor:
+        outputs = invoke(
+            _dag(_process_id_and_square, n_partitions=6, partitions_per_worker=3),
+            partition_executor=partition_executor,
+        )
+
+    results = json.loads(outputs["results"])
+    assert len({pid for pid, _ in results[:3]}) == 1
+    assert len({pid for pid, _ in results[3:]}) == 1
+    assert [n for _, n in results] == [0, 1, 4, 9, 16, 25]
+
+
+def test__invoke__with_a_report_measures_each_partition():
+    report = RunReport()
+    with ThreadPoolExecutor(2) as executor:
+        invoke(_dag(lambda n: n ** 2), executor=executor, report=report)
+
+    (_, map_report, _) = report.nodes
+    assert [p.address for p in map_report.partitions] == [
+        f"map[{i}]" for i in range(10)
+    ]
+    assert all(p.bytes_out > 0 for p in map_report.partitions)
+    assert map_report.bytes_out == sum(p.bytes_out for p in map_report.partitions)
+
+
+def test__invoke__when_a_partition_of_a_batch_fails():
+    def square(n):
+        if n == 5:
+            raise ValueError("5 is not welcome")
+        return n ** 2
+
+    with ThreadPoolExecutor(2) as executor:
+        with pytest.raises(ValueError) as e:
+            invoke(_dag(square), executor=executor)
+
+    assert str(e.value) == "Error when invoking node 'map'. 5 is not welcome"
@@ -0,0 +1,302 @@
+import functools
+import os
+import tempfile
+import time
+from typing import Any, List
+
+import pytest
+
+from dagger.dag import DAG
+from dagger.input import FromNodeOutput, FromParam
+from dagger.output import FromKey, FromReturnValue
+from dagger.runtime.local import LazyPartitions, NodeCache, PartitionedOutput, invoke
+from dagger.serializer import AsJSON, AsPickle
+from dagger.task import Task
+
+_invocations: List[int] = []
+
+
+def _double(x):
+    _invocations.append(x)
+    return x * 2
+
+
+def _double_differently(x):
+    _invocations.append(x)
+    return x + x
+
+
+def _multiply(x, factor):
+    return x * factor
+
+
+def _task(func=_double, **kwargs) -> Task:
+    return Task(
+        func,
+        inputs=dict(x=FromParam()),
+        outputs=dict(doubled=FromReturnValue()),
+        **kwargs,
+    )
+
+
+def test__init__with_invalid_limits():
+    with pytest.raises(ValueError) as e:
+        NodeCache("dir", max_size_bytes=-1)
+
+    assert (
+        str(e.value)
+        == "The maximum size of the cache must be a non-negative number of bytes. Instead, we found -1."
+    )
+
+    with pytest.raises(ValueError) as e:
+        NodeCache("dir", max_age_seconds=-1)
+
+    assert (
+        str(e.value)
+        == "The maximum age of the entries in the cache must be a non-negative number of seconds. Instead, we found -1."
+    )
+
+
+def test__invoke__reuses_the_outputs_of_a_task_invoked_with_the_same_inputs():
+    _invocations.clear()
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = NodeCache(tmp)
+
+        assert invoke(_task(), params=dict(x=2), cache=cache) == dict(doubled=b"4")
+        assert invoke(_task(), params=dict(x=2), cache=cache) == dict(doubled=b"4")
+        assert invoke(_task(), params=dict(x=3), cache=cache) == dict(doubled=b"6")
+
+    assert _invocations == [2, 3]
+
+
+def test__invoke__with_a_persistent_cache_across_instances():
+    _invocations.clear()
+    with tempfile.TemporaryDirectory() as tmp:
+        invoke(_task(), params=dict(x=2), cache=NodeCache(tmp))
+        invoke(_task(), params=dict(x=2), cache=NodeCache(tmp))
+
+    assert _invocations == [2]
+
+
+def test__invoke__with_partitioned_outputs():
+    task = Task(
+        lambda: [1, 2],
+        outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = NodeCache(tmp)
+        outputs = invoke(task, cache=cache)
+        assert isinstance(outputs["numbers"], PartitionedOutput)
+        assert list(outputs["numbers"]) == [b"1", b"2"]
+
+        cached_outputs = invoke(task, cache=cache)
+        assert isinstance(cached_outputs["numbers"], PartitionedOutput)
+        assert list(cached_outputs["numbers"]) == [b"1", b"2"]
+
+
+def test__key__changes_with_the_code_of_the_function():
+    cache = NodeCache("dir")
+    assert cache.key(_task(), dict(x=1)) == cache.key(_task(), dict(x=1))
+    assert cache.key(_task(), dict(x=1)) != cache.key(
+        _task(_double_differently), dict(x=1)
+    )
+
+
+def test__key__changes_with_the_names_of_the_arguments_of_the_function():
+    def subtract(a, b):
+        return a - b
+
+    def subtract_swapped(b, a):
+        return b - a
+
+    def task(func):
+        return Task(
+            func,
+            inputs=dict(a=FromParam(), b=FromParam()),
+            outputs=dict(difference=FromReturnValue()),
+        )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = NodeCache(tmp)
+        assert invoke(task(subtract), params=dict(a=1, b=2), cache=cache) == dict(
+            difference=b"-1"
+        )
+        assert invoke(
+            task(subtract_swapped), params=dict(a=1, b=2), cache=cache
+        ) == dict(difference=b"1")
+
+
+def test__key__changes_with_the_literal_values_bound_to_the_function():
+    cache = NodeCache("dir")
+
+    def task_multiplying_by(factor):
+        return Task(
+            functools.partial(_multiply, factor=factor),
+            inputs=dict(x=FromParam()),
+            outputs=dict(doubled=FromReturnValue()),
+        )
+
+    def task_closing_over(factor):
+        return _task(lambda x: x * factor)
+
+    assert cache.key(task_multiplying_by(2), dict(x=1)) == cache.key(
+        task_multiplying_by(2), dict(x=1)
+    )
+    assert cache.key(task_multiplying_by(2), dict(x=1)) != cache.key(
+        task_multiplying_by(3), dict(x=1)
+    )
+    assert cache.key(task_closing_over(2), dict(x=1)) != cache.key(
+        task_closing_over(3), dict(x=1)
+    )
+
+
+def test__key__changes_with_the_outputs_of_the_task():
+    cache = NodeCache("dir")
+    other_task = Task(
+        _double,
+        inputs=dict(x=FromParam()),
+        outputs=dict(doubled=FromReturnValue(serializer=AsPickle())),
+    )
+    assert cache.key(_task(), dict(x=1)) != cache.key(other_task, dict(x=1))
+
+
+def test__key__with_recursive_functions():
+    def factorial(x):
+        return 1 if x <= 1 else x * factorial(x - 1)
+
+    cache = NodeCache("dir")
+    assert cache.key(_task(factorial), dict(x=3)) is not None
+
+
+def test__key__when_the_inputs_cannot_be_serialized():
+    cache = NodeCache("dir")
+    assert cache.key(_task(), dict(x=object())) is None
+
+
+def test__key__with_lazy_partitions_hashes_their_serialized_partitions():
+    cache = NodeCache("cache")
+    lazy = LazyPartitions([b"1", b"2"], AsJSON().deserialize)
+
+    assert cache.key(_task(), dict(x=lazy)) is not None
+    assert cache.key(_task(), dict(x=lazy)) == cache.key(
+        _task(), dict(x=LazyPartitions([b"1", b"2"], AsJSON().deserialize))
+    )
+    assert cache.key(_task(), dict(x=lazy)) != cache.key(
+        _task(), dict(x=LazyPartitions([b"1", b"3"], AsJSON().deserialize))
+    )
+
+
+def test__get__when_the_entry_has_expired():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = NodeCache(tmp, max_age_seconds=60)
+        cache.put("key", dict(x=b"1"))
+        assert cache.get("key") == dict(x=b"1")
+
+        stored_long_ago = time.time() - 120
+        os.utime(os.path.join(tmp, "key.outputs"), (stored_long_ago, stored_long_ago))
+
+        assert cache.get("key") is None
+        assert os.listdir(tmp) == []
+
+
+def test__put__evicts_the_least_recently_used_entries_when_the_cache_is_full():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = NodeCache(tmp)
+        cache.put("a", dict(x=b"1" * 100))
+        entry_size = os.path.getsize(os.path.join(tmp, "a.outputs"))
+
+        cache = NodeCache(tmp, max_size_bytes=2 * entry_size)
+        now = time.time()
+        cache.put("b", dict(x=b"2" * 100))
+        os.utime(os.path.join(tmp, "a.outputs"), (now - 10, now - 10))
+        os.utime(os.path.join(tmp, "b.outputs"), (now - 20, now - 20))
+        assert cache.get("b") is not None
+
+        cache.put("c", dict(x=b"3" * 100))
+
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+        assert cache.get("c") is not None
+
+
+def test__put__only_lists_the_directory_once(monkeypatch):
+    listed = []
+    listdir = os.listdir
+
+    def record_listdir(path):
+        listed.append(path)
+        return listdir(path)
+
+    monkeypatch.setattr(os, "listdir", record_listdir)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = NodeCache(tmp, max_size_bytes=1024)
+        for i in range(20):
+            cache.put(str(i), dict(x=b"1" * 100))
+
+        assert listdir(tmp) and len(listdir(tmp)) < 20
+
+    assert listed == [tmp]
+
+
+def test__put__evicts_expired_entries():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = NodeCache(tmp, max_age_seconds=0.5)
+        cache.put("a", dict(x=b"1"))
+        time.sleep(0.6)
+        cache.put("b", dict(x=b"2"))
+
+        assert sorted(os.listdir(tmp)) == ["b.outputs"]
+
+
+def test__clear():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = NodeCache(tmp)
+        cache.put("a", dict(x=b"1"))
+        cache.clear()
+        assert cache.get("a") is None
+
+
+def test__invoke__with_a_cache_and_outputs_from_a_key():
+    task = Task(
+        lambda: {"a": 1, "b": 2},
+        outputs=dict(a=FromKey("a"), b=FromKey("b")),
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = NodeCache(tmp)
+        assert invoke(task, cache=cache) == invoke(task, cache=cache)
+
+
+_serialized_values: List[Any] = []
+
+
+class _RecordSerializations(AsJSON):
+    def serialize(self, value):
+        _serialized_values.append(value)
+        return super().serialize(value)
+
+
+def test__invoke__hashes_the_serialized_inputs_of_a_dag():
+    _serialized_values.clear()
+    serializer = _RecordSerializations()
+    dag = DAG(
+        nodes=dict(
+            generate=Task(
+                lambda: [1, 2],
+                outputs=dict(numbers=FromReturnValue(serializer=serializer)),
+            ),
+            total=Task(
+                lambda numbers: sum(numbers),
+                inputs=dict(numbers=FromNodeOutput("generate", "numbers", serializer)),
+                outputs=dict(total=FromReturnValue()),
+            ),
+        ),
+        outputs=dict(total=FromNodeOutput("total", "total")),
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        assert invoke(dag, cache=NodeCache(tmp)) == dict(total=b"3")
+        assert invoke(dag, cache=NodeCache(tmp)) == dict(total=b"3")
+
+    # The input of "total" is never serialized again to compute its key
+    assert _serialized_values == [[1, 2]]
@@ -0,0 +1,173 @@
+import os
+import tempfile
+from typing import List, Set
+
+import pytest
+
+from dagger.dag import DAG
+from dagger.input import FromNodeOutput, FromParam
+from dagger.output import FromReturnValue
+from dagger.runtime.local import invoke
+from dagger.task import Task
+
+_invocations: List[str] = []
+_failing_nodes: Set[str] = set()
+
+
+def _generate(n):
+    _invocations.append("generate")
+    return list(range(n))
+
+
+def _square(number):
+    _invocations.append(f"square-{number}")
+    if "square" in _failing_nodes and number == 2:
+        raise ValueError("transient failure")
+    return number ** 2
+
+
+def _total(numbers):
+    _invocations.append("total")
+    if "total" in _failing_nodes:
+        raise ValueError("transient failure")
+    return sum(numbers)
+
+
+def _dag() -> DAG:
+    return DAG(
+        inputs=dict(n=FromParam()),
+        outputs=dict(total=FromNodeOutput("aggregate", "total")),
+        nodes=dict(
+            generate=Task(
+                _generate,
+                inputs=dict(n=FromParam()),
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            square=Task(
+                _square,
+                inputs=dict(number=FromNodeOutput("generate", "numbers")),
+                outputs=dict(squared=FromReturnValue()),
+                partition_by_input="number",
+            ),
+            aggregate=DAG(
+                inputs=dict(numbers=FromNodeOutput("square", "squared")),
+                outputs=dict(total=FromNodeOutput("total", "total")),
+                nodes=dict(
+                    double=Task(
+                        lambda numbers: [2 * n for n in numbers],
+                        inputs=dict(numbers=FromParam()),
+                        outputs=dict(numbers=FromReturnValue()),
+                    ),
+                    total=Task(
+                        _total,
+                        inputs=dict(numbers=FromNodeOutput("double", "numbers")),
+                        outputs=dict(total=FromReturnValue()),
+                    ),
+                ),
+            ),
+        ),
+    )
+
+
+def test__invoke__resume_without_a_checkpoint_dir():
+    with pytest.raises(ValueError) as e:
+        invoke(_dag(), params=dict(n=3), resume=True)
+
+    assert (
+        str(e.value)
+        == "Resuming an invocation requires the directory where the checkpoints of the previous invocation were stored. Please supply a checkpoint_dir."
+    )
+
+
+def test__invoke__with_a_checkpoint_dir_without_serializing_intermediate_outputs():
+    with tempfile.TemporaryDirectory() as tmp:
+        with pytest.raises(ValueError) as e:
+            invoke(
+                _dag(),
+                params=dict(n=3),
+                checkpoint_dir=tmp,
+                serialize_intermediate_outputs=False,
+            )
+
+    assert (
+        str(e.value)
+        == "Checkpoints store the serialized outputs of each node, but the outputs of the nodes are not serialized when serialize_intermediate_outputs is False. Please remove the checkpoint_dir, or serialize the intermediate outputs."
+    )
+
+
+def test__invoke__stores_a_checkpoint_for_each_node():
+    with tempfile.TemporaryDirectory() as tmp:
+        invoke(_dag(), params=dict(n=2), checkpoint_dir=tmp)
+        assert sorted(os.listdir(tmp)) == [
+            "aggregate.checkpoint",
+            "aggregate.double.checkpoint",
+            "aggregate.total.checkpoint",
+            "generate.checkpoint",
+            "square.checkpoint",
+        ]
+
+
+def test__invoke__resumes_from_a_failed_nested_node():
+    with tempfile.TemporaryDirectory() as tmp:
+        _invocations.clear()
+        _failing_nodes.clear()
+        _failing_nodes.add("total")
+        with pytest.raises(ValueError):
+            invoke(_dag(), params=dict(n=3), checkpoint_dir=tmp)
+
+        _invocations.clear()
+        _failing_nodes.clear()
+        outputs = invoke(_dag(), params=dict(n=3), checkpoint_dir=tmp, resume=True)
+
+        assert outputs == dict(total=b"10")
+        assert _invocations == ["total"]
+
+
+def test__invoke__resumes_a_partially_failed_partitioned_node():
+    with tempfile.TemporaryDirectory() as tmp:
+        _invocations.clear()
+        _failing_nodes.clear()
+        _failing_nodes.add("square")
+        with pytest.raises(ValueError):
+            invoke(_dag(), params=dict(n=3), checkpoint_dir=tmp)
+
+        _invocations.clear()
+        _failing_nodes.clear()
+        outputs = invoke(_dag(), params=dict(n=3), checkpoint_dir=tmp, resume=True)
+
+        # Partitions are checkpointed together with the rest of their node
+        assert outputs == dict(total=b"10")
+        assert sorted(_invocations) == ["square-0", "square-1", "square-2", "total"]
+
+
+def test__invoke__without_resuming_removes_previous_checkpoints():
+    with tempfile.TemporaryDirectory() as tmp:
+        invoke(_dag(), params=dict(n=3), checkpoint_dir=tmp)
+        with open(os.path.join(tmp, "unrelated-file"), "w") as f:
+            f.write("")
+
+        _invocations.clear()
+        _failing_nodes.clear()
+        invoke(_dag(), params=dict(n=3), checkpoint_dir=tmp)
+
+        assert "generate" in _invocations
+        assert "unrelated-file" in os.listdir(tmp)
+
+
+def test__invoke__with_checkpoints_and_partitioned_outputs_as_dag_outputs():
+    dag = DAG(
+        outputs=dict(numbers=FromNodeOutput("generate", "numbers")),
+        nodes=dict(
+            generate=Task(
+                lambda: [1, 2],
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+        ),
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        assert list(invoke(dag, checkpoint_dir=tmp)["numbers"]) == [b"1", b"2"]
+        assert list(invoke(dag, checkpoint_dir=tmp, resume=True)["numbers"]) == [
+            b"1",
+            b"2",
+        ]
@@ -0,0 +1,166 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from dagger.dag import DAG
+from dagger.input import FromNodeOutput, FromParam
+from dagger.output import FromReturnValue
+from dagger.runtime.local import RunReport, invoke
+from dagger.task import Task
+
+
+def _range(n):
+    return list(range(n))
+
+
+def _sum(numbers):
+    return sum(numbers)
+
+
+def _concatenate(strings):
+    return "".join(strings)
+
+
+def _dag(combine, n_partitions: int = 10, group_size: int = 3) -> DAG:
+    return DAG(
+        outputs=dict(combined=FromNodeOutput("combine", "combined")),
+        nodes=dict(
+            generate=Task(
+                lambda: [str(i) for i in range(n_partitions)],
+                outputs=dict(strings=FromReturnValue(is_partitioned=True)),
+            ),
+            combine=Task(
+                combine,
+                inputs=dict(strings=FromNodeOutput("generate", "strings")),
+                outputs=dict(combined=FromReturnValue()),
+                combine_input="strings",
+                combine_group_size=group_size,
+            ),
+        ),
+    )
+
+
+def test__invoke__combines_partitions_in_a_tree():
+    groups = []
+
+    def concatenate(strings):
+        strings = list(strings)
+        groups.append(strings)
+        return "".join(strings)
+
+    assert invoke(_dag(concatenate)) == dict(combined=b'"0123456789"')
+    assert groups == [
+        ["0", "1", "2"],
+        ["3", "4", "5"],
+        ["6", "7", "8"],
+        ["9"],
+        ["012", "345", "678"],
+        ["9"],
+        ["012345678", "9"],
+    ]
+
+
+def test__invoke__with_fewer_partitions_than_the_group_size():
+    groups = []
+
+    def concatenate(strings):
+        strings = list(strings)
+        groups.append(strings)
+        return "".join(strings)
+
+    assert invoke(_dag(concatenate, n_partitions=3)) == dict(combined=b'"012"')
+    assert groups == [["0", "1", "2"]]
+
+
+def test__invoke__without_partitions():
+    assert invoke(_dag(_concatenate, n_partitions=0)) == dict(combined=b'""')
+
+
+def test__invoke__with_an_input_that_is_not_partitioned():
+    dag = DAG(
+        outputs=dict(combined=FromNodeOutput("combine", "combined")),
+        nodes=dict(
+            generate=Task(
+                lambda: ["a", "b"],
+                outputs=dict(strings=FromReturnValue()),
+            ),
+            combine=Task(
+                _concatenate,
+                inputs=dict(strings=FromNodeOutput("generate", "strings")),
+                outputs=dict(combined=FromReturnValue()),
+                combine_input="strings",
+            ),
+        ),
+    )
+
+    assert invoke(dag) == dict(combined=b'"ab"')
+
+
+def test__invoke__with_a_partition_executor_combines_groups_in_parallel():
+    threads = set()
+
+    def concatenate(strings):
+        threads.add(threading.get_ident())
+        return "".join(strings)
+
+    with ThreadPoolExecutor(2) as partition_executor:
+        outputs = invoke(_dag(concatenate), partition_executor=partition_executor)
+
+    assert outputs == dict(combined=b'"0123456789"')
+    assert threading.get_ident() not in threads
+
+
+def test__invoke__with_an_executor_process_pool():
+    dag = DAG(
+        inputs=dict(n=FromParam()),
+        outputs=dict(total=FromNodeOutput("sum", "total")),
+        nodes=dict(
+            generate=Task(
+                _range,
+                inputs=dict(n=FromParam()),
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            sum=Task(
+                _sum,
+                inputs=dict(numbers=FromNodeOutput("generate", "numbers")),
+                outputs=dict(total=FromReturnValue()),
+                combine_input="numbers",
+                combine_group_size=4,
+            ),
+        ),
+    )
+
+    with ProcessPoolExecutor(2) as executor:
+        assert invoke(dag, params=dict(n=100), executor=executor) == dict(total=b"4950")
+
+
+def test__invoke__with_a_report():
+    report = RunReport()
+    invoke(_dag(_concatenate), report=report)
+
+    (_, combine) = report.nodes
+    assert combine.address == "combine"
+    assert [p.address for p in combine.partitions] == [
+        "combine[0.0]",
+        "combine[0.1]",
+        "combine[0.2]",
+        "combine[0.3]",
+        "combine[1.0]",
+        "combine[1.1]",
+        "combine[2.0]",
+    ]
+    assert combine.bytes_out == len(b'"0123456789"')
+
+
+def test__invoke__when_a_group_fails():
+    def concatenate(strings):
+        strings = list(strings)
+        if "9" in strings:
+            raise ValueError("9 is not welcome")
+        return "".join(strings)
+
+    with pytest.raises(ValueError) as e:
+        invoke(_dag(concatenate))
+
+    assert str(e.value) == "Error when invoking node 'combine'. 9 is not welcome"
@@ -0,0 +1,77 @@
+import pickle
+from array import array
+
+import pytest
+
+from dagger.runtime.local import CompactPartitions, PartitionedOutput
+
+
+def test__from_iterable__stores_partitions_back_to_back():
+    partitions = CompactPartitions.from_iterable([b"1", b"", b"234"])
+    assert len(partitions) == 3
+    assert partitions.nbytes == 4
+    assert list(partitions) == [b"1", b"", b"234"]
+    assert all(isinstance(p, memoryview) for p in partitions)
+
+
+def test__from_iterable__accepts_any_bytes_like_partitions():
+    partitions = CompactPartitions.from_iterable(
+        p for p in [bytearray(b"1"), memoryview(b"23")]
+    )
+    assert list(partitions) == [b"1", b"23"]
+
+
+def test__from_iterable__reuses_compact_partitions():
+    partitions = CompactPartitions.from_iterable([b"1", b"2"])
+    assert CompactPartitions.from_iterable(partitions) is partitions
+    assert CompactPartitions.from_iterable(PartitionedOutput(partitions)) is partitions
+
+
+def test__from_iterable__without_partitions():
+    partitions = CompactPartitions.from_iterable([])
+    assert len(partitions) == 0
+    assert partitions.nbytes == 0
+    assert list(partitions) == []
+
+
+def test__init__with_invalid_offsets():
+    with pytest.raises(ValueError) as e:
+        CompactPartitions(b"123", array("Q", [0, 2]))
+
+    assert (
+        str(e.value)
+        == "The offsets of a compact buffer should start at 0 and end at the length of the buffer (3). Instead, we found [0] and [2]."
+    )
+
+
+def test__getitem__():
+    partitions = CompactPartitions.from_iterable([b"1", b"23", b"456"])
+    assert partitions[0] == b"1"
+    assert partitions[-1] == b"456"
+    assert partitions[1:] == [b"23", b"456"]
+
+    with pytest.raises(IndexError):
+        partitions[3]
+
+
+def test__getitem__does_not_copy_the_buffer():
+    partitions = CompactPartitions.from_iterable([b"1", b"23"])
+    assert partitions[1].obj is partitions[0].obj
+
+
+def test__pickle__roundtrip():
+    partitions = CompactPartitions.from_iterable([b"1", b"23"])
+    unpickled = pickle.loads(pickle.dumps(partitions))
+    assert isinstance(unpickled, CompactPartitions)
+    assert list(unpickled) == [b"1", b"23"]
+
+
+def test__pickle__with_a_memoryview_as_buffer():
+    partitions = CompactPartitions(memoryview(b"123"), array("Q", [0, 1, 3]))
+    unpickled = pickle.loads(pickle.dumps(PartitionedOutput(partitions)))
+    assert list(unpickled) == [b"1", b"23"]
+
+
+def test__repr__():
+    partitions = CompactPartitions.from_iterable([b"1", b"23"])
+    assert repr(partitions) == "CompactPartitions(partitions=2, nbytes=3)"
@@ -0,0 +1,171 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dagger.dag import DAG
+from dagger.hooks import Hooks, registered
+from dagger.input import FromNodeOutput, FromParam
+from dagger.output import FromReturnValue
+from dagger.runtime.local import invoke
+from dagger.serializer import SerializationError
+from dagger.task import Task
+
+
+class RecordEvents(Hooks):
+    def __init__(self):
+        self.events = []
+
+    def node_start(self, address):
+        self.events.append(("node_start", address))
+
+    def node_end(self, address, error):
+        self.events.append(("node_end", address, type(error).__name__))
+
+    def partition_start(self, address):
+        self.events.append(("partition_start", address))
+
+    def partition_end(self, address, error):
+        self.events.append(("partition_end", address, type(error).__name__))
+
+    def serialize_start(self, address, output_name):
+        self.events.append(("serialize_start", address, output_name))
+
+    def serialize_end(self, address, output_name, size, error):
+        self.events.append(("serialize_end", address, output_name, size))
+
+    def deserialize_start(self, address, input_name):
+        self.events.append(("deserialize_start", address, input_name))
+
+    def deserialize_end(self, address, input_name, size, error):
+        self.events.append(("deserialize_end", address, input_name, size))
+
+
+def _dag() -> DAG:
+    return DAG(
+        inputs=dict(n=FromParam()),
+        outputs=dict(total=FromNodeOutput("aggregate", "total")),
+        nodes=dict(
+            generate=Task(
+                lambda n: list(range(n)),
+                inputs=dict(n=FromParam()),
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            square=Task(
+                lambda number: number ** 2,
+                inputs=dict(number=FromNodeOutput("generate", "numbers")),
+                outputs=dict(squared=FromReturnValue()),
+                partition_by_input="number",
+            ),
+            aggregate=DAG(
+                inputs=dict(numbers=FromNodeOutput("square", "squared")),
+                outputs=dict(total=FromNodeOutput("sum", "total")),
+                nodes=dict(
+                    sum=Task(
+                        lambda numbers: sum(numbers),
+                        inputs=dict(numbers=FromParam()),
+                        outputs=dict(total=FromReturnValue()),
+                    ),
+                ),
+            ),
+        ),
+    )
+
+
+def test__invoke__calls_the_hooks_at_each_step():
+    hooks = RecordEvents()
+
+    with registered(hooks):
+        invoke(_dag(), params=dict(n=2))
+
+    assert hooks.events == [
+        ("node_start", "generate"),
+        ("partition_start", "generate"),
+        ("serialize_start", "generate", "numbers"),
+        ("serialize_end", "generate", "numbers", 2),
+        ("partition_end", "generate", "NoneType"),
+        ("node_end", "generate", "NoneType"),
+        ("node_start", "square"),
+        ("deserialize_start", "square", "number"),
+        ("deserialize_end", "square", "number", 1),
+        ("deserialize_start", "square", "number"),
+        ("deserialize_end", "square", "number", 1),
+        ("partition_start", "square[0]"),
+        ("serialize_start", "square[0]", "squared"),
+        ("serialize_end", "square[0]", "squared", 1),
+        ("partition_end", "square[0]", "NoneType"),
+        ("partition_start", "square[1]"),
+        ("serialize_start", "square[1]", "squared"),
+        ("serialize_end", "square[1]", "squared", 1),
+        ("partition_end", "square[1]", "NoneType"),
+        ("node_end", "square", "NoneType"),
+        ("node_start", "aggregate"),
+        ("deserialize_start", "aggregate", "numbers"),
+        ("deserialize_end", "aggregate", "numbers", 1),
+        ("deserialize_start", "aggregate", "numbers"),
+        ("deserialize_end", "aggregate", "numbers", 1),
+        ("node_start", "aggregate.sum"),
+        ("partition_start", "aggregate.sum"),
+        ("serialize_start", "aggregate.sum", "total"),
+        ("serialize_end", "aggregate.sum", "total", 1),
+        ("partition_end", "aggregate.sum", "NoneType"),
+        ("node_end", "aggregate.sum", "NoneType"),
+        ("node_end", "aggregate", "NoneType"),
+    ]
+
+
+def test__invoke__calls_the_hooks_from_the_executor_threads():
+    hooks = RecordEvents()
+
+    with registered(hooks):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            invoke(_dag(), params=dict(n=3), executor=executor)
+
+    for start, end in [
+        ("node_start", "node_end"),
+        ("partition_start", "partition_end"),
+        ("serialize_start", "serialize_end"),
+    ]:
+        started = sorted(e[1] for e in hooks.events if e[0] == start)
+        ended = sorted(e[1] for e in hooks.events if e[0] == end)
+        assert started == ended
+
+    assert ("partition_end", "square[2]", "NoneType") in hooks.events
+
+
+def test__invoke__notifies_the_nodes_that_failed():
+    def fail():
+        raise ValueError("failure")
+
+    dag = DAG(
+        nodes=dict(
+            fail=Task(fail, outputs=dict(x=FromReturnValue())),
+        ),
+    )
+    hooks = RecordEvents()
+
+    with registered(hooks):
+        with pytest.raises(ValueError):
+            invoke(dag)
+
+    assert hooks.events == [
+        ("node_start", "fail"),
+        ("partition_start", "fail"),
+        ("partition_end", "fail", "ValueError"),
+        ("node_end", "fail", "ValueError"),
+    ]
+
+
+def test__invoke__notifies_the_serialization_errors():
+    dag = DAG(
+        nodes=dict(
+            task=Task(lambda: object(), outputs=dict(x=FromReturnValue())),
+        ),
+    )
+    hooks = RecordEvents()
+
+    with registered(hooks):
+        with pytest.raises(SerializationError):
+            invoke(dag)
+
+    assert ("serialize_end", "task", "x", 0) in hooks.events
+    assert hooks.events[-1] == ("node_end", "task", "SerializationError")
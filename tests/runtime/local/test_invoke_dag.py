@@ -1,9 +1,25 @@
+import gc
+import os
+import tempfile
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List
+
 import pytest
 
+import dagger.runtime.local.dag as dag_module
 from dagger.dag import DAG
 from dagger.input import FromNodeOutput, FromParam
 from dagger.output import FromKey, FromReturnValue
-from dagger.runtime.local import invoke
+from dagger.runtime.local import (
+    LazyPartitions,
+    NodeCache,
+    SpillingOutputStore,
+    invoke,
+)
+from dagger.serializer import AsJSON, SerializationError
 from dagger.task import Task
 
 
@@ -202,3 +218,757 @@ def test__invoke_dag__with_partitions_but_invalid_outputs():
         str(e.value)
         == "Error when invoking node 'poorly-partitioned-task'. This node is supposed to be partitioned by input 'x'. When a node is partitioned, the value of the input that determines the partition should be an iterable. Instead, we found a value of type 'int'."
     )
+
+
+def test__invoke_dag__with_an_executor_runs_independent_nodes_concurrently():
+    # Both nodes wait for each other. If they ran sequentially, the barrier would time out
+    barrier = threading.Barrier(2, timeout=5)
+    dag = DAG(
+        {
+            "left": Task(lambda: barrier.wait(), outputs=dict(x=FromReturnValue())),
+            "right": Task(lambda: barrier.wait(), outputs=dict(x=FromReturnValue())),
+            "join": Task(
+                lambda left, right: sorted([left, right]),
+                inputs=dict(
+                    left=FromNodeOutput("left", "x"),
+                    right=FromNodeOutput("right", "x"),
+                ),
+                outputs=dict(x=FromReturnValue()),
+            ),
+        },
+        outputs=dict(x=FromNodeOutput("join", "x")),
+    )
+
+    with ThreadPoolExecutor(2) as executor:
+        assert invoke(dag, executor=executor) == dict(x=b"[0, 1]")
+
+
+def test__invoke_dag__with_an_executor_runs_partitions_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def wait_and_double(n):
+        barrier.wait()
+        return n * 2
+
+    dag = DAG(
+        {
+            "fan-out": Task(
+                lambda: [1, 2, 3],
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            "map": Task(
+                wait_and_double,
+                inputs=dict(n=FromNodeOutput("fan-out", "numbers")),
+                outputs=dict(n=FromReturnValue()),
+                partition_by_input="n",
+            ),
+            "reduce": Task(
+                lambda numbers: sum(numbers),
+                inputs=dict(numbers=FromNodeOutput("map", "n")),
+                outputs=dict(total=FromReturnValue()),
+            ),
+        },
+        outputs=dict(total=FromNodeOutput("reduce", "total")),
+    )
+
+    with ThreadPoolExecutor(3) as executor:
+        assert invoke(dag, executor=executor) == dict(total=b"12")
+
+
+def test__invoke_dag__with_an_executor_and_nested_dags_does_not_deadlock():
+    # A single worker would deadlock if the nested DAGs took it while waiting for their own tasks
+    def nested_dag():
+        return DAG(
+            {
+                "inner": Task(
+                    lambda x: x + 1,
+                    inputs=dict(x=FromParam()),
+                    outputs=dict(y=FromReturnValue()),
+                )
+            },
+            inputs=dict(x=FromParam()),
+            outputs=dict(y=FromNodeOutput("inner", "y")),
+        )
+
+    dag = DAG(
+        {
+            "first": nested_dag(),
+            "second": nested_dag(),
+            "sum": Task(
+                lambda a, b: a + b,
+                inputs=dict(
+                    a=FromNodeOutput("first", "y"),
+                    b=FromNodeOutput("second", "y"),
+                ),
+                outputs=dict(total=FromReturnValue()),
+            ),
+        },
+        inputs=dict(x=FromParam()),
+        outputs=dict(total=FromNodeOutput("sum", "total")),
+    )
+
+    with ThreadPoolExecutor(1) as executor:
+        assert invoke(dag, params=dict(x=1), executor=executor) == dict(total=b"4")
+
+
+@pytest.mark.parametrize("orchestrator_threads", [0, 1])
+def test__invoke_dag__with_an_executor_and_nested_dags_bounds_the_orchestrator_threads(
+    monkeypatch, orchestrator_threads
+):
+    monkeypatch.setattr(dag_module, "_MAX_ORCHESTRATOR_THREADS", orchestrator_threads)
+    existing_threads = set(threading.enumerate())
+    concurrent_orchestrators = []
+
+    def inner(x):
+        concurrent_orchestrators.append(
+            sum(
+                1
+                for t in threading.enumerate()
+                if t not in existing_threads and not t.name.startswith("worker")
+            )
+        )
+        return x + 1
+
+    def nested_dag():
+        return DAG(
+            {
+                "inner": Task(
+                    inner,
+                    inputs=dict(x=FromParam()),
+                    outputs=dict(y=FromReturnValue()),
+                )
+            },
+            inputs=dict(x=FromParam()),
+            outputs=dict(y=FromNodeOutput("inner", "y")),
+        )
+
+    dag = DAG(
+        {
+            "first": nested_dag(),
+            "second": nested_dag(),
+            "third": nested_dag(),
+        },
+        inputs=dict(x=FromParam()),
+        outputs=dict(y=FromNodeOutput("third", "y")),
+    )
+
+    with ThreadPoolExecutor(1, thread_name_prefix="worker") as executor:
+        assert invoke(dag, params=dict(x=1), executor=executor) == dict(y=b"2")
+
+    assert max(concurrent_orchestrators) <= orchestrator_threads
+
+
+def test__invoke_dag__with_an_executor_stops_nested_dags_when_another_node_fails(
+    monkeypatch,
+):
+    thread_errors = []
+    monkeypatch.setattr(threading, "excepthook", thread_errors.append)
+    started = threading.Event()
+    release = threading.Event()
+    invocations = []
+
+    def fail():
+        started.wait(5)
+        raise ValueError("failed")
+
+    dag = DAG(
+        {
+            "nested": DAG(
+                {
+                    "slow": Task(
+                        lambda: started.set() or release.wait(5),
+                        outputs=dict(x=FromReturnValue()),
+                    ),
+                    "after": Task(
+                        lambda x: invocations.append(x),
+                        inputs=dict(x=FromNodeOutput("slow", "x")),
+                    ),
+                }
+            ),
+            "fail": Task(fail),
+        }
+    )
+
+    with ThreadPoolExecutor(2) as executor:
+        with pytest.raises(ValueError):
+            invoke(dag, executor=executor)
+        release.set()
+
+    # Give the thread of the nested DAG a chance to submit the next node, if it were still running
+    time.sleep(0.1)
+    assert invocations == []
+    assert thread_errors == []
+
+
+def test__invoke_dag__with_an_executor_propagates_task_exceptions_extending_the_details():
+    dag = DAG(
+        nodes=dict(
+            square=Task(
+                lambda x: x ** 2,
+                inputs=dict(x=FromParam()),
+                outputs=dict(x_squared=FromKey("missing-key")),
+            ),
+        ),
+        inputs=dict(x=FromParam()),
+    )
+
+    with ThreadPoolExecutor(2) as executor:
+        with pytest.raises(TypeError) as e:
+            invoke(dag, params=dict(x=3), executor=executor)
+
+    assert str(e.value).startswith(
+        "Error when invoking node 'square'. We encountered the following error while attempting to serialize the results of this task"
+    )
+
+
+def test__invoke_dag__with_an_executor_starts_each_node_as_soon_as_its_dependencies_complete():
+    # "slow" only completes after "fast-child" has run. If "fast-child" waited
+    # for every node in the previous level (including "slow"), it would never run
+    fast_child_ran = threading.Event()
+    dag = DAG(
+        {
+            "slow": Task(
+                lambda: fast_child_ran.wait(timeout=5),
+                outputs=dict(x=FromReturnValue()),
+            ),
+            "fast": Task(lambda: 1, outputs=dict(x=FromReturnValue())),
+            "fast-child": Task(
+                lambda x: fast_child_ran.set(),
+                inputs=dict(x=FromNodeOutput("fast", "x")),
+            ),
+        },
+        outputs=dict(slow=FromNodeOutput("slow", "x")),
+    )
+
+    with ThreadPoolExecutor(2) as executor:
+        assert invoke(dag, executor=executor) == dict(slow=b"true")
+
+
+def test__invoke_dag__with_a_partitioned_node_without_partitions():
+    dag = DAG(
+        {
+            "fan-out": Task(
+                lambda: [],
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            "map": Task(
+                lambda n: n,
+                inputs=dict(n=FromNodeOutput("fan-out", "numbers")),
+                outputs=dict(n=FromReturnValue()),
+                partition_by_input="n",
+            ),
+            "reduce": Task(
+                lambda numbers: len(numbers),
+                inputs=dict(numbers=FromNodeOutput("map", "n")),
+                outputs=dict(n=FromReturnValue()),
+            ),
+        },
+        outputs=dict(n=FromNodeOutput("reduce", "n")),
+    )
+
+    assert invoke(dag) == dict(n=b"0")
+    with ThreadPoolExecutor(2) as executor:
+        assert invoke(dag, executor=executor) == dict(n=b"0")
+
+
+def _process_id_and_square(n):
+    return [os.getpid(), n ** 2]
+
+
+def test__invoke_dag__with_a_partition_executor_runs_partitions_in_worker_processes():
+    dag = DAG(
+        {
+            "fan-out": Task(
+                lambda: [1, 2, 3],
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            "map": Task(
+                _process_id_and_square,
+                inputs=dict(n=FromNodeOutput("fan-out", "numbers")),
+                outputs=dict(pid_and_n=FromReturnValue()),
+                partition_by_input="n",
+            ),
+            "reduce": Task(
+                lambda results: dict(
+                    ran_in_worker=all(pid != os.getpid() for pid, _ in results),
+                    numbers=[n for _, n in results],
+                ),
+                inputs=dict(results=FromNodeOutput("map", "pid_and_n")),
+                outputs=dict(
+                    ran_in_worker=FromKey("ran_in_worker"),
+                    numbers=FromKey("numbers"),
+                ),
+            ),
+        },
+        outputs=dict(
+            ran_in_worker=FromNodeOutput("reduce", "ran_in_worker"),
+            numbers=FromNodeOutput("reduce", "numbers"),
+        ),
+    )
+
+    with ProcessPoolExecutor(2) as partition_executor:
+        assert invoke(dag, partition_executor=partition_executor) == dict(
+            ran_in_worker=b"true",
+            numbers=b"[1, 4, 9]",
+        )
+
+
+def _split(n):
+    return [n, n + 1]
+
+
+def test__invoke_dag__with_an_executor_process_pool_returns_partitioned_outputs_from_worker_processes():
+    dag = DAG(
+        {
+            "split": Task(
+                _split,
+                inputs=dict(n=FromParam()),
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+        },
+        inputs=dict(n=FromParam()),
+        outputs=dict(numbers=FromNodeOutput("split", "numbers")),
+    )
+
+    with ProcessPoolExecutor(2) as executor:
+        outputs = invoke(dag, params=dict(n=1), executor=executor)
+
+    assert list(outputs["numbers"]) == [b"1", b"2"]
+
+
+def _one_two_three():
+    return [1, 2, 3]
+
+
+def _square(n):
+    return n ** 2
+
+
+def _fold_lazily(numbers):
+    return dict(
+        lazy=isinstance(numbers, LazyPartitions) and len(numbers) == 3,
+        total=sum(numbers) + sum(numbers),
+    )
+
+
+def _lazy_fan_in_dag() -> DAG:
+    return DAG(
+        {
+            "fan-out": Task(
+                _one_two_three,
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            "map": Task(
+                _square,
+                inputs=dict(n=FromNodeOutput("fan-out", "numbers")),
+                outputs=dict(n=FromReturnValue()),
+                partition_by_input="n",
+            ),
+            "reduce": Task(
+                _fold_lazily,
+                inputs=dict(numbers=FromNodeOutput("map", "n", lazy=True)),
+                outputs=dict(lazy=FromKey("lazy"), total=FromKey("total")),
+            ),
+        },
+        outputs=dict(
+            lazy=FromNodeOutput("reduce", "lazy"),
+            total=FromNodeOutput("reduce", "total"),
+        ),
+    )
+
+
+def test__invoke_dag__with_a_lazy_input_deserializes_partitions_while_the_node_iterates():
+    deserialized = []
+
+    class RecordingSerializer(AsJSON):
+        def deserialize(self, serialized_value):
+            deserialized.append(bytes(serialized_value))
+            return super().deserialize(serialized_value)
+
+    def fold(numbers):
+        assert deserialized == []
+        iterator = iter(numbers)
+        assert next(iterator) == 1
+        assert deserialized == [b"1"]
+        return sum(iterator)
+
+    dag = DAG(
+        {
+            "fan-out": Task(
+                lambda: [1, 2, 3],
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            "reduce": Task(
+                fold,
+                inputs=dict(
+                    numbers=FromNodeOutput(
+                        "fan-out",
+                        "numbers",
+                        serializer=RecordingSerializer(),
+                        lazy=True,
+                    )
+                ),
+                outputs=dict(rest=FromReturnValue()),
+            ),
+        },
+        outputs=dict(rest=FromNodeOutput("reduce", "rest")),
+    )
+
+    assert invoke(dag) == dict(rest=b"5")
+    assert deserialized == [b"1", b"2", b"3"]
+
+
+def test__invoke_dag__with_a_lazy_input_can_be_iterated_several_times():
+    assert invoke(_lazy_fan_in_dag()) == dict(lazy=b"true", total=b"28")
+
+
+def test__invoke_dag__with_a_lazy_input_in_worker_processes():
+    with ProcessPoolExecutor(2) as executor:
+        assert invoke(_lazy_fan_in_dag(), executor=executor) == dict(
+            lazy=b"true", total=b"28"
+        )
+
+
+class _NotSerializable:
+    def __init__(self, value):
+        self.value = value
+
+
+def _in_memory_dag() -> DAG:
+    return DAG(
+        {
+            "fan-out": Task(
+                lambda: [_NotSerializable(1), _NotSerializable(2)],
+                outputs=dict(objects=FromReturnValue(is_partitioned=True)),
+            ),
+            "map": Task(
+                lambda obj: _NotSerializable(obj.value * 10),
+                inputs=dict(obj=FromNodeOutput("fan-out", "objects")),
+                outputs=dict(obj=FromReturnValue()),
+                partition_by_input="obj",
+            ),
+            "nested": DAG(
+                {
+                    "reduce": Task(
+                        lambda objects: {
+                            "total": sum(o.value for o in objects),
+                            "same-type": all(
+                                isinstance(o, _NotSerializable) for o in objects
+                            ),
+                        },
+                        inputs=dict(objects=FromParam()),
+                        outputs=dict(
+                            total=FromKey("total"),
+                            same_type=FromKey("same-type"),
+                        ),
+                    ),
+                },
+                inputs=dict(objects=FromNodeOutput("map", "obj")),
+                outputs=dict(
+                    total=FromNodeOutput("reduce", "total"),
+                    same_type=FromNodeOutput("reduce", "same_type"),
+                ),
+            ),
+        },
+        outputs=dict(
+            total=FromNodeOutput("nested", "total"),
+            same_type=FromNodeOutput("nested", "same_type"),
+        ),
+    )
+
+
+def test__invoke_dag__without_serializing_intermediate_outputs():
+    dag = _in_memory_dag()
+
+    with pytest.raises(SerializationError):
+        invoke(dag)
+
+    assert invoke(dag, serialize_intermediate_outputs=False) == dict(
+        total=b"30",
+        same_type=b"true",
+    )
+
+
+def test__invoke_dag__without_serializing_intermediate_outputs_using_an_executor():
+    with ThreadPoolExecutor(2) as executor:
+        assert (
+            invoke(
+                _in_memory_dag(),
+                executor=executor,
+                serialize_intermediate_outputs=False,
+            )
+            == dict(total=b"30", same_type=b"true")
+        )
+
+
+def test__invoke_dag__without_serializing_intermediate_outputs_still_serializes_dag_outputs():
+    dag = DAG(
+        {
+            "fan-out": Task(
+                lambda: (1, 2),
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            "unserializable": Task(
+                lambda: _NotSerializable(1),
+                outputs=dict(obj=FromReturnValue()),
+            ),
+        },
+        outputs=dict(
+            numbers=FromNodeOutput("fan-out", "numbers"),
+            obj=FromNodeOutput("unserializable", "obj"),
+        ),
+    )
+
+    with pytest.raises(SerializationError) as e:
+        invoke(dag, serialize_intermediate_outputs=False)
+
+    assert str(e.value).startswith("Error when invoking node 'unserializable'.")
+
+    dag = DAG(
+        dag.nodes,
+        outputs=dict(numbers=FromNodeOutput("fan-out", "numbers")),
+    )
+    outputs = invoke(dag, serialize_intermediate_outputs=False)
+    assert list(outputs["numbers"]) == [b"1", b"2"]
+
+
+def test__invoke_dag__without_serializing_any_outputs():
+    outputs = invoke(
+        _in_memory_dag(),
+        serialize_intermediate_outputs=False,
+        serialize_outputs=False,
+    )
+
+    assert outputs == dict(total=30, same_type=True)
+
+
+def test__invoke_dag__without_serializing_its_outputs_but_serializing_intermediate_outputs():
+    with pytest.raises(ValueError) as e:
+        invoke(_in_memory_dag(), serialize_outputs=False)
+
+    assert (
+        str(e.value)
+        == "The outputs of a DAG can only be returned without serializing them when the outputs of its nodes are not serialized either. Please set serialize_intermediate_outputs=False together with serialize_outputs=False."
+    )
+
+
+def test__invoke_dag__releases_intermediate_outputs_after_their_last_consumer_retrieves_them():
+    references = []
+
+    def produce():
+        obj = _NotSerializable(1)
+        references.append(weakref.ref(obj))
+        return obj
+
+    def is_released(value):
+        gc.collect()
+        return references[0]() is None
+
+    dag = DAG(
+        {
+            "produce": Task(produce, outputs=dict(obj=FromReturnValue())),
+            "consume": Task(
+                lambda obj: obj.value,
+                inputs=dict(obj=FromNodeOutput("produce", "obj")),
+                outputs=dict(value=FromReturnValue()),
+            ),
+            "check": Task(
+                is_released,
+                inputs=dict(value=FromNodeOutput("consume", "value")),
+                outputs=dict(released=FromReturnValue()),
+            ),
+        },
+        outputs=dict(released=FromNodeOutput("check", "released")),
+    )
+
+    assert invoke(dag, serialize_intermediate_outputs=False) == dict(released=b"true")
+
+
+def test__invoke_dag__with_an_output_store_that_spills_intermediate_outputs():
+    dag = DAG(
+        inputs=dict(n=FromParam()),
+        outputs=dict(
+            total=FromNodeOutput("sum", "total"),
+            items=FromNodeOutput("generate", "items"),
+        ),
+        nodes=dict(
+            generate=Task(
+                lambda n: [{"n": i, "padding": "x" * 100} for i in range(n)],
+                inputs=dict(n=FromParam()),
+                outputs=dict(items=FromReturnValue(is_partitioned=True)),
+            ),
+            square=Task(
+                lambda item: item["n"] ** 2,
+                inputs=dict(item=FromNodeOutput("generate", "items")),
+                outputs=dict(n=FromReturnValue()),
+                partition_by_input="item",
+            ),
+            sum=Task(
+                lambda squares: sum(squares),
+                inputs=dict(squares=FromNodeOutput("square", "n")),
+                outputs=dict(total=FromReturnValue()),
+            ),
+        ),
+    )
+
+    with SpillingOutputStore(memory_budget=150) as store:
+        outputs = invoke(
+            dag,
+            params=dict(n=5),
+            executor=ThreadPoolExecutor(max_workers=2),
+            output_store=store,
+        )
+        assert store.bytes_in_memory == 0
+
+    assert outputs["total"] == b"30"
+    assert isinstance(outputs["total"], bytes)
+    assert all(isinstance(p, bytes) for p in outputs["items"])
+
+
+_extractions: List[int] = []
+
+
+def _extract(n):
+    _extractions.append(n)
+    return list(range(n))
+
+
+def test__invoke_dag__with_a_cache_only_invokes_the_tasks_that_changed():
+    def dag_with_transformation(transform) -> DAG:
+        return DAG(
+            inputs=dict(n=FromParam()),
+            outputs=dict(result=FromNodeOutput("transform", "result")),
+            nodes=dict(
+                extract=Task(
+                    _extract,
+                    inputs=dict(n=FromParam()),
+                    outputs=dict(numbers=FromReturnValue()),
+                ),
+                transform=Task(
+                    transform,
+                    inputs=dict(numbers=FromNodeOutput("extract", "numbers")),
+                    outputs=dict(result=FromReturnValue()),
+                ),
+            ),
+        )
+
+    _extractions.clear()
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = NodeCache(tmp)
+        assert (
+            invoke(
+                dag_with_transformation(lambda numbers: sum(numbers)),
+                params=dict(n=4),
+                cache=cache,
+            )
+            == dict(result=b"6")
+        )
+        assert (
+            invoke(
+                dag_with_transformation(lambda numbers: max(numbers)),
+                params=dict(n=4),
+                cache=cache,
+            )
+            == dict(result=b"3")
+        )
+
+    assert _extractions == [4]
+
+
+class _AsText:
+    """A serializer that only works with bytes, as custom serializers may do."""
+
+    extension = "txt"
+
+    def serialize(self, value):
+        return value.encode()
+
+    def deserialize(self, serialized_value):
+        return serialized_value.decode()
+
+    def __eq__(self, obj):
+        return isinstance(obj, _AsText)
+
+
+def test__invoke_dag__passes_bytes_to_serializers():
+    dag = DAG(
+        {
+            "fan-out": Task(
+                lambda: ["a", "b", "c"],
+                outputs=dict(
+                    letters=FromReturnValue(serializer=_AsText(), is_partitioned=True)
+                ),
+            ),
+            "upper": Task(
+                lambda letter: letter.upper(),
+                inputs=dict(letter=FromNodeOutput("fan-out", "letters", _AsText())),
+                outputs=dict(letter=FromReturnValue(serializer=_AsText())),
+                partition_by_input="letter",
+            ),
+            "join": Task(
+                lambda letters, lazy_letters: "".join(letters) + "".join(lazy_letters),
+                inputs=dict(
+                    letters=FromNodeOutput("upper", "letter", _AsText()),
+                    lazy_letters=FromNodeOutput(
+                        "upper", "letter", _AsText(), lazy=True
+                    ),
+                ),
+                outputs=dict(joined=FromReturnValue(serializer=_AsText())),
+            ),
+        },
+        outputs=dict(joined=FromNodeOutput("join", "joined", _AsText())),
+    )
+
+    assert invoke(dag) == dict(joined=b"ABCABC")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Spilled outputs are memory-mapped
+        with SpillingOutputStore(memory_budget=0, directory=tmp) as store:
+            assert invoke(dag, output_store=store) == dict(joined=b"ABCABC")
+
+
+class _AsTextFromBuffers(_AsText):
+    """A serializer that accepts any bytes-like object, and records the types it receives."""
+
+    accepts_buffers = True
+
+    def __init__(self, received_types):
+        self._received_types = received_types
+
+    def deserialize(self, serialized_value):
+        self._received_types.append(type(serialized_value))
+        return str(serialized_value, "utf-8")
+
+
+def test__invoke_dag__passes_views_to_serializers_that_accept_buffers():
+    received_types = []
+    serializer = _AsTextFromBuffers(received_types)
+    dag = DAG(
+        {
+            "fan-out": Task(
+                lambda: ["a", "b", "c"],
+                outputs=dict(
+                    letters=FromReturnValue(serializer=serializer, is_partitioned=True)
+                ),
+            ),
+            "upper": Task(
+                lambda letter: letter.upper(),
+                inputs=dict(letter=FromNodeOutput("fan-out", "letters", serializer)),
+                outputs=dict(letter=FromReturnValue(serializer=serializer)),
+                partition_by_input="letter",
+            ),
+            "join": Task(
+                lambda letters: "".join(letters),
+                inputs=dict(letters=FromNodeOutput("upper", "letter", serializer)),
+                outputs=dict(joined=FromReturnValue(serializer=serializer)),
+            ),
+        },
+        outputs=dict(joined=FromNodeOutput("join", "joined", serializer)),
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Spilled outputs are memory-mapped
+        with SpillingOutputStore(memory_budget=0, directory=tmp) as store:
+            assert invoke(dag, output_store=store) == dict(joined=b"ABC")
+
+    assert memoryview in received_types
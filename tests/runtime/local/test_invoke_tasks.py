@@ -1,3 +1,4 @@
+import asyncio
 import warnings
 
 import pytest
@@ -25,6 +26,43 @@ def test__invoke__task_with_single_input_and_output():
     assert invoke(task, params=dict(number=2)) == dict(doubled_number=b"4")
 
 
+def test__invoke__task_with_a_coroutine_function():
+    async def double(number):
+        await asyncio.sleep(0)
+        return number * 2
+
+    task = Task(
+        double,
+        inputs=dict(number=FromParam()),
+        outputs=dict(doubled_number=FromReturnValue()),
+    )
+    assert invoke(task, params=dict(number=2)) == dict(doubled_number=b"4")
+
+
+def test__invoke__task_with_a_coroutine_function_from_a_running_event_loop():
+    async def double(number):
+        return number * 2
+
+    task = Task(
+        double,
+        inputs=dict(number=FromParam()),
+        outputs=dict(doubled_number=FromReturnValue()),
+    )
+
+    async def invoke_from_the_loop():
+        return invoke(task, params=dict(number=2))
+
+    with warnings.catch_warnings():
+        # The coroutine is closed, so it never warns that it was not awaited
+        warnings.simplefilter("error")
+        with pytest.raises(RuntimeError) as e:
+            asyncio.run(invoke_from_the_loop())
+
+    assert str(e.value).startswith(
+        "The function of this task is a coroutine function, but it was invoked from a thread that is already running an event loop"
+    )
+
+
 def test__invoke__task_with_multiple_inputs_and_outputs():
     task = Task(
         lambda first_name, last_name: dict(
@@ -150,6 +188,32 @@ def test__invoke__task_with_partitioned_output_from_iterator():
     assert list(outputs["partitioned"]) == [b"1", b"0"]
 
 
+def test__invoke__returns_partitions_as_bytes():
+    task = Task(
+        lambda: range(3),
+        outputs={"partitioned": FromReturnValue(is_partitioned=True)},
+    )
+    outputs = invoke(task)
+
+    assert list(outputs["partitioned"]) == [b"0", b"1", b"2"]
+    assert all(isinstance(p, bytes) for p in outputs["partitioned"])
+
+
+def test__invoke__task_without_serializing_its_outputs():
+    value = object()
+    task = Task(
+        lambda: {"partitioned": range(2), "not_partitioned": value},
+        outputs={
+            "partitioned": FromKey("partitioned", is_partitioned=True),
+            "not_partitioned": FromKey("not_partitioned"),
+        },
+    )
+    outputs = invoke(task, serialize_outputs=False)
+
+    assert outputs["not_partitioned"] is value
+    assert list(outputs["partitioned"]) == [0, 1]
+
+
 def test__invoke__task_with_partitioned_output_that_cannot_be_partitioned():
     task = Task(
         lambda: 1,
@@ -0,0 +1,151 @@
+import os
+import tempfile
+
+import pytest
+
+import dagger.runtime.local.output_store as output_store_module
+from dagger.runtime.local import (
+    CompactPartitions,
+    PartitionedOutput,
+    SpillingOutputStore,
+)
+
+
+def test__init__with_a_negative_budget():
+    with pytest.raises(ValueError) as e:
+        SpillingOutputStore(memory_budget=-1)
+
+    assert (
+        str(e.value)
+        == "The memory budget of the output store must be a non-negative number of bytes. Instead, we found -1."
+    )
+
+
+def test__namespace__keeps_outputs_in_memory_within_the_budget():
+    with tempfile.TemporaryDirectory() as tmp:
+        with SpillingOutputStore(memory_budget=10, directory=tmp) as store:
+            outputs = store.new_namespace()
+            outputs["a"] = {"x": b"12345"}
+            outputs["b"] = {"y": b"67890"}
+
+            assert outputs["a"] == {"x": b"12345"}
+            assert isinstance(outputs["a"]["x"], bytes)
+            assert store.bytes_in_memory == 10
+            assert os.listdir(tmp) == []
+
+
+def test__namespace__spills_the_oldest_outputs_when_the_budget_is_exceeded():
+    with tempfile.TemporaryDirectory() as tmp:
+        with SpillingOutputStore(memory_budget=6, directory=tmp) as store:
+            outputs = store.new_namespace()
+            outputs["a"] = {"x": b"1234"}
+            outputs["b"] = {"y": b"5678"}
+
+            assert store.bytes_in_memory == 4
+            assert isinstance(outputs["a"]["x"], memoryview)
+            assert outputs["a"]["x"] == b"1234"
+            assert isinstance(outputs["b"]["y"], bytes)
+
+        assert os.listdir(tmp) == []
+
+
+def test__namespace__maps_each_spilled_output_once(monkeypatch):
+    mapped = []
+    original_memory_map = output_store_module._memory_map
+
+    def memory_map(path):
+        mapped.append(path)
+        return original_memory_map(path)
+
+    monkeypatch.setattr(output_store_module, "_memory_map", memory_map)
+
+    with SpillingOutputStore(memory_budget=0) as store:
+        outputs = store.new_namespace()
+        outputs["a"] = {"x": b"1234"}
+
+        assert outputs["a"]["x"] == b"1234"
+        assert outputs["a"]["x"] == b"1234"
+        assert len(mapped) == 1
+
+
+def test__namespace__spills_outputs_bigger_than_the_budget():
+    with SpillingOutputStore(memory_budget=0) as store:
+        outputs = store.new_namespace()
+        outputs["a"] = {"x": b"1234", "empty": b""}
+
+        assert store.bytes_in_memory == 0
+        assert outputs["a"] == {"x": b"1234", "empty": b""}
+
+
+def test__namespace__with_partitioned_executions_and_outputs():
+    with SpillingOutputStore(memory_budget=0) as store:
+        outputs = store.new_namespace()
+        outputs["a"] = PartitionedOutput(
+            [
+                {"x": b"1", "y": PartitionedOutput([b"2", b"3"])},
+                {"x": b"4", "y": PartitionedOutput([b"5"])},
+            ]
+        )
+
+        partitions = list(outputs["a"])
+        assert [p["x"] for p in partitions] == [b"1", b"4"]
+        assert [list(p["y"]) for p in partitions] == [[b"2", b"3"], [b"5"]]
+
+        # Each retrieval returns a new partitioned output
+        assert len(list(outputs["a"])) == 2
+
+
+def test__namespace__leaves_values_that_were_not_serialized_untouched():
+    value = {"not": "serialized"}
+    with SpillingOutputStore(memory_budget=0) as store:
+        outputs = store.new_namespace()
+        outputs["a"] = {"x": value}
+
+        assert outputs["a"]["x"] is value
+
+
+def test__namespace__frees_memory_and_disk_when_outputs_are_deleted():
+    with tempfile.TemporaryDirectory() as tmp:
+        with SpillingOutputStore(memory_budget=4, directory=tmp) as store:
+            outputs = store.new_namespace()
+            outputs["a"] = {"x": b"1234"}
+            outputs["b"] = {"x": b"5678"}
+            (spill_directory,) = os.listdir(tmp)
+            assert len(os.listdir(os.path.join(tmp, spill_directory))) == 1
+
+            del outputs["a"]
+            del outputs["b"]
+
+            assert store.bytes_in_memory == 0
+            assert os.listdir(os.path.join(tmp, spill_directory)) == []
+            assert len(outputs) == 0
+
+
+def test__namespaces_share_the_budget_of_the_store():
+    with SpillingOutputStore(memory_budget=4) as store:
+        outputs_1 = store.new_namespace()
+        outputs_2 = store.new_namespace()
+        outputs_1["a"] = {"x": b"1234"}
+        outputs_2["a"] = {"x": b"5678"}
+
+        assert store.bytes_in_memory == 4
+        assert isinstance(outputs_1["a"]["x"], memoryview)
+        assert outputs_2["a"]["x"] == b"5678"
+
+
+def test__namespace__stores_compact_partitions_as_a_single_value():
+    with tempfile.TemporaryDirectory() as tmp:
+        with SpillingOutputStore(memory_budget=0, directory=tmp) as store:
+            outputs = store.new_namespace()
+            outputs["a"] = {
+                "x": PartitionedOutput(
+                    CompactPartitions.from_iterable([b"1", b"23", b"456"])
+                )
+            }
+
+            (spill_directory,) = os.listdir(tmp)
+            assert len(os.listdir(os.path.join(tmp, spill_directory))) == 1
+            assert list(outputs["a"]["x"]) == [b"1", b"23", b"456"]
+
+            del outputs["a"]
+            assert os.listdir(os.path.join(tmp, spill_directory)) == []
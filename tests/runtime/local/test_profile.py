@@ -0,0 +1,117 @@
+import os
+import pstats
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dagger.dag import DAG
+from dagger.input import FromNodeOutput, FromParam
+from dagger.output import FromReturnValue
+from dagger.runtime.local import invoke
+from dagger.task import Task
+
+
+def _square(number):
+    return number ** 2
+
+
+def _dag(profile_sum: bool = False) -> DAG:
+    return DAG(
+        inputs=dict(n=FromParam()),
+        outputs=dict(total=FromNodeOutput("aggregate", "total")),
+        nodes=dict(
+            generate=Task(
+                lambda n: list(range(n)),
+                inputs=dict(n=FromParam()),
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            square=Task(
+                _square,
+                inputs=dict(number=FromNodeOutput("generate", "numbers")),
+                outputs=dict(squared=FromReturnValue()),
+                partition_by_input="number",
+            ),
+            aggregate=DAG(
+                inputs=dict(numbers=FromNodeOutput("square", "squared")),
+                outputs=dict(total=FromNodeOutput("sum", "total")),
+                nodes=dict(
+                    sum=Task(
+                        lambda numbers: sum(numbers),
+                        inputs=dict(numbers=FromParam()),
+                        outputs=dict(total=FromReturnValue()),
+                        runtime_options=dict(profile=profile_sum),
+                    ),
+                ),
+            ),
+        ),
+    )
+
+
+def test__invoke__profiles_the_nodes_selected():
+    with tempfile.TemporaryDirectory() as tmp:
+        invoke(
+            _dag(),
+            params=dict(n=2),
+            profile_dir=tmp,
+            profile_nodes=["square", "aggregate.sum"],
+        )
+
+        assert sorted(os.listdir(tmp)) == [
+            "aggregate.sum.pstats",
+            "square[0].pstats",
+            "square[1].pstats",
+        ]
+
+        stats = pstats.Stats(os.path.join(tmp, "square[1].pstats"))
+        profiled_functions = {func_name for _, _, func_name in stats.stats}
+        assert "_square" in profiled_functions
+        # Only the function of the task is profiled
+        assert "serialize" not in profiled_functions
+
+
+def test__invoke__profiles_the_nodes_marked_in_their_runtime_options():
+    with tempfile.TemporaryDirectory() as tmp:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            invoke(
+                _dag(profile_sum=True),
+                params=dict(n=2),
+                executor=executor,
+                profile_dir=tmp,
+            )
+
+        assert os.listdir(tmp) == ["aggregate.sum.pstats"]
+
+
+def test__invoke__does_not_profile_without_a_profile_dir():
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            invoke(_dag(profile_sum=True), params=dict(n=2))
+        finally:
+            os.chdir(cwd)
+
+        assert os.listdir(tmp) == []
+
+
+def test__invoke__a_task_on_its_own():
+    with tempfile.TemporaryDirectory() as tmp:
+        invoke(
+            Task(_square, inputs=dict(number=FromParam())),
+            params=dict(number=2),
+            profile_dir=tmp,
+            profile_nodes=[""],
+        )
+
+        assert os.listdir(tmp) == ["task.pstats"]
+
+
+def test__invoke__with_profile_nodes_but_no_profile_dir():
+    with pytest.raises(ValueError) as e:
+        invoke(_dag(), params=dict(n=2), profile_nodes=["square"])
+
+    assert (
+        str(e.value)
+        == "Profiling statistics are stored in a directory. Please supply a profile_dir together with the nodes to profile."
+    )
@@ -0,0 +1,276 @@
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dagger.dag import DAG
+from dagger.input import FromNodeOutput, FromParam
+from dagger.output import FromReturnValue
+from dagger.runtime.local import NodeCache, NodeReport, RunReport, invoke
+from dagger.task import Task
+
+
+def _slow_square(number):
+    time.sleep(0.01)
+    return number ** 2
+
+
+def _dag() -> DAG:
+    return DAG(
+        inputs=dict(n=FromParam()),
+        outputs=dict(total=FromNodeOutput("aggregate", "total")),
+        nodes=dict(
+            generate=Task(
+                lambda n: list(range(n)),
+                inputs=dict(n=FromParam()),
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            square=Task(
+                _slow_square,
+                inputs=dict(number=FromNodeOutput("generate", "numbers")),
+                outputs=dict(squared=FromReturnValue()),
+                partition_by_input="number",
+            ),
+            aggregate=DAG(
+                inputs=dict(numbers=FromNodeOutput("square", "squared")),
+                outputs=dict(total=FromNodeOutput("sum", "total")),
+                nodes=dict(
+                    sum=Task(
+                        lambda numbers: sum(numbers),
+                        inputs=dict(numbers=FromParam()),
+                        outputs=dict(total=FromReturnValue()),
+                    ),
+                ),
+            ),
+        ),
+    )
+
+
+def _nodes_by_address(report: RunReport):
+    return {node.address: node for node in report.nodes}
+
+
+def test__invoke__with_a_report():
+    report = RunReport()
+    assert invoke(_dag(), params=dict(n=3), report=report) == dict(total=b"5")
+
+    nodes = _nodes_by_address(report)
+    assert list(nodes) == ["generate", "square", "aggregate.sum", "aggregate"]
+
+    generate = nodes["generate"]
+    assert generate.bytes_in == 0
+    assert generate.bytes_out == 3
+    assert generate.func_time > 0
+    assert generate.partitions == []
+
+    square = nodes["square"]
+    assert [p.address for p in square.partitions] == [
+        "square[0]",
+        "square[1]",
+        "square[2]",
+    ]
+    assert square.bytes_in == 3
+    assert square.bytes_out == 3
+    assert [p.bytes_out for p in square.partitions] == [1, 1, 1]
+    assert all(p.func_time >= 0.01 for p in square.partitions)
+    assert square.func_time == sum(p.func_time for p in square.partitions)
+    assert square.wall_time >= square.func_time
+
+    assert nodes["aggregate.sum"].bytes_out == 1
+    assert nodes["aggregate"].bytes_in == 3
+    assert nodes["aggregate"].bytes_out == 1
+
+
+def test__invoke__with_a_report_and_an_executor():
+    report = RunReport()
+    invoke(
+        _dag(),
+        params=dict(n=3),
+        executor=ThreadPoolExecutor(max_workers=3),
+        report=report,
+    )
+
+    square = _nodes_by_address(report)["square"]
+    assert all(p.func_time >= 0.01 for p in square.partitions)
+    assert all(p.wall_time >= p.func_time for p in square.partitions)
+    assert square.cpu_time == sum(p.cpu_time for p in square.partitions)
+    assert square.serialize_time > 0
+    assert square.deserialize_time > 0
+
+
+def test__invoke__with_a_report_and_a_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = NodeCache(tmp)
+        invoke(_dag(), params=dict(n=2), cache=cache)
+
+        report = RunReport()
+        invoke(_dag(), params=dict(n=2), cache=cache, report=report)
+
+    nodes = _nodes_by_address(report)
+    assert nodes["generate"].reused
+    assert nodes["generate"].func_time == 0
+    assert all(p.reused for p in nodes["square"].partitions)
+
+
+def test__write_json():
+    report = RunReport()
+    invoke(_dag(), params=dict(n=1), report=report)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "report.json")
+        report.write_json(path)
+
+        with open(path) as f:
+            assert json.load(f) == report.to_dict()
+
+    assert [n["address"] for n in report.to_dict()["nodes"]] == [
+        "generate",
+        "square",
+        "aggregate.sum",
+        "aggregate",
+    ]
+
+
+def test__node_report__to_dict():
+    assert NodeReport(address="a", partitions=[NodeReport("a[0]")]).to_dict() == {
+        "address": "a",
+        "wall_time": 0.0,
+        "cpu_time": 0.0,
+        "func_time": 0.0,
+        "serialize_time": 0.0,
+        "deserialize_time": 0.0,
+        "bytes_in": 0,
+        "bytes_out": 0,
+        "reused": False,
+        "partitions": [
+            {
+                "address": "a[0]",
+                "wall_time": 0.0,
+                "cpu_time": 0.0,
+                "func_time": 0.0,
+                "serialize_time": 0.0,
+                "deserialize_time": 0.0,
+                "bytes_in": 0,
+                "bytes_out": 0,
+                "reused": False,
+                "partitions": [],
+                "peak_memory": None,
+                "allocation_sites": [],
+            }
+        ],
+        "peak_memory": None,
+        "allocation_sites": [],
+    }
+
+
+def _allocate(size):
+    return bytearray(size)
+
+
+def test__invoke__with_profile_memory():
+    dag = DAG(
+        nodes=dict(
+            allocate=Task(
+                lambda: len(_allocate(10 * 1024 * 1024)),
+                outputs=dict(size=FromReturnValue()),
+            ),
+            split=Task(
+                lambda: [1024 * 1024, 2 * 1024 * 1024],
+                outputs=dict(sizes=FromReturnValue(is_partitioned=True)),
+            ),
+            keep=Task(
+                lambda size: _allocate(size).decode(),
+                inputs=dict(size=FromNodeOutput("split", "sizes")),
+                outputs=dict(zeros=FromReturnValue()),
+                partition_by_input="size",
+            ),
+        ),
+    )
+    report = RunReport()
+
+    invoke(dag, report=report, profile_memory=True)
+
+    nodes = {n.address: n for n in report.nodes}
+    assert nodes["allocate"].peak_memory >= 10 * 1024 * 1024
+
+    keep = nodes["keep"]
+    assert keep.partitions[0].peak_memory >= 1024 * 1024
+    assert keep.partitions[1].peak_memory >= 2 * 1024 * 1024
+    assert keep.peak_memory == keep.partitions[1].peak_memory
+    assert keep.allocation_sites == keep.partitions[1].allocation_sites
+    assert keep.allocation_sites[0].size >= 2 * 1024 * 1024
+
+    assert not tracemalloc.is_tracing()
+
+
+def test__invoke__task_with_a_report():
+    report = RunReport()
+    task = Task(
+        lambda size: len(_allocate(size)),
+        inputs=dict(size=FromParam()),
+        outputs=dict(length=FromReturnValue()),
+    )
+
+    invoke(task, params=dict(size=1024 * 1024), report=report, profile_memory=True)
+
+    (node,) = report.nodes
+    assert node.address == ""
+    assert node.bytes_out == len(b"1048576")
+    assert node.wall_time >= node.func_time > 0
+    assert node.peak_memory >= 1024 * 1024
+
+
+def test__invoke__vectorized_task_with_a_report():
+    report = RunReport()
+    task = Task(
+        lambda numbers: [n ** 2 for n in numbers],
+        inputs=dict(numbers=FromNodeOutput("generate", "numbers")),
+        outputs=dict(squared=FromReturnValue()),
+        partition_by_input="numbers",
+        vectorized=True,
+    )
+
+    invoke(task, params=dict(numbers=[1, 2, 4]), report=report)
+
+    (node,) = report.nodes
+    assert [p.address for p in node.partitions] == ["[0]", "[1]", "[2]"]
+    assert node.bytes_out == len(b"1") + len(b"4") + len(b"16")
+    assert node.func_time == pytest.approx(sum(p.func_time for p in node.partitions))
+
+
+def test__invoke__without_profile_memory():
+    report = RunReport()
+
+    invoke(_dag(), params=dict(n=2), report=report)
+
+    assert all(n.peak_memory is None for n in report.nodes)
+    assert all(not n.allocation_sites for n in report.nodes)
+
+
+def test__invoke__with_profile_memory_but_no_report():
+    with pytest.raises(ValueError) as e:
+        invoke(_dag(), params=dict(n=2), profile_memory=True)
+
+    assert (
+        str(e.value)
+        == "Memory measurements are added to the report of the invocation. Please supply a report together with profile_memory=True."
+    )
+
+
+def test__invoke__with_a_report_and_outputs_passed_in_memory():
+    report = RunReport()
+
+    invoke(
+        _dag(),
+        params=dict(n=2),
+        serialize_intermediate_outputs=False,
+        report=report,
+    )
+
+    nodes = {n.address: n for n in report.nodes}
+    assert nodes["generate"].bytes_out == 0
+    assert nodes["aggregate"].bytes_out == 0
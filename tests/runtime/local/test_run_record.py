@@ -0,0 +1,243 @@
+import os
+import tempfile
+from typing import List
+
+import pytest
+
+import dagger.runtime.local.cache as cache_module
+import dagger.runtime.local.run_record as run_record_module
+from dagger.dag import DAG
+from dagger.input import FromNodeOutput, FromParam
+from dagger.output import FromReturnValue
+from dagger.runtime.local import NodeCache, NodeDecision, RunRecord, invoke
+from dagger.task import Task
+
+_invocations: List[str] = []
+
+
+def _extract(n):
+    _invocations.append("extract")
+    return list(range(n))
+
+
+def _square(number):
+    _invocations.append("square")
+    return number ** 2
+
+
+def _total(numbers):
+    _invocations.append("total")
+    return sum(numbers)
+
+
+def _maximum(numbers):
+    _invocations.append("maximum")
+    return max(numbers)
+
+
+def _concatenate(strings):
+    _invocations.append("concatenate")
+    return "".join(strings)
+
+
+def _dag(aggregate=_total) -> DAG:
+    return DAG(
+        inputs=dict(n=FromParam()),
+        outputs=dict(result=FromNodeOutput("report", "result")),
+        nodes=dict(
+            extract=Task(
+                _extract,
+                inputs=dict(n=FromParam()),
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            square=Task(
+                _square,
+                inputs=dict(number=FromNodeOutput("extract", "numbers")),
+                outputs=dict(squared=FromReturnValue()),
+                partition_by_input="number",
+            ),
+            report=DAG(
+                inputs=dict(numbers=FromNodeOutput("square", "squared")),
+                outputs=dict(result=FromNodeOutput("aggregate", "result")),
+                nodes=dict(
+                    aggregate=Task(
+                        aggregate,
+                        inputs=dict(numbers=FromParam()),
+                        outputs=dict(result=FromReturnValue()),
+                    ),
+                ),
+            ),
+        ),
+    )
+
+
+def test__invoke__with_a_run_record_but_no_cache():
+    with pytest.raises(ValueError) as e:
+        invoke(_dag(), params=dict(n=2), run_record=RunRecord("record.json"))
+
+    assert (
+        str(e.value)
+        == "Incremental runs need a cache to retrieve the outputs of the tasks that did not change since the previous run. Please supply a cache together with the run record."
+    )
+
+
+def test__invoke__only_invokes_the_tasks_that_changed_since_the_previous_run():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = NodeCache(os.path.join(tmp, "cache"))
+        record_path = os.path.join(tmp, "record.json")
+
+        _invocations.clear()
+        record = RunRecord(record_path)
+        assert invoke(_dag(), params=dict(n=3), cache=cache, run_record=record) == dict(
+            result=b"5"
+        )
+        assert sorted(_invocations) == [
+            "extract",
+            "square",
+            "square",
+            "square",
+            "total",
+        ]
+        assert record.decisions == {
+            "extract": NodeDecision(True, "It was not invoked in the previous run."),
+            "square[0]": NodeDecision(True, "It was not invoked in the previous run."),
+            "square[1]": NodeDecision(True, "It was not invoked in the previous run."),
+            "square[2]": NodeDecision(True, "It was not invoked in the previous run."),
+            "report.aggregate": NodeDecision(
+                True, "It was not invoked in the previous run."
+            ),
+        }
+
+        _invocations.clear()
+        record = RunRecord(record_path)
+        assert invoke(
+            _dag(_maximum), params=dict(n=3), cache=cache, run_record=record
+        ) == dict(result=b"4")
+        assert _invocations == ["maximum"]
+
+        unchanged = NodeDecision(
+            False,
+            "Its function, literal parameters and inputs did not change since the previous run.",
+        )
+        assert record.decisions == {
+            "extract": unchanged,
+            "square[0]": unchanged,
+            "square[1]": unchanged,
+            "square[2]": unchanged,
+            "report.aggregate": NodeDecision(
+                True, "Its function or literal parameters changed."
+            ),
+        }
+
+        _invocations.clear()
+        record = RunRecord(record_path)
+        assert invoke(
+            _dag(_maximum), params=dict(n=4), cache=cache, run_record=record
+        ) == dict(result=b"9")
+        assert sorted(_invocations) == ["extract", "maximum", "square"]
+        assert record.decisions["extract"] == NodeDecision(
+            True, "The following inputs changed: ['n']."
+        )
+        assert record.decisions["square[2]"] == unchanged
+        assert record.decisions["square[3]"] == NodeDecision(
+            True, "It was not invoked in the previous run."
+        )
+        assert record.decisions["report.aggregate"] == NodeDecision(
+            True, "The following inputs changed: ['numbers']."
+        )
+
+
+def test__invoke__when_the_outputs_are_no_longer_in_the_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = NodeCache(os.path.join(tmp, "cache"))
+        record_path = os.path.join(tmp, "record.json")
+
+        invoke(_dag(), params=dict(n=1), cache=cache, run_record=RunRecord(record_path))
+        cache.clear()
+
+        record = RunRecord(record_path)
+        invoke(_dag(), params=dict(n=1), cache=cache, run_record=record)
+        assert record.decisions["extract"] == NodeDecision(
+            True,
+            "Nothing changed since the previous run, but its outputs are no longer in the cache.",
+        )
+
+
+def test__invoke__records_the_tasks_completed_before_a_failure():
+    def fail(numbers):
+        raise ValueError("boom")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = NodeCache(os.path.join(tmp, "cache"))
+        record_path = os.path.join(tmp, "record.json")
+
+        with pytest.raises(ValueError):
+            invoke(
+                _dag(fail),
+                params=dict(n=2),
+                cache=cache,
+                run_record=RunRecord(record_path),
+            )
+
+        _invocations.clear()
+        record = RunRecord(record_path)
+        invoke(_dag(), params=dict(n=2), cache=cache, run_record=record)
+        assert _invocations == ["total"]
+        assert not record.decisions["extract"].invoked
+
+
+def _lazy_dag(combine_input=None) -> DAG:
+    return DAG(
+        outputs=dict(result=FromNodeOutput("concatenate", "result")),
+        nodes=dict(
+            generate=Task(
+                lambda: ["a", "b", "c"],
+                outputs=dict(strings=FromReturnValue(is_partitioned=True)),
+            ),
+            concatenate=Task(
+                _concatenate,
+                inputs=dict(strings=FromNodeOutput("generate", "strings", lazy=True)),
+                outputs=dict(result=FromReturnValue()),
+                combine_input=combine_input,
+                combine_group_size=2,
+            ),
+        ),
+    )
+
+
+def test__invoke__fingerprints_lazy_inputs_and_combiners():
+    for dag in [_lazy_dag(), _lazy_dag(combine_input="strings")]:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = NodeCache(os.path.join(tmp, "cache"))
+            record_path = os.path.join(tmp, "record.json")
+
+            invoke(dag, cache=cache, run_record=RunRecord(record_path))
+
+            _invocations.clear()
+            record = RunRecord(record_path)
+            assert invoke(dag, cache=cache, run_record=record) == dict(result=b'"abc"')
+            assert _invocations == []
+            assert all(not d.invoked for d in record.decisions.values())
+
+
+def test__invoke__fingerprints_each_task_once(monkeypatch):
+    fingerprinted = []
+
+    def fingerprint(task, params, input_hashes=None):
+        fingerprinted.append(task)
+        return original_fingerprint(task, params, input_hashes=input_hashes)
+
+    original_fingerprint = cache_module._fingerprint
+    monkeypatch.setattr(cache_module, "_fingerprint", fingerprint)
+    monkeypatch.setattr(run_record_module, "_fingerprint", fingerprint)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        invoke(
+            _dag(),
+            params=dict(n=3),
+            cache=NodeCache(os.path.join(tmp, "cache")),
+            run_record=RunRecord(os.path.join(tmp, "record.json")),
+        )
+
+    # extract, square (once per partition) and aggregate
+    assert len(fingerprinted) == 5
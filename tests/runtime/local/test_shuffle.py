@@ -0,0 +1,205 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from dagger.dag import DAG
+from dagger.input import FromNodeOutput
+from dagger.output import FromKey, FromReturnValue
+from dagger.runtime.local import (
+    RunReport,
+    invoke,
+    merge_key_groups,
+    split_into_key_groups,
+)
+from dagger.serializer import AsJSON
+from dagger.task import Task
+
+
+def _orders():
+    return [
+        [("ann", 1), ("bob", 2)],
+        [("ann", 3), ("cid", 4)],
+        [("bob", 5)],
+    ]
+
+
+def _identity(orders):
+    return orders
+
+
+def _totals(group):
+    return {customer: sum(amounts) for customer, amounts in group}
+
+
+def _merge(totals):
+    merged = {}
+    for t in totals:
+        merged.update(t)
+    return dict(sorted(merged.items()))
+
+
+def _shuffle_dag(key_groups: int = 3) -> DAG:
+    return DAG(
+        outputs=dict(totals=FromNodeOutput("merge", "totals")),
+        nodes=dict(
+            orders=Task(
+                _orders,
+                outputs=dict(orders=FromReturnValue(is_partitioned=True)),
+            ),
+            amounts=Task(
+                _identity,
+                inputs=dict(orders=FromNodeOutput("orders", "orders")),
+                outputs=dict(amounts=FromReturnValue(key_groups=key_groups)),
+                partition_by_input="orders",
+            ),
+            totals=Task(
+                _totals,
+                inputs=dict(group=FromNodeOutput("amounts", "amounts")),
+                outputs=dict(totals=FromReturnValue()),
+                partition_by_input="group",
+            ),
+            merge=Task(
+                _merge,
+                inputs=dict(totals=FromNodeOutput("totals", "totals")),
+                outputs=dict(totals=FromReturnValue()),
+            ),
+        ),
+    )
+
+
+#
+# split_into_key_groups / merge_key_groups
+#
+
+
+def test__split_into_key_groups():
+    groups = split_into_key_groups(
+        [("a", 1), ("b", 2), ("a", 3)],
+        serializer=AsJSON(),
+        key_groups=2,
+    )
+
+    assert len(groups) == 2
+    assert sorted(pair for group in groups for pair in group) == [
+        ("a", [1, 3]),
+        ("b", [2]),
+    ]
+
+
+def test__split_into_key_groups__from_a_mapping():
+    groups = split_into_key_groups(dict(a=1, b=2), serializer=AsJSON(), key_groups=1)
+
+    assert groups == [[("a", [1]), ("b", [2])]]
+
+
+def test__split_into_key_groups__assigns_keys_to_the_same_group_consistently():
+    first = split_into_key_groups(
+        [(str(i), i) for i in range(20)], serializer=AsJSON(), key_groups=4
+    )
+    second = split_into_key_groups(
+        [(str(i), -i) for i in reversed(range(20))], serializer=AsJSON(), key_groups=4
+    )
+
+    assert [sorted(k for k, _ in g) for g in first] == [
+        sorted(k for k, _ in g) for g in second
+    ]
+
+
+def test__split_into_key_groups__with_items_that_are_not_pairs():
+    with pytest.raises(TypeError) as e:
+        split_into_key_groups([1, 2], serializer=AsJSON(), key_groups=2)
+
+    assert (
+        str(e.value)
+        == "Keyed outputs should be mappings, or iterables of (key, value) pairs. Instead, we found an item of type 'int'."
+    )
+
+
+def test__merge_key_groups():
+    assert (
+        merge_key_groups(
+            [
+                [("a", [1]), ("b", [2])],
+                [["a", [3]]],
+                [],
+            ],
+            serializer=AsJSON(),
+        )
+        == [("a", [1, 3]), ("b", [2])]
+    )
+
+
+#
+# invoke
+#
+
+
+def test__invoke__shuffles_key_groups_between_partitioned_nodes():
+    assert invoke(_shuffle_dag()) == dict(
+        totals=b'{"ann": 4, "bob": 7, "cid": 4}',
+    )
+
+
+def test__invoke__shuffles_key_groups_in_memory():
+    assert invoke(_shuffle_dag(), serialize_intermediate_outputs=False) == dict(
+        totals=b'{"ann": 4, "bob": 7, "cid": 4}',
+    )
+
+
+def test__invoke__shuffles_key_groups_from_worker_processes():
+    with ProcessPoolExecutor(2) as executor:
+        outputs = invoke(_shuffle_dag(), executor=executor)
+
+    assert outputs == dict(totals=b'{"ann": 4, "bob": 7, "cid": 4}')
+
+
+def test__invoke__invokes_a_partition_per_key_group():
+    report = RunReport()
+    invoke(_shuffle_dag(key_groups=5), report=report)
+
+    totals = next(n for n in report.nodes if n.address == "totals")
+    assert len(totals.partitions) == 5
+
+
+def test__invoke__with_a_keyed_output_of_a_node_that_is_not_partitioned():
+    dag = DAG(
+        outputs=dict(counts=FromNodeOutput("merge", "counts")),
+        nodes=dict(
+            words=Task(
+                lambda: {"words": [("a", 1), ("b", 1), ("a", 1)]},
+                outputs=dict(words=FromKey("words", key_groups=2)),
+            ),
+            count=Task(
+                _totals,
+                inputs=dict(group=FromNodeOutput("words", "words")),
+                outputs=dict(counts=FromReturnValue()),
+                partition_by_input="group",
+            ),
+            merge=Task(
+                _merge,
+                inputs=dict(totals=FromNodeOutput("count", "counts")),
+                outputs=dict(counts=FromReturnValue()),
+            ),
+        ),
+    )
+
+    assert invoke(dag) == dict(counts=b'{"a": 2, "b": 1}')
+
+
+def test__invoke__with_a_keyed_output_that_is_not_a_mapping():
+    dag = DAG(
+        dict(
+            words=Task(
+                lambda: 3,
+                outputs=dict(words=FromReturnValue(key_groups=2)),
+            ),
+        )
+    )
+
+    with pytest.raises(TypeError) as e:
+        invoke(dag)
+
+    assert (
+        "Keyed outputs should be mappings, or iterables of (key, value) pairs"
+        in str(e.value)
+    )
@@ -1,4 +1,6 @@
-from collections.abc import Iterable, Iterator
+import pickle
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
@@ -20,3 +22,74 @@ def test__partitioned_output__is_iterable():
 
 def test__partitioned_output__representation():
     assert repr(PartitionedOutput([1, 2, 3])) == "[1, 2, 3]"
+
+
+def test__partitioned_output__can_be_iterated_several_times():
+    output = PartitionedOutput(map(lambda x: x * 2, [1, 2, 3]))
+
+    assert list(output) == [2, 4, 6]
+    assert list(output) == [2, 4, 6]
+
+
+def test__partitioned_output__supports_len_and_indexing():
+    output = PartitionedOutput([1, 2, 3])
+
+    assert isinstance(output, Sequence)
+    assert len(output) == 3
+    assert output[0] == 1
+    assert output[-1] == 3
+    assert list(output[1:]) == [2, 3]
+    assert isinstance(output[1:], PartitionedOutput)
+
+    with pytest.raises(IndexError):
+        output[3]
+
+
+def test__partitioned_output__consumes_lazy_iterables_only_as_needed():
+    consumed = []
+
+    def consume(x):
+        consumed.append(x)
+        return x
+
+    output = PartitionedOutput(map(consume, [1, 2, 3]))
+    assert consumed == []
+
+    assert output
+    assert consumed == [1]
+
+    assert output[1] == 2
+    assert consumed == [1, 2]
+
+    i, j = iter(output), iter(output)
+    assert next(i) == 1
+    assert next(j) == 1
+    assert consumed == [1, 2]
+
+    assert len(output) == 3
+    assert consumed == [1, 2, 3]
+    assert list(i) == [2, 3]
+    assert list(j) == [2, 3]
+
+
+def test__partitioned_output__empty():
+    output = PartitionedOutput(iter([]))
+
+    assert not output
+    assert len(output) == 0
+    assert list(output) == []
+
+
+def test__partitioned_output__can_be_shared_by_several_threads():
+    output = PartitionedOutput(iter(range(1000)))
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: list(output), range(8)))
+
+    assert all(r == list(range(1000)) for r in results)
+
+
+def test__partitioned_output__can_be_pickled():
+    output = PartitionedOutput(map(lambda x: x * 2, [1, 2, 3]))
+
+    assert list(pickle.loads(pickle.dumps(output))) == [2, 4, 6]
@@ -0,0 +1,221 @@
+import asyncio
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List
+
+import pytest
+
+from dagger.dag import DAG
+from dagger.input import FromNodeOutput, FromParam
+from dagger.output import FromKey, FromReturnValue
+from dagger.runtime.local import (
+    NodeCache,
+    PartitionedOutput,
+    RunReport,
+    ainvoke,
+    invoke,
+)
+from dagger.task import Task
+
+_BATCHES: List[List[int]] = []
+
+
+def _powers(numbers, exponent):
+    return [n ** exponent for n in numbers]
+
+
+def _recorded_powers(numbers, exponent):
+    # The cache fingerprints the values bound to a function, so the batches are recorded outside of it
+    _BATCHES.append(numbers)
+    return [n ** exponent for n in numbers]
+
+
+def _dag(
+    powers=_powers,
+    n_partitions: int = 5,
+    partitions_per_worker: int = 2,
+) -> DAG:
+    return DAG(
+        inputs=dict(exponent=FromParam()),
+        outputs=dict(results=FromNodeOutput("reduce", "results")),
+        nodes=dict(
+            generate=Task(
+                lambda: list(range(n_partitions)),
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            power=Task(
+                powers,
+                inputs=dict(
+                    numbers=FromNodeOutput("generate", "numbers"),
+                    exponent=FromParam(),
+                ),
+                outputs=dict(result=FromReturnValue()),
+                partition_by_input="numbers",
+                partitions_per_worker=partitions_per_worker,
+                vectorized=True,
+            ),
+            reduce=Task(
+                lambda results: list(results),
+                inputs=dict(results=FromNodeOutput("power", "result")),
+                outputs=dict(results=FromReturnValue()),
+            ),
+        ),
+    )
+
+
+def test__invoke__calls_the_function_once_per_batch():
+    batches = []
+
+    def powers(numbers, exponent):
+        batches.append(numbers)
+        return [n ** exponent for n in numbers]
+
+    assert invoke(_dag(powers), params=dict(exponent=2)) == dict(
+        results=b"[0, 1, 4, 9, 16]"
+    )
+    assert batches == [[0, 1], [2, 3], [4]]
+
+
+def test__invoke__with_an_executor():
+    with ThreadPoolExecutor(2) as executor:
+        outputs = invoke(_dag(), params=dict(exponent=3), executor=executor)
+
+    assert outputs == dict(results=b"[0, 1, 8, 27, 64]")
+
+
+def test__invoke__with_a_partition_executor_process_pool():
+    with ProcessPoolExecutor(2) as partition_executor:
+        outputs = invoke(
+            _dag(),
+            params=dict(exponent=2),
+            partition_executor=partition_executor,
+        )
+
+    assert outputs == dict(results=b"[0, 1, 4, 9, 16]")
+
+
+def test__invoke__with_several_outputs_per_partition():
+    dag = DAG(
+        outputs=dict(
+            squares=FromNodeOutput("reduce", "squares"),
+            cubes=FromNodeOutput("reduce", "cubes"),
+        ),
+        nodes=dict(
+            generate=Task(
+                lambda: [1, 2, 3],
+                outputs=dict(numbers=FromReturnValue(is_partitioned=True)),
+            ),
+            power=Task(
+                lambda numbers: [dict(square=n ** 2, cube=n ** 3) for n in numbers],
+                inputs=dict(numbers=FromNodeOutput("generate", "numbers")),
+                outputs=dict(square=FromKey("square"), cube=FromKey("cube")),
+                partition_by_input="numbers",
+                partitions_per_worker=10,
+                vectorized=True,
+            ),
+            reduce=Task(
+                lambda squares, cubes: dict(squares=squares, cubes=cubes),
+                inputs=dict(
+                    squares=FromNodeOutput("power", "square"),
+                    cubes=FromNodeOutput("power", "cube"),
+                ),
+                outputs=dict(squares=FromKey("squares"), cubes=FromKey("cubes")),
+            ),
+        ),
+    )
+
+    assert invoke(dag) == dict(squares=b"[1, 4, 9]", cubes=b"[1, 8, 27]")
+
+
+def test__invoke__with_a_report_measures_each_partition():
+    report = RunReport()
+    invoke(_dag(), params=dict(exponent=2), report=report)
+
+    (_, power_report, _) = report.nodes
+    assert [p.address for p in power_report.partitions] == [
+        f"power[{i}]" for i in range(5)
+    ]
+    assert [p.bytes_out for p in power_report.partitions] == [1, 1, 1, 1, 2]
+
+
+def test__invoke__with_a_cache_only_calls_the_function_with_new_partitions():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = NodeCache(cache_dir)
+        invoke(
+            _dag(_recorded_powers, n_partitions=3),
+            params=dict(exponent=2),
+            cache=cache,
+        )
+        _BATCHES.clear()
+
+        outputs = invoke(
+            _dag(_recorded_powers, n_partitions=4),
+            params=dict(exponent=2),
+            cache=cache,
+        )
+
+    assert outputs == dict(results=b"[0, 1, 4, 9]")
+    assert _BATCHES == [[3]]
+
+
+def test__invoke__when_the_function_returns_fewer_results_than_partitions():
+    with pytest.raises(TypeError) as e:
+        invoke(_dag(lambda numbers, exponent: [1]), params=dict(exponent=2))
+
+    assert (
+        str(e.value)
+        == "Error when invoking node 'power'. Vectorized tasks should return one result per partition they receive. Instead, the function received 2 partitions and returned 1 results."
+    )
+
+
+def test__invoke__when_the_function_does_not_return_a_sequence():
+    with pytest.raises(TypeError) as e:
+        invoke(_dag(lambda numbers, exponent: 1), params=dict(exponent=2))
+
+    assert (
+        str(e.value)
+        == "Error when invoking node 'power'. Vectorized tasks should return a sequence with one result per partition they receive (e.g. a list or an array). Instead, the function returned a value of type 'int'."
+    )
+
+
+def test__invoke__task_on_its_own():
+    task = Task(
+        _powers,
+        inputs=dict(numbers=FromNodeOutput("x", "y"), exponent=FromParam()),
+        outputs=dict(result=FromReturnValue()),
+        partition_by_input="numbers",
+        vectorized=True,
+    )
+
+    outputs = invoke(task, params=dict(numbers=[1, 2, 3], exponent=2))
+
+    assert isinstance(outputs["result"], PartitionedOutput)
+    assert list(outputs["result"]) == [b"1", b"4", b"9"]
+
+
+def test__ainvoke__calls_the_function_once_per_batch():
+    batches = []
+
+    def powers(numbers, exponent):
+        batches.append(numbers)
+        return [n ** exponent for n in numbers]
+
+    outputs = asyncio.run(ainvoke(_dag(powers), params=dict(exponent=2)))
+
+    assert outputs == dict(results=b"[0, 1, 4, 9, 16]")
+    assert sorted(batches) == [[0, 1], [2, 3], [4]]
+
+
+def test__ainvoke__task_on_its_own():
+    task = Task(
+        _powers,
+        inputs=dict(numbers=FromNodeOutput("x", "y"), exponent=FromParam()),
+        outputs=dict(result=FromReturnValue()),
+        partition_by_input="numbers",
+        vectorized=True,
+    )
+
+    outputs = asyncio.run(ainvoke(task, params=dict(numbers=[1, 2], exponent=3)))
+
+    assert isinstance(outputs["result"], PartitionedOutput)
+    assert list(outputs["result"]) == [b"1", b"8"]
@@ -1,8 +1,10 @@
+import io
+
 import pytest
 
 from dagger.serializer.as_json import AsJSON
 from dagger.serializer.errors import DeserializationError, SerializationError
-from dagger.serializer.protocol import Serializer
+from dagger.serializer.protocol import Serializer, StreamingSerializer
 
 
 def test__conforms_to_protocol():
@@ -64,3 +66,36 @@ def test_deserialization__with_invalid_values():
     for value in invalid_values:
         with pytest.raises(DeserializationError):
             serializer.deserialize(value)
+
+
+def test_deserialization__from_a_memoryview():
+    serializer = AsJSON()
+    assert serializer.deserialize(memoryview(b'{"a": [1, 2]}')) == {"a": [1, 2]}
+
+
+def test__conforms_to_streaming_protocol():
+    assert isinstance(AsJSON(), StreamingSerializer)
+
+
+def test_serialization_and_deserialization__with_streams():
+    serializer = AsJSON(indent=2)
+    value = {"object": {"with": ["nested", "values", "ñ"]}}
+
+    stream = io.BytesIO()
+    serializer.serialize_to(value, stream)
+    assert stream.getvalue() == serializer.serialize(value)
+
+    # The stream still belongs to the caller
+    assert not stream.closed
+    stream.seek(0)
+    assert serializer.deserialize_from(stream) == value
+
+
+def test_serialization_to_a_stream__with_invalid_values():
+    with pytest.raises(SerializationError):
+        AsJSON().serialize_to(float("nan"), io.BytesIO())
+
+
+def test_deserialization_from_a_stream__with_invalid_values():
+    with pytest.raises(DeserializationError):
+        AsJSON().deserialize_from(io.BytesIO(b"{not json"))
@@ -1,8 +1,10 @@
+import io
+
 import pytest
 
 from dagger.serializer.as_pickle import AsPickle
 from dagger.serializer.errors import DeserializationError, SerializationError
-from dagger.serializer.protocol import Serializer
+from dagger.serializer.protocol import Serializer, StreamingSerializer
 
 
 def test__conforms_to_protocol():
@@ -68,3 +70,35 @@ def test_deserialization__with_invalid_values():
     for value in invalid_values:
         with pytest.raises(DeserializationError):
             serializer.deserialize(value)
+
+
+def test_deserialization__from_a_memoryview():
+    serializer = AsPickle()
+    value = {"a": [1, 2]}
+    assert serializer.deserialize(memoryview(serializer.serialize(value))) == value
+
+
+def test__conforms_to_streaming_protocol():
+    assert isinstance(AsPickle(), StreamingSerializer)
+
+
+def test_serialization_and_deserialization__with_streams():
+    serializer = AsPickle()
+    value = {"python", "set"}
+
+    stream = io.BytesIO()
+    serializer.serialize_to(value, stream)
+    assert stream.getvalue() == serializer.serialize(value)
+
+    stream.seek(0)
+    assert serializer.deserialize_from(stream) == value
+
+
+def test_serialization_to_a_stream__with_invalid_values():
+    with pytest.raises(SerializationError):
+        AsPickle().serialize_to(lambda: 1, io.BytesIO())
+
+
+def test_deserialization_from_a_stream__with_invalid_values():
+    with pytest.raises(DeserializationError):
+        AsPickle().deserialize_from(io.BytesIO(b"arbitrary byte string"))
@@ -1,10 +1,11 @@
 from itertools import combinations
+from typing import Any, Dict
 
 import pytest
 
 from dagger.input import FromNodeOutput, FromParam
 from dagger.output import FromKey, FromReturnValue
-from dagger.serializer import DefaultSerializer
+from dagger.serializer import AsPickle, DefaultSerializer
 from dagger.task import Task
 
 #
@@ -141,6 +142,99 @@ def test__init__with_partitioned_node_with_partitioned_output():
     )
 
 
+def test__init__with_partitioned_node_with_keyed_output():
+    task = Task(
+        lambda n: {n: 1},
+        inputs={
+            "n": FromNodeOutput("fan-out", "nums"),
+        },
+        outputs={
+            "counts": FromReturnValue(key_groups=4),
+        },
+        partition_by_input="n",
+    )
+
+    assert task.outputs["counts"].key_groups == 4
+
+
+def _combiner(**kwargs) -> Task:
+    options: Dict[str, Any] = dict(
+        inputs={"values": FromNodeOutput("map", "value")},
+        outputs={"total": FromReturnValue()},
+        combine_input="values",
+    )
+    options.update(kwargs)
+    return Task(lambda values: sum(values), **options)
+
+
+def test__init__combining_a_nonexistent_input():
+    with pytest.raises(ValueError) as e:
+        _combiner(combine_input="other")
+
+    assert (
+        str(e.value)
+        == "This node combines the partitions of 'other'. However, 'other' is not an input of the node. The available inputs are ['values']."
+    )
+
+
+def test__init__combining_a_param():
+    with pytest.raises(ValueError) as e:
+        _combiner(inputs={"values": FromParam()})
+
+    assert (
+        str(e.value)
+        == "Nodes may not combine the partitions of an input that comes from a parameter. Combiners reduce the partitions of the output of another node."
+    )
+
+
+def test__init__with_a_partitioned_combiner():
+    with pytest.raises(ValueError) as e:
+        _combiner(partition_by_input="values")
+
+    assert (
+        str(e.value)
+        == "Combiners may not be partitioned. A combiner reduces all the partitions of its input into a single value."
+    )
+
+
+def test__init__with_a_combine_group_size_too_small():
+    with pytest.raises(ValueError) as e:
+        _combiner(combine_group_size=1)
+
+    assert (
+        str(e.value)
+        == "Combiners need to combine at least 2 values on each invocation. Instead, the group size was 1."
+    )
+
+
+@pytest.mark.parametrize(
+    "outputs",
+    [
+        {},
+        {"a": FromReturnValue(), "b": FromReturnValue()},
+        {"a": FromKey("a")},
+        {"a": FromReturnValue(is_partitioned=True)},
+    ],
+)
+def test__init__with_a_combiner_with_invalid_outputs(outputs):
+    with pytest.raises(ValueError) as e:
+        _combiner(outputs=outputs)
+
+    assert (
+        str(e.value)
+        == "Combiners must have a single output, taken from the return value of their function (and not partitioned), since the results of each group of partitions are combined again."
+    )
+
+
+def test__init__with_a_combiner_with_different_serializers():
+    with pytest.raises(ValueError) as e:
+        _combiner(outputs={"total": FromReturnValue(serializer=AsPickle())})
+
+    assert str(e.value).startswith(
+        "The output of a combiner is read back as one of the values of 'values', so both need to use the same serializer."
+    )
+
+
 #
 # Properties
 #
@@ -193,6 +287,80 @@ def test__partition_by_input():
     )
 
 
+def test__combine_input():
+    assert Task(lambda: 1).combine_input is None
+
+    task = _combiner(combine_group_size=4)
+    assert task.combine_input == "values"
+    assert task.combine_group_size == 4
+
+
+def test__partitions_per_worker():
+    assert Task(lambda: 1).partitions_per_worker == 1
+    assert (
+        Task(
+            lambda x: 1,
+            inputs={"x": FromNodeOutput("a", "b")},
+            partition_by_input="x",
+            partitions_per_worker=8,
+        ).partitions_per_worker
+        == 8
+    )
+
+
+def test__init__with_no_partitions_per_worker():
+    with pytest.raises(ValueError) as e:
+        Task(
+            lambda x: 1,
+            inputs={"x": FromNodeOutput("a", "b")},
+            partition_by_input="x",
+            partitions_per_worker=0,
+        )
+
+    assert (
+        str(e.value)
+        == "Partitioned tasks need to invoke at least 1 partition per worker. Instead, they were declared with 0 partitions per worker."
+    )
+
+
+def test__init__with_partitions_per_worker_but_not_partitioned():
+    with pytest.raises(ValueError) as e:
+        Task(
+            lambda x: 1,
+            inputs={"x": FromNodeOutput("a", "b")},
+            partitions_per_worker=4,
+        )
+
+    assert (
+        str(e.value)
+        == "This task invokes 4 partitions per worker. However, it is not partitioned. Only tasks declared with a partition_by_input may invoke their partitions in batches."
+    )
+
+
+def test__vectorized():
+    assert not Task(lambda: 1).vectorized
+    assert Task(
+        lambda x: 1,
+        inputs={"x": FromNodeOutput("a", "b")},
+        partition_by_input="x",
+        vectorized=True,
+    ).vectorized
+
+
+def test__init__vectorized_but_not_partitioned():
+    with pytest.raises(ValueError) as e:
+        Task(
+            lambda x: 1,
+            inputs={"x": FromNodeOutput("a", "b")},
+            vectorized=True,
+        )
+
+    assert (
+        str(e.value)
+        == "Only partitioned tasks may be vectorized. A vectorized task receives the values of a batch of partitions of the input it is partitioned by."
+    )
+
+
 def test__eq():
     def f(**kwargs):
         return 11
@@ -222,6 +390,69 @@ def test__eq():
     assert all(x != y for x, y in combinations(different, 2))
 
 
+def test__eq__with_combiners():
+    def f(values):
+        return sum(values)
+
+    inputs = {"values": FromNodeOutput("map", "value")}
+    outputs = {"total": FromReturnValue()}
+
+    same = [
+        Task(f, inputs=inputs, outputs=outputs, combine_input="values")
+        for i in range(3)
+    ]
+    different = [
+        Task(f, inputs=inputs, outputs=outputs, combine_input="values"),
+        Task(f, inputs=inputs, outputs=outputs),
+        Task(
+            f,
+            inputs=inputs,
+            outputs=outputs,
+            combine_input="values",
+            combine_group_size=4,
+        ),
+    ]
+
+    assert all(x == y for x, y in combinations(same, 2))
+    assert all(x != y for x, y in combinations(different, 2))
+
+
+def test__eq__with_partitions_per_worker():
+    def f(n):
+        return n
+
+    inputs = {"n": FromNodeOutput("generate", "numbers")}
+    outputs = {"n": FromReturnValue()}
+
+    assert Task(f, inputs=inputs, outputs=outputs, partition_by_input="n") == Task(
+        f, inputs=inputs, outputs=outputs, partition_by_input="n"
+    )
+    assert Task(f, inputs=inputs, outputs=outputs, partition_by_input="n") != Task(
+        f,
+        inputs=inputs,
+        outputs=outputs,
+        partition_by_input="n",
+        partitions_per_worker=2,
+    )
+
+
+def test__eq__vectorized():
+    def f(n):
+        return n
+
+    inputs = {"n": FromNodeOutput("generate", "numbers")}
+    outputs = {"n": FromReturnValue()}
+
+    assert Task(
+        f, inputs=inputs, outputs=outputs, partition_by_input="n", vectorized=True
+    ) == Task(
+        f, inputs=inputs, outputs=outputs, partition_by_input="n", vectorized=True
+    )
+    assert Task(
+        f, inputs=inputs, outputs=outputs, partition_by_input="n", vectorized=True
+    ) != Task(f, inputs=inputs, outputs=outputs, partition_by_input="n")
+
+
 def test__representation():
     def f(a):
         pass
@@ -240,5 +471,5 @@ def test__representation():
 
     assert (
         repr(task)
-        == f"Task(func={f}, inputs={{'a': {input_a}}}, outputs={{'b': {output_b}}}, runtime_options={{'my': 'options'}}, partition_by_input=a)"
+        == f"Task(func={f}, inputs={{'a': {input_a}}}, outputs={{'b': {output_b}}}, runtime_options={{'my': 'options'}}, partition_by_input=a, combine_input=None, combine_group_size=16, partitions_per_worker=1, vectorized=False)"
     )